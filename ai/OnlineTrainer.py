@@ -2,7 +2,8 @@
 import logging
 
 import numpy as np
-from sklearn.ensemble import GradientBoostingClassifier
+
+from models.np_runtime import runtime_choice, runtime_path, try_load_runtime
 
 
 class OnlineTrainer:
@@ -11,8 +12,12 @@ class OnlineTrainer:
         n_features=5,
         model_path="onlinetrainer_model.pkl",
         max_buffer=1000,
+        runtime=None,
     ):
-        self.model = GradientBoostingClassifier()
+        # "native" (joblib) albo "numpy" (eksport np_runtime – bez importu
+        # biblioteki treningowej); domyślnie MODEL_RUNTIME
+        self.runtime = runtime_choice(runtime)
+        self.model = None
         self.X = []
         self.y = []
         self.n_features = n_features
@@ -21,6 +26,13 @@ class OnlineTrainer:
         self.drift_history = []
         self.max_buffer = max_buffer
         self.load_model()
+        if self.model is None:
+            self.model = self._new_model()
+
+    def _new_model(self):
+        from sklearn.ensemble import GradientBoostingClassifier
+
+        return GradientBoostingClassifier()
 
     def add_sample(self, features, label):
         self.X.append(features)
@@ -46,6 +58,8 @@ class OnlineTrainer:
     def update_model(self):
         import joblib
 
+        from models.model_export import export_quietly
+
         X_np = np.array(self.X)
         y_np = np.array(self.y)
         if len(np.unique(y_np)) < 2:
@@ -53,14 +67,21 @@ class OnlineTrainer:
                 "OnlineTrainer: not enough class diversity for training."
             )
             return
+        if not hasattr(self.model, "fit"):
+            self.model = self._new_model()  # eksport służy tylko do predykcji
         self.model.fit(X_np, y_np)
         joblib.dump(self.model, self.model_path)
+        export_quietly(self.model, runtime_path(self.model_path))
         logging.info(
             "OnlineTrainer: model updated and saved with %d samples",
             len(self.X),
         )
 
     def load_model(self):
+        if self.runtime == "numpy":
+            self.model = try_load_runtime(self.model_path)
+            if self.model is not None:
+                return
         import joblib
 
         try:
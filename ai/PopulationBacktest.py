@@ -0,0 +1,294 @@
+# PopulationBacktest.py – ocena całej populacji genomów jednym przebiegiem
+"""
+PopulationBacktest: batched genome evaluation with the population as a
+NumPy axis.
+
+Zamiast backtestu genom po genomie:
+- IndicatorCache liczy każdy wskaźnik raz na odrębną długość okna
+  (SMA/std Bollingera, RSI, EMA, momentum, średni wolumen) i współdzieli
+  go między genomami o tym samym oknie,
+- sygnały wszystkich genomów powstają w jednym przebiegu na macierzach
+  (P, T) – wiersze wskaźników wybierane indeksami, progi jako kolumny
+  (P, 1) nadawane na oś czasu,
+- zdarzenia (wejście long/short, wyjście) zamieniane są na pozycje
+  wektorowym forward-fill, a PnL, drawdown i sharpe liczone dla całej
+  populacji naraz.
+
+Reguły sygnałów odpowiadają analyze() MeanReversionStrategy i
+MomentumStrategy wywoływanemu świeca po świecy na rosnącej historii
+(łącznie ze stanem pozycji i stałym trailing stopem Momentum).
+"""
+
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+# Wartość zdarzenia "brak zdarzenia" w macierzy zdarzeń
+NO_EVENT = np.nan
+
+
+class IndicatorCache:
+    """Per-window indicator arrays over one candle set, computed once."""
+
+    def __init__(self, close, volume=None):
+        self.close_s = pd.Series(np.asarray(close, dtype=np.float64))
+        self.close = self.close_s.to_numpy()
+        # Brak wolumenu -> zera, jak IndicatorHub._col w ścieżce per świeca
+        self.volume_s = (
+            pd.Series(np.asarray(volume, dtype=np.float64))
+            if volume is not None else pd.Series(np.zeros(len(self.close)))
+        )
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def _get(self, key, fn) -> np.ndarray:
+        out = self._cache.get(key)
+        if out is None:
+            out = self._cache[key] = fn()
+        return out
+
+    def sma(self, window: int) -> np.ndarray:
+        return self._get(
+            ("sma", window),
+            lambda: self.close_s.rolling(window).mean().to_numpy(),
+        )
+
+    def std(self, window: int) -> np.ndarray:
+        return self._get(
+            ("std", window),
+            lambda: self.close_s.rolling(window).std().to_numpy(),
+        )
+
+    def ema(self, span: int) -> np.ndarray:
+        return self._get(
+            ("ema", span),
+            lambda: self.close_s.ewm(span=span).mean().to_numpy(),
+        )
+
+    def rsi(self, period: int) -> np.ndarray:
+        # Ta sama definicja co MeanReversionStrategy.calculate_rsi
+        def compute():
+            delta = self.close_s.diff()
+            gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            return (100 - (100 / (1 + gain / loss))).to_numpy()
+
+        return self._get(("rsi", period), compute)
+
+    def momentum(self, lookback: int) -> np.ndarray:
+        def compute():
+            out = np.full(self.close.shape[0], np.nan)
+            out[lookback - 1:] = (
+                self.close[lookback - 1:]
+                - self.close[: self.close.shape[0] - lookback + 1]
+            )
+            return out
+
+        return self._get(("momentum", lookback), compute)
+
+    def volume_mean(self, lookback: int) -> np.ndarray:
+        return self._get(
+            ("volume_mean", lookback),
+            lambda: self.volume_s.rolling(lookback).mean().to_numpy(),
+        )
+
+    def stacked(self, name: str, windows: np.ndarray) -> np.ndarray:
+        """(P, T) matrix: one row per genome, each distinct window once."""
+        unique, inverse = np.unique(windows, return_inverse=True)
+        rows = np.stack([getattr(self, name)(int(w)) for w in unique])
+        return rows[inverse]
+
+
+def _window(value, minimum=2) -> int:
+    # Genomy po mutacji niosą floaty
+    return max(minimum, int(round(value)))
+
+
+def _column(params_list, key, default, cast=float) -> np.ndarray:
+    return np.array(
+        [cast(p.get(key, default)) for p in params_list]
+    )[:, None]
+
+
+def positions_from_events(events: np.ndarray) -> np.ndarray:
+    """
+    Forward-fill (P, T) events (+1 long, -1 short, 0 flat, NaN none) into
+    the position held after each bar.
+    """
+    has_event = ~np.isnan(events)
+    idx = np.where(has_event, np.arange(events.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    pos = np.take_along_axis(events, idx, axis=1)
+    # Przed pierwszym zdarzeniem: brak pozycji
+    started = np.maximum.accumulate(has_event, axis=1)
+    return np.where(started, pos, 0.0)
+
+
+def mean_reversion_events(
+    cache: IndicatorCache, params_list: Sequence[Dict[str, Any]]
+) -> np.ndarray:
+    defaults = MeanReversionStrategy().parameters
+    bb_period = np.array(
+        [_window(p.get("bb_period", defaults["bb_period"]))
+         for p in params_list]
+    )
+    rsi_period = np.array(
+        [_window(p.get("rsi_period", defaults["rsi_period"]))
+         for p in params_list]
+    )
+    ema_fast = np.array(
+        [_window(p.get("trend_ema_fast", defaults["trend_ema_fast"]), 1)
+         for p in params_list]
+    )
+    ema_slow = np.array(
+        [_window(p.get("trend_ema_slow", defaults["trend_ema_slow"]), 1)
+         for p in params_list]
+    )
+    k = _column(params_list, "bb_std", defaults["bb_std"])
+    close = cache.close[None, :]
+    mid = cache.stacked("sma", bb_period)
+    std = cache.stacked("std", bb_period)
+    rsi = cache.stacked("rsi", rsi_period)
+    trend_gap = np.abs(
+        cache.stacked("ema", ema_fast) - cache.stacked("ema", ema_slow)
+    )
+    with np.errstate(invalid="ignore"):
+        trend_ok = trend_gap < 0.5 * std
+        buy = trend_ok & ((close < mid - k * std) | (rsi < 30))
+        sell = ~buy & trend_ok & ((close > mid + k * std) | (rsi > 70))
+        exit_ = ~buy & ~sell & (np.abs(close - mid) < std)
+    events = np.full(mid.shape, NO_EVENT)
+    events[exit_] = 0.0
+    events[buy] = 1.0
+    events[sell] = -1.0
+    return events
+
+
+def momentum_events(
+    cache: IndicatorCache, params_list: Sequence[Dict[str, Any]]
+) -> np.ndarray:
+    defaults = MomentumStrategy().parameters
+    lookback = np.array(
+        [_window(p.get("lookback", defaults["lookback"]))
+         for p in params_list]
+    )
+    threshold = _column(
+        params_list, "entry_threshold", defaults["entry_threshold"]
+    )
+    volume_mult = _column(params_list, "volume_mult", defaults["volume_mult"])
+    trailing_pct = _column(
+        params_list, "trailing_stop_pct", defaults["trailing_stop_pct"]
+    )
+    use_scalping = _column(
+        params_list, "use_scalping", defaults["use_scalping"], bool
+    )
+    use_trailing = _column(
+        params_list, "use_trailing", defaults["use_trailing"], bool
+    )
+    close = cache.close[None, :]
+    momentum = cache.stacked("momentum", lookback)
+    volume = cache.volume_s.to_numpy()[None, :]
+    with np.errstate(invalid="ignore"):
+        active = volume > cache.stacked("volume_mean", lookback) * volume_mult
+        buy = active & (momentum > threshold)
+        sell = active & (momentum < -threshold)
+        # Scalp nie zmienia pozycji, ale blokuje sprawdzenie trailing stopu
+        scalp = use_scalping & active & ~buy & ~sell & (
+            ((momentum > 0) & (momentum < threshold))
+            | ((momentum < 0) & (np.abs(momentum) < threshold))
+        )
+    entries = np.full(momentum.shape, NO_EVENT)
+    entries[buy] = 1.0
+    entries[sell] = -1.0
+    events = entries.copy()
+    # Stały stop ustawiany przy wejściu: cena wejścia z ostatniego wejścia
+    # przed świecą; wyjście przy pierwszym przebiciu (kolejne to no-op)
+    side = positions_from_events(entries)
+    has_entry = ~np.isnan(entries)
+    idx = np.where(has_entry, np.arange(entries.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    entry_price = cache.close[idx]
+    with np.errstate(invalid="ignore"):
+        long_stop = entry_price * (1 - trailing_pct / 100)
+        short_stop = entry_price * (1 + trailing_pct / 100)
+        stop_hit = (
+            ((side > 0) & (close < long_stop))
+            | ((side < 0) & (close > short_stop))
+        )
+    exits = use_trailing & stop_hit & ~has_entry & ~scalp
+    events[exits] = 0.0
+    return events
+
+
+POPULATION_EVENTS: Dict[type, Callable] = {
+    MeanReversionStrategy: mean_reversion_events,
+    MomentumStrategy: momentum_events,
+}
+
+
+def population_metrics(close, positions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-genome PnL of holding ``positions`` (one unit, position after bar
+    t earns close[t + 1] - close[t]); arrays of shape (P,).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    bar_pnl = positions[:, :-1] * np.diff(close)[None, :]
+    equity = np.cumsum(bar_pnl, axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+    drawdown = (peak - equity).max(axis=1) if equity.shape[1] else (
+        np.zeros(positions.shape[0])
+    )
+    mean = bar_pnl.mean(axis=1) if bar_pnl.shape[1] else 0.0
+    std = bar_pnl.std(axis=1) if bar_pnl.shape[1] else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(
+            std > 0, mean / std * np.sqrt(bar_pnl.shape[1]), 0.0
+        )
+    pnl = equity[:, -1] if equity.shape[1] else np.zeros(positions.shape[0])
+    return {
+        "score": pnl,
+        "pnl": pnl,
+        "drawdown": drawdown,
+        "sharpe": sharpe,
+        "trades": (np.diff(positions, axis=1) != 0).sum(axis=1),
+    }
+
+
+def evaluate_population(
+    strategy_cls, params_list: List[Dict[str, Any]], data, cache=None
+) -> Dict[str, np.ndarray]:
+    """
+    Score every parameter set at once. ``data``: DataFrame (or dict) with
+    close and volume; pass ``cache`` to reuse indicators across
+    generations.
+    """
+    events_fn = POPULATION_EVENTS.get(strategy_cls)
+    if events_fn is None:
+        name = getattr(strategy_cls, "__name__", strategy_cls)
+        raise ValueError(f"No batched evaluator for {name}")
+    if cache is None:
+        cache = IndicatorCache(
+            data["close"], data["volume"] if "volume" in data else None
+        )
+    positions = positions_from_events(events_fn(cache, params_list))
+    metrics = population_metrics(cache.close, positions)
+    metrics["positions"] = positions
+    return metrics
+
+
+def population_scorer(strategy_cls, data) -> Callable:
+    """
+    batch_fn for StrategyGenomeEngine.evaluate_batch; the indicator cache
+    lives across generations.
+    """
+    cache = IndicatorCache(
+        data["close"], data["volume"] if "volume" in data else None
+    )
+
+    def batch_fn(params_list):
+        return evaluate_population(strategy_cls, params_list, data, cache)
+
+    return batch_fn
@@ -2,14 +2,20 @@
 import logging
 
 import numpy as np
-from xgboost import XGBClassifier
+
+from models.np_runtime import runtime_choice, runtime_path, try_load_runtime
 
 logger = logging.getLogger("PreRiskPredictor")
 
 
 class PreRiskPredictor:
-    def __init__(self, n_features=3, model_path="prerisk_model.pkl"):
-        self.model = XGBClassifier()
+    def __init__(
+        self, n_features=3, model_path="prerisk_model.pkl", runtime=None
+    ):
+        # "native" (joblib) albo "numpy" (eksport np_runtime – bez importu
+        # biblioteki treningowej); domyślnie MODEL_RUNTIME
+        self.runtime = runtime_choice(runtime)
+        self.model = None
         self.X = []
         self.y = []
         self.n_features = n_features
@@ -17,6 +23,13 @@ class PreRiskPredictor:
         self.model_path = model_path
         self.drift_history = []
         self.load_model()
+        if self.model is None:
+            self.model = self._new_model()
+
+    def _new_model(self):
+        from xgboost import XGBClassifier
+
+        return XGBClassifier()
 
     def add_sample(self, features, label):
         """
@@ -56,6 +69,8 @@ class PreRiskPredictor:
     def update_model(self):
         import joblib
 
+        from models.model_export import export_quietly
+
         X_np = np.array(self.X)
         y_np = np.array(self.y)
         if len(np.unique(y_np)) < 2:
@@ -63,13 +78,20 @@ class PreRiskPredictor:
                 "PreRiskPredictor: not enough class diversity for training."
             )
             return
+        if not hasattr(self.model, "fit"):
+            self.model = self._new_model()  # eksport służy tylko do predykcji
         self.model.fit(X_np, y_np)
         joblib.dump(self.model, self.model_path)
+        export_quietly(self.model, runtime_path(self.model_path))
         logging.info(
             f"PreRiskPredictor: model updated and saved with " f"{len(self.X)} samples"
         )
 
     def load_model(self):
+        if self.runtime == "numpy":
+            self.model = try_load_runtime(self.model_path)
+            if self.model is not None:
+                return
         import joblib
 
         try:
@@ -0,0 +1,246 @@
+# RLLearner.py – trening agenta RL w osobnym procesie
+"""
+RLLearner: runs DQN training for RLOmegaAgent in a separate (spawn)
+process, away from the live decision path.
+
+- Aktor (strategia) wysyła przejścia przez ``multiprocessing.Queue``
+  (``put_nowait`` – przy pełnej kolejce przejście jest pomijane i
+  liczone, ścieżka decyzji nigdy nie czeka na ucznia).
+- Uczeń trzyma ReplayBuffer (opcjonalnie priorytetowy), robi
+  ``replay_ratio`` kroków gradientu na każde nowe przejście albo paczkę
+  z VectorizedTradingEnv (jak dawny replay po każdym ``remember``) i co
+  ``publish_every`` kroków publikuje wagi (tablice NumPy) do kolejki o
+  rozmiarze 1 – starsza, nieodebrana publikacja jest zastępowana.
+- Aktor odbiera wagi w ``poll()`` (bez blokowania) na początku
+  ``analyze``. Proces ucznia ma obniżony priorytet (``nice``) i jeden
+  wątek torch, żeby trening nie podbijał latencji inferencji.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = "stop"
+_TRANSITION = "t"
+_BATCH = "b"
+_WEIGHTS = "w"
+
+
+def _publish(weights_queue, model, updates, buffered):
+    from strategies.rl_omega import policy_to_numpy
+
+    message = {
+        "weights": policy_to_numpy(model),
+        "updates": updates,
+        "buffer": buffered,
+    }
+    try:
+        weights_queue.get_nowait()  # zastąp nieodebraną publikację
+    except queue.Empty:
+        pass
+    try:
+        weights_queue.put_nowait(message)
+    except queue.Full:
+        pass
+
+
+def _learner_main(config, experience, weights_queue):
+    try:
+        os.nice(config["nice"])
+    except (AttributeError, OSError):
+        pass
+    import torch
+    import torch.optim as optim
+
+    from ai.ReplayBuffer import ReplayBuffer
+    from strategies.rl_omega import DQN, dqn_train_step, load_numpy_policy
+
+    torch.set_num_threads(config["torch_threads"])
+    torch.manual_seed(config["seed"] or 0)
+    model = DQN(config["state_dim"], config["action_dim"])
+    optimizer = optim.Adam(model.parameters(), lr=config["lr"])
+    buffer = ReplayBuffer(
+        config["memory_size"], config["state_dim"],
+        alpha=config["prioritized_alpha"], seed=config["seed"],
+    )
+    batch_size = config["batch_size"]
+    updates = 0
+    credit = 0.0  # kroki gradientu należne za nowe przejścia
+    while True:
+        # Bez zaległych kroków czekamy na doświadczenie (bez busy loop)
+        block = credit < 1 or len(buffer) < batch_size
+        try:
+            message = experience.get(timeout=0.5) if block else \
+                experience.get_nowait()
+        except queue.Empty:
+            message = None
+        while message is not None:
+            kind = message[0]
+            if kind == _STOP:
+                return
+            if kind == _TRANSITION:
+                buffer.add(*message[1:])
+                credit += config["replay_ratio"]
+            elif kind == _BATCH:
+                buffer.extend(message[1])
+                credit += config["replay_ratio"]
+            elif kind == _WEIGHTS:
+                load_numpy_policy(model, message[1])
+            try:
+                message = experience.get_nowait()
+            except queue.Empty:
+                message = None
+        if credit < 1 or len(buffer) < batch_size:
+            continue
+        credit -= 1
+        batch, indices, weights = buffer.sample(
+            batch_size, beta=config["per_beta"]
+        )
+        _, td_errors = dqn_train_step(
+            model, optimizer, batch, weights, config["gamma"]
+        )
+        buffer.update_priorities(indices, td_errors)
+        updates += 1
+        if updates % config["publish_every"] == 0:
+            _publish(weights_queue, model, updates, len(buffer))
+
+
+class RLLearner:
+    """Actor-side handle of the learner process."""
+
+    def __init__(
+        self,
+        state_dim: int = 10,
+        action_dim: int = 3,
+        gamma: float = 0.99,
+        lr: float = 1e-3,
+        memory_size: int = 10000,
+        batch_size: int = 64,
+        prioritized_alpha: float = 0.0,
+        per_beta: float = 0.4,
+        replay_ratio: float = 1.0,
+        publish_every: int = 50,
+        queue_size: int = 10000,
+        nice: int = 10,
+        torch_threads: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.config = {
+            "state_dim": state_dim,
+            "action_dim": action_dim,
+            "gamma": gamma,
+            "lr": lr,
+            "memory_size": memory_size,
+            "batch_size": batch_size,
+            "prioritized_alpha": prioritized_alpha,
+            "per_beta": per_beta,
+            "replay_ratio": replay_ratio,
+            "publish_every": max(1, int(publish_every)),
+            "nice": nice,
+            "torch_threads": torch_threads,
+            "seed": seed,
+        }
+        self.queue_size = queue_size
+        self._process = None
+        self._experience = None
+        self._weights = None
+        self.stats = {"sent": 0, "dropped": 0, "published": 0, "updates": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self, initial_weights: Optional[Dict[str, np.ndarray]] = None):
+        # spawn: bez dziedziczenia wątków/stanu torch z procesu bota
+        ctx = multiprocessing.get_context("spawn")
+        self._experience = ctx.Queue(maxsize=self.queue_size)
+        self._weights = ctx.Queue(maxsize=1)
+        self._process = ctx.Process(
+            target=_learner_main,
+            args=(self.config, self._experience, self._weights),
+            name="rl-learner",
+            daemon=True,
+        )
+        self._process.start()
+        if initial_weights is not None:
+            self.set_weights(initial_weights)
+
+    def submit(self, state, action, reward, next_state, done) -> bool:
+        """Queue one transition; never blocks (full queue -> dropped)."""
+        if self._experience is None:
+            return False
+        try:
+            self._experience.put_nowait((
+                _TRANSITION,
+                np.asarray(state, dtype=np.float32),
+                int(action),
+                float(reward),
+                np.asarray(next_state, dtype=np.float32),
+                float(done),
+            ))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["sent"] += 1
+        return True
+
+    def submit_batch(self, batch: np.ndarray) -> bool:
+        """
+        Queue a structured array of transitions (ReplayBuffer dtype) as
+        one message; counts as one replay step, like ``update_batch``.
+        """
+        if self._experience is None:
+            return False
+        try:
+            self._experience.put_nowait((_BATCH, batch))
+        except queue.Full:
+            self.stats["dropped"] += len(batch)
+            return False
+        self.stats["sent"] += len(batch)
+        return True
+
+    def set_weights(self, weights: Dict[str, np.ndarray]):
+        """Replace the learner's weights (e.g. after a federated update)."""
+        if self._experience is not None:
+            self._experience.put((_WEIGHTS, weights), timeout=1.0)
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Newest published ``{"weights", "updates", "buffer"}`` or None."""
+        if self._weights is None:
+            return None
+        latest = None
+        while True:
+            try:
+                latest = self._weights.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            self.stats["published"] += 1
+            self.stats["updates"] = latest["updates"]
+        return latest
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"running": self.running, **self.stats}
+
+    def close(self, timeout: float = 5.0):
+        if self._process is None:
+            return
+        try:
+            self._experience.put((_STOP,), timeout=timeout)
+        except queue.Full:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout)
+        for q in (self._experience, self._weights):
+            q.cancel_join_thread()
+            q.close()
+        self._process = None
+        self._experience = self._weights = None
@@ -1,25 +1,46 @@
 # SelfPlayArena.py – symulacja walki strategii o najlepszy wynik
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Callable, List
 
 
+def _play(strategy, market_data):
+    pnl = 0.0
+    dd = 0.0
+    for tick in market_data:
+        result = strategy(tick)
+        pnl += result.get("pnl", 0)
+        dd = min(dd, result.get("drawdown", 0))
+    return {"strategy": strategy.__name__, "pnl": pnl, "drawdown": dd}
+
+
 class SelfPlayArena:
-    def __init__(self, strategies: List[Callable]):
+    def __init__(self, strategies: List[Callable], max_workers=None):
         self.strategies = strategies
         self.results = []
+        # max_workers > 1: każda strategia w osobnym procesie (strategie
+        # muszą być picklowalne – funkcje modułowe)
+        self.max_workers = max_workers
 
     def run(self, market_data):
-        for strategy in self.strategies:
-            pnl = 0.0
-            dd = 0.0
-            for tick in market_data:
-                result = strategy(tick)
-                pnl += result.get("pnl", 0)
-                dd = min(dd, result.get("drawdown", 0))
-            self.results.append(
-                {"strategy": strategy.__name__, "pnl": pnl, "drawdown": dd}
+        if self.max_workers and self.max_workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                results = list(pool.map(
+                    _play, self.strategies,
+                    [market_data] * len(self.strategies),
+                ))
+        else:
+            results = [_play(s, market_data) for s in self.strategies]
+        for r in results:
+            self.results.append(r)
+            logging.info(
+                f"SelfPlayArena: {r['strategy']} pnl={r['pnl']}, "
+                f"dd={r['drawdown']}"
             )
-            logging.info(f"SelfPlayArena: {strategy.__name__} pnl={pnl}, dd={dd}")
         best = max(self.results, key=lambda r: (r["pnl"], -r["drawdown"]), default=None)
         logging.info(f"SelfPlayArena: best strategy={best}")
         return best
@@ -4,6 +4,8 @@ import random
 from dataclasses import dataclass
 from typing import Any, Dict, List
 
+import numpy as np
+
 
 @dataclass
 class StrategyGenome:
@@ -34,7 +36,13 @@ class StrategyGenomeEngine:
             self.population.append(genome)
         logging.info(f"Zainicjowano populację: {self.population_size}")
 
-    def evaluate(self, scoring_func):
+    def evaluate(self, scoring_func=None, runner=None):
+        # runner (ai.SweepRunner): backtesty genomów równolegle w puli
+        # procesów; wyniki trafiają do genomów w kolejności ukończenia
+        if runner is not None:
+            for genome in runner.run(self.population):
+                logging.info(f"Ocena genomu: {genome}")
+            return
         for genome in self.population:
             result = scoring_func(genome.params)
             genome.score = result.get("score", 0)
@@ -43,14 +51,35 @@ class StrategyGenomeEngine:
             genome.sharpe = result.get("sharpe", 0)
             logging.info(f"Ocena genomu: {genome}")
 
-    def select(self, top_n=5):
-        self.population.sort(key=lambda g: g.score, reverse=True)
-        selected = self.population[:top_n]
+    def evaluate_batch(self, batch_fn):
+        # batch_fn (np. ai.PopulationBacktest.population_scorer): cała
+        # populacja w jednym wywołaniu, metryki jako tablice (P,)
+        result = batch_fn([genome.params for genome in self.population])
+        scores = np.asarray(result["score"], dtype=float)
+        for i, genome in enumerate(self.population):
+            genome.score = float(scores[i])
+            for key in ("pnl", "drawdown", "sharpe"):
+                if key in result:
+                    setattr(genome, key, float(result[key][i]))
+        logging.info(
+            f"Ocena populacji: {len(scores)} genomów, "
+            f"najlepszy wynik {scores.max() if len(scores) else 0:.4f}"
+        )
+        return scores
+
+    def select(self, top_n=5, scores=None):
+        # scores: tablica wyników w kolejności populacji (evaluate_batch)
+        if scores is not None:
+            order = np.argsort(-np.asarray(scores, dtype=float), kind="stable")
+            selected = [self.population[i] for i in order[:top_n]]
+        else:
+            self.population.sort(key=lambda g: g.score, reverse=True)
+            selected = self.population[:top_n]
         logging.info(f"Wybrano najlepsze genomy: {[g.score for g in selected]}")
         return selected
 
-    def evolve(self):
-        selected = self.select()
+    def evolve(self, scores=None):
+        selected = self.select(scores=scores)
         new_population = []
         for genome in selected:
             clone = StrategyGenome(params=genome.params.copy())
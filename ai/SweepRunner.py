@@ -0,0 +1,318 @@
+# SweepRunner.py – równoległy sweep parametrów i walk-forward backtestów
+"""
+SweepRunner: evaluates a strategy class over a parameter grid or a genome
+population on a ProcessPoolExecutor.
+
+- Świece trafiają do workerów przez memmap, nie przez pickle w każdym
+  zadaniu: CandleSeries z CandleStore jest otwierana z jej własnych plików,
+  DataFrame/tablice są raz zrzucane do katalogu tymczasowego (.npy) i
+  mapowane read-only w każdym procesie (wspólny page cache); timestamp
+  (także stringi/datetime) jest zapisywany jako int64 ms, kolumny typu
+  object są odrzucane już w procesie głównym (ValueError).
+- Zadanie to genom (wszystkie jego splity) – parametry i granice okien,
+  ~100 bajtów; klasa strategii i konfiguracja RiskManagera idą raz, w
+  initializerze workera.
+- Walk-forward: ``walk_forward_splits`` tnie dane na kolejne okna
+  train/test; genom dostaje metryki in-sample (train) i out-of-sample
+  (test), a ``walk_forward_report`` wybiera najlepszy genom na train i
+  raportuje jego wynik na następnym teście.
+- ``run`` zwraca genomy (StrategyGenome) w kolejności ukończenia, z
+  wypełnionymi polami score/pnl/drawdown/sharpe.
+"""
+
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ai.StrategyGenome import StrategyGenome
+from core.CandleStore import COLUMNS, CandleSeries
+
+logger = logging.getLogger(__name__)
+
+# (train_start, train_end, test_start, test_end), końce wyłączne
+Split = Tuple[int, int, int, int]
+
+
+def param_grid(grid: Dict[str, Sequence[Any]]) -> List[StrategyGenome]:
+    """Cartesian product of ``grid`` values as a genome population."""
+    keys = list(grid)
+    return [
+        StrategyGenome(params=dict(zip(keys, values)))
+        for values in itertools.product(*(grid[k] for k in keys))
+    ]
+
+
+def walk_forward_splits(
+    n: int,
+    n_splits: int = 4,
+    train_size: Optional[int] = None,
+    test_size: Optional[int] = None,
+    anchored: bool = False,
+) -> List[Split]:
+    """
+    Consecutive train/test windows over ``n`` bars. Rolling by default
+    (fixed ``train_size``); ``anchored`` grows the train window from bar 0.
+    Without sizes the data is cut into ``n_splits + 1`` equal blocks.
+    """
+    if test_size is None:
+        test_size = n // (n_splits + 1)
+    if train_size is None:
+        train_size = n - n_splits * test_size
+    if test_size <= 0 or train_size <= 0:
+        raise ValueError("not enough bars for the requested splits")
+    splits = []
+    for k in range(n_splits):
+        test_start = train_size + k * test_size
+        test_end = test_start + test_size
+        if test_end > n:
+            break
+        train_start = 0 if anchored else test_start - train_size
+        splits.append((train_start, test_start, test_start, test_end))
+    return splits
+
+
+def default_score(result: Dict[str, Any], initial_balance: float) -> float:
+    return result["final_balance"] - initial_balance
+
+
+def _timestamp_ms(values: np.ndarray) -> np.ndarray:
+    # Jak w CandleStore: int64 ms (stringi z API / ISO, datetime64)
+    if values.dtype.kind in "iuf":
+        return values
+    if values.dtype.kind != "M":
+        numeric = pd.to_numeric(values, errors="coerce")
+        if not np.isnan(numeric).any():
+            return numeric.astype(np.int64)
+        values = pd.to_datetime(values).to_numpy()
+    return values.astype("datetime64[ms]").astype(np.int64)
+
+
+# -- worker -----------------------------------------------------------------
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _open_columns(spec) -> Dict[str, np.ndarray]:
+    kind = spec[0]
+    if kind == "series":
+        _, path, symbol, interval, n = spec
+        arrays = CandleSeries(path, symbol, interval).arrays(0, n)
+        return {c: arrays[c] for c in COLUMNS}
+    _, directory, names = spec
+    return {
+        c: np.load(os.path.join(directory, f"{c}.npy"), mmap_mode="r")
+        for c in names
+    }
+
+
+def _init_worker(spec, strategy_cls, risk_config, initial_balance):
+    from core.RiskManager import RiskManager
+
+    _WORKER["columns"] = _open_columns(spec)
+    _WORKER["strategy_cls"] = strategy_cls
+    _WORKER["risk_manager"] = RiskManager(**(risk_config or {}))
+    _WORKER["initial_balance"] = initial_balance
+    _WORKER["frames"] = {}
+
+
+def _frame(start: int, stop: int) -> pd.DataFrame:
+    # Ramka per okno, budowana raz na proces z widoków memmap
+    frames = _WORKER["frames"]
+    key = (start, stop)
+    if key not in frames:
+        frames[key] = pd.DataFrame(
+            {c: a[start:stop] for c, a in _WORKER["columns"].items()}
+        )
+    return frames[key]
+
+
+def _backtest(params, start, stop) -> Dict[str, Any]:
+    from utils.backtesting import run_backtest
+
+    strategy = _WORKER["strategy_cls"](**params)
+    result = run_backtest(
+        strategy,
+        _frame(start, stop),
+        initial_balance=_WORKER["initial_balance"],
+        risk_manager=_WORKER["risk_manager"],
+    )
+    result.pop("trades")
+    return result
+
+
+def _evaluate_task(key, params, splits: List[Split], in_sample: bool):
+    out = []
+    for train_start, train_end, test_start, test_end in splits:
+        res = {"test": _backtest(params, test_start, test_end)}
+        if in_sample:
+            res["train"] = _backtest(params, train_start, train_end)
+        out.append(res)
+    return key, out
+
+
+# -- runner -----------------------------------------------------------------
+
+
+class SweepRunner:
+    """
+    Parallel backtest sweep of ``strategy_cls(**genome.params)`` over
+    ``data`` (CandleSeries, DataFrame or dict of OHLCV arrays).
+    """
+
+    def __init__(
+        self,
+        strategy_cls,
+        data,
+        max_workers: Optional[int] = None,
+        splits: Optional[List[Split]] = None,
+        risk_config: Optional[Dict[str, Any]] = None,
+        initial_balance: float = 1000,
+        score_fn=default_score,
+        mp_context: str = "spawn",
+    ):
+        self.strategy_cls = strategy_cls
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.risk_config = risk_config
+        self.initial_balance = initial_balance
+        self.score_fn = score_fn
+        self.mp_context = mp_context
+        self._tmpdir = None
+        self.spec, self.n = self._share(data)
+        # Bez splitów: jeden "test" na całych danych
+        self.splits = splits or [(0, 0, 0, self.n)]
+        self.in_sample = splits is not None
+        self.results: Dict[int, List[Dict[str, Any]]] = {}
+        self._executor = None
+
+    def _share(self, data):
+        if isinstance(data, CandleSeries):
+            n = len(data)
+            return ("series", data.path, data.symbol, data.interval, n), n
+        if isinstance(data, pd.DataFrame):
+            cols = {c: data[c].to_numpy() for c in data.columns
+                    if c in COLUMNS}
+        else:
+            cols = {c: np.asarray(v) for c, v in data.items()}
+        if "timestamp" in cols:
+            cols["timestamp"] = _timestamp_ms(cols["timestamp"])
+        # Tablice obiektów nie dają się zmapować (np.load mmap_mode) –
+        # workery padałyby z samym BrokenProcessPool
+        bad = [c for c, v in cols.items() if v.dtype.hasobject]
+        if bad:
+            raise ValueError(
+                f"SweepRunner: columns {bad} have object dtype and cannot "
+                "be memory-mapped; convert them to numeric arrays"
+            )
+        self._tmpdir = tempfile.mkdtemp(prefix="sweep_")
+        for name, values in cols.items():
+            np.save(os.path.join(self._tmpdir, f"{name}.npy"), values)
+        n = len(next(iter(cols.values()))) if cols else 0
+        return ("npy", self._tmpdir, tuple(cols)), n
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=_init_worker,
+                initargs=(
+                    self.spec,
+                    self.strategy_cls,
+                    self.risk_config,
+                    self.initial_balance,
+                ),
+            )
+        return self._executor
+
+    def _finish(self, genome: StrategyGenome, per_split) -> StrategyGenome:
+        tests = [r["test"] for r in per_split]
+        scores = [self.score_fn(t, self.initial_balance) for t in tests]
+        pnl = [t["final_balance"] - self.initial_balance for t in tests]
+        genome.score = float(np.mean(scores))
+        genome.pnl = float(np.sum(pnl))
+        genome.drawdown = float(max(t["drawdown"] for t in tests))
+        std = float(np.std(pnl))
+        genome.sharpe = (
+            float(np.mean(pnl)) / std * math.sqrt(len(pnl)) if std else 0.0
+        )
+        return genome
+
+    def run(self, genomes: Sequence[StrategyGenome]) -> Iterator[
+        StrategyGenome
+    ]:
+        """
+        Evaluate every genome on every split; yields each genome as soon
+        as its worker finishes (metrics filled in).
+        """
+        genomes = list(genomes)
+        executor = self._get_executor()
+        futures = [
+            executor.submit(
+                _evaluate_task, g, dict(genome.params), self.splits,
+                self.in_sample,
+            )
+            for g, genome in enumerate(genomes)
+        ]
+        self.results = {}
+        for future in as_completed(futures):
+            g, per_split = future.result()
+            self.results[g] = per_split
+            yield self._finish(genomes[g], per_split)
+
+    def evaluate(self, genomes: Sequence[StrategyGenome]):
+        """Run to completion; returns genomes sorted by score (desc)."""
+        done = list(self.run(genomes))
+        return sorted(done, key=lambda g: g.score, reverse=True)
+
+    def walk_forward_report(self, genomes: Sequence[StrategyGenome]):
+        """
+        Per split: genome with the best in-sample score and its
+        out-of-sample score; plus the summed out-of-sample PnL.
+        """
+        if not self.in_sample:
+            raise ValueError("walk-forward report needs explicit splits")
+        genomes = list(genomes)
+        rows = []
+        for s, split in enumerate(self.splits):
+            best = max(
+                self.results,
+                key=lambda g: self.score_fn(
+                    self.results[g][s]["train"], self.initial_balance
+                ),
+            )
+            test = self.results[best][s]["test"]
+            rows.append({
+                "split": split,
+                "params": dict(genomes[best].params),
+                "train_score": self.score_fn(
+                    self.results[best][s]["train"], self.initial_balance
+                ),
+                "test_score": self.score_fn(test, self.initial_balance),
+            })
+        return {
+            "splits": rows,
+            "oos_score": float(sum(r["test_score"] for r in rows)),
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
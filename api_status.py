@@ -1,18 +1,22 @@
-# Health check endpoint for root
-@app.get("/")
-def root_status():
-    return {"status": "ok"}
-
 import re
+import hashlib
 import json
+import os
+import subprocess
+import sys
 import threading
-from fastapi import FastAPI, Query
+import time
+from datetime import datetime
+from typing import Optional
+from fastapi import FastAPI, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse
-from sqlalchemy import desc
-# Import run_bot to start live trading via API
-from core.BotCore import run_bot
-
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from core.PositionManager import PositionManager
 from core.DynamicStrategyRouter import DynamicStrategyRouter
 from core.db_models import (
@@ -22,30 +26,112 @@ from core.db_models import (
     LogEntry,
     Equity
 )
+from core.db_utils import db_writer_metrics, keyset_page
+from core.LiveBroadcaster import LiveBroadcaster, batch_json, sse_format
+from core.MetricsAggregator import MetricsAggregator
+from core.StateSnapshot import StateSnapshotReader
 from utils.health_check import check_api, check_bot_status, check_ticks
 
 app = FastAPI()
 position_manager = PositionManager()
+# Stan bota z procesu workera (start_worker.py); API nie dzieli z nim
+# obiektów ani GIL-a. Bez świeżego snapshotu – lokalny stan / baza.
+state_reader = StateSnapshotReader()
+STATE_STALE_SEC = float(os.environ.get("BOT_STATE_STALE_SEC", "300"))
+
+
+def bot_state():
+    """Latest worker snapshot, or None if missing or stale."""
+    state = state_reader.read()
+    if state is None or state["age_sec"] > STATE_STALE_SEC:
+        return None
+    return state
+
+
+# Push stanu workera do dashboardu (/ws/live, /metrics/live) zamiast
+# odpytywania /decisions i /equity
+broadcaster = LiveBroadcaster(
+    bot_state,
+    interval=float(os.environ.get("LIVE_POLL_SEC", "0.25")),
+    buffer_size=int(os.environ.get("LIVE_BUFFER_SIZE", "256")),
+)
+LIVE_HEARTBEAT_SEC = 15.0
+
+
+# Metryki z agregatów (metrics_summary) z cache TTL – /status,
+# /performance i /metrics nie skanują bazy przy każdym odpytaniu
+aggregator = MetricsAggregator(SessionLocal)
+_health = {"at": float("-inf"), "value": None}
+
+
+def health_checks():
+    """check_api/check_ticks/check_bot_status, cached for aggregator.ttl."""
+    now = time.monotonic()
+    if _health["value"] is None or now - _health["at"] >= aggregator.ttl:
+        _health["value"] = {
+            "api": check_api(),
+            "ticks": check_ticks(),
+            "bot": check_bot_status(),
+        }
+        _health["at"] = now
+    return _health["value"]
+
+
+def cached_json(request: Request, content):
+    """
+    JSON response with an ETag of the body; 304 if the client already
+    holds it (If-None-Match), so polling dashboards skip the payload.
+    """
+    content = jsonable_encoder(content)
+    body = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    etag = f'W/"{hashlib.sha1(body.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in match.split(",")) or match == "*":
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
+
+
+def page_headers(response: Response, cursor):
+    """Next-page cursor for keyset pagination (?before=&before_id=)."""
+    if cursor is not None:
+        response.headers["X-Next-Before"] = cursor[0].isoformat()
+        response.headers["X-Next-Before-Id"] = str(cursor[1])
+
+
+# Health check endpoint for root
+@app.get("/")
+def root_status():
+    return {"status": "ok"}
 
 
 # --- /decisions endpoint ---
 @app.get("/decisions")
-def get_decisions(limit: int = Query(20, ge=1, le=500)):
+def get_decisions(
+    response: Response,
+    limit: int = Query(20, ge=1, le=500),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    symbol: Optional[str] = None,
+):
     try:
         db = SessionLocal()
-        decisions = (
-            db.query(Decision)
-            .order_by(desc(Decision.timestamp))
-            .limit(limit)
-            .all()[::-1]
+        decisions, cursor = keyset_page(
+            db, Decision, limit, before, before_id,
+            (Decision.symbol == symbol,) if symbol else (),
         )
+        page_headers(response, cursor)
         return [
             {
                 "timestamp": d.timestamp.isoformat(),
                 "decision": d.decision,
-                "details": d.details
+                "details": d.details,
+                "symbol": d.symbol,
+                "strategy": d.strategy,
+                "signal": d.signal,
+                "allocation": d.allocation,
             }
-            for d in decisions
+            for d in decisions[::-1]
         ]
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -129,12 +215,19 @@ def root():
 
 @app.get("/positions")
 def get_all_positions():
+    state = bot_state()
+    if state is not None:
+        return state["positions"]
     return getattr(position_manager, 'positions', {})
 
 
 @app.get("/positions/{symbol}")
 def get_position(symbol: str):
-    pos = position_manager.get_position(symbol)
+    state = bot_state()
+    if state is not None:
+        pos = state["positions"].get(symbol)
+    else:
+        pos = position_manager.get_position(symbol)
     return pos if pos else {"error": "Brak pozycji dla symbolu"}
 
 
@@ -157,19 +250,36 @@ def get_closed_positions():
 @app.post("/start-live")
 def start_live():
     """
-    Start the ZoL0 trading bot in live mode. This endpoint spawns
-    the main bot loop in a background thread so the API remains responsive.
+    Start the ZoL0 trading bot in live mode. The bot runs as a separate
+    worker process (start_worker.py), so it does not share the GIL with
+    the API; its state comes back through the state snapshot.
     """
     try:
-        thread = threading.Thread(target=run_bot, kwargs={"simulate": False}, daemon=True)
-        thread.start()
-        return {"status": "started"}
+        worker = getattr(app.state, "worker", None)
+        if worker is not None and worker.poll() is None:
+            return {"status": "already running", "pid": worker.pid}
+        root = os.path.dirname(os.path.abspath(__file__))
+        app.state.worker = subprocess.Popen(
+            [sys.executable, os.path.join(root, "start_worker.py")],
+            cwd=root,
+        )
+        return {"status": "started", "pid": app.state.worker.pid}
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @app.get("/strategy")
 def get_current_strategy():
+    state = bot_state()
+    if state is not None:
+        return {
+            "strategies": state["strategies"],
+            "last_allocations": state["last_allocations"],
+            "allocations": state["allocations"],
+            "latency": state.get("strategy_latency"),
+            "modes": None,
+            "params": None,
+        }
     router = getattr(app.state, "current_strategy_router", None)
     if not router:
         return {"error": "Strategy router not initialized"}
@@ -187,20 +297,21 @@ def get_current_strategy():
 
 
 @app.get("/equity")
-def get_equity(limit: int = Query(200, ge=1, le=1000)):
+def get_equity(
+    response: Response,
+    limit: int = Query(200, ge=1, le=1000),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+):
     try:
         db = SessionLocal()
-        rows = (
-            db.query(Equity)
-            .order_by(desc(Equity.timestamp))
-            .limit(limit)
-            .all()[::-1]
-        )
+        rows, cursor = keyset_page(db, Equity, limit, before, before_id)
+        page_headers(response, cursor)
         return [
             {
                 "timestamp": e.timestamp.isoformat(),
                 "equity": e.equity
-            } for e in rows
+            } for e in rows[::-1]
         ]
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -209,70 +320,29 @@ def get_equity(limit: int = Query(200, ge=1, le=1000)):
 
 
 @app.get("/metrics")
-def get_metrics(limit: int = Query(30, ge=1, le=500)):
+def get_metrics(request: Request, limit: int = Query(30, ge=1, le=500)):
     try:
-        db = SessionLocal()
-        decisions = (
-            db.query(Decision)
-            .order_by(desc(Decision.timestamp))
-            .limit(limit)
-            .all()
-        )
-        equity_map = {
-            e.timestamp.replace(microsecond=0): e.equity
-            for e in (
-                db.query(Equity)
-                .order_by(desc(Equity.timestamp))
-                .limit(limit)
-                .all()
-            )
-        }
-        result = []
-        for d in decisions:
-            trend = volatility = tick = None
-            try:
-                parsed = json.loads(d.details)
-                trend = parsed.get("trend")
-                volatility = parsed.get("volatility")
-                tick = parsed.get("tick")
-            except Exception:
-                trend_match = re.search(r"trend=([A-Z_]+)", d.details)
-                vol_match = re.search(r"volatility=([\d\.]+)", d.details)
-                tick_match = re.search(r"tick=([\d]+)", d.details)
-                if trend_match:
-                    trend = trend_match.group(1)
-                if vol_match:
-                    volatility = float(vol_match.group(1))
-                if tick_match:
-                    tick = int(tick_match.group(1))
-            equity_val = equity_map.get(
-                d.timestamp.replace(microsecond=0)
-            )
-            result.append({
-                "timestamp": d.timestamp.isoformat(),
-                "trend": trend,
-                "volatility": volatility,
-                "tick": tick,
-                "equity": equity_val
-            })
-        return result[::-1]
+        return cached_json(request, aggregator.metrics(limit))
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        db.close()
 
 
 @app.get("/logs")
 @app.get("/logs/ai")
-def get_logs(limit: int = Query(30, ge=1, le=500)):
+def get_logs(
+    response: Response,
+    limit: int = Query(30, ge=1, le=500),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    event: Optional[str] = None,
+):
     try:
         db = SessionLocal()
-        logs = (
-            db.query(LogEntry)
-            .order_by(desc(LogEntry.timestamp))
-            .limit(limit)
-            .all()
+        logs, cursor = keyset_page(
+            db, LogEntry, limit, before, before_id,
+            (LogEntry.event == event,) if event else (),
         )
+        page_headers(response, cursor)
         return [
             {
                 "timestamp": log.timestamp.isoformat(),
@@ -287,34 +357,47 @@ def get_logs(limit: int = Query(30, ge=1, le=500)):
 
 
 @app.get("/status")
-def get_status():
+def get_status(request: Request):
     try:
+        health = health_checks()
+        state = bot_state()
+        if state is not None:
+            return cached_json(request, {
+                "api": health["api"],
+                "ticks": health["ticks"],
+                "bot": True,
+                "last_decision": state["last_decision"],
+                "db_writer": state.get("db_writer"),
+                "scheduler": state.get("scheduler"),
+                "state_age_sec": round(state["age_sec"], 3),
+                **state["stats"]
+            })
         stats = compute_stats()
-        return {
-            "api": check_api(),
-            "ticks": check_ticks(),
-            "bot": check_bot_status(),
+        return cached_json(request, {
+            **health,
             "last_decision": get_last_decision(),
+            "db_writer": db_writer_metrics(),
             **stats
-        }
+        })
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @app.get("/performance")
-def get_performance():
+def get_performance(request: Request):
     try:
-        stats = compute_stats()
+        state = bot_state()
+        stats = state["stats"] if state is not None else compute_stats()
         final_balance = stats.get("final_balance", 0)
         pnl = final_balance - 10000
-        return {
+        return cached_json(request, {
             "pnl": round(pnl, 2),
             "winrate": stats.get("winrate"),
             "drawdown": stats.get("drawdown"),
             "trades": stats.get("trades"),
             "sharpe": stats.get("sharpe"),
             "sortino": stats.get("sortino")
-        }
+        })
     except Exception as e:
         return JSONResponse(
             content={"error": f"Błąd /performance: {str(e)}"},
@@ -323,93 +406,59 @@ def get_performance():
 
 
 @app.get("/metrics/live")
-def metrics_live():
-    return JSONResponse(
-        content={"error": "Metrics not connected yet"},
-        status_code=501
+async def metrics_live(request: Request):
+    """
+    Server-Sent Events: snapshot on connect, then decision / equity /
+    stats / position / allocation deltas as the worker publishes them.
+    """
+    client = broadcaster.subscribe()
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                batch = await client.get(timeout=LIVE_HEARTBEAT_SEC)
+                if not batch:
+                    yield ": ping\n\n"
+                    continue
+                yield "".join(sse_format(event) for event in batch)
+        finally:
+            broadcaster.unsubscribe(client)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
-def compute_stats():
-    db = SessionLocal()
+@app.websocket("/ws/live")
+async def ws_live(websocket: WebSocket):
+    """Same events as /metrics/live; one JSON array per frame."""
+    await websocket.accept()
+    client = broadcaster.subscribe()
     try:
-        equity_rows = (
-            db.query(Equity)
-            .order_by(desc(Equity.timestamp))
-            .limit(200)
-            .all()[::-1]
-        )
-        equity = [e.equity for e in equity_rows]
-        drawdown = 0.0
-        final_balance = equity[-1] if equity else 0.0
-        peak = equity[0] if equity else 0.0
-        for val in equity:
-            if val > peak:
-                peak = val
-            dd = (peak - val) / peak if peak else 0.0
-            drawdown = max(drawdown, dd)
-        total = db.query(Decision).count()
-        wins = db.query(Decision).filter(
-            Decision.decision.in_(["win", "tp", "take_profit"])
-        ).count()
-        winrate = wins / total if total > 0 else 0.0
-        returns = (
-            [equity[i + 1] - equity[i] for i in range(len(equity) - 1)]
-            if len(equity) > 1 else []
-        )
-        sharpe = sortino = None
-        if returns:
-            mean_ret = sum(returns) / len(returns)
-            std_ret = (
-                (
-                    sum((r - mean_ret) ** 2 for r in returns) / len(returns)
-                ) ** 0.5
-                if len(returns) > 1 else 0
-            )
-            downside = [r for r in returns if r < 0]
-            std_down = (
-                (
-                    sum((r - mean_ret) ** 2 for r in downside) / len(downside)
-                ) ** 0.5
-                if downside else 0
-            )
-            sharpe = round(mean_ret / std_ret, 2) if std_ret else None
-            sortino = round(mean_ret / std_down, 2) if std_down else None
-        return {
-            "final_balance": final_balance,
-            "drawdown": round(drawdown * 100, 2),
-            "winrate": round(winrate * 100, 2),
-            "open_trades": 0,
-            "trades": total,
-            "sharpe": sharpe,
-            "sortino": sortino
-        }
+        while True:
+            batch = await client.get(timeout=LIVE_HEARTBEAT_SEC)
+            await websocket.send_text(batch_json(batch))
+    except WebSocketDisconnect:
+        pass
     finally:
-        db.close()
+        broadcaster.unsubscribe(client)
+
+
+def compute_stats():
+    return aggregator.stats()
 
 
 def get_last_decision():
     try:
-        db = SessionLocal()
-        last = (
-            db.query(Decision)
-            .order_by(desc(Decision.timestamp))
-            .first()
-        )
-        if last:
-            return {
-                "timestamp": last.timestamp.isoformat(),
-                "decision": last.decision,
-                "details": last.details
-            }
-        return None
+        return aggregator.last_decision()
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        db.close()
 
 
 def parse_details(details: str):
+    # Tylko wiersze CSV (parse_decision_row); baza ma kolumny typowane
     regexes = {
         "trend": r"trend=([A-Z_]+)",
         "volatility": r"volatility=([\d\.]+)",
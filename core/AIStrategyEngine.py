@@ -6,6 +6,7 @@ import logging
 import os
 
 import pandas as pd
+from core.CandleBuffer import as_frame
 from models.trend_predictor import TrendPredictor
 from models.volatility_forecaster import VolatilityForecaster
 
@@ -31,12 +32,16 @@ class AIStrategyEngine:
         pnl_history=None,
         tracker=None,
         risk_manager=None,
+        candles=None,
     ):
         # ⬆️ optimized for performance:
         # reuse model objects, minimize object creation
         logger = logging.getLogger("AIStrategyEngine")
-        candles = self.fetcher.get_ohlcv(symbol, timeframe)
-        df = pd.DataFrame(candles)
+        # Współdzielony CandleBuffer symbolu: ramka z cache zamiast
+        # pobierania i konwersji w każdym wywołaniu
+        if candles is None:
+            candles = self.fetcher.get_ohlcv(symbol, timeframe)
+        df = as_frame(candles)
         trend = self.trend_model.predict_trend(df)
         volatility = self.vol_model.forecast_volatility(df)
         status = self.position_manager.get_status()
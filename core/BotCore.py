@@ -1,4 +1,18 @@
-from core.db_utils import save_decision_to_db, save_equity_to_db
+import json
+import time
+
+from core.BudgetedExecutor import BudgetedExecutor
+from core.CandleBuffer import CandleBuffer
+from core.CandleScheduler import CandleScheduler
+from core.CandleStore import CandleStore
+from core.IndicatorHub import IndicatorHub
+from core.InferenceServer import InferenceServer
+from core.db_retention import RetentionScheduler, retention_enabled
+from core.db_utils import (
+    db_writer_metrics, save_decision_to_db, save_equity_to_db
+)
+from core.StateSnapshot import BotStatePublisher
+from core.StrategyAdapter import StrategyDispatcher, TickContext
 # BotCore.py – Final production refactor for ZoL0 (LEVEL-Ω, LEVEL-ALPHA-FUND)
 
 from utils.config_loader import load_config
@@ -7,6 +21,47 @@ from utils.news_social_fetcher import NewsSocialFetcher
 from utils.news_social_scheduler import NewsSocialScheduler
 
 
+def lead_signal(ensemble_signals):
+    """
+    (strategy, signal, allocation) of the highest-allocated entry of
+    DynamicStrategyRouter.route output – typed columns of the decision row.
+    """
+    if not ensemble_signals:
+        return None, None, None
+    lead = max(ensemble_signals, key=lambda s: s.get("allocation") or 0)
+    signal = lead.get("signal")
+    if isinstance(signal, dict):
+        signal = signal.get("signal", signal.get("action"))
+    return lead.get("strategy"), signal, lead.get("allocation")
+
+
+def build_strategies(symbol, sim_env=None, rl_learner=None):
+    """Create the per-symbol strategy set used by run_bot."""
+    from strategies.breakout import BreakoutStrategy
+    from strategies.grid_trading import GridTradingStrategy
+    from strategies.mean_reversion import MeanReversionStrategy
+    from strategies.momentum import MomentumStrategy
+    from strategies.sentiment import SentimentStrategy
+    from strategies.trend_following import TrendFollowingStrategy
+    from strategies.UniversalStrategy import UniversalStrategy
+    from strategies.market_making import MarketMakingStrategy
+    from strategies.arbitrage import ArbitrageStrategy
+    from strategies.rl_omega import RLOmegaStrategy
+
+    return [
+        MomentumStrategy(name="Momentum"),
+        MeanReversionStrategy(name="MeanReversion"),
+        BreakoutStrategy(name="Breakout"),
+        TrendFollowingStrategy(),
+        UniversalStrategy(name="Universal"),
+        GridTradingStrategy(name="GridTrading"),
+        MarketMakingStrategy(symbol=symbol, name="MarketMaking"),
+        ArbitrageStrategy(name="Arbitrage"),
+        SentimentStrategy(name="Sentiment"),
+        RLOmegaStrategy(sim_env=sim_env, learner=rl_learner),
+    ]
+
+
 def run_bot(simulate=False):
     """
     Production-grade main bot logic with full error handling and ML.
@@ -34,16 +89,7 @@ def run_bot(simulate=False):
     from models.tp_sl_optimizer import TpSlOptimizer
     from models.trend_predictor import TrendPredictor
     from models.volatility_forecaster import VolatilityForecaster
-    from strategies.breakout import BreakoutStrategy
-    from strategies.grid_trading import GridTradingStrategy
-    from strategies.mean_reversion import MeanReversionStrategy
-    from strategies.momentum import MomentumStrategy
-    from strategies.sentiment import SentimentStrategy
-    from strategies.trend_following import TrendFollowingStrategy
-    from strategies.UniversalStrategy import UniversalStrategy
-    from strategies.market_making import MarketMakingStrategy
-    from strategies.arbitrage import ArbitrageStrategy
-    from strategies.rl_omega import RLOmegaStrategy
+    from models.feature_engine import FeatureEngine
     from core.DynamicStrategyRouter import DynamicStrategyRouter
 
     # Initialize core objects once, reuse in loop
@@ -58,113 +104,75 @@ def run_bot(simulate=False):
         api_key=config.get("api_key"),
         api_secret=config.get("api_secret"),
     )
-    trend_predictor = TrendPredictor()
+    # Wspólny stan cech per symbol – O(1) na nową świecę zamiast pandas
+    feature_engine = FeatureEngine()
+    # Runtime per model ("native" / "numpy"), domyślnie MODEL_RUNTIME
+    runtimes = config.get("model_runtime") or {}
+    trend_predictor = TrendPredictor(
+        feature_engine=feature_engine, runtime=runtimes.get("trend")
+    )
     tp_sl_optimizer = TpSlOptimizer()
-    vol_forecaster = VolatilityForecaster()
+    vol_forecaster = VolatilityForecaster(
+        feature_engine=feature_engine, runtime=runtimes.get("volatility")
+    )
+    # Jeden predict na model dla symboli zsynchronizowanych blisko siebie
+    # (inference_max_wait_sec), nie predict per symbol
+    inference = InferenceServer(
+        max_batch=config.get("inference_max_batch", 256)
+    )
+    inference.register("trend", trend_predictor.predict_trend_batch)
+    inference.register("volatility", vol_forecaster.forecast_batch)
     infinity_logger = InfinityLayerLogger()
-    ai_trainer = OnlineTrainer()
+    ai_trainer = OnlineTrainer(runtime=runtimes.get("online_trainer"))
     symbols = config.get("symbols", [config.get("symbol", "BTC/USDT")])
 
     # Pre-create strategies_per_symbol and router_per_symbol
     # outside the main loop
+    timeframe = str(config["timeframe"])
+    # Lokalny cache świec: historia z dysku, z API tylko brakujący ogon
+    candle_store = CandleStore()
+    history_limit = config.get("history_limit", 500)
+    candle_window = config.get("candle_window", 200)
     strategies_per_symbol = {}
     from strategies.sim_env import SimulatedTradingEnv  # Import before use
 
-    for symbol in symbols:
-        momentum = MomentumStrategy(name="Momentum")
-        mean_reversion = MeanReversionStrategy(name="MeanReversion")
-        breakout = BreakoutStrategy(name="Breakout")
-        trend_following = TrendFollowingStrategy()
-        universal = UniversalStrategy(name="Universal")
-        grid_trading = GridTradingStrategy(name="GridTrading")
-        market_making = MarketMakingStrategy(
-            symbol=symbol,
-            name="MarketMaking"
-        )
-        arbitrage = ArbitrageStrategy(name="Arbitrage")
-        sentiment = SentimentStrategy(name="Sentiment")
-        # Import SimulatedTradingEnv only once, outside the loop,
-        # to avoid shadowing
-        price_series = [
-            c["close"]
-            for c in fetcher.get_ohlcv(
-                symbol, str(config["timeframe"]), limit=500
-            )
-        ]
-        sim_env = SimulatedTradingEnv(price_series) if simulate else None
-        rl_omega = RLOmegaStrategy(sim_env=sim_env)
-        strategies = [
-            momentum,
-            mean_reversion,
-            breakout,
-            trend_following,
-            universal,
-            grid_trading,
-            market_making,
-            arbitrage,
-            sentiment,
-            rl_omega,
-        ]
-        strategies_per_symbol[symbol] = strategies
-    router_per_symbol = {
-        symbol: DynamicStrategyRouter(
-            strategies=strategies_per_symbol[symbol]
-        )
-        for symbol in symbols
-    }
-    news_fetcher = NewsSocialFetcher()
-    news_scheduler = NewsSocialScheduler(
-        lambda: news_fetcher.fetch_news(query="crypto", limit=20),
-        interval_sec=300,
-    )
-    news_scheduler.start()
-    federated_round = 0
-    retrain_interval = config.get("retrain_interval", 1000)
-    reconnect_attempts = 0
-    max_reconnect = 5
-    strategies_per_symbol = {}
-    from strategies.sim_env import SimulatedTradingEnv  # moved import here
+    # Trening RLOmega (symulacja) w osobnym procesie ucznia na symbol
+    rl_learners = {}
 
-    for symbol in symbols:
-        momentum = MomentumStrategy(name="Momentum")
-        mean_reversion = MeanReversionStrategy(name="MeanReversion")
-        breakout = BreakoutStrategy(name="Breakout")
-        trend_following = TrendFollowingStrategy()
-        universal = UniversalStrategy(name="Universal")
-        grid_trading = GridTradingStrategy(name="GridTrading")
-        market_making = MarketMakingStrategy(
-            symbol=symbol,
-            name="MarketMaking"
-        )
-        arbitrage = ArbitrageStrategy(name="Arbitrage")
-        sentiment = SentimentStrategy(name="Sentiment")
+    for symbol, series in candle_store.sync_many(
+        symbols, timeframe, fetcher, limit=history_limit, repair=True
+    ):
+        if series is None:
+            series = candle_store.series(symbol, timeframe)
+        price_series = series.close[-history_limit:].tolist()
+        sim_env = SimulatedTradingEnv(price_series) if simulate else None
+        if sim_env is not None and config.get("rl_learner_process", True):
+            from ai.RLLearner import RLLearner
 
-        price_series = [
-            c["close"]
-            for c in fetcher.get_ohlcv(
-                symbol, str(config["timeframe"]), limit=500
+            rl_learners[symbol] = RLLearner(
+                prioritized_alpha=config.get("rl_prioritized_alpha", 0.0),
+                publish_every=config.get("rl_publish_every", 50),
             )
-        ]
-        sim_env = SimulatedTradingEnv(price_series) if simulate else None
-        rl_omega = RLOmegaStrategy(sim_env=sim_env)
-        strategies = [
-            momentum,
-            mean_reversion,
-            breakout,
-            trend_following,
-            universal,
-            grid_trading,
-            market_making,
-            arbitrage,
-            sentiment,
-            rl_omega,
-        ]
-        strategies_per_symbol[symbol] = strategies
+        strategies_per_symbol[symbol] = build_strategies(
+            symbol, sim_env, rl_learners.get(symbol)
+        )
+    # Strategie routera równolegle (wątki + pętla asyncio) z budżetem
+    # czasu na tick; spóźnione wyniki z poprzedniego ticku albo pominięte
+    router_budget_ms = config.get("router_budget_ms", 250)
+    router_executor = BudgetedExecutor(
+        max_workers=config.get("router_workers", 4),
+        budget_sec=(
+            router_budget_ms / 1000 if router_budget_ms is not None else None
+        ),
+        on_timeout=config.get("router_on_timeout", "previous"),
+    )
     router_per_symbol = {
         symbol: DynamicStrategyRouter(
             strategies=strategies_per_symbol[symbol],
             perf_tracker=perf_tracker,
             risk_manager=risk_manager,
+            executor=router_executor,
+            symbol=symbol,
         )
         for symbol in symbols
     }
@@ -174,26 +182,125 @@ def run_bot(simulate=False):
         interval_sec=300,
     )
     news_scheduler.start()
+    # Retencja tabel append-only (DB_RETENTION_DAYS) w wątku w tle
+    if retention_enabled():
+        RetentionScheduler().start()
     federated_round = 0
     retrain_interval = config.get("retrain_interval", 1000)
     reconnect_attempts = 0
     max_reconnect = 5
+    # Strategie i modele liczone na zamknięciu świecy subskrybowanego
+    # timeframe'u; między zamknięciami zapamiętane wyniki
+    scheduler = (
+        CandleScheduler(timeframe)
+        if config.get("candle_close_scheduling", True) else None
+    )
+    # Plany wywołań analyze() kompilowane raz, nie co tick
+    dispatcher_per_symbol = {
+        symbol: StrategyDispatcher(
+            strategies_per_symbol[symbol], scheduler, router_executor
+        )
+        for symbol in symbols
+    }
+    # Jeden bufor świec na symbol, współdzielony przez strategie i modele
+    candle_buffers = {
+        symbol: CandleBuffer(candle_window, symbol) for symbol in symbols
+    }
+    # Wskaźniki deklarowane przez strategie, liczone raz na wersję bufora
+    indicator_hub = IndicatorHub()
+    indicator_views = {
+        symbol: indicator_hub.view(symbol, candle_buffers[symbol])
+        for symbol in symbols
+    }
+    # Minimalny czas cyklu – wcześniej tempo wyznaczał sleep w fetcherze
+    loop_interval = config.get("loop_interval_sec", 1.0)
+    # Stan dla procesu API (pozycje, decyzje, alokacje, equity) – raz na
+    # tick przez pamięć współdzieloną zamiast wspólnych obiektów i bazy
+    state_publisher = (
+        BotStatePublisher() if config.get("state_snapshot", True) else None
+    )
+    strategy_names = {
+        s.name for group in strategies_per_symbol.values() for s in group
+    }
+    # Ile (s) wiersz cech czeka na wspólną paczkę inferencji z kolejnymi
+    # symbolami; 0 – każdy symbol liczony od razu, bez paczek
+    inference_max_wait = config.get("inference_max_wait_sec", 0.05)
+
+    def _prepare(symbol, series):
+        # Bufor świec + memo modeli albo futures z InferenceServer
+        if series is None:
+            series = candle_store.series(symbol, timeframe)
+        buffer = candle_buffers[symbol]
+        buffer.sync(series)
+        if not len(buffer):
+            logger.warning(f"No OHLCV data fetched for {symbol}. Skipping.")
+            return None
+        # Trend, zmienność i TP/SL tylko po zamknięciu świecy
+        model_key = models = None
+        if scheduler is not None:
+            model_key = scheduler.key("models", symbol, None, buffer.last_ts)
+            models = scheduler.get(model_key)
+        if models is not None:
+            return symbol, buffer, model_key, models, None
+        return symbol, buffer, model_key, None, (
+            inference.submit(
+                "trend", trend_predictor.batch_row(buffer, symbol=symbol)
+            ),
+            inference.submit(
+                "volatility", vol_forecaster.batch_row(buffer, symbol=symbol)
+            ),
+        )
+
+    def _stream_ready():
+        """
+        Yield symbols in sync order as soon as their model outputs exist.
+        Rows of symbols synced close together share one batched predict:
+        a batch runs at ``max_batch`` (in submit) or when the oldest
+        waiting row is ``inference_max_wait`` old; the rest is flushed
+        once every symbol has synced. A waiting symbol is re-checked when
+        the next one finishes syncing.
+        """
+        waiting = []  # (czas zgłoszenia, element) w kolejności zgłoszeń
+        for symbol, series in candle_store.sync_many(
+            symbols, timeframe, fetcher
+        ):
+            try:
+                item = _prepare(symbol, series)
+            except Exception as e:
+                logger.error(
+                    f"Feature extraction failed for {symbol}: {e}",
+                    exc_info=True,
+                )
+                item = None
+            if item is not None and item[4] is None:
+                yield item  # modele z memo – od razu do strategii
+            elif item is not None:
+                waiting.append((time.monotonic(), item))
+            if waiting and (
+                time.monotonic() - waiting[0][0] >= inference_max_wait
+            ):
+                inference.flush()
+            still = []
+            for since, item in waiting:
+                if all(f.done() for f in item[4]):
+                    yield item
+                else:
+                    still.append((since, item))
+            waiting = still
+        inference.flush()
+        for _, item in waiting:
+            yield item
+
     while True:
-        # ⬆️ optimized for performance: batch fetch OHLCV and ML predictions
-        ohlcv_cache = {}
-        for symbol in symbols:
+        cycle_start = time.monotonic()
+        # ⬆️ optimized for performance: z API tylko nowe świece (ogon od
+        # ostatniego zapisanego timestampu), pobierane współbieżnie. Symbol
+        # idzie do strategii, gdy tylko jego modele są policzone – nie
+        # czeka na pobranie pozostałych (patrz _stream_ready).
+        for symbol, buffer, model_key, models, futures in _stream_ready():
             try:
-                # Cache OHLCV fetches for this loop
-                if symbol not in ohlcv_cache:
-                    ohlcv_cache[symbol] = fetcher.get_ohlcv(
-                        symbol, str(config["timeframe"])
-                    )
-                candles = ohlcv_cache[symbol]
-                if not candles:
-                    logger.warning(
-                        f"No OHLCV data fetched for {symbol}. Skipping."
-                    )
-                    continue
+                # Lista dictów budowana raz na tick (tp/sl, Universal, DB)
+                candles = buffer.records()
                 logger.info(
                     f"Fetched OHLCV for {symbol}: {candles[-1]}"
                 )
@@ -201,11 +308,14 @@ def run_bot(simulate=False):
                 balance = config.get("balance", 1000)
                 position_status = "none"
                 pnl_history = []
-                # Batch ML predictions if possible (placeholder, real batching
-                # requires model support)
-                trend = trend_predictor.predict_trend(candles)
-                sl, tp = tp_sl_optimizer.optimize(candles)
-                vol = vol_forecaster.forecast_volatility(candles)
+                if models is None:
+                    trend = futures[0].result()
+                    sl, tp = tp_sl_optimizer.optimize(candles)
+                    vol = futures[1].result()
+                    models = (trend, vol, sl, tp)
+                    if model_key is not None:
+                        scheduler.put(model_key, models)
+                trend, vol, sl, tp = models
                 market_state = {
                     "trend": trend,
                     "volatility": vol,
@@ -217,115 +327,29 @@ def run_bot(simulate=False):
                     "symbol": symbol,
                 }
                 router = router_per_symbol[symbol]
-                ensemble_signals = router.route(market_state)
+                route_key = ensemble_signals = None
+                if scheduler is not None:
+                    route_key = scheduler.key(
+                        "router", symbol, None, buffer.last_ts
+                    )
+                    ensemble_signals = scheduler.get(route_key)
+                if ensemble_signals is None:
+                    ensemble_signals = router.route(market_state)
+                    if route_key is not None:
+                        scheduler.put(route_key, ensemble_signals)
                 # Log raw signals from each strategy for diagnosis
-                import asyncio
-                import inspect
-                from inspect import signature
-                import json
-                raw_signals = []
-                # Prepare available data for argument mapping
-                klines = candles
-                indicators = None  # TODO: extract indicators if available
-                timeframe = str(config["timeframe"])
-                price = candles[-1]["close"] if candles else None
-                mid_price = price if price is not None else 0.0
-                inventory = None  # TODO: track inventory if available
-                orderbooks = {}  # Default: empty dict
-                prices = {}  # Default: empty dict
-                sentiment_data = []  # Default: empty list
-                data = klines if klines else []
-                orderbook = {}  # Default: empty dict
-                state = market_state
-                for s in strategies_per_symbol[symbol]:
-                    try:
-                        analyze_fn = getattr(s, "analyze", None)
-                        if analyze_fn is not None:
-                            sig_obj = signature(analyze_fn)
-                            params = sig_obj.parameters
-                            call_args = {}
-                            # Map known argument names to available data
-                            for pname in params:
-                                # Special handling for MarketMakingStrategy:
-                                # always provide orderbook and mid_price
-                                # defaults
-                                if (
-                                    getattr(s, "__class__", None)
-                                    and (
-                                        s.__class__.__name__
-                                        == "MarketMakingStrategy"
-                                    )
-                                ):
-                                    if pname == "orderbook":
-                                        call_args[pname] = orderbook
-                                    if pname == "mid_price":
-                                        call_args[pname] = mid_price
-                                if pname == "self":
-                                    continue
-                                elif pname in ("market_data", "market_state"):
-                                    call_args[pname] = market_state
-                                elif pname == "klines":
-                                    call_args[pname] = klines
-                                elif pname == "indicators":
-                                    call_args[pname] = indicators
-                                elif pname == "timeframe":
-                                    call_args[pname] = timeframe
-                                elif pname == "price":
-                                    call_args[pname] = price
-                                elif pname == "mid_price":
-                                    if pname not in call_args:
-                                        call_args[pname] = mid_price
-                                elif pname == "inventory":
-                                    call_args[pname] = inventory
-                                elif pname == "orderbooks":
-                                    call_args[pname] = orderbooks
-                                elif pname == "prices":
-                                    call_args[pname] = prices
-                                elif pname == "sentiment_data":
-                                    call_args[pname] = sentiment_data
-                                elif pname == "symbol":
-                                    call_args[pname] = symbol
-                                elif pname == "data":
-                                    call_args[pname] = data
-                                elif pname == "orderbook":
-                                    if pname not in call_args:
-                                        call_args[pname] = orderbook
-                                elif pname == "state":
-                                    call_args[pname] = state
-                                else:
-                                    # Try to get from market_state
-                                    if pname in market_state:
-                                        call_args[pname] = market_state[pname]
-                                    else:
-                                        # Provide a safe default for unknown
-                                        # args
-                                        call_args[pname] = None
-                            if inspect.iscoroutinefunction(analyze_fn):
-                                try:
-                                    sig = asyncio.run(analyze_fn(**call_args))
-                                except RuntimeError:
-                                    sig = (
-                                        asyncio.get_event_loop()
-                                        .run_until_complete(
-                                            analyze_fn(**call_args)
-                                        )
-                                    )
-                            else:
-                                sig = analyze_fn(**call_args)
-                            raw_signals.append({
-                                "strategy": getattr(s, "name", str(s)),
-                                "signal": sig
-                            })
-                        else:
-                            raw_signals.append({
-                                "strategy": getattr(s, "name", str(s)),
-                                "error": "No analyze method"
-                            })
-                    except Exception as e:
-                        raw_signals.append({
-                            "strategy": getattr(s, "name", str(s)),
-                            "error": str(e)
-                        })
+                ctx = TickContext(
+                    symbol=symbol,
+                    market_state=market_state,
+                    klines=buffer.frame(),
+                    indicators=indicator_views[symbol],
+                    timeframe=timeframe,
+                    price=price,
+                    inventory=None,  # TODO: track inventory if available
+                    data=candles,
+                    candle_ts=buffer.last_ts,
+                )
+                raw_signals = dispatcher_per_symbol[symbol].dispatch(ctx)
                 infinity_logger.log(
                     "strategy_signals",
                     {"symbol": symbol, "raw_signals": raw_signals},
@@ -339,15 +363,28 @@ def run_bot(simulate=False):
                     {"symbol": symbol, "signals": ensemble_signals},
                 )
                 # Zapis decyzji do bazy (każda iteracja)
+                decision = "buy" if ensemble_signals else "hold"
+                lead, lead_sig, allocation = lead_signal(ensemble_signals)
+                details = json.dumps({
+                    "ensemble_signals": ensemble_signals,
+                    "trend": trend,
+                    "volatility": vol
+                }, default=str)
                 save_decision_to_db(
                     timestamp=candles[-1]["timestamp"],
-                    decision="buy" if ensemble_signals else "hold",
-                    details=json.dumps({
-                        "ensemble_signals": ensemble_signals,
-                        "trend": trend,
-                        "volatility": vol
-                    })
+                    decision=decision,
+                    details=details,
+                    symbol=symbol,
+                    strategy=lead,
+                    signal=lead_sig,
+                    trend=trend,
+                    volatility=vol,
+                    allocation=allocation,
                 )
+                if state_publisher is not None:
+                    state_publisher.record_decision(
+                        symbol, candles[-1]["timestamp"], decision, details
+                    )
                 if ensemble_signals:
                     main_sig = max(
                         ensemble_signals, key=lambda x: x.get("allocation", 0)
@@ -463,6 +500,10 @@ def run_bot(simulate=False):
                         equity=balance,
                         pnl=0.0
                     )
+                    if state_publisher is not None:
+                        state_publisher.record_equity(
+                            candles[-1]["timestamp"], balance, 0.0
+                        )
                 if federated_round % retrain_interval == 0:
                     ai_trainer.fit_if_needed()
                     infinity_logger.log(
@@ -482,3 +523,26 @@ def run_bot(simulate=False):
                     )
                     return
                 continue
+        if state_publisher is not None:
+            try:
+                state_publisher.publish(
+                    positions=position_manager.positions,
+                    routers=router_per_symbol,
+                    strategies=strategy_names,
+                    extra={
+                        "db_writer": db_writer_metrics(),
+                        "scheduler": (
+                            scheduler.metrics() if scheduler is not None
+                            else None
+                        ),
+                        "strategy_latency": router_executor.metrics(),
+                        "rl_learners": {
+                            s: lr.metrics() for s, lr in rl_learners.items()
+                        },
+                    },
+                )
+            except Exception as e:
+                logger.error(f"State snapshot publish failed: {e}")
+        remaining = loop_interval - (time.monotonic() - cycle_start)
+        if remaining > 0:
+            time.sleep(remaining)
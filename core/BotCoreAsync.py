@@ -1,52 +1,163 @@
 import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from core.HttpTransport import AsyncHttpTransport
 from core.MarketDataFetcher import MarketDataFetcher
-from core.db_utils import save_decision_to_db, save_equity_to_db
+from core.MarketDataStream import MarketDataStream
+from core.db_retention import RetentionScheduler, retention_enabled
+from core.db_utils import save_decision_async, save_equity_async
 import datetime
 from utils.config_loader import load_config
 
 
 class BotCoreAsync:
-    def __init__(self, strategy_router, position_manager):
+    """
+    Bot loop sharing the FastAPI event loop (main_async.py), so nothing
+    in a cycle may block it:
+    - świece z MarketDataStream (pamięć) albo get_ohlcv_async (httpx),
+    - symbole przetwarzane równolegle przez asyncio.gather,
+    - router.analyze (inferencja, CPU) w ograniczonym executorze – co
+      najwyżej ``inference_workers`` wywołań naraz, reszta czeka w pętli,
+    - zapis decyzji/equity przez save_*_async (kolejka write-behind),
+    - retencja tabel (DB_RETENTION_DAYS) jako zadanie w tej samej pętli,
+      purge w wątku.
+    """
+
+    def __init__(
+        self,
+        strategy_router,
+        position_manager,
+        stream=None,
+        fetcher=None,
+        symbols=None,
+        market_stream=None,
+        inference_workers=None,
+    ):
         self.router = strategy_router
         self.pm = position_manager
         self.running = True
-        self.fetcher = MarketDataFetcher()
+        self.fetcher = fetcher or MarketDataFetcher()
+        # Budowa klienta httpx (kontekst SSL) trwa ~100 ms – tu, nie w pętli
+        if self.fetcher.async_transport is None:
+            self.fetcher.async_transport = AsyncHttpTransport()
         config = load_config("config/config.yaml")
-        self.symbols = config.get("symbols", [config.get("symbol", "BTCUSDT")])
+        self.symbols = symbols or config.get(
+            "symbols", [config.get("symbol", "BTCUSDT")]
+        )
         self.last_prices = {s: None for s in self.symbols}
+        self.interval = str(config.get("timeframe", "1"))
+        # WebSocket zamiast odpytywania REST: pętla budzi się na zamknięcie
+        # świecy (market_stream: false wraca do pollingu co 5 s)
+        if market_stream is None:
+            market_stream = config.get("market_stream", True)
+        if stream is None and market_stream:
+            stream = MarketDataStream(
+                self.symbols, self.interval, fetcher=self.fetcher
+            )
+        self.stream = stream
+        # Bez zamknięcia świecy przez tyle sekund – i tak przejdź cykl
+        self.stale_timeout = float(config.get("stream_stale_sec", 300))
+        self.poll_interval = float(config.get("poll_interval_sec", 5))
+        self.inference_workers = int(
+            inference_workers
+            or config.get("inference_workers")
+            or os.environ.get("BOT_INFERENCE_WORKERS", "2")
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.inference_workers,
+            thread_name_prefix="bot-inference",
+        )
+        self._inference_slots = None
+        self.cycles = 0
+        self.retention = RetentionScheduler() if retention_enabled() else None
+        self._retention_task = None
 
     async def run_loop(self):
-        while self.running:
-            try:
-                for symbol in self.symbols:
-                    data = self.fetch_market_data(symbol)
-                    decision = self.router.analyze(data)
-                    if decision.get("signal") in ["buy", "sell"]:
-                        self.pm.update_position(symbol, {
-                            "amount": 100,
-                            "side": decision["signal"]
-                        })
-                    self.log_decision(symbol, decision, data)
-            except Exception as e:
-                logging.exception("Bot loop error: %s", str(e))
-            await asyncio.sleep(5)
+        if self.stream is not None:
+            self.stream.start()
+        if self.retention is not None:
+            self._retention_task = asyncio.create_task(
+                self.retention.run_async()
+            )
+        try:
+            while self.running:
+                if self.stream is not None:
+                    symbols = await self.stream.wait_closed(
+                        self.stale_timeout
+                    )
+                    if not symbols:
+                        logging.warning(
+                            "Market stream: no candle close, polling"
+                        )
+                        symbols = self.symbols
+                else:
+                    symbols = self.symbols
+                await self.run_cycle(symbols)
+                if self.stream is None:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            await self.aclose()
+
+    async def run_cycle(self, symbols):
+        """One decision pass; symbols run concurrently, errors per symbol."""
+        results = await asyncio.gather(
+            *(self.process_symbol(symbol) for symbol in symbols),
+            return_exceptions=True,
+        )
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logging.error(
+                    "Bot loop error (%s): %s", symbol, result,
+                    exc_info=result,
+                )
+        self.cycles += 1
+        return results
+
+    async def process_symbol(self, symbol):
+        data = await self.fetch_market_data(symbol)
+        decision = await self.infer(data)
+        if decision.get("signal") in ["buy", "sell"]:
+            self.pm.update_position(symbol, {
+                "amount": 100,
+                "side": decision["signal"],
+                "price": data.get("price"),
+            })
+        await self.log_decision(symbol, decision, data)
+        return decision
+
+    async def infer(self, data):
+        # Semafor = liczba workerów: kolejka czeka w pętli, nie w executorze
+        if self._inference_slots is None:
+            self._inference_slots = asyncio.Semaphore(self.inference_workers)
+        async with self._inference_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self.router.analyze, data
+            )
 
-    def fetch_market_data(self, symbol):
-        candles = self.fetcher.get_ohlcv(symbol, "1m", limit=50)
+    async def fetch_market_data(self, symbol):
+        if self.stream is not None and self.stream.ready.is_set():
+            candles = self.stream.candles(symbol, limit=50)
+        else:
+            candles = await self.fetcher.get_ohlcv_async(
+                symbol, self.interval, limit=50
+            )
         if not candles:
             return {"price": None}
         last = candles[-1]
         self.last_prices[symbol] = last["close"]
         return {"price": last["close"], "ohlcv": candles}
 
-    def log_decision(self, symbol, decision, data):
+    async def log_decision(self, symbol, decision, data):
         logging.info(f"Decision: {symbol} {decision}")
         now = datetime.datetime.utcnow().isoformat()
-        save_decision_to_db(
+        await save_decision_async(
             timestamp=now,
             decision=decision.get("signal", "hold"),
-            details=str(decision)
+            details=str(decision),
+            symbol=symbol,
+            signal=decision.get("signal"),
         )
         # Real PnL: equity = unrealized + realized (tu uproszczone)
         pos = self.pm.get_position(symbol)
@@ -62,4 +173,17 @@ class BotCoreAsync:
             elif side == "sell":
                 pnl = (entry - price) * amount
             equity += pnl
-        save_equity_to_db(timestamp=now, equity=equity, pnl=pnl)
+        await save_equity_async(timestamp=now, equity=equity, pnl=pnl)
+
+    def stop(self):
+        self.running = False
+
+    async def aclose(self):
+        if self._retention_task is not None:
+            self._retention_task.cancel()
+            self._retention_task = None
+        if self.stream is not None:
+            # join wątku WS (do 5 s) poza pętlą zdarzeń
+            await asyncio.to_thread(self.stream.stop)
+        await self.fetcher.aclose()
+        self.executor.shutdown(wait=False, cancel_futures=True)
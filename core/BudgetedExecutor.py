@@ -0,0 +1,247 @@
+# BudgetedExecutor.py – równoległe wywołania strategii z budżetem czasu
+"""
+BudgetedExecutor: runs a tick's strategy calls concurrently – sync ones
+on a thread pool, coroutine ones on an event loop in a background thread
+– and waits for them at most ``budget_sec``.
+
+Wywołanie, które nie zdąży przed terminem, nie blokuje ticku: dostaje
+status "stale" (wynik z poprzedniego ticku, ``on_timeout="previous"``)
+albo "dropped". Nadal trwające wywołanie nie jest zlecane ponownie –
+w kolejnym ticku czekamy na to samo future, a jego spóźniony wynik
+zostaje zapamiętany jako "poprzedni". Dzięki temu wolna strategia
+(RL z krokiem replay, sentyment z pobieraniem newsów) zajmuje co
+najwyżej jeden wątek. Wynik future zleconego w jednym z wcześniejszych
+``run`` (policzony na starym market_state) ma status "stale", nie "ok".
+``busy(key)`` mówi, czy wywołanie dla klucza wciąż trwa – inni
+wywołujący (StrategyDispatcher) nie uruchamiają wtedy tej samej
+strategii równolegle.
+
+Pula wątków, nie procesów: strategie trzymają stan (pozycje, trailing
+stop, bufor replay), który musi zostać w obiekcie strategii procesu bota.
+
+Czas każdego zakończonego wywołania (także spóźnionego; od startu w
+wątku, bez czekania w kolejce puli) trafia do LatencyHistogram per
+etykieta – ``(symbol, nazwa strategii)`` z routera albo sama nazwa.
+"""
+
+import asyncio
+import bisect
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ON_TIMEOUT = ("previous", "drop")
+_FAILED = object()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (upper bounds in ms)."""
+
+    BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1e3
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.BOUNDS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in self.BOUNDS_MS] + [
+            f">{self.BOUNDS_MS[-1]}"
+        ]
+        return {
+            "count": self.count,
+            "mean_ms": (
+                round(self.total_ms / self.count, 3) if self.count else None
+            ),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+Task = Tuple[Hashable, Hashable, Callable[[], Any]]
+
+
+class BudgetedExecutor:
+    """
+    ``run(tasks)`` with tasks ``(key, label, fn)``; returns
+    ``{key: (status, value)}`` where status is "ok" (value = result),
+    "error" (value = exception), "stale" (value = previous result) or
+    "dropped" (value = None).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        budget_sec: Optional[float] = 0.25,
+        on_timeout: str = "previous",
+    ):
+        if on_timeout not in ON_TIMEOUT:
+            raise ValueError(f"on_timeout must be one of {ON_TIMEOUT}")
+        self.budget_sec = budget_sec
+        self.on_timeout = on_timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="strategy"
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # key -> (future wciąż trwającego wywołania, numer run) / ostatni
+        # wynik
+        self._pending: Dict[Hashable, Tuple[Any, int]] = {}
+        self._runs = 0
+        self._last: Dict[Hashable, Any] = {}
+        self.timings: Dict[Hashable, LatencyHistogram] = {}
+        self.stats = {"ok": 0, "error": 0, "stale": 0, "dropped": 0}
+
+    # -- pętla zdarzeń dla strategii async --------------------------------
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="strategy-loop",
+                daemon=True,
+            )
+            self._loop_thread.start()
+        return self._loop
+
+    def _finish(self, key, label, start, result=_FAILED):
+        # W wątku wywołania, zanim future się rozstrzygnie
+        with self._lock:
+            hist = self.timings.get(label)
+            if hist is None:
+                hist = self.timings[label] = LatencyHistogram()
+            hist.record(time.perf_counter() - start)
+            # Także spóźniony wynik staje się "poprzednim" dla klucza
+            if result is not _FAILED:
+                self._last[key] = result
+        return result
+
+    def _call_sync(self, key, label, fn):
+        start = time.perf_counter()
+        try:
+            result = fn()
+            if inspect.iscoroutine(result):
+                # Funkcja sync zwróciła korutynę – wykonaj ją na pętli
+                result = asyncio.run_coroutine_threadsafe(
+                    result, self._event_loop()
+                ).result()
+        except BaseException:
+            self._finish(key, label, start)
+            raise
+        return self._finish(key, label, start, result)
+
+    async def _call_async(self, key, label, fn):
+        start = time.perf_counter()
+        try:
+            result = await fn()
+        except BaseException:
+            self._finish(key, label, start)
+            raise
+        return self._finish(key, label, start, result)
+
+    def _submit(self, key: Hashable, label: Hashable, fn):
+        if inspect.iscoroutinefunction(fn):
+            return asyncio.run_coroutine_threadsafe(
+                self._call_async(key, label, fn), self._event_loop()
+            )
+        return self._pool.submit(self._call_sync, key, label, fn)
+
+    def busy(self, key: Hashable) -> bool:
+        """True while a call submitted for ``key`` has not finished."""
+        pending = self._pending.get(key)
+        return pending is not None and not pending[0].done()
+
+    # -- tick ---------------------------------------------------------------
+
+    def run(
+        self, tasks: List[Task], budget_sec: Optional[float] = None
+    ) -> Dict[Hashable, Tuple[str, Any]]:
+        budget = self.budget_sec if budget_sec is None else budget_sec
+        self._runs += 1
+        futures = {}
+        for key, label, fn in tasks:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = (
+                    self._submit(key, label, fn), self._runs
+                )
+            futures[key] = pending
+        if futures:
+            wait([f for f, _ in futures.values()], timeout=budget)
+        outcomes = {}
+        for key, (future, run) in futures.items():
+            if future.done():
+                del self._pending[key]
+                error = future.exception()
+                if error is not None:
+                    outcomes[key] = ("error", error)
+                elif run == self._runs:
+                    outcomes[key] = ("ok", future.result())
+                else:
+                    # Zlecone we wcześniejszym ticku – stary market_state
+                    outcomes[key] = ("stale", future.result())
+            elif self.on_timeout == "previous" and key in self._last:
+                with self._lock:
+                    outcomes[key] = ("stale", self._last[key])
+            else:
+                outcomes[key] = ("dropped", None)
+            self.stats[outcomes[key][0]] += 1
+        return outcomes
+
+    def metrics(self) -> Dict[str, Any]:
+        timings: Dict[str, Any] = {}
+        with self._lock:
+            for label, hist in self.timings.items():
+                if isinstance(label, tuple):
+                    # (symbol, strategia) -> {symbol: {strategia: ...}}
+                    symbol, name = label
+                    timings.setdefault(symbol, {})[name] = hist.snapshot()
+                else:
+                    timings[label] = hist.snapshot()
+        return {
+            "budget_ms": (
+                None if self.budget_sec is None
+                else round(self.budget_sec * 1e3, 3)
+            ),
+            "in_flight": len(self._pending),
+            "outcomes": dict(self.stats),
+            "timings": timings,
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._loop_thread is not None:
+                self._loop_thread.join(timeout=1.0)
+            self._loop.close()
+            self._loop = None
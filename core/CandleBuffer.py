@@ -0,0 +1,220 @@
+# CandleBuffer.py – kolumnowy bufor pierścieniowy świec per symbol
+"""
+CandleBuffer: fixed-capacity OHLCV ring buffer shared by every strategy
+and model that looks at a symbol within one tick.
+
+Kolumny float64 (open, high, low, close, volume) i int64 timestamp leżą
+w tablicach o długości 2 * capacity; każda świeca jest zapisywana pod
+indeksem ``i`` i ``i + capacity``, więc ostatnie ``n`` świec to zawsze
+ciągły wycinek – widok bez kopiowania (ważny do następnej zmiany
+bufora). Dopisanie świecy jest O(1), świeca z tym samym timestampem co
+ostatnia (formująca się) nadpisuje ją.
+
+DataFrame dla strategii pandasowych i lista dictów dla starszych
+konsumentów są budowane leniwie i cache'owane do następnej zmiany bufora
+(czyli raz na tick), niezależnie od liczby czytelników.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+COLUMNS = ("timestamp",) + FIELDS
+
+
+class CandleBuffer:
+    """Ring buffer of the last ``capacity`` candles of one symbol."""
+
+    __slots__ = (
+        "symbol",
+        "capacity",
+        "_ts",
+        "_values",
+        "_head",
+        "_len",
+        "version",
+        "_frame",
+        "_records",
+    )
+
+    def __init__(self, capacity: int = 500, symbol: Optional[str] = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.symbol = symbol
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(FIELDS), 2 * capacity))
+        # _head: indeks w [0, capacity) następnego zapisu
+        self._head = 0
+        self._len = 0
+        self.version = 0
+        self._frame = None
+        self._records = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if not self._len:
+            return None
+        return int(self._ts[self._head - 1 + self.capacity])
+
+    def _touch(self):
+        self.version += 1
+        self._frame = None
+        self._records = None
+
+    def _write(self, i: int, ts: int, values):
+        cap = self.capacity
+        self._ts[i] = self._ts[i + cap] = ts
+        self._values[:, i] = self._values[:, i + cap] = values
+
+    def append(self, candle) -> bool:
+        """
+        Add a candle (dict or (ts, o, h, l, c, v) tuple). A candle with
+        the last timestamp replaces it, older ones are ignored. Returns
+        whether the buffer changed.
+        """
+        if isinstance(candle, dict):
+            ts = int(candle["timestamp"])
+            values = [float(candle[f]) for f in FIELDS[:4]]
+            values.append(float(candle.get("volume", 0.0)))
+        else:
+            ts = int(candle[0])
+            values = [float(v) for v in candle[1:6]]
+        last = self.last_ts
+        if last is not None and ts < last:
+            return False
+        if ts == last:
+            i = (self._head - 1) % self.capacity
+            if np.array_equal(self._values[:, i], values):
+                return False
+        else:
+            i = self._head
+            self._head = (self._head + 1) % self.capacity
+            self._len = min(self._len + 1, self.capacity)
+        self._write(i, ts, values)
+        self._touch()
+        return True
+
+    def extend(self, candles) -> int:
+        """Append candles in any order (e.g. newest-first from Bybit)."""
+        if not candles:
+            return 0
+        ordered = sorted(
+            candles,
+            key=lambda c: int(c["timestamp"] if isinstance(c, dict)
+                              else c[0]),
+        )
+        return sum(self.append(c) for c in ordered)
+
+    def sync(self, series) -> int:
+        """
+        Bring the buffer up to date with a CandleSeries: only candles from
+        the last buffered timestamp on are copied.
+        """
+        ts = series.timestamps
+        if not len(ts):
+            return 0
+        last = self.last_ts
+        start = 0 if last is None else int(np.searchsorted(ts, last))
+        start = max(start, len(ts) - self.capacity)
+        if start >= len(ts):
+            return 0
+        cols = series.arrays(start)
+        changed = 0
+        for k in range(len(ts) - start):
+            changed += self.append(
+                (cols["timestamp"][k],)
+                + tuple(cols[f][k] for f in FIELDS)
+            )
+        return changed
+
+    # -- odczyt (widoki bez kopiowania) -----------------------------------
+
+    def _span(self, n: Optional[int]):
+        n = self._len if n is None else min(n, self._len)
+        stop = self._head + self.capacity
+        return stop - n, stop
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        start, stop = self._span(None)
+        return self._ts[start:stop]
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        start, stop = self._span(n)
+        if name == "timestamp":
+            return self._ts[start:stop]
+        return self._values[FIELDS.index(name), start:stop]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.column("open")
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column("high")
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column("low")
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column("close")
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column("volume")
+
+    def arrays(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Column views of the last ``n`` candles (all if None)."""
+        lo, hi = self._span(n)
+        out = {"timestamp": self._ts[lo:hi]}
+        for k, name in enumerate(FIELDS):
+            out[name] = self._values[k, lo:hi]
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Whole window as a DataFrame (a snapshot, unlike the live array
+        views), built once per buffer version.
+        """
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.arrays())
+        return self._frame
+
+    def records(self) -> List[dict]:
+        """
+        Whole window as ascending candle dicts (timestamp as str, like
+        MarketDataFetcher), built once per buffer version.
+        """
+        if self._records is None:
+            cols = self.arrays()
+            ts = cols["timestamp"].tolist()
+            values = [cols[f].tolist() for f in FIELDS]
+            self._records = [
+                {
+                    "timestamp": str(ts[i]),
+                    "open": values[0][i],
+                    "high": values[1][i],
+                    "low": values[2][i],
+                    "close": values[3][i],
+                    "volume": values[4][i],
+                }
+                for i in range(len(ts))
+            ]
+        return self._records
+
+
+def as_frame(ohlcv) -> pd.DataFrame:
+    """OHLCV as a DataFrame: the buffer's cached frame, lists converted."""
+    if isinstance(ohlcv, CandleBuffer):
+        return ohlcv.frame()
+    if isinstance(ohlcv, list):
+        return pd.DataFrame(ohlcv)
+    return ohlcv
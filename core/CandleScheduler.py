@@ -0,0 +1,109 @@
+# CandleScheduler.py – strategie i modele uruchamiane na zamknięciu świecy
+"""
+CandleScheduler: runs strategies and models only when a candle closes on
+a timeframe they subscribe to, and returns memoized results otherwise.
+
+Bot pobiera świece jednego, bazowego interwału; ostatnia świeca w
+buforze to świeca formująca się (timestamp = otwarcie). Świeca
+interwału ``tf`` zamyka się, gdy otwarcie świecy formującej przechodzi
+do kolejnego kubełka ``tf``, więc otwarcie ostatniej zamkniętej świecy
+to ``(last_ts // tf - 1) * tf`` – czysta funkcja timestampu, bez stanu
+"poprzedniego ticku".
+
+Klucz memo: (właściciel, symbol, interwał, otwarcie ostatniej zamkniętej
+świecy). Interwał to najdrobniejszy z subskrybowanych (``timeframes``
+strategii), nie mniejszy niż bazowy – zamknięcie grubszej świecy jest
+zawsze też zamknięciem drobniejszej. Dopóki klucz się nie zmienia,
+``get`` zwraca zapamiętany wynik (pominięte wywołanie); nowy klucz
+oznacza zamkniętą świecę i wynik liczony jest ponownie (``put``).
+Trzymany jest tylko ostatni wynik per (właściciel, symbol).
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.CandleStore import interval_ms
+
+# Jednostki timeframe'ów strategii ("1m", "5m", "1h", "4h", "1d", "1w")
+UNIT_MS = {
+    "m": 60_000,
+    "h": 3_600_000,
+    "d": 86_400_000,
+    "w": 604_800_000,
+}
+
+Key = Tuple[str, str, int, int]
+
+
+def timeframe_ms(timeframe) -> Optional[int]:
+    """Strategy ("5m", "1h") or Bybit ("5", "60", "D") timeframe in ms."""
+    timeframe = str(timeframe).strip()
+    unit = UNIT_MS.get(timeframe[-1:].lower())
+    if unit is not None and timeframe[:-1].isdigit():
+        return int(timeframe[:-1]) * unit
+    return interval_ms(timeframe)
+
+
+class CandleScheduler:
+    """Memoizes per-(owner, symbol) results until a subscribed candle
+    closes; counts run vs skipped invocations per owner."""
+
+    def __init__(self, base_timeframe):
+        self.base_ms = timeframe_ms(base_timeframe)
+        if not self.base_ms:
+            raise ValueError(f"unsupported base timeframe: {base_timeframe}")
+        self._periods: Dict[Tuple, int] = {}
+        self._memo: Dict[Tuple[str, str], Tuple[Key, Any]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def period_ms(self, timeframes: Optional[Iterable] = None) -> int:
+        """Finest subscribed timeframe, never below the base interval."""
+        timeframes = tuple(timeframes or ())
+        period = self._periods.get(timeframes)
+        if period is None:
+            known = [timeframe_ms(tf) for tf in timeframes]
+            known = [ms for ms in known if ms]
+            period = max(min(known), self.base_ms) if known else self.base_ms
+            self._periods[timeframes] = period
+        return period
+
+    def key(
+        self, owner: str, symbol: str, timeframes, last_ts: int
+    ) -> Key:
+        """Memo key: (owner, symbol, period, last closed candle open)."""
+        period = self.period_ms(timeframes)
+        return owner, symbol, period, (int(last_ts) // period - 1) * period
+
+    def _count(self, owner: str, field: str):
+        counts = self.stats.get(owner)
+        if counts is None:
+            counts = self.stats[owner] = {"run": 0, "skipped": 0}
+        counts[field] += 1
+
+    def get(self, key: Key):
+        """Memoized result for ``key`` (counted as skipped) or None."""
+        entry = self._memo.get(key[:2])
+        if entry is None or entry[0] != key:
+            return None
+        self._count(key[0], "skipped")
+        return entry[1]
+
+    def put(self, key: Key, value):
+        """Store a freshly computed (non-None) result; counted as run."""
+        self._memo[key[:2]] = (key, value)
+        self._count(key[0], "run")
+        return value
+
+    def forget(self, symbol: str):
+        for memo_key in [k for k in self._memo if k[1] == symbol]:
+            del self._memo[memo_key]
+
+    def metrics(self) -> Dict[str, Any]:
+        run = sum(c["run"] for c in self.stats.values())
+        skipped = sum(c["skipped"] for c in self.stats.values())
+        total = run + skipped
+        return {
+            "run": run,
+            "skipped": skipped,
+            "skip_ratio": round(skipped / total, 4) if total else 0.0,
+            "by_owner": {k: dict(v) for k, v in self.stats.items()},
+        }
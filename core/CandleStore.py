@@ -0,0 +1,377 @@
+# CandleStore.py – lokalny, trwały cache świec OHLCV (memmap, kolumnowo)
+"""
+CandleStore: persistent candle cache keyed by (symbol, interval).
+
+Każda seria to katalog ``<root>/<symbol>_<interval>/`` z kolumnami jako
+surowe pliki binarne (timestamp int64 ms, open/high/low/close/volume
+float64) i ``meta.json`` z liczbą ważnych wierszy. Kolumny są otwierane
+przez np.memmap, więc historia ładuje się natychmiast, a strategie i
+modele dostają widoki tablic bez kopiowania.
+
+Synchronizacja pobiera tylko świece od ostatniego zapisanego timestampu
+(ostatnia, wciąż formująca się świeca jest nadpisywana), stronicuje wstecz
+gdy bot był wyłączony dłużej niż ``limit`` świec, deduplikuje po
+timestampie i łata dziury (repair_gaps).
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+_DTYPES = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+}
+# Bybit: maksymalny limit świec w jednym zapytaniu
+MAX_PAGE = 1000
+MAX_PAGES_PER_SYNC = 20
+
+
+def interval_ms(interval) -> Optional[int]:
+    """Bybit kline interval ("1", "60", "D", "W") in ms; None for "M"."""
+    interval = str(interval)
+    if interval.isdigit():
+        return int(interval) * 60_000
+    return {"D": 86_400_000, "W": 604_800_000}.get(interval)
+
+
+def _rows_to_columns(candles) -> Dict[str, np.ndarray]:
+    """Fetcher candles (any order) -> ascending, ts-deduped columns."""
+    if not candles:
+        return {c: np.empty(0, dtype=_DTYPES[c]) for c in COLUMNS}
+    cols = {
+        c: np.fromiter(
+            (int(x[c]) if c == "timestamp" else float(x[c])
+             for x in candles),
+            dtype=_DTYPES[c],
+            count=len(candles),
+        )
+        for c in COLUMNS
+    }
+    return _dedupe(cols)
+
+
+def _dedupe(cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Sort by timestamp, keeping the last occurrence of duplicates."""
+    ts = cols["timestamp"]
+    # stabilne sortowanie odwróconej tablicy: pierwsze wystąpienie po
+    # odwróceniu = ostatnie w wejściu (najświeższa wersja świecy)
+    rev = ts[::-1]
+    order = np.argsort(rev, kind="stable")
+    keep = np.ones(order.shape[0], dtype=bool)
+    keep[1:] = rev[order][1:] != rev[order][:-1]
+    idx = order[keep]
+    return {c: v[::-1][idx] for c, v in cols.items()}
+
+
+class CandleSeries:
+    """One (symbol, interval) series backed by memory-mapped columns."""
+
+    def __init__(self, path: str, symbol: str, interval: str):
+        self.path = path
+        self.symbol = symbol
+        self.interval = str(interval)
+        self.interval_ms = interval_ms(interval)
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._length = self._load_meta()
+        self._maps: Dict[str, np.ndarray] = {}
+        self._remap()
+
+    # -- pliki ---------------------------------------------------------
+    def _col_path(self, col: str) -> str:
+        return os.path.join(self.path, f"{col}.bin")
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _load_meta(self) -> int:
+        try:
+            with open(self._meta_path()) as f:
+                length = int(json.load(f)["length"])
+        except (OSError, ValueError, KeyError):
+            length = 0
+        # Plik kolumny dłuższy niż meta = przerwany zapis; obcinamy
+        for col in COLUMNS:
+            p = self._col_path(col)
+            size = length * np.dtype(_DTYPES[col]).itemsize
+            if not os.path.exists(p):
+                if length:
+                    logger.error(f"CandleStore: missing {p}, resetting")
+                    return self._reset()
+                open(p, "wb").close()
+            elif os.path.getsize(p) < size:
+                logger.error(f"CandleStore: truncated {p}, resetting")
+                return self._reset()
+            elif os.path.getsize(p) > size:
+                with open(p, "r+b") as f:
+                    f.truncate(size)
+        return length
+
+    def _reset(self) -> int:
+        for col in COLUMNS:
+            open(self._col_path(col), "wb").close()
+        self._write_meta(0)
+        return 0
+
+    def _write_meta(self, length: int):
+        tmp = self._meta_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "symbol": self.symbol,
+                    "interval": self.interval,
+                    "length": length,
+                    "columns": {c: np.dtype(_DTYPES[c]).str for c in COLUMNS},
+                },
+                f,
+            )
+        os.replace(tmp, self._meta_path())
+
+    def _remap(self):
+        n = self._length
+        self._maps = {
+            c: (
+                np.memmap(self._col_path(c), dtype=_DTYPES[c], mode="r",
+                          shape=(n,))
+                if n else np.empty(0, dtype=_DTYPES[c])
+            )
+            for c in COLUMNS
+        }
+
+    # -- odczyt --------------------------------------------------------
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        """Zero-copy read-only view of a column."""
+        return self._maps[col]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._maps["timestamp"]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._maps["close"]
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self.timestamps[-1]) if self._length else None
+
+    def arrays(self, start: int = 0, stop: Optional[int] = None):
+        """Dict of zero-copy column views for rows [start:stop]."""
+        maps = self._maps
+        return {c: maps[c][start:stop] for c in COLUMNS}
+
+    def tail(self, n: int) -> Dict[str, np.ndarray]:
+        return self.arrays(max(0, self._length - n))
+
+    def tail_records(self, n: int) -> List[dict]:
+        """Last ``n`` candles as fetcher-style dicts, oldest first."""
+        cols = self.tail(n)
+        ts = cols["timestamp"].tolist()
+        values = [cols[c].tolist() for c in COLUMNS[1:]]
+        return [
+            {
+                "timestamp": str(t),
+                "open": o,
+                "high": h,
+                "low": lo,
+                "close": c,
+                "volume": v,
+            }
+            for t, o, h, lo, c, v in zip(ts, *values)
+        ]
+
+    def to_frame(self, start=None, end=None) -> pd.DataFrame:
+        """DataFrame of candles with start <= timestamp <= end (ms)."""
+        ts = self.timestamps
+        lo = 0 if start is None else int(np.searchsorted(ts, start, "left"))
+        hi = (
+            self._length if end is None
+            else int(np.searchsorted(ts, end, "right"))
+        )
+        return pd.DataFrame(self.arrays(lo, hi))
+
+    def gaps(self) -> List[tuple]:
+        """(first_missing_ts, last_missing_ts) for every hole in the series."""
+        step = self.interval_ms
+        if step is None or self._length < 2:
+            return []
+        ts = self.timestamps
+        holes = np.flatnonzero(np.diff(ts) > step)
+        return [(int(ts[i]) + step, int(ts[i + 1]) - step) for i in holes]
+
+    # -- zapis ---------------------------------------------------------
+    def merge(self, candles) -> int:
+        """
+        Merge fetched candles; returns the number of new rows. Candles at
+        or after the last stored timestamp are appended (the last row is
+        overwritten in place); older ones trigger a full rewrite.
+        """
+        cols = (
+            _rows_to_columns(candles) if not isinstance(candles, dict)
+            else _dedupe(candles)
+        )
+        if cols["timestamp"].shape[0] == 0:
+            return 0
+        with self.lock:
+            last = self.last_ts
+            if last is None or cols["timestamp"][0] >= last:
+                return self._append(cols, last)
+            return self._rewrite(cols)
+
+    def _append(self, cols, last) -> int:
+        n = self._length
+        if last is not None and cols["timestamp"][0] == last:
+            # Nadpisanie formującej się świecy – widoczne też w istniejących
+            # memmapach (wspólne mapowanie pliku)
+            for c in COLUMNS:
+                item = np.dtype(_DTYPES[c]).itemsize
+                with open(self._col_path(c), "r+b") as f:
+                    f.seek((n - 1) * item)
+                    f.write(cols[c][:1].tobytes())
+            cols = {c: v[1:] for c, v in cols.items()}
+        added = cols["timestamp"].shape[0]
+        if added:
+            for c in COLUMNS:
+                with open(self._col_path(c), "ab") as f:
+                    f.write(np.ascontiguousarray(cols[c]).tobytes())
+            self._length = n + added
+            self._write_meta(self._length)
+            self._remap()
+        return added
+
+    def _rewrite(self, cols) -> int:
+        old = {c: np.array(self._maps[c]) for c in COLUMNS}
+        merged = _dedupe(
+            {c: np.concatenate([old[c], cols[c]]) for c in COLUMNS}
+        )
+        added = merged["timestamp"].shape[0] - self._length
+        for c in COLUMNS:
+            tmp = self._col_path(c) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(np.ascontiguousarray(merged[c]).tobytes())
+            os.replace(tmp, self._col_path(c))
+        self._length = merged["timestamp"].shape[0]
+        self._write_meta(self._length)
+        self._remap()
+        return added
+
+
+class CandleStore:
+    """Registry of CandleSeries under ``root`` (CANDLE_STORE_DIR)."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.environ.get(
+            "CANDLE_STORE_DIR", os.path.join("data", "candles")
+        )
+        self._series: Dict[tuple, CandleSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, symbol: str, interval) -> CandleSeries:
+        key = (symbol, str(interval))
+        s = self._series.get(key)
+        if s is None:
+            with self._lock:
+                s = self._series.get(key)
+                if s is None:
+                    name = re.sub(r"[^A-Za-z0-9_.-]", "_", symbol)
+                    path = os.path.join(self.root, f"{name}_{interval}")
+                    s = self._series[key] = CandleSeries(
+                        path, symbol, interval
+                    )
+        return s
+
+    def sync(
+        self,
+        symbol: str,
+        interval,
+        fetcher,
+        limit: int = 500,
+        repair: bool = False,
+    ) -> CandleSeries:
+        """
+        Bring the series up to date: an empty series gets the latest
+        ``limit`` candles, otherwise only candles since the last stored
+        timestamp are fetched (paging back if more than one page behind).
+        """
+        series = self.series(symbol, interval)
+        with series.lock:
+            last = series.last_ts
+            step = series.interval_ms
+            if last is None:
+                series.merge(fetcher.get_ohlcv(symbol, interval, limit=limit))
+            else:
+                behind = (
+                    (int(time.time() * 1000) - last) // step + 1
+                    if step else MAX_PAGE
+                )
+                self._fetch_range(
+                    series, fetcher, last, None, min(MAX_PAGE, max(1, behind))
+                )
+            if repair:
+                self.repair_gaps(series, fetcher)
+        return series
+
+    def _fetch_range(self, series, fetcher, start, end, limit):
+        """
+        Fetch [start, end] newest-first, paging back through full pages,
+        and merge everything at once (so paging never forces a rewrite).
+        """
+        fetched = []
+        for _ in range(MAX_PAGES_PER_SYNC):
+            candles = fetcher.get_ohlcv(
+                series.symbol, series.interval, limit=limit,
+                start=start, end=end,
+            )
+            fetched.extend(candles)
+            if len(candles) < limit:
+                break
+            oldest = min(int(c["timestamp"]) for c in candles)
+            if oldest <= start:
+                break
+            end = oldest - 1
+            limit = MAX_PAGE
+        return series.merge(fetched)
+
+    def repair_gaps(self, series, fetcher, max_requests: int = 50) -> int:
+        """Refetch missing ranges; returns the number of candles filled."""
+        before = len(series)
+        for first, last in series.gaps()[:max_requests]:
+            missing = (last - first) // series.interval_ms + 1
+            self._fetch_range(
+                series, fetcher, first, last, min(MAX_PAGE, missing)
+            )
+        filled = len(series) - before
+        if filled:
+            logger.info(
+                f"CandleStore: repaired {filled} candles for "
+                f"{series.symbol} {series.interval}"
+            )
+        return filled
+
+    def sync_many(self, symbols, interval, fetcher, **kwargs):
+        """
+        Sync many symbols on the fetcher's pool; yields
+        ``(symbol, series)`` as each one is up to date.
+        """
+        return fetcher.map_symbols(
+            lambda symbol: self.sync(symbol, interval, fetcher, **kwargs),
+            symbols,
+        )
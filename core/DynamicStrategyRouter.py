@@ -2,9 +2,20 @@
 DynamicStrategyRouter: Ensemble & Regime-Switching for ZoL0 Level Ω
 Dynamic allocation and switching between multiple strategies
 based on market regime and performance.
+
+Strategie z niezerową alokacją są wywoływane przez wspólny
+BudgetedExecutor (równolegle, z budżetem czasu na tick), a bez niego
+po kolei; korutyny (np. GridTrading) są wykonywane, nie zwracane.
+Czasy wywołań trafiają do histogramów per (symbol, strategia).
 """
 
-from typing import List, Dict, Any
+import asyncio
+import functools
+import inspect
+import time
+from typing import List, Dict, Any, Optional
+
+from core.BudgetedExecutor import LatencyHistogram
 
 
 class DynamicStrategyRouter:
@@ -13,7 +24,8 @@ class DynamicStrategyRouter:
             "strategies": [
                 getattr(s, "name", str(s)) for s in self.strategies
             ],
-            "last_allocations": getattr(self, "last_allocations", {})
+            "last_allocations": getattr(self, "last_allocations", {}),
+            "timings": self.latency_metrics(),
         }
 
     def __init__(
@@ -23,11 +35,20 @@ class DynamicStrategyRouter:
         perf_tracker=None,
         risk_manager=None,
         meta_model=None,
+        executor=None,
+        symbol: Optional[str] = None,
     ):
         self.strategies = strategies
         self.perf_tracker = perf_tracker
         self.risk_manager = risk_manager
         self.meta_model = meta_model  # Optional AI regime classifier
+        # Optional core.BudgetedExecutor (współdzielony między symbolami)
+        self.executor = executor
+        # Symbol routera – etykieta histogramów we wspólnym executorze;
+        # bez niego brany z market_state["symbol"]
+        self.symbol = symbol
+        self.timings: Dict[str, LatencyHistogram] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.last_allocations = {
             s.name: 1.0 / len(strategies) for s in strategies
         }
@@ -94,28 +115,58 @@ class DynamicStrategyRouter:
         # Compute allocations
         alloc = self.compute_allocations(regime, perf_stats)
         # Get signals from each strategy
+        active = [s for s in self.strategies if alloc.get(s.name, 0) > 0]
+        if self.symbol is None:
+            self.symbol = market_state.get("symbol")
+        if self.executor is not None:
+            outcomes = self.executor.run([
+                (
+                    s, (self.symbol, s.name),
+                    functools.partial(s.analyze, market_state),
+                )
+                for s in active
+            ])
+        else:
+            outcomes = {s: self._run_inline(s, market_state) for s in active}
         signals = []
-        for s in self.strategies:
-            if alloc.get(s.name, 0) > 0:
-                try:
-                    sig = s.analyze(market_state)
-                    signals.append(
-                        {
-                            "strategy": s.name,
-                            "allocation": alloc[s.name],
-                            "signal": sig,
-                        }
-                    )
-                except Exception as e:
-                    signals.append(
-                        {
-                            "strategy": s.name,
-                            "allocation": alloc[s.name],
-                            "signal": None,
-                            "error": str(e),
-                        }
-                    )
+        for s in active:
+            status, value = outcomes[s]
+            if status == "dropped":  # nie zdążyła, brak poprzedniego wyniku
+                continue
+            entry = {
+                "strategy": s.name,
+                "allocation": alloc[s.name],
+                "signal": None if status == "error" else value,
+            }
+            if status == "error":
+                entry["error"] = str(value)
+            elif status == "stale":
+                entry["stale"] = True
+            signals.append(entry)
         return signals
 
+    def _run_inline(self, strategy, market_state):
+        start = time.perf_counter()
+        try:
+            result = strategy.analyze(market_state)
+            if inspect.iscoroutine(result):
+                if self._loop is None or self._loop.is_closed():
+                    self._loop = asyncio.new_event_loop()
+                result = self._loop.run_until_complete(result)
+            outcome = ("ok", result)
+        except Exception as e:
+            outcome = ("error", e)
+        hist = self.timings.get(strategy.name)
+        if hist is None:
+            hist = self.timings[strategy.name] = LatencyHistogram()
+        hist.record(time.perf_counter() - start)
+        return outcome
+
+    def latency_metrics(self) -> Dict[str, Any]:
+        """Per-strategy analyze() latency histograms."""
+        if self.executor is not None:
+            return self.executor.metrics()["timings"].get(self.symbol, {})
+        return {k: h.snapshot() for k, h in self.timings.items()}
+
     def get_last_allocations(self):
         return self.last_allocations
@@ -0,0 +1,257 @@
+# HttpTransport.py – współdzielona warstwa HTTP (keep-alive, pula połączeń)
+"""
+HttpTransport: one pooled requests.Session shared by MarketDataFetcher,
+OrderExecutor and MetaPlatformManager instead of a fresh TCP+TLS
+connection per call.
+
+- HTTPAdapter with ``pool_connections`` host pools and at most
+  ``pool_maxsize`` keep-alive connections per host (``pool_block`` caps
+  concurrent connections to one host at that limit),
+- gzip/deflate response decompression (Accept-Encoding),
+- retries with full-jitter exponential backoff for idempotent methods on
+  connection errors, timeouts, 429 and 5xx; with ``rate_limiter`` every
+  attempt (retries included) takes a token from the shared TokenBucket.
+
+Pool size and backoff come from HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE and HTTP_BACKOFF_CAP.
+
+AsyncHttpTransport is the same policy on an httpx.AsyncClient for
+coroutines (BotCoreAsync): requests never block the event loop and
+backoff waits with asyncio.sleep.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class _RetryPolicy:
+    """Pool size and jittered backoff settings shared by both transports."""
+
+    def __init__(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_cap: Optional[float] = None,
+        timeout: float = 10,
+    ):
+        env = os.environ.get
+        self.pool_connections = pool_connections or int(
+            env("HTTP_POOL_CONNECTIONS", "10")
+        )
+        self.pool_maxsize = pool_maxsize or int(
+            env("HTTP_POOL_MAXSIZE", "10")
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else int(env("HTTP_MAX_RETRIES", "3"))
+        )
+        self.backoff_base = (
+            backoff_base if backoff_base is not None
+            else float(env("HTTP_BACKOFF_BASE", "0.2"))
+        )
+        self.backoff_cap = (
+            backoff_cap if backoff_cap is not None
+            else float(env("HTTP_BACKOFF_CAP", "5.0"))
+        )
+        self.timeout = timeout
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter backoff: uniform(0, min(cap, base * 2**attempt))."""
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _attempts(self, method: str, retries: Optional[int]) -> int:
+        if method not in IDEMPOTENT_METHODS:
+            return 1
+        return max(1, retries if retries is not None else self.max_retries)
+
+
+class HttpTransport(_RetryPolicy):
+    """Pooled keep-alive HTTP client with jittered retry backoff."""
+
+    def __init__(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        pool_block: bool = True,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_cap: Optional[float] = None,
+        timeout: float = 10,
+    ):
+        super().__init__(
+            pool_connections, pool_maxsize, max_retries, backoff_base,
+            backoff_cap, timeout,
+        )
+        self.sleep = time.sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        retries: Optional[int] = None,
+        rate_limiter=None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request through the pooled session. Idempotent methods are
+        retried up to ``retries`` attempts in total; the last response
+        (retryable status) or exception is returned/raised. Each attempt
+        first acquires a token from ``rate_limiter`` (TokenBucket), if any.
+        """
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        attempts = self._attempts(method, retries)
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt + 1 >= attempts:
+                    raise
+                logger.warning(
+                    f"HttpTransport: {method} {url} failed ({e}), retrying"
+                )
+            else:
+                if (
+                    resp.status_code not in RETRY_STATUSES
+                    or attempt + 1 >= attempts
+                ):
+                    return resp
+                logger.warning(
+                    f"HttpTransport: {method} {url} -> "
+                    f"{resp.status_code}, retrying"
+                )
+                resp.close()
+            self.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHttpTransport(_RetryPolicy):
+    """
+    HttpTransport for coroutines: one httpx.AsyncClient (keep-alive pool
+    of ``pool_maxsize`` connections) with the same retry policy. Bound to
+    the event loop it is first used on; ``aclose`` it on shutdown.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_cap: Optional[float] = None,
+        timeout: float = 10,
+    ):
+        super().__init__(
+            None, pool_maxsize, max_retries, backoff_base, backoff_cap,
+            timeout,
+        )
+        self.sleep = asyncio.sleep
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize,
+            ),
+            headers={"Accept-Encoding": "gzip, deflate"},
+            timeout=timeout,
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        retries: Optional[int] = None,
+        rate_limiter=None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Async ``HttpTransport.request`` (same retry semantics)."""
+        method = method.upper()
+        attempts = self._attempts(method, retries)
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                await rate_limiter.acquire_async()
+            try:
+                resp = await self.client.request(method, url, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt + 1 >= attempts:
+                    raise
+                logger.warning(
+                    f"AsyncHttpTransport: {method} {url} failed ({e}), "
+                    "retrying"
+                )
+            else:
+                if (
+                    resp.status_code not in RETRY_STATUSES
+                    or attempt + 1 >= attempts
+                ):
+                    return resp
+                logger.warning(
+                    f"AsyncHttpTransport: {method} {url} -> "
+                    f"{resp.status_code}, retrying"
+                )
+                await resp.aclose()
+            await self.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Process-wide shared transport."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HttpTransport()
+    return _transport
@@ -0,0 +1,202 @@
+# IndicatorHub.py – wspólne wskaźniki per symbol dla wszystkich strategii
+"""
+IndicatorHub: strategies declare the indicators they need instead of
+recomputing rolling windows, EMAs and RSI on every tick.
+
+Strategia zwraca z ``indicator_requirements()`` słownik alias -> spec
+(``indicator("ema", span=12)``). Spec to krotka (nazwa, posortowane
+parametry), więc identyczne żądania różnych strategii i symboli są tym
+samym kluczem cache. Hub trzyma per symbol słownik spec -> pd.Series
+ważny dla jednej wersji CandleBuffer: każdy wskaźnik liczony jest raz na
+zmianę bufora (nową albo zaktualizowaną świecę), niezależnie od liczby
+strategii, które go czytają.
+
+``hub.view(symbol, buffer)`` to lekki uchwyt przekazywany w
+TickContext.indicators; StrategyAdapter zamienia go na słownik
+alias -> Series wymagany przez daną strategię. Strategie wywoływane
+bezpośrednio (backtesty, benche) bez huba liczą te same wskaźniki
+lokalnie przez ``resolve_indicators``.
+"""
+
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+Spec = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+def indicator(name: str, **params) -> Spec:
+    """Hashable indicator spec, e.g. ``indicator("sma", period=20)``."""
+    if name not in INDICATORS:
+        raise ValueError(f"unknown indicator: {name}")
+    return name, tuple(sorted(params.items()))
+
+
+def _col(frame: pd.DataFrame, column: str) -> pd.Series:
+    # Brak kolumny (np. wolumenu) -> zera, jak dotychczas w strategiach
+    if column in frame:
+        return frame[column]
+    return pd.Series(0.0, index=frame.index)
+
+
+def _sma(frame, period, column="close"):
+    return _col(frame, column).rolling(period).mean()
+
+
+def _std(frame, period, column="close"):
+    return _col(frame, column).rolling(period).std()
+
+
+def _rolling_max(frame, period, column="close"):
+    return _col(frame, column).rolling(period).max()
+
+
+def _rolling_min(frame, period, column="close"):
+    return _col(frame, column).rolling(period).min()
+
+
+def _ema(frame, span, column="close", adjust=True):
+    return _col(frame, column).ewm(span=span, adjust=adjust).mean()
+
+
+def _diff(frame, periods, column="close"):
+    return _col(frame, column).diff(periods)
+
+
+def _rsi(frame, period, column="close"):
+    # Ta sama definicja co MeanReversionStrategy.calculate_rsi
+    delta = _col(frame, column).diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def _true_range(frame):
+    prev_close = frame["close"].shift(1)
+    high, low = frame["high"], frame["low"]
+    return pd.concat(
+        [high - low, (high - prev_close).abs(), (low - prev_close).abs()],
+        axis=1,
+    ).max(axis=1)
+
+
+def _wilder(series, period):
+    return series.ewm(alpha=1.0 / period, adjust=False).mean()
+
+
+def _atr(frame, period):
+    return _wilder(_true_range(frame), period)
+
+
+def _adx(frame, period):
+    up = frame["high"].diff()
+    down = -frame["low"].diff()
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+    atr = _atr(frame, period)
+    plus_di = 100 * _wilder(plus_dm, period) / atr
+    minus_di = 100 * _wilder(minus_dm, period) / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return _wilder(dx, period)
+
+
+# nazwa wskaźnika -> fn(frame, **params) -> pd.Series
+INDICATORS: Dict[str, Callable[..., pd.Series]] = {
+    "sma": _sma,
+    "std": _std,
+    "rolling_max": _rolling_max,
+    "rolling_min": _rolling_min,
+    "ema": _ema,
+    "diff": _diff,
+    "rsi": _rsi,
+    "atr": _atr,
+    "adx": _adx,
+}
+
+
+def compute_indicator(frame: pd.DataFrame, spec: Spec) -> pd.Series:
+    name, params = spec
+    return INDICATORS[name](frame, **dict(params))
+
+
+class IndicatorHub:
+    """Per-symbol indicator cache, invalidated by CandleBuffer.version."""
+
+    def __init__(self):
+        # symbol -> (wersja bufora, {spec: Series})
+        self._cache: Dict[str, Tuple[int, Dict[Spec, pd.Series]]] = {}
+        self.stats = {"requests": 0, "computes": 0}
+
+    def _entries(self, symbol: str, buffer) -> Dict[Spec, pd.Series]:
+        cached = self._cache.get(symbol)
+        if cached is None or cached[0] != buffer.version:
+            cached = self._cache[symbol] = (buffer.version, {})
+        return cached[1]
+
+    def get(self, symbol: str, buffer, spec: Spec) -> pd.Series:
+        """``spec`` over the buffer's current window, computed once."""
+        entries = self._entries(symbol, buffer)
+        self.stats["requests"] += 1
+        series = entries.get(spec)
+        if series is None:
+            self.stats["computes"] += 1
+            series = entries[spec] = compute_indicator(buffer.frame(), spec)
+        return series
+
+    def select(
+        self, symbol: str, buffer, requirements: Mapping[str, Spec]
+    ) -> Dict[str, pd.Series]:
+        return {
+            alias: self.get(symbol, buffer, spec)
+            for alias, spec in requirements.items()
+        }
+
+    def view(self, symbol: str, buffer) -> "IndicatorView":
+        return IndicatorView(self, symbol, buffer)
+
+    def forget(self, symbol: str):
+        self._cache.pop(symbol, None)
+
+
+class IndicatorView:
+    """One symbol's handle on the hub (TickContext.indicators)."""
+
+    __slots__ = ("hub", "symbol", "buffer")
+
+    def __init__(self, hub: IndicatorHub, symbol: str, buffer):
+        self.hub = hub
+        self.symbol = symbol
+        self.buffer = buffer
+
+    def __getitem__(self, spec: Spec) -> pd.Series:
+        return self.hub.get(self.symbol, self.buffer, spec)
+
+    def array(self, spec: Spec) -> np.ndarray:
+        """Cached indicator as a NumPy view (no copy)."""
+        return self[spec].to_numpy()
+
+    def select(self, requirements: Mapping[str, Spec]) -> Dict[str, pd.Series]:
+        return self.hub.select(self.symbol, self.buffer, requirements)
+
+
+def resolve_indicators(
+    indicators, klines: Optional[pd.DataFrame],
+    requirements: Mapping[str, Spec],
+) -> Dict[str, pd.Series]:
+    """
+    alias -> Series for ``requirements``: from a hub view, from a dict
+    that already holds every alias, or computed locally from ``klines``.
+    """
+    if isinstance(indicators, IndicatorView):
+        return indicators.select(requirements)
+    if isinstance(indicators, Mapping) and all(
+        alias in indicators for alias in requirements
+    ):
+        return {alias: indicators[alias] for alias in requirements}
+    if isinstance(klines, list):
+        klines = pd.DataFrame(klines)
+    return {
+        alias: compute_indicator(klines, spec)
+        for alias, spec in requirements.items()
+    }
@@ -0,0 +1,156 @@
+# InferenceServer.py – micro-batching predykcji modeli między symbolami
+"""
+InferenceServer: rows for the same model submitted by many symbols go
+through one batched ``predict`` instead of one call per symbol.
+
+sklearn / XGBoost / torch mają duży stały koszt na wywołanie (walidacja,
+alokacje, przejście po drzewach w Pythonie), więc 100 wierszy w jednej
+paczce kosztuje niewiele więcej niż 1 wiersz.
+
+- ``register(name, batch_fn)`` – ``batch_fn(rows) -> list`` wyników w tej
+  samej kolejności (np. TrendPredictor.predict_trend_batch).
+- ``submit(name, row)`` zwraca ``concurrent.futures.Future``.
+- Paczka rusza, gdy: minie ``max_wait`` od pierwszego oczekującego
+  wiersza (wątek w tle – dla współbieżnych wołających), zbierze się
+  ``max_batch`` wierszy albo wołający zrobi ``flush()`` (pętla bota,
+  gdy najstarszy wiersz czeka ``inference_max_wait_sec`` albo po
+  zsynchronizowaniu wszystkich symboli ticku). ``max_wait=None`` – tylko
+  ``flush``/``max_batch``, bez wątku.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceServer:
+    """In-process micro-batching inference for registered models."""
+
+    def __init__(self, max_batch: int = 256, max_wait: Optional[float] = None):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._models: Dict[str, Callable[[List[Any]], List[Any]]] = {}
+        self._pending: Dict[str, list] = {}
+        self._first_at: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self.stats = {"rows": 0, "batches": 0, "max_batch_seen": 0,
+                      "errors": 0}
+
+    def register(self, name: str, batch_fn: Callable[[List[Any]], List[Any]]):
+        self._models[name] = batch_fn
+
+    def submit(self, name: str, row) -> Future:
+        """Queue ``row`` for model ``name``; the Future gets its result."""
+        if name not in self._models:
+            raise KeyError(f"unknown model: {name}")
+        future = Future()
+        batch = None
+        with self._cond:
+            pending = self._pending.setdefault(name, [])
+            if not pending:
+                self._first_at[name] = time.monotonic()
+            pending.append((row, future))
+            if len(pending) >= self.max_batch:
+                batch = self._take(name)
+            elif self.max_wait is not None:
+                self._ensure_thread()
+                self._cond.notify()
+        if batch:
+            self._run(name, batch)  # pełna paczka – od razu, w tym wątku
+        return future
+
+    def predict(self, name: str, row):
+        """Single-row convenience (still shares a batch with concurrent
+        callers when ``max_wait`` is set)."""
+        future = self.submit(name, row)
+        if self.max_wait is None:
+            self.flush(name)
+        return future.result()
+
+    def flush(self, name: Optional[str] = None):
+        """Run every pending batch (or only ``name``'s) in this thread."""
+        with self._cond:
+            names = [name] if name is not None else list(self._pending)
+            batches = [(n, self._take(n)) for n in names]
+        for n, batch in batches:
+            if batch:
+                self._run(n, batch)
+
+    def close(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._thread = None
+        self.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        batches = stats["batches"]
+        stats["avg_batch"] = stats["rows"] / batches if batches else 0.0
+        return stats
+
+    def _take(self, name: str) -> list:
+        self._first_at.pop(name, None)
+        return self._pending.pop(name, [])
+
+    def _run(self, name: str, batch: list):
+        rows = [row for row, _ in batch]
+        try:
+            results = self._models[name](rows)
+            if len(results) != len(rows):
+                raise ValueError(
+                    f"{name}: {len(results)} results for {len(rows)} rows"
+                )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"InferenceServer: batch of {name} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.stats["rows"] += len(rows)
+        self.stats["batches"] += 1
+        if len(rows) > self.stats["max_batch_seen"]:
+            self.stats["max_batch_seen"] = len(rows)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._loop, name="inference-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _due(self) -> list:
+        # Wołane pod self._cond: paczki, których najstarszy wiersz czeka
+        # już max_wait; inaczej śpi do najbliższego terminu
+        now = time.monotonic()
+        due = [
+            n for n, t in self._first_at.items()
+            if now - t >= self.max_wait
+        ]
+        if not due:
+            deadlines = [t + self.max_wait for t in self._first_at.values()]
+            self._cond.wait(min(deadlines) - now if deadlines else None)
+        return [(n, self._take(n)) for n in due]
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if self._closing:
+                    return
+                batches = self._due()
+            for name, batch in batches:
+                self._run(name, batch)
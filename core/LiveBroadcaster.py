@@ -0,0 +1,204 @@
+# LiveBroadcaster.py – push stanu bota do dashboardu (WebSocket / SSE)
+"""
+LiveBroadcaster: one producer turns worker state snapshots into deltas
+and fans them out to any number of WebSocket/SSE subscribers.
+
+- Źródło: funkcja zwracająca bieżący stan (api_status.bot_state – snapshot
+  workera ze StateSnapshot). Jedna pętla odczytu na proces API, niezależnie
+  od liczby klientów; baza nie jest odpytywana wcale.
+- Delty: decyzja i alokacje per symbol, pozycja per symbol (None =
+  zamknięta), equity i statystyki. Na start klient dostaje pełny
+  snapshot.
+- Bufor per klient jest ograniczony i scala zdarzenia po kluczu
+  (typ, symbol) – wolny klient dostaje tylko najnowszą wartość każdego
+  klucza. Gdy kluczy jest więcej niż ``buffer_size``, bufor jest czyszczony
+  i klient dostaje świeży snapshot (resync). Producent nigdy nie czeka na
+  klienta.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LiveEvent(dict):
+    """Event dict that JSON-encodes once for all subscribers."""
+
+    __slots__ = ("_json",)
+
+    def json(self) -> str:
+        try:
+            return self._json
+        except AttributeError:
+            self._json = json.dumps(self, separators=(",", ":"), default=str)
+            return self._json
+
+
+def state_deltas(
+    prev: Optional[Dict[str, Any]], curr: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Events describing what changed between two bot state snapshots."""
+    prev = prev or {}
+    events = []
+    for kind, field in (
+        ("decision", "decisions"),
+        ("position", "positions"),
+        ("allocation", "allocations"),
+    ):
+        old = prev.get(field) or {}
+        new = curr.get(field) or {}
+        for symbol in new.keys() | old.keys():
+            if new.get(symbol) != old.get(symbol):
+                events.append(LiveEvent(
+                    type=kind, symbol=symbol, data=new.get(symbol)
+                ))
+    for kind in ("equity", "stats"):
+        if curr.get(kind) != prev.get(kind):
+            events.append(LiveEvent(type=kind, data=curr.get(kind)))
+    return events
+
+
+def event_json(event: Dict[str, Any]) -> str:
+    if isinstance(event, LiveEvent):
+        return event.json()
+    return json.dumps(event, separators=(",", ":"), default=str)
+
+
+def sse_format(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {event_json(event)}\n\n"
+
+
+def batch_json(batch: List[Dict[str, Any]]) -> str:
+    """JSON array of a batch, reusing each event's cached encoding."""
+    return "[" + ",".join(event_json(event) for event in batch) + "]"
+
+
+class ClientBuffer:
+    """Bounded, coalescing event buffer of one subscriber."""
+
+    def __init__(self, maxsize: int, snapshot: Callable[[], Dict[str, Any]]):
+        self.maxsize = maxsize
+        self._snapshot = snapshot
+        self._pending: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._resync = False
+        self.stats = {"offered": 0, "coalesced": 0, "resyncs": 0, "sent": 0}
+
+    def offer(self, event: Dict[str, Any]):
+        """Non-blocking; called by the producer for every event."""
+        self.stats["offered"] += 1
+        if self._resync:
+            return  # i tak dostanie pełny snapshot
+        key = (event["type"], event.get("symbol"))
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+            self._pending.move_to_end(key)
+        self._pending[key] = event
+        if len(self._pending) > self.maxsize:
+            self._pending.clear()
+            self._resync = True
+            self.stats["resyncs"] += 1
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Everything pending (coalesced), or [] after ``timeout``."""
+        if not self._pending and not self._resync:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        if self._resync:
+            self._resync = False
+            batch = [self._snapshot()]
+        else:
+            batch = list(self._pending.values())
+        self._pending.clear()
+        self.stats["sent"] += len(batch)
+        return batch
+
+
+class LiveBroadcaster:
+    """Polls ``source`` while anyone listens and fans deltas out."""
+
+    def __init__(
+        self,
+        source: Callable[[], Optional[Dict[str, Any]]],
+        interval: float = 0.25,
+        buffer_size: int = 256,
+    ):
+        self.source = source
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.clients = set()
+        self._state: Optional[Dict[str, Any]] = None
+        self._snapshot = LiveEvent(type="snapshot", data=None)
+        self._version = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "polls": 0, "publishes": 0, "events": 0, "coalesced": 0,
+            "resyncs": 0,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._snapshot
+
+    def subscribe(self) -> ClientBuffer:
+        """New subscriber primed with the current snapshot."""
+        self.poll()
+        client = ClientBuffer(self.buffer_size, self.snapshot)
+        client.offer(self.snapshot())
+        self.clients.add(client)
+        self._ensure_running()
+        return client
+
+    def unsubscribe(self, client: ClientBuffer):
+        if client in self.clients:
+            self.clients.discard(client)
+            self.stats["coalesced"] += client.stats["coalesced"]
+            self.stats["resyncs"] += client.stats["resyncs"]
+
+    def publish(self, state: Dict[str, Any]) -> int:
+        """Diff ``state`` against the last one and queue the deltas."""
+        events = state_deltas(self._state, state)
+        at = state.get("published_at")
+        for event in events:
+            event["at"] = at  # czas publikacji ticku przez workera
+        self._state = state
+        self._snapshot = LiveEvent(type="snapshot", data=state, at=at)
+        self.stats["publishes"] += 1
+        self.stats["events"] += len(events)
+        for client in list(self.clients):
+            for event in events:
+                client.offer(event)
+        return len(events)
+
+    def poll(self) -> int:
+        self.stats["polls"] += 1
+        try:
+            state = self.source()
+        except Exception as e:
+            logger.error(f"LiveBroadcaster: state read failed: {e}")
+            return 0
+        if state is None:
+            return 0
+        version = (state.get("pid"), state.get("tick"))
+        if version == self._version:
+            return 0
+        self._version = version
+        return self.publish(state)
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while self.clients:
+            await asyncio.sleep(self.interval)
+            self.poll()
@@ -4,9 +4,12 @@
 # MarketDataFetcher.py – Pobieranie danych OHLCV (mock)
 
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
+from core.HttpTransport import AsyncHttpTransport, get_transport
+from core.RateLimiter import get_rate_limiter
 
 
 class MarketDataFetcher:
@@ -20,17 +23,37 @@ class MarketDataFetcher:
         api_url="https://api.bybit.com/v5/market/kline",
         throttle_sec=1,
         max_retries=3,
+        transport=None,
+        rate_limiter=None,
+        max_workers=None,
+        async_transport=None,
     ):
         self.api_url = api_url
+        # throttle_sec zostaje dla zgodności wywołań; limit zapytań trzyma
+        # współdzielony token bucket (core.RateLimiter), nie sleep per
+        # instancja.
         self.throttle_sec = throttle_sec
         self.max_retries = max_retries
+        # Wspólna sesja keep-alive; retry z backoffem robi transport
+        self.transport = transport or get_transport()
+        # Klient httpx dla get_ohlcv_async, tworzony przy pierwszym użyciu
+        # (wiąże się z pętlą zdarzeń, która go wywołała)
+        self.async_transport = async_transport
+        self.rate_limiter = rate_limiter or get_rate_limiter("bybit_public")
+        self.max_workers = max_workers or int(
+            os.environ.get("OHLCV_FETCH_WORKERS", "8")
+        )
+        self._pool = None
         self.last_call = 0
 
-    def get_ohlcv(self, symbol, interval, limit=10):
-        # ⬆️ optimized for performance: use list comprehension for candles
-        import os
-
+    def _params(self, symbol, interval, limit, start, end):
         params = {"symbol": symbol, "interval": interval, "limit": limit}
+        # Zakres czasu (ms) – Bybit zwraca najnowsze ``limit`` świec z
+        # przedziału [start, end]
+        if start is not None:
+            params["start"] = int(start)
+        if end is not None:
+            params["end"] = int(end)
         logging.info(
             f"MarketDataFetcher: Requesting OHLCV with params: {params} | "
             f"URL: {self.api_url}"
@@ -43,54 +66,133 @@ class MarketDataFetcher:
                     "Set USE_MOCK=0 for real data."
                 )
             )
-        for attempt in range(1, self.max_retries + 1):
-            now = time.time()
-            if now - self.last_call < self.throttle_sec:
-                time.sleep(self.throttle_sec - (now - self.last_call))
-            self.last_call = time.time()
+        return params
+
+    @staticmethod
+    def _parse(response):
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "MarketDataFetcher: Raw API response (status "
+                f"{response.status_code}): {response.text}"
+            )
+        response.raise_for_status()
+        data = response.json()
+        if "result" in data and "list" in data["result"]:
+            # ⬆️ optimized for performance: use list comprehension
+            return [
+                {
+                    "timestamp": item[0],
+                    "open": float(item[1]),
+                    "high": float(item[2]),
+                    "low": float(item[3]),
+                    "close": float(item[4]),
+                    "volume": float(item[5]),
+                }
+                for item in data["result"]["list"]
+            ]
+        logging.error(f"Bybit response missing result/list: {data}")
+        return []
+
+    @staticmethod
+    def _failed(symbol, interval, e):
+        logging.error(
+            "MarketDataFetcher: Exception for %s at %s: %s"
+            % (
+                symbol,
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+                str(e),
+            )
+        )
+        logging.error(
+            f"MarketDataFetcher: All attempts failed for {symbol} {interval}"
+        )
+        return []
+
+    def get_ohlcv(self, symbol, interval, limit=10, start=None, end=None):
+        params = self._params(symbol, interval, limit, start, end)
+        self.last_call = time.time()
+        try:
+            # Token z bucketu przed każdą próbą, także retry po 429/5xx
+            response = self.transport.get(
+                self.api_url,
+                params=params,
+                timeout=10,
+                retries=self.max_retries,
+                rate_limiter=self.rate_limiter,
+            )
+            return self._parse(response)
+        except Exception as e:
+            return self._failed(symbol, interval, e)
+
+    async def get_ohlcv_async(
+        self, symbol, interval, limit=10, start=None, end=None
+    ):
+        """
+        ``get_ohlcv`` for coroutines: token bucket and HTTP wait without
+        blocking the event loop.
+        """
+        params = self._params(symbol, interval, limit, start, end)
+        if self.async_transport is None:
+            self.async_transport = AsyncHttpTransport()
+        self.last_call = time.time()
+        try:
+            response = await self.async_transport.get(
+                self.api_url,
+                params=params,
+                timeout=10,
+                retries=self.max_retries,
+                rate_limiter=self.rate_limiter,
+            )
+            return self._parse(response)
+        except Exception as e:
+            return self._failed(symbol, interval, e)
+
+    def map_symbols(self, fn, symbols, default=None):
+        """
+        Run ``fn(symbol)`` for every symbol on the shared fetch pool and
+        yield ``(symbol, result)`` as each call completes (``default`` if
+        it raised).
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="ohlcv-fetch",
+            )
+        futures = {self._pool.submit(fn, symbol): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
             try:
-                response = requests.get(
-                    self.api_url,
-                    params=params,
-                    timeout=10,
-                )
-                logging.info(
-                    (
-                        "MarketDataFetcher: Raw API response (status "
-                        f"{response.status_code}): "
-                        f"{response.text}"
-                    )
-                )
-                response.raise_for_status()
-                data = response.json()
-                if "result" in data and "list" in data["result"]:
-                    candles = [
-                        {
-                            "timestamp": item[0],
-                            "open": float(item[1]),
-                            "high": float(item[2]),
-                            "low": float(item[3]),
-                            "close": float(item[4]),
-                            "volume": float(item[5]),
-                        }
-                        for item in data["result"]["list"]
-                    ]
-                    return candles
-                else:
-                    logging.error(
-                        f"Bybit response missing result/list: {data}"
-                    )
-                    return []
+                result = future.result()
             except Exception as e:
                 logging.error(
-                    "MarketDataFetcher: Exception for %s at %s: %s"
-                    % (
-                        symbol,
-                        time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-                        str(e),
-                    )
+                    f"MarketDataFetcher: fetch failed for {symbol}: {e}"
                 )
-        logging.error(
-            f"MarketDataFetcher: All attempts failed for {symbol} {interval}"
+                result = default
+            yield symbol, result
+
+    def get_ohlcv_many(self, symbols, interval, limit=10):
+        """
+        Fetch OHLCV for many symbols concurrently (shared thread pool and
+        rate limiter). Yields ``(symbol, candles)`` as each request
+        completes, so callers can process a symbol while others are still
+        in flight.
+        """
+        return self.map_symbols(
+            lambda symbol: self.get_ohlcv(symbol, interval, limit),
+            symbols,
+            default=[],
         )
-        return []
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def aclose(self):
+        self.close()
+        if self.async_transport is not None:
+            await self.async_transport.aclose()
+            self.async_transport = None
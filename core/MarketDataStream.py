@@ -0,0 +1,505 @@
+# MarketDataStream.py – strumień kline/tickers/orderbook z Bybit WebSocket
+"""
+MarketDataStream: public Bybit v5 WebSocket subscription manager.
+
+Zamiast odpytywać REST co cykl, jeden wątek trzyma połączenie WebSocket
+(klient ``websocket`` jak w LowLatencyExecutor) i dla każdego symbolu
+utrzymuje:
+- bufor zamkniętych świec (CandleBuffer o stałej pojemności) i bieżącą,
+  formującą się świecę,
+- ostatni ticker (snapshot + delty),
+- orderbook (snapshot + delty).
+
+Po zerwaniu połączenia następuje reconnect z backoffem (full jitter),
+ponowna subskrypcja i dociągnięcie brakujących świec przez REST
+(MarketDataFetcher). Dziura wykryta w trakcie strumienia (zamknięta
+świeca dalej niż o jeden interwał od poprzedniej) też jest łatana przez
+REST – w osobnym wątku, żeby odbiór ramek nie stał na round-tripie; do
+końca łatania kolejne zamknięcia tego symbolu czekają i są dopisywane po
+dziurze, w kolejności. Dłuższe przerwy są dociągane stronami (do
+pojemności bufora); czego REST nie odda, zostaje w ``unfilled_gaps`` i w
+logu. Zamknięcie świecy budzi konsumentów asyncio (``wait_closed``).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import websocket
+
+from core.CandleBuffer import CandleBuffer
+from core.CandleStore import interval_ms
+from core.MarketDataFetcher import MarketDataFetcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WS_URL = "wss://stream.bybit.com/v5/public/linear"
+# Bybit: maks. 10 tematów w jednej wiadomości subscribe
+SUBSCRIBE_CHUNK = 10
+
+
+def _candle(item) -> dict:
+    """Bybit kline frame item -> candle dict in MarketDataFetcher format."""
+    return {
+        "timestamp": str(item["start"]),
+        "open": float(item["open"]),
+        "high": float(item["high"]),
+        "low": float(item["low"]),
+        "close": float(item["close"]),
+        "volume": float(item["volume"]),
+    }
+
+
+class MarketDataStream:
+    """
+    Streams klines (plus optional tickers and orderbook) for ``symbols``
+    on a background thread. ``fetcher`` backfills history and gaps over
+    REST; ``store`` (CandleStore), if given, persists closed candles.
+    """
+
+    def __init__(
+        self,
+        symbols,
+        interval="1",
+        ws_url: Optional[str] = None,
+        fetcher: Optional[MarketDataFetcher] = None,
+        store=None,
+        channels=("kline", "tickers", "orderbook"),
+        depth: int = 1,
+        buffer_size: int = 500,
+        ping_interval: float = 20.0,
+        recv_timeout: float = 1.0,
+        reconnect_base: float = 0.5,
+        reconnect_cap: float = 30.0,
+    ):
+        self.symbols = list(symbols)
+        self.interval = str(interval)
+        self.step = interval_ms(self.interval)
+        self.ws_url = ws_url or os.environ.get(
+            "BYBIT_WS_PUBLIC_URL", DEFAULT_WS_URL
+        )
+        self.fetcher = fetcher or MarketDataFetcher()
+        self.store = store
+        self.channels = tuple(channels)
+        self.depth = depth
+        self.buffer_size = buffer_size
+        self.ping_interval = ping_interval
+        self.recv_timeout = recv_timeout
+        self.reconnect_base = reconnect_base
+        self.reconnect_cap = reconnect_cap
+
+        self._closed = {
+            s: CandleBuffer(buffer_size, s) for s in self.symbols
+        }
+        self._partial: Dict[str, Optional[dict]] = {
+            s: None for s in self.symbols
+        }
+        self._last_closed: Dict[str, Optional[int]] = {
+            s: None for s in self.symbols
+        }
+        # symbol -> zamknięcia czekające na łatanie dziury (REST w tle)
+        self._gap_hold: Dict[str, List[dict]] = {}
+        self._gap_pool: Optional[ThreadPoolExecutor] = None
+        self._tickers: Dict[str, dict] = {}
+        self._books: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.ready = threading.Event()
+        self._thread = None
+        self._ws = None
+        self.connected = False
+
+        # Budzenie pętli asyncio: zbiór symboli z nowymi zamkniętymi
+        # świecami + asyncio.Event ustawiany przez call_soon_threadsafe
+        self._pending = set()
+        self._loop = None
+        self._event = None
+        self.stats = {
+            "messages": 0,
+            "closed": 0,
+            "reconnects": 0,
+            "backfilled": 0,
+            "gaps": 0,
+            "unfilled_gaps": 0,
+        }
+
+    # -- cykl życia -------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="market-data-stream", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._gap_pool is not None:
+            self._gap_pool.shutdown(wait=False, cancel_futures=True)
+            self._gap_pool = None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first connection has backfilled history."""
+        return self.ready.wait(timeout)
+
+    def topics(self) -> List[str]:
+        topics = []
+        for symbol in self.symbols:
+            if "kline" in self.channels:
+                topics.append(f"kline.{self.interval}.{symbol}")
+            if "tickers" in self.channels:
+                topics.append(f"tickers.{symbol}")
+            if "orderbook" in self.channels:
+                topics.append(f"orderbook.{self.depth}.{symbol}")
+        return topics
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                ws = websocket.WebSocket()
+                ws.connect(self.ws_url, timeout=10)
+                ws.settimeout(self.recv_timeout)
+                self._ws = ws
+                self.connected = True
+                attempt = 0
+                logger.info(f"MarketDataStream: connected to {self.ws_url}")
+                self._subscribe(ws)
+                self._backfill_all()
+                self.ready.set()
+                self._read(ws)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"MarketDataStream: connection lost: {e}")
+            finally:
+                self.connected = False
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+            if self._stop.is_set():
+                break
+            delay = random.uniform(
+                0, min(self.reconnect_cap, self.reconnect_base * 2 ** attempt)
+            )
+            attempt += 1
+            self.stats["reconnects"] += 1
+            self._stop.wait(delay)
+
+    def _subscribe(self, ws):
+        topics = self.topics()
+        for i in range(0, len(topics), SUBSCRIBE_CHUNK):
+            ws.send(json.dumps({
+                "op": "subscribe",
+                "args": topics[i:i + SUBSCRIBE_CHUNK],
+            }))
+
+    def _read(self, ws):
+        last_ping = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                raw = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                raw = None
+            if time.monotonic() - last_ping >= self.ping_interval:
+                ws.send(json.dumps({"op": "ping"}))
+                last_ping = time.monotonic()
+            if raw is None:
+                continue
+            if not raw:
+                raise ConnectionError("server closed the stream")
+            self.handle_message(json.loads(raw))
+
+    # -- wiadomości -------------------------------------------------------
+
+    def handle_message(self, msg: dict):
+        topic = msg.get("topic")
+        if not topic:
+            # odpowiedzi subscribe/pong
+            if msg.get("success") is False:
+                logger.error(f"MarketDataStream: {msg}")
+            return
+        self.stats["messages"] += 1
+        kind, _, rest = topic.partition(".")
+        symbol = rest.rsplit(".", 1)[-1]
+        if kind == "kline":
+            for item in msg.get("data", []):
+                self._on_kline(symbol, item)
+        elif kind == "tickers":
+            with self._lock:
+                ticker = self._tickers.setdefault(symbol, {})
+                if msg.get("type") == "snapshot":
+                    ticker.clear()
+                ticker.update(msg.get("data", {}))
+        elif kind == "orderbook":
+            self._on_book(symbol, msg)
+
+    def _on_kline(self, symbol: str, item: dict):
+        if symbol not in self._closed:
+            return
+        candle = _candle(item)
+        ts = int(item["start"])
+        if not item.get("confirm"):
+            with self._lock:
+                last = self._last_closed[symbol]
+                if last is None or ts > last:
+                    self._partial[symbol] = candle
+            return
+        with self._lock:
+            held = self._gap_hold.get(symbol)
+            if held is not None:
+                held.append(candle)  # dziura jeszcze łatana
+                return
+            last = self._last_closed[symbol]
+            gap = last is not None and self.step and ts > last + self.step
+            if gap:
+                self._gap_hold[symbol] = [candle]
+        if gap:
+            # Zgubione zamknięcia (np. przerwa w strumieniu) – dociągnij
+            # [last + step, ts - step] przez REST, poza wątkiem odbioru
+            self.stats["gaps"] += 1
+            if self._gap_pool is None:
+                self._gap_pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="market-data-gap"
+                )
+            self._gap_pool.submit(self._fill_gap, symbol, ts)
+            return
+        self._add_closed(symbol, [candle])
+
+    def _fill_gap(self, symbol: str, ts: int):
+        try:
+            self._backfill(symbol, end=ts - self.step, bounded=True)
+        except Exception as e:
+            logger.error(
+                f"MarketDataStream: gap backfill failed for {symbol}: {e}"
+            )
+        # Dopisz wstrzymane zamknięcia; wyrejestrowanie dopiero przy
+        # pustej liście, pod blokadą – nowsze nie wyprzedzą starszych
+        while True:
+            with self._lock:
+                held = self._gap_hold[symbol]
+                if not held:
+                    del self._gap_hold[symbol]
+                    return
+                self._gap_hold[symbol] = []
+            self._add_closed(symbol, held)
+
+    def _on_book(self, symbol: str, msg: dict):
+        data = msg.get("data", {})
+        with self._lock:
+            book = self._books.get(symbol)
+            if msg.get("type") == "snapshot" or book is None:
+                book = self._books[symbol] = {"b": {}, "a": {}}
+            for side in ("b", "a"):
+                levels = book[side]
+                for price, size in data.get(side, []):
+                    if float(size) == 0:
+                        levels.pop(price, None)
+                    else:
+                        levels[price] = size
+            book["u"] = data.get("u")
+            book["ts"] = msg.get("ts")
+
+    def _add_closed(self, symbol: str, candles: List[dict]) -> int:
+        added = []
+        with self._lock:
+            buf = self._closed[symbol]
+            last = self._last_closed[symbol]
+            for candle in candles:
+                ts = int(candle["timestamp"])
+                if last is not None and ts <= last:
+                    if ts == last:
+                        buf.append(candle)  # korekta ostatniej zamkniętej
+                    continue
+                buf.append(candle)
+                added.append(candle)
+                last = ts
+            self._last_closed[symbol] = last
+            partial = self._partial[symbol]
+            if partial is not None and last is not None:
+                if int(partial["timestamp"]) <= last:
+                    self._partial[symbol] = None
+            if added:
+                self._pending.add(symbol)
+        if added:
+            self.stats["closed"] += len(added)
+            if self.store is not None:
+                self.store.series(symbol, self.interval).merge(added)
+            self._notify()
+        return len(added)
+
+    # -- backfill REST ----------------------------------------------------
+
+    def _backfill_all(self):
+        for symbol in self.symbols:
+            try:
+                self._backfill(symbol)
+            except Exception as e:
+                logger.error(
+                    f"MarketDataStream: backfill failed for {symbol}: {e}"
+                )
+
+    def _fetch_since(self, symbol: str, start: int, end=None) -> List[dict]:
+        """
+        Candles in [start, end] (ascending), paged backwards from ``end``
+        (REST returns the newest ``limit`` first) until ``start`` or
+        until the buffer would be full anyway.
+        """
+        want = self.buffer_size + 1
+        limit = min(1000, want)
+        rows: List[dict] = []
+        while len(rows) < want:
+            page = sorted(
+                self.fetcher.get_ohlcv(
+                    symbol, self.interval, limit=limit, start=start, end=end
+                ),
+                key=lambda c: int(c["timestamp"]),
+            )
+            if not page:
+                break
+            rows = page + rows
+            oldest = int(page[0]["timestamp"])
+            if oldest <= start:
+                break
+            end = oldest - self.step
+        return rows[-want:]
+
+    def _backfill(self, symbol: str, end=None, bounded=False):
+        """
+        Fetch closed candles after the last one in the buffer. Unbounded
+        (after (re)connect) the newest REST candle is the forming one.
+        """
+        last = self._last_closed[symbol]
+        if last is None:
+            rows = self.fetcher.get_ohlcv(
+                symbol, self.interval, limit=self.buffer_size + 1
+            )
+            rows = sorted(rows, key=lambda c: int(c["timestamp"]))
+        else:
+            start = last + self.step
+            rows = self._fetch_since(symbol, start, end)
+            first = int(rows[0]["timestamp"]) if rows else None
+            # Dziura zostaje, jeśli REST nie doszedł do start, a nowe
+            # świece nie wypychają z bufora wszystkich starych
+            if (
+                (first is None and bounded and end >= start)
+                or (first is not None and first > start
+                    and len(rows) <= self.buffer_size)
+            ):
+                self.stats["unfilled_gaps"] += 1
+                missing = ((first or end + self.step) - start) // self.step
+                logger.warning(
+                    f"MarketDataStream: {symbol} backfill left a gap of "
+                    f"{missing} candle(s) after {last}"
+                )
+        if not bounded and rows:
+            forming = rows.pop()
+            with self._lock:
+                partial = self._partial[symbol]
+                if partial is None or int(partial["timestamp"]) <= int(
+                    forming["timestamp"]
+                ):
+                    self._partial[symbol] = forming
+        added = self._add_closed(symbol, rows)
+        self.stats["backfilled"] += added
+        return added
+
+    # -- odczyt -----------------------------------------------------------
+
+    def candles(
+        self, symbol: str, limit: Optional[int] = None, partial=False
+    ) -> List[dict]:
+        """Closed candles (ascending), optionally with the forming one."""
+        with self._lock:
+            buf = self._closed.get(symbol)
+            out = list(buf.records()) if buf is not None else []
+            current = self._partial.get(symbol)
+        if limit is not None:
+            out = out[-limit:]
+        if partial and current is not None:
+            out.append(current)
+        return out
+
+    def buffer(self, symbol: str) -> CandleBuffer:
+        """
+        The symbol's shared closed-candle buffer (array views and cached
+        frame); read it right after ``wait_closed``, the stream thread
+        appends the next close in place.
+        """
+        return self._closed[symbol]
+
+    def partial(self, symbol: str) -> Optional[dict]:
+        return self._partial.get(symbol)
+
+    def last_closed_ts(self, symbol: str) -> Optional[int]:
+        return self._last_closed.get(symbol)
+
+    def ticker(self, symbol: str) -> dict:
+        with self._lock:
+            return dict(self._tickers.get(symbol, {}))
+
+    def orderbook(self, symbol: str, levels: int = 10) -> dict:
+        """Top ``levels`` bids (desc) and asks (asc) as (price, size)."""
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                return {"bids": [], "asks": []}
+            bids = sorted(
+                ((float(p), float(s)) for p, s in book["b"].items()),
+                reverse=True,
+            )
+            asks = sorted((float(p), float(s)) for p, s in book["a"].items())
+        return {"bids": bids[:levels], "asks": asks[:levels]}
+
+    def metrics(self) -> dict:
+        return {**self.stats, "connected": self.connected}
+
+    # -- budzenie asyncio -------------------------------------------------
+
+    def _notify(self):
+        loop, event = self._loop, self._event
+        if loop is not None and event is not None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # pętla zamknięta
+
+    async def wait_closed(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Wait until at least one symbol closes a candle; returns those
+        symbols (in ``self.symbols`` order), or [] on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._event = asyncio.Event()
+            self._loop = loop
+        while True:
+            self._event.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            if pending:
+                return [s for s in self.symbols if s in pending]
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
@@ -0,0 +1,239 @@
+# MetricsAggregator.py – zmaterializowane metryki dla /status, /performance
+"""
+MetricsAggregator: equity/decision statistics for the API without
+rescanning Postgres on every dashboard poll.
+
+- Zapis: ``record_batch`` działa w transakcji flushu WriteBehindQueue i
+  podbija liczniki w jednym wierszu ``metrics_summary`` (decyzje, wygrane,
+  equity, ostatnia decyzja) – COUNT(*) po ``decisions`` nie jest już
+  potrzebny.
+- Odczyt: agregator trzyma okno ``equity_window`` ostatnich punktów equity
+  i dociąga tylko nowe wiersze (``id > ostatnie``); statystyki (sharpe,
+  sortino, drawdown) przelicza wyłącznie, gdy liczniki się zmieniły.
+  Między odświeżeniami odpowiada z pamięci (TTL, METRICS_CACHE_TTL).
+- /metrics czyta typowane kolumny decyzji (symbol/trend/volatility/tick)
+  zamiast parsować ``details``; wynik cache'owany per ``limit`` do zmiany
+  liczników.
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import desc, func, inspect, select, update
+
+from core.db_models import Decision, Equity, MetricsSummary
+from core.StateSnapshot import WIN_DECISIONS, performance_stats
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_ID = 1
+# Sprawdzenie, czy tabela agregatów już istnieje (przed migracją v2)
+_SUMMARY_RECHECK_SEC = 30.0
+_summary_ready: Dict[str, float] = {}
+
+
+def _summary_available(db) -> bool:
+    bind = db.get_bind()
+    key = str(bind.url)
+    state = _summary_ready.get(key)
+    if state == -1.0:
+        return True
+    now = time.monotonic()
+    if state is not None and now - state < _SUMMARY_RECHECK_SEC:
+        return False
+    if inspect(bind).has_table(MetricsSummary.__tablename__):
+        _summary_ready[key] = -1.0
+        return True
+    _summary_ready[key] = now
+    return False
+
+
+def record_batch(db, rows_by_model) -> None:
+    """
+    WriteBehindQueue hook: fold a flushed batch into ``metrics_summary``
+    (atomic increments, safe with several writer processes).
+    """
+    decisions = rows_by_model.get(Decision, ())
+    equity = rows_by_model.get(Equity, ())
+    if not decisions and not equity:
+        return
+    if not _summary_available(db):
+        return
+    values = {
+        "decisions_total": MetricsSummary.decisions_total + len(decisions),
+        "wins_total": MetricsSummary.wins_total + sum(
+            1 for row in decisions if row.get("decision") in WIN_DECISIONS
+        ),
+        "equity_total": MetricsSummary.equity_total + len(equity),
+        "updated_at": datetime.datetime.now(),
+    }
+    if decisions:
+        last = decisions[-1]
+        values.update(
+            last_decision_at=last.get("timestamp"),
+            last_decision=last.get("decision"),
+            last_decision_details=last.get("details"),
+        )
+    db.execute(
+        update(MetricsSummary)
+        .where(MetricsSummary.id == SUMMARY_ID)
+        .values(**values)
+    )
+
+
+class MetricsAggregator:
+    """TTL-cached, incrementally refreshed API metrics."""
+
+    def __init__(
+        self,
+        session_factory=None,
+        ttl: Optional[float] = None,
+        equity_window: int = 200,
+    ):
+        if session_factory is None:
+            from core.db_models import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.ttl = (
+            ttl if ttl is not None
+            else float(os.environ.get("METRICS_CACHE_TTL", "2.0"))
+        )
+        self._lock = threading.Lock()
+        self._equity = deque(maxlen=equity_window)
+        self._last_equity_id = 0
+        self._key = None
+        self._checked = float("-inf")
+        self._stats: Dict[str, Any] = performance_stats([], 0, 0)
+        self._last_decision: Optional[Dict[str, Any]] = None
+        self._metrics: Dict[int, Any] = {}
+        self.counters = {"hits": 0, "refreshes": 0, "recomputes": 0}
+
+    # -- odświeżanie ----------------------------------------------------
+
+    def _summary(self, db):
+        summary = db.get(MetricsSummary, SUMMARY_ID)
+        if summary is not None:
+            return (
+                summary.decisions_total,
+                summary.wins_total,
+                summary.equity_total,
+                summary.last_decision_at,
+                summary.last_decision,
+                summary.last_decision_details,
+            )
+        # Baza bez migracji v2: liczniki wprost (stara ścieżka)
+        last = db.execute(
+            select(Decision.timestamp, Decision.decision, Decision.details)
+            .order_by(desc(Decision.timestamp))
+            .limit(1)
+        ).first()
+        return (
+            db.execute(select(func.count()).select_from(Decision))
+            .scalar_one(),
+            db.execute(
+                select(func.count()).select_from(Decision)
+                .where(Decision.decision.in_(WIN_DECISIONS))
+            ).scalar_one(),
+            db.execute(select(func.count()).select_from(Equity))
+            .scalar_one(),
+            *(last if last else (None, None, None)),
+        )
+
+    def _pull_equity(self, db):
+        rows = db.execute(
+            select(Equity.id, Equity.equity)
+            .where(Equity.id > self._last_equity_id)
+            .order_by(desc(Equity.id))
+            .limit(self._equity.maxlen)
+        ).all()
+        for row_id, value in reversed(rows):
+            self._equity.append(value)
+        if rows:
+            self._last_equity_id = rows[0][0]
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked < self.ttl:
+                self.counters["hits"] += 1
+                return
+            self.counters["refreshes"] += 1
+            db = self.session_factory()
+            try:
+                key = self._summary(db)
+                if key != self._key:
+                    self._pull_equity(db)
+                    decisions, wins, _, at, decision, details = key
+                    self._stats = performance_stats(
+                        list(self._equity), decisions, wins
+                    )
+                    self._last_decision = (
+                        {
+                            "timestamp": at.isoformat(),
+                            "decision": decision,
+                            "details": details,
+                        }
+                        if at is not None else None
+                    )
+                    self._metrics.clear()
+                    self._key = key
+                    self.counters["recomputes"] += 1
+            finally:
+                db.close()
+            self._checked = now
+
+    # -- odczyt ---------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        self.refresh()
+        return dict(self._stats)
+
+    def last_decision(self) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        return self._last_decision
+
+    def metrics(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Recent decisions with typed fields and matching equity."""
+        self.refresh()
+        cached = self._metrics.get(limit)
+        if cached is not None:
+            return cached
+        db = self.session_factory()
+        try:
+            decisions = db.execute(
+                select(
+                    Decision.timestamp, Decision.trend, Decision.volatility,
+                    Decision.tick,
+                )
+                .order_by(desc(Decision.timestamp))
+                .limit(limit)
+            ).all()
+            equity_map = {
+                ts.replace(microsecond=0): value
+                for ts, value in db.execute(
+                    select(Equity.timestamp, Equity.equity)
+                    .order_by(desc(Equity.timestamp))
+                    .limit(limit)
+                )
+            }
+        finally:
+            db.close()
+        result = [
+            {
+                "timestamp": ts.isoformat(),
+                "trend": trend,
+                "volatility": volatility,
+                "tick": tick,
+                "equity": equity_map.get(ts.replace(microsecond=0)),
+            }
+            for ts, trend, volatility, tick in reversed(decisions)
+        ]
+        with self._lock:
+            self._metrics[limit] = result
+        return result
@@ -0,0 +1,145 @@
+# OnlineStats.py – statystyki strumieniowe O(1) na aktualizację i odczyt
+"""
+OnlineStats: running PnL statistics for StrategyPerformanceTracker.
+
+- suma, licznik, wygrane/przegrane – liczniki bieżące,
+- średnia i wariancja – algorytm Welforda (stabilny numerycznie, bez
+  przechodzenia historii),
+- rolling max/min ostatnich ``window`` wartości – kolejki monotoniczne
+  (deque ograniczone oknem, amortyzowane O(1)),
+- opcjonalnie wykładniczo ważona średnia/wariancja (``ew_alpha``,
+  rekurencja Westa) – reaguje na zmianę reżimu szybciej niż pełna
+  historia.
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+
+class RollingExtrema:
+    """Max and min of the last ``window`` values via monotonic deques."""
+
+    __slots__ = ("window", "_i", "_max", "_min")
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._i = 0
+        self._max = deque()  # (indeks, wartość), wartości malejące
+        self._min = deque()  # (indeks, wartość), wartości rosnące
+
+    def push(self, x: float):
+        i = self._i
+        self._i += 1
+        expired = i - self.window
+        q = self._max
+        while q and q[-1][1] <= x:
+            q.pop()
+        q.append((i, x))
+        if q[0][0] <= expired:
+            q.popleft()
+        q = self._min
+        while q and q[-1][1] >= x:
+            q.pop()
+        q.append((i, x))
+        if q[0][0] <= expired:
+            q.popleft()
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+
+class OnlineStats:
+    """Streaming mean/variance, sums, win counts and rolling extrema."""
+
+    __slots__ = (
+        "count", "total", "wins", "losses", "_mean", "_m2", "extrema",
+        "ew_alpha", "ew_mean", "ew_var",
+    )
+
+    def __init__(self, window: int = 10, ew_alpha: Optional[float] = None):
+        if ew_alpha is not None and not 0 < ew_alpha <= 1:
+            raise ValueError("ew_alpha must be in (0, 1]")
+        self.count = 0
+        self.total = 0.0
+        self.wins = 0
+        self.losses = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.extrema = RollingExtrema(window)
+        self.ew_alpha = ew_alpha
+        self.ew_mean = 0.0
+        self.ew_var = 0.0
+
+    def push(self, x: float):
+        x = float(x)
+        self.count += 1
+        self.total += x
+        if x > 0:
+            self.wins += 1
+        else:
+            self.losses += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+        self.extrema.push(x)
+        alpha = self.ew_alpha
+        if alpha is not None:
+            if self.count == 1:
+                self.ew_mean = x
+            else:
+                diff = x - self.ew_mean
+                incr = alpha * diff
+                self.ew_mean += incr
+                self.ew_var = (1 - alpha) * (self.ew_var + diff * incr)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ddof=0)."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    @property
+    def winrate(self) -> float:
+        return self.wins / self.count if self.count else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        # Konwencja trackera: przy jednej próbce std = 1
+        if not self.count:
+            return 0.0
+        std = self.std if self.count > 1 else 1.0
+        return self._mean / std if std != 0 else 0.0
+
+    @property
+    def ew_std(self) -> float:
+        return math.sqrt(max(self.ew_var, 0.0))
+
+    @property
+    def ew_sharpe(self) -> float:
+        if self.ew_alpha is None or not self.count:
+            return 0.0
+        std = self.ew_std if self.count > 1 else 1.0
+        return self.ew_mean / std if std != 0 else 0.0
+
+    @property
+    def rolling_drawdown(self) -> float:
+        """(max - min) / max of the window, as the tracker defines it."""
+        peak = self.extrema.max
+        if peak is None or peak == 0:
+            return 0.0
+        return (peak - self.extrema.min) / peak
@@ -8,7 +8,7 @@ import logging
 import time
 from datetime import datetime
 
-import requests
+from core.HttpTransport import get_transport
 
 
 class OrderExecutor:
@@ -22,6 +22,7 @@ class OrderExecutor:
         max_retries=3,
         api_key=None,
         api_secret=None,
+        transport=None,
     ):
         import os
 
@@ -31,11 +32,14 @@ class OrderExecutor:
         # Prefer explicit args, else load from env
         self.api_key = api_key or os.environ.get("BYBIT_API_KEY")
         self.api_secret = api_secret or os.environ.get("BYBIT_API_SECRET")
+        self.transport = transport or get_transport()
         self.last_call = 0
 
     def execute_order(self, order, use_rest=True, max_retries=None, throttle_sec=None):
         # Allow test to inject a mock requests.post
-        post_func = getattr(self, "_requests_post", None) or requests.post
+        post_func = (
+            getattr(self, "_requests_post", None) or self.transport.post
+        )
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "action": order.get("side"),
@@ -82,7 +86,8 @@ class OrderExecutor:
                 return resp_json
             except Exception as e:
                 logging.warning(f"REST API error: {e}, retrying...")
-                time.sleep(self.throttle_sec)
+                if attempt < retries:
+                    time.sleep(self.transport.backoff_delay(attempt - 1))
         logging.error(
             f"OrderExecutor: All REST API attempts failed for order: {payload}"
         )
@@ -0,0 +1,111 @@
+# RateLimiter.py – współdzielony token bucket dla limitów API giełdy
+"""
+TokenBucket: thread-safe token bucket shared by every client hitting the
+same exchange limit, replacing per-instance ``time.sleep`` throttles.
+
+Bybit v5 allows 600 requests per 5 s per IP on market endpoints; the
+default ``bybit_public`` bucket (BYBIT_REST_RATE / BYBIT_REST_BURST)
+stays below that.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0  # łączny czas oczekiwania (metryka)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(
+                self.capacity, self._tokens + elapsed * self.rate
+            )
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def _reserve(self, tokens: float, timeout: Optional[float]):
+        # Zwraca czas oczekiwania po rezerwacji albo None (timeout)
+        if tokens > self.capacity:
+            raise ValueError("tokens exceed bucket capacity")
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = (tokens - self._tokens) / self.rate
+            if wait > 0 and timeout is not None and wait > timeout:
+                return None
+            # Rezerwacja: saldo może zejść poniżej zera, kolejni czekają dłużej
+            self._tokens -= tokens
+            if wait > 0:
+                self.waited += wait  # += nie jest atomowe między wątkami
+        return wait
+
+    def acquire(
+        self, tokens: float = 1.0, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Block until ``tokens`` are available (False after ``timeout``).
+        Tokens are reserved up front, so concurrent callers are served in
+        arrival order without busy-waiting.
+        """
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(
+        self, tokens: float = 1.0, timeout: Optional[float] = None
+    ) -> bool:
+        """``acquire`` for coroutines: waits with asyncio.sleep."""
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+_DEFAULTS = {
+    "bybit_public": ("BYBIT_REST_RATE", "BYBIT_REST_BURST", 100.0),
+}
+
+
+def get_rate_limiter(name: str = "bybit_public") -> TokenBucket:
+    """Process-wide bucket for ``name`` (configured from env)."""
+    bucket = _buckets.get(name)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(name)
+            if bucket is None:
+                rate, burst = 10.0, None
+                if name in _DEFAULTS:
+                    rate_env, burst_env, rate = _DEFAULTS[name]
+                    rate = float(os.environ.get(rate_env, rate))
+                    burst = float(os.environ.get(burst_env, rate))
+                bucket = _buckets[name] = TokenBucket(rate, burst)
+    return bucket
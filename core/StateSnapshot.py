@@ -0,0 +1,288 @@
+# StateSnapshot.py – stan bota publikowany przez pamięć współdzieloną
+"""
+StateSnapshot: the bot worker (start_worker.py) publishes its state once
+per tick; the API process (api_status.py) reads it without touching the
+bot's objects, the GIL of the bot process or Postgres.
+
+- Kanał to plik zmapowany w pamięci (domyślnie w /dev/shm, jak memmap w
+  CandleStore – bez resource_trackera SharedMemory): nagłówek
+  [magic, seq, length, published_at] + bufor JSON o stałej pojemności.
+- Seqlock: zapis podbija ``seq`` na nieparzysty, kopiuje payload, ustawia
+  długość i znów podbija ``seq`` na parzysty. Czytelnik kopiuje payload i
+  porównuje ``seq`` przed i po – przy rozjeździe powtarza odczyt. Jeden
+  pisarz, dowolnie wielu czytelników, nikt nie czeka na lock.
+- Restart workera tworzy nowy plik (os.replace), więc czytelnik z
+  otwartym starym mapowaniem nie trafi na obcięty plik; nową wersję
+  wykrywa po zmianie inode.
+
+BotStatePublisher składa snapshot (pozycje, ostatnie decyzje, alokacje
+routerów, equity i statystyki jak /performance) z danych, które pętla
+bota i tak ma w pamięci.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ZOL0SNAP"
+# magic, seq, length, published_at
+HEADER = struct.Struct("<8sQQd")
+DEFAULT_CAPACITY = 1 << 20
+WIN_DECISIONS = ("win", "tp", "take_profit")
+
+
+def default_state_path() -> str:
+    path = os.environ.get("BOT_STATE_PATH")
+    if path:
+        return path
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "zol0_bot_state")
+
+
+class StateSnapshotWriter:
+    """Single-writer seqlock snapshot in a memory-mapped file."""
+
+    def __init__(
+        self, path: Optional[str] = None, capacity: int = DEFAULT_CAPACITY
+    ):
+        self.path = path or default_state_path()
+        self.capacity = capacity
+        self.seq = 0
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".state_")
+        try:
+            os.ftruncate(fd, HEADER.size + capacity)
+            self._mm = mmap.mmap(fd, HEADER.size + capacity)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self._mm, 0, MAGIC, 0, 0, 0.0)
+        os.replace(tmp, self.path)
+        self.stats = {"published": 0, "oversize": 0, "bytes": 0}
+
+    def publish(self, state: Dict[str, Any]) -> bool:
+        """Replace the snapshot with ``state`` (JSON; False if too big)."""
+        payload = json.dumps(state, default=str).encode()
+        n = len(payload)
+        if n > self.capacity:
+            self.stats["oversize"] += 1
+            logger.error(
+                f"StateSnapshot: {n} B state exceeds {self.capacity} B"
+            )
+            return False
+        mm = self._mm
+        self.seq += 1  # nieparzysty: zapis w toku
+        HEADER.pack_into(mm, 0, MAGIC, self.seq, 0, 0.0)
+        mm[HEADER.size:HEADER.size + n] = payload
+        self.seq += 1
+        HEADER.pack_into(mm, 0, MAGIC, self.seq, n, time.time())
+        self.stats["published"] += 1
+        self.stats["bytes"] = n
+        return True
+
+    def close(self, unlink: bool = False):
+        self._mm.close()
+        if unlink:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class StateSnapshotReader:
+    """Lock-free reader; decodes JSON only when the snapshot changed."""
+
+    def __init__(self, path: Optional[str] = None, retries: int = 100):
+        self.path = path or default_state_path()
+        self.retries = retries
+        self._mm = None
+        self._ino = None
+        self._cached_seq = None
+        self._cached = None
+        self.stats = {"reads": 0, "retries": 0, "decodes": 0}
+
+    def _open(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if st.st_ino == self._ino and self._mm is not None:
+            return True
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if st.st_size < HEADER.size:
+            return False
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._ino = st.st_ino
+        self._cached_seq = None
+        return True
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        Latest state with ``age_sec`` added; None if no worker has
+        published yet (or every retry hit a write in progress).
+        """
+        if not self._open():
+            return None
+        mm = self._mm
+        self.stats["reads"] += 1
+        for _ in range(self.retries):
+            magic, seq1, length, published = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or seq1 == 0:
+                return None
+            if seq1 & 1:
+                self.stats["retries"] += 1
+                time.sleep(0)
+                continue
+            if seq1 == self._cached_seq:
+                state = self._cached
+                break
+            payload = mm[HEADER.size:HEADER.size + length]
+            if HEADER.unpack_from(mm, 0)[1] != seq1:
+                self.stats["retries"] += 1
+                continue
+            state = json.loads(payload)
+            state["published_at"] = published
+            self.stats["decodes"] += 1
+            self._cached_seq, self._cached = seq1, state
+            break
+        else:
+            return None
+        return {**state, "age_sec": time.time() - state["published_at"]}
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def performance_stats(
+    equity: List[float], trades: int, wins: int
+) -> Dict[str, Any]:
+    """Equity-curve stats in the shape of the API's /status payload."""
+    drawdown = 0.0
+    final_balance = equity[-1] if equity else 0.0
+    peak = equity[0] if equity else 0.0
+    for val in equity:
+        if val > peak:
+            peak = val
+        dd = (peak - val) / peak if peak else 0.0
+        drawdown = max(drawdown, dd)
+    winrate = wins / trades if trades > 0 else 0.0
+    returns = (
+        [equity[i + 1] - equity[i] for i in range(len(equity) - 1)]
+        if len(equity) > 1 else []
+    )
+    sharpe = sortino = None
+    if returns:
+        mean_ret = sum(returns) / len(returns)
+        std_ret = (
+            (
+                sum((r - mean_ret) ** 2 for r in returns) / len(returns)
+            ) ** 0.5
+            if len(returns) > 1 else 0
+        )
+        downside = [r for r in returns if r < 0]
+        std_down = (
+            (
+                sum((r - mean_ret) ** 2 for r in downside) / len(downside)
+            ) ** 0.5
+            if downside else 0
+        )
+        sharpe = round(mean_ret / std_ret, 2) if std_ret else None
+        sortino = round(mean_ret / std_down, 2) if std_down else None
+    return {
+        "final_balance": final_balance,
+        "drawdown": round(drawdown * 100, 2),
+        "winrate": round(winrate * 100, 2),
+        "open_trades": 0,
+        "trades": trades,
+        "sharpe": sharpe,
+        "sortino": sortino,
+    }
+
+
+class BotStatePublisher:
+    """
+    Collects per-tick bot state and publishes it through a
+    StateSnapshotWriter (statystyki od startu workera, okno equity jak
+    /performance – ostatnie ``equity_window`` punktów).
+    """
+
+    def __init__(
+        self,
+        writer: Optional[StateSnapshotWriter] = None,
+        equity_window: int = 200,
+    ):
+        self.writer = writer or StateSnapshotWriter()
+        self.equity = deque(maxlen=equity_window)
+        self.trades = 0
+        self.wins = 0
+        self.tick = 0
+        self.last_decision = None
+        self.decisions: Dict[str, Dict[str, Any]] = {}
+        self.last_equity = None
+        self.started_at = time.time()
+
+    def record_decision(self, symbol, timestamp, decision, details=None):
+        row = {
+            "symbol": symbol,
+            "timestamp": str(timestamp),
+            "decision": decision,
+            "details": details,
+        }
+        self.decisions[symbol] = row
+        self.last_decision = row
+        self.trades += 1
+        if decision in WIN_DECISIONS:
+            self.wins += 1
+
+    def record_equity(self, timestamp, equity, pnl):
+        self.equity.append(float(equity))
+        self.last_equity = {
+            "timestamp": str(timestamp), "equity": equity, "pnl": pnl
+        }
+
+    def publish(
+        self,
+        positions: Dict[str, Any],
+        routers: Optional[Dict[str, Any]] = None,
+        strategies: Optional[Iterable[str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        self.tick += 1
+        allocations = {
+            symbol: router.get_last_allocations()
+            for symbol, router in (routers or {}).items()
+        }
+        state = {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "tick": self.tick,
+            "positions": positions,
+            "last_decision": self.last_decision,
+            "decisions": self.decisions,
+            "allocations": allocations,
+            "last_allocations": (
+                allocations.get(self.last_decision["symbol"], {})
+                if self.last_decision else {}
+            ),
+            "strategies": sorted(strategies or []),
+            "equity": self.last_equity,
+            "stats": performance_stats(
+                list(self.equity), self.trades, self.wins
+            ),
+        }
+        if extra:
+            state.update(extra)
+        return self.writer.publish(state)
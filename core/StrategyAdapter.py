@@ -0,0 +1,228 @@
+# StrategyAdapter.py – prekompilowane plany wywołań analyze() strategii
+"""
+StrategyAdapter: resolves each strategy's ``analyze`` parameters once at
+startup into a call plan (tuple of getters over a per-tick TickContext),
+so run_bot does not call inspect.signature on every symbol and tick.
+Strategies with ``indicator_requirements()`` get their indicators from
+the per-symbol IndicatorHub view in ``TickContext.indicators``. With a
+CandleScheduler a strategy runs only when a candle closes on one of its
+``timeframes``; in between its memoized signal is returned. With the
+router's BudgetedExecutor a strategy whose routed ``analyze`` is still
+running on a worker thread is skipped (``"busy"``), so its state is
+never mutated from two threads at once.
+Coroutine strategies run on one persistent event loop.
+"""
+
+import asyncio
+import inspect
+import logging
+from operator import attrgetter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TickContext:
+    """Data available to strategies for one symbol on one tick."""
+
+    __slots__ = (
+        "symbol",
+        "market_state",
+        "klines",
+        "indicators",
+        "timeframe",
+        "price",
+        "mid_price",
+        "inventory",
+        "orderbooks",
+        "prices",
+        "sentiment_data",
+        "data",
+        "orderbook",
+        "candle_ts",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        market_state: Dict[str, Any],
+        klines=None,
+        indicators=None,
+        timeframe: Optional[str] = None,
+        price: Optional[float] = None,
+        inventory=None,
+        orderbooks=None,
+        prices=None,
+        sentiment_data=None,
+        data=None,
+        orderbook=None,
+        candle_ts: Optional[int] = None,
+    ):
+        self.symbol = symbol
+        self.market_state = market_state
+        self.klines = klines
+        self.indicators = indicators
+        self.timeframe = timeframe
+        self.price = price
+        self.mid_price = price if price is not None else 0.0
+        self.inventory = inventory
+        self.orderbooks = orderbooks if orderbooks is not None else {}
+        self.prices = prices if prices is not None else {}
+        self.sentiment_data = (
+            sentiment_data if sentiment_data is not None else []
+        )
+        if data is None:
+            data = klines if klines is not None else []
+        self.data = data
+        self.orderbook = orderbook if orderbook is not None else {}
+        # Otwarcie ostatniej (formującej się) świecy – klucz CandleScheduler
+        self.candle_ts = candle_ts
+
+
+# analyze() parameter name -> TickContext attribute
+PARAM_SOURCES = {
+    "market_data": "market_state",
+    "market_state": "market_state",
+    "state": "market_state",
+    "klines": "klines",
+    "indicators": "indicators",
+    "timeframe": "timeframe",
+    "price": "price",
+    "mid_price": "mid_price",
+    "inventory": "inventory",
+    "orderbooks": "orderbooks",
+    "prices": "prices",
+    "sentiment_data": "sentiment_data",
+    "symbol": "symbol",
+    "data": "data",
+    "orderbook": "orderbook",
+}
+
+_SKIPPED_KINDS = (
+    inspect.Parameter.VAR_POSITIONAL,
+    inspect.Parameter.VAR_KEYWORD,
+)
+
+
+def _market_state_getter(name: str):
+    # Nieznane parametry: wartość z market_state albo None
+    def getter(ctx: TickContext):
+        return ctx.market_state.get(name)
+
+    return getter
+
+
+def _indicators_getter(strategy):
+    # Widok huba -> tylko wskaźniki zadeklarowane przez strategię;
+    # wymagania czytane co tick, bo parametry strategii mogą się zmienić
+    def getter(ctx: TickContext):
+        indicators = ctx.indicators
+        if hasattr(indicators, "select"):
+            return indicators.select(strategy.indicator_requirements())
+        return indicators
+
+    return getter
+
+
+class StrategyCallPlan:
+    """Compiled mapping from a TickContext to one strategy's analyze()."""
+
+    __slots__ = (
+        "strategy", "name", "fn", "params", "is_async", "timeframes"
+    )
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.name = getattr(strategy, "name", str(strategy))
+        self.timeframes = tuple(getattr(strategy, "timeframes", None) or ())
+        self.fn = getattr(strategy, "analyze", None)
+        self.params = ()
+        self.is_async = False
+        if self.fn is None:
+            return
+        params = []
+        for pname, param in inspect.signature(self.fn).parameters.items():
+            if pname == "self" or param.kind in _SKIPPED_KINDS:
+                continue
+            source = PARAM_SOURCES.get(pname)
+            if source == "indicators" and hasattr(
+                strategy, "indicator_requirements"
+            ):
+                getter = _indicators_getter(strategy)
+            elif source:
+                getter = attrgetter(source)
+            else:
+                getter = _market_state_getter(pname)
+            params.append((pname, getter))
+        self.params = tuple(params)
+        self.is_async = inspect.iscoroutinefunction(self.fn)
+
+    def kwargs(self, ctx: TickContext) -> Dict[str, Any]:
+        return {pname: getter(ctx) for pname, getter in self.params}
+
+
+class StrategyDispatcher:
+    """
+    Runs a fixed list of strategies against a TickContext using
+    precompiled call plans. Coroutine strategies share one event loop
+    that lives as long as the dispatcher.
+    """
+
+    def __init__(self, strategies: List[Any], scheduler=None, executor=None):
+        self.plans = tuple(StrategyCallPlan(s) for s in strategies)
+        self.scheduler = scheduler
+        # BudgetedExecutor routera (klucz = obiekt strategii)
+        self.executor = executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _run_coroutine(self, coro):
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def call(self, plan: StrategyCallPlan, ctx: TickContext):
+        result = plan.fn(**plan.kwargs(ctx))
+        if plan.is_async:
+            result = self._run_coroutine(result)
+        return result
+
+    def dispatch(self, ctx: TickContext) -> List[Dict[str, Any]]:
+        """Return raw signals in the run_bot format, one per strategy."""
+        raw_signals = []
+        scheduled = self.scheduler is not None and ctx.candle_ts is not None
+        for plan in self.plans:
+            if plan.fn is None:
+                raw_signals.append(
+                    {"strategy": plan.name, "error": "No analyze method"}
+                )
+                continue
+            if self.executor is not None and self.executor.busy(
+                plan.strategy
+            ):
+                # analyze wciąż trwa w wątku routera – nie wołamy drugi raz;
+                # bez zapisu w schedulerze, więc następny tick spróbuje znów
+                raw_signals.append(
+                    {"strategy": plan.name, "signal": None, "busy": True}
+                )
+                continue
+            if scheduled:
+                key = self.scheduler.key(
+                    plan.name, ctx.symbol, plan.timeframes, ctx.candle_ts
+                )
+                cached = self.scheduler.get(key)
+                if cached is not None:
+                    raw_signals.append(cached)
+                    continue
+            try:
+                entry = {"strategy": plan.name, "signal": self.call(plan, ctx)}
+            except Exception as e:
+                entry = {"strategy": plan.name, "error": str(e)}
+            if scheduled:
+                self.scheduler.put(key, entry)
+            raw_signals.append(entry)
+        return raw_signals
+
+    def close(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self._loop = None
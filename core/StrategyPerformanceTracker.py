@@ -4,10 +4,15 @@ StrategyPerformanceTracker.py – Production-grade strategy performance tracker
 - Advanced metrics: rolling drawdown, score, hitrate, Sharpe ratio, etc.
 - Robust logging, error handling, type annotations
 - ML pipeline compatibility
+- Online statistics (core.OnlineStats): every metric O(1) to update and
+  read, PnL history in a compact array('d')
 """
 
 import logging
-from typing import Any, Dict
+from array import array
+from typing import Any, Dict, Optional
+
+from core.OnlineStats import OnlineStats
 
 logger = logging.getLogger("StrategyPerformanceTracker")
 
@@ -19,126 +24,111 @@ class StrategyPerformanceTracker:
         for each strategy.
         """
         stats = {}
-        for strategy in self.performance:
+        for strategy, perf in self.performance.items():
+            online = perf["stats"]
+            pnl = online.total
+            winrate = online.winrate
+            dd = online.rolling_drawdown
             stats[strategy] = {
-                "sharpe": self.sharpe_ratio(strategy),
-                "pnl": self.track_pnl(strategy),
-                "winrate": self.winrate(strategy),
-                "drawdown": self.drawdown(strategy),
-                "score": self.score(strategy),
+                "sharpe": online.sharpe,
+                "pnl": pnl,
+                "winrate": winrate,
+                "drawdown": dd,
+                "score": pnl * winrate - dd,
             }
+            if online.ew_alpha is not None:
+                stats[strategy]["ew_sharpe"] = online.ew_sharpe
         return stats
 
     def sharp_ratio(self, strategy: str) -> float:
         # Alias for legacy test compatibility (should be sharpe_ratio)
         return self.sharpe_ratio(strategy)
 
-    def __init__(self):
+    def __init__(
+        self, drawdown_window: int = 10, ew_alpha: Optional[float] = None
+    ):
         self.name = "StrategyPerformanceTracker"
         self.performance: Dict[str, Dict[str, Any]] = {}
+        # Okno rolling drawdown utrzymywane online; ew_alpha włącza
+        # wykładniczo ważone warianty (ew_sharpe)
+        self.drawdown_window = drawdown_window
+        self.ew_alpha = ew_alpha
+
+    def _stats(self, strategy: str) -> Optional[OnlineStats]:
+        perf = self.performance.get(strategy)
+        return perf["stats"] if perf else None
 
     def update(self, strategy: str, result: Dict[str, Any]):
         """Update strategy performance with new result."""
         try:
-            if strategy not in self.performance:
-                self.performance[strategy] = {
-                    "pnl": [],
+            perf = self.performance.get(strategy)
+            if perf is None:
+                perf = self.performance[strategy] = {
+                    "pnl": array("d"),
                     "wins": 0,
                     "losses": 0,
+                    "stats": OnlineStats(self.drawdown_window, self.ew_alpha),
                 }
-            self.performance[strategy]["pnl"].append(result.get("pnl", 0))
-            if result.get("pnl", 0) > 0:
-                self.performance[strategy]["wins"] += 1
+            pnl = result.get("pnl", 0)
+            perf["pnl"].append(pnl)
+            perf["stats"].push(pnl)
+            if pnl > 0:
+                perf["wins"] += 1
             else:
-                self.performance[strategy]["losses"] += 1
-            logger.info(
-                f"StrategyTracker: {strategy} updated. "
-                f"PnL={result.get('pnl', 0)}, "
-                f"Wins={self.performance[strategy]['wins']}, "
-                f"Losses={self.performance[strategy]['losses']}"
-            )
+                perf["losses"] += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"StrategyTracker: {strategy} updated. "
+                    f"PnL={pnl}, Wins={perf['wins']}, "
+                    f"Losses={perf['losses']}"
+                )
         except Exception as e:
             logger.error(f"StrategyPerformanceTracker.update error: {e}")
 
     def track_pnl(self, strategy: str) -> float:
-        try:
-            pnl_list = self.performance.get(strategy, {}).get("pnl", [])
-            return float(sum(pnl_list))
-        except Exception as e:
-            logger.error(f"StrategyPerformanceTracker.track_pnl error: {e}")
-            return 0.0
+        stats = self._stats(strategy)
+        return stats.total if stats else 0.0
 
     def winrate(self, strategy: str) -> float:
-        try:
-            perf = self.performance.get(strategy, {})
-            total = perf.get("wins", 0) + perf.get("losses", 0)
-            return perf.get("wins", 0) / total if total > 0 else 0.0
-        except Exception as e:
-            logger.error(f"StrategyPerformanceTracker.winrate error: {e}")
-            return 0.0
+        stats = self._stats(strategy)
+        return stats.winrate if stats else 0.0
 
     def sharpe_ratio(self, strategy: str) -> float:
-        try:
-            pnl = self.performance.get(strategy, {}).get("pnl", [])
-            if not pnl:
-                return 0.0
-            mean = sum(pnl) / len(pnl)
-            std = (
-                (sum((x - mean) ** 2 for x in pnl) / len(pnl)) ** 0.5
-                if len(pnl) > 1
-                else 1.0
-            )
-            return mean / std if std != 0 else 0.0
-        except Exception as e:
-            logger.error(f"StrategyPerformanceTracker.sharpe_ratio error: {e}")
-            return 0.0
+        stats = self._stats(strategy)
+        return stats.sharpe if stats else 0.0
 
-    def drawdown(self, strategy: str, window: int = 10) -> float:
+    def ew_sharpe_ratio(self, strategy: str) -> float:
+        """Exponentially weighted Sharpe (0.0 unless ``ew_alpha`` set)."""
+        stats = self._stats(strategy)
+        return stats.ew_sharpe if stats else 0.0
+
+    def drawdown(self, strategy: str, window: Optional[int] = None) -> float:
         """Calculate rolling drawdown for a strategy over a window."""
         try:
-            pnl = self.performance.get(strategy, {}).get("pnl", [])
-            if not pnl:
+            stats = self._stats(strategy)
+            if stats is None or not stats.count:
                 return 0.0
-            recent = pnl[-window:] if len(pnl) >= window else pnl
+            if window is None or window == self.drawdown_window:
+                return stats.rolling_drawdown
+            # Inne okno niż utrzymywane online: O(window) z ogona historii
+            recent = self.performance[strategy]["pnl"][-window:]
             peak = max(recent)
             trough = min(recent)
-            dd = (peak - trough) / peak if peak != 0 else 0.0
-            logger.info(
-                f"StrategyTracker: {strategy} rolling drawdown={dd:.4f} "
-                f"(window={window})"
-            )
-            return dd
+            return (peak - trough) / peak if peak != 0 else 0.0
         except Exception as e:
             logger.error(f"StrategyPerformanceTracker.drawdown error: {e}")
             return 0.0
 
     def hitrate(self, strategy: str) -> float:
         """Calculate hitrate (percentage of winning trades)."""
-        try:
-            perf = self.performance.get(strategy, {})
-            total = perf.get("wins", 0) + perf.get("losses", 0)
-            hitrate = perf.get("wins", 0) / total if total > 0 else 0.0
-            logger.info(f"StrategyTracker: {strategy} hitrate={hitrate:.2f}")
-            return hitrate
-        except Exception as e:
-            logger.error(f"StrategyPerformanceTracker.hitrate error: {e}")
-            return 0.0
+        return self.winrate(strategy)
 
     def score(self, strategy: str) -> float:
         """Calculate composite score: PnL * winrate - drawdown."""
-        try:
-            pnl = self.track_pnl(strategy)
-            winrate = self.winrate(strategy)
-            dd = self.drawdown(strategy)
-            score = pnl * winrate - dd
-            logger.info(
-                f"StrategyTracker: {strategy} score={score:.2f} "
-                f"(PnL={pnl}, Winrate={winrate:.2f}, DD={dd:.2f})"
-            )
-            return score
-        except Exception as e:
-            logger.error(f"StrategyPerformanceTracker.score error: {e}")
+        stats = self._stats(strategy)
+        if stats is None:
             return 0.0
+        return stats.total * stats.winrate - stats.rolling_drawdown
 
     def best_performing_strategy(self) -> str:
         try:
@@ -0,0 +1,148 @@
+# db_migrations.py – wersjonowane, idempotentne zmiany schematu
+"""
+Minimal schema migrations for an existing database (create_all only
+creates missing tables, it never adds columns).
+
+Każda migracja to (wersja, funkcja(conn)); zastosowane wersje trafiają
+do ``schema_migrations``. ``upgrade`` uruchamia brakujące po kolei, każdą
+w osobnej transakcji – wywołuje je init_db() przy starcie API.
+"""
+
+import datetime
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import func, inspect, insert, select, text, update
+
+from core.db_models import (
+    Base,
+    Decision,
+    Equity,
+    LogEntry,
+    MetricsSummary,
+    SchemaMigration,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH = 1000
+
+
+def _add_missing_columns(conn, table, columns):
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    for column in columns:
+        if column.name in existing:
+            continue
+        ddl = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN {column.name} {ddl}"
+        ))
+
+
+def _backfill_decision_fields(conn, names):
+    """Fill typed columns ``names`` from ``details``, id-ordered batches."""
+    from core.db_utils import decision_fields
+
+    table = Decision.__table__
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.details)
+            .where(table.c.id > last_id, table.c.details.is_not(None))
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            return
+        for row_id, details in rows:
+            fields = decision_fields(details)
+            values = {
+                name: fields[name] for name in names
+                if fields[name] is not None
+            }
+            if values:
+                conn.execute(
+                    update(table).where(table.c.id == row_id).values(**values)
+                )
+        last_id = rows[-1][0]
+
+
+def _v1_typed_decision_columns(conn):
+    """symbol/trend/volatility/tick columns, backfilled from details."""
+    names = ("symbol", "trend", "volatility", "tick")
+    table = Decision.__table__
+    _add_missing_columns(conn, table.name, [table.c[n] for n in names])
+    _backfill_decision_fields(conn, names)
+
+
+def _v2_metrics_summary(conn):
+    """Seed the running aggregates with one full count."""
+    from core.MetricsAggregator import SUMMARY_ID, WIN_DECISIONS
+
+    if conn.execute(
+        select(MetricsSummary.id).where(MetricsSummary.id == SUMMARY_ID)
+    ).first():
+        return
+    last = conn.execute(
+        select(Decision.timestamp, Decision.decision, Decision.details)
+        .order_by(Decision.timestamp.desc())
+        .limit(1)
+    ).first()
+    conn.execute(insert(MetricsSummary).values(
+        id=SUMMARY_ID,
+        decisions_total=conn.execute(
+            select(func.count()).select_from(Decision)
+        ).scalar_one(),
+        wins_total=conn.execute(
+            select(func.count()).select_from(Decision)
+            .where(Decision.decision.in_(WIN_DECISIONS))
+        ).scalar_one(),
+        equity_total=conn.execute(
+            select(func.count()).select_from(Equity)
+        ).scalar_one(),
+        last_decision_at=last[0] if last else None,
+        last_decision=last[1] if last else None,
+        last_decision_details=last[2] if last else None,
+        updated_at=datetime.datetime.now(),
+    ))
+
+
+def _v3_decision_schema_indexes(conn):
+    """
+    strategy/signal/allocation columns (backfilled) and the (timestamp, id)
+    / (symbol|event, timestamp, id) indexes used by keyset pagination and
+    retention deletes.
+    """
+    names = ("strategy", "signal", "allocation")
+    table = Decision.__table__
+    _add_missing_columns(conn, table.name, [table.c[n] for n in names])
+    _backfill_decision_fields(conn, names)
+    for model in (Decision, Equity, LogEntry):
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+MIGRATIONS: List[Tuple[int, Callable]] = [
+    (1, _v1_typed_decision_columns),
+    (2, _v2_metrics_summary),
+    (3, _v3_decision_schema_indexes),
+]
+
+
+def upgrade(engine) -> List[int]:
+    """Create missing tables and apply pending migrations in order."""
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(SchemaMigration.version)).scalars())
+    done = []
+    for version, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(insert(SchemaMigration).values(
+                version=version, applied_at=datetime.datetime.now()
+            ))
+        logger.info(f"db_migrations: applied v{version} {migrate.__name__}")
+        done.append(version)
+    return done
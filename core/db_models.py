@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, DateTime, Text
+    create_engine, Column, Integer, String, Float, DateTime, Index, Text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -21,6 +21,19 @@ class Decision(Base):
     timestamp = Column(DateTime, nullable=False)
     decision = Column(String(32), nullable=False)
     details = Column(Text)
+    # Pola typowane (db_migrations v1, v3) – odczyt nie parsuje ``details``
+    symbol = Column(String(32))
+    trend = Column(String(32))
+    volatility = Column(Float)
+    tick = Column(Integer)
+    strategy = Column(String(64))
+    signal = Column(String(16))
+    allocation = Column(Float)
+    # Stronicowanie po (timestamp, id) malejąco bez sortowania całej tabeli
+    __table_args__ = (
+        Index("ix_decisions_timestamp_id", "timestamp", "id"),
+        Index("ix_decisions_symbol_timestamp_id", "symbol", "timestamp", "id"),
+    )
 
 
 class Equity(Base):
@@ -29,6 +42,7 @@ class Equity(Base):
     timestamp = Column(DateTime, nullable=False)
     equity = Column(Float, nullable=False)
     pnl = Column(Float, nullable=False)
+    __table_args__ = (Index("ix_equity_timestamp_id", "timestamp", "id"),)
 
 
 # Model logów do bazy
@@ -38,7 +52,33 @@ class LogEntry(Base):
     timestamp = Column(DateTime, nullable=False)
     event = Column(String(64), nullable=False)
     details = Column(Text)
+    __table_args__ = (
+        Index("ix_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_logs_event_timestamp_id", "event", "timestamp", "id"),
+    )
+
+
+# Agregaty utrzymywane przy zapisie (MetricsAggregator.record_batch) –
+# jeden wiersz zamiast COUNT(*) po całej tabeli decisions
+class MetricsSummary(Base):
+    __tablename__ = "metrics_summary"
+    id = Column(Integer, primary_key=True)
+    decisions_total = Column(Integer, nullable=False, default=0)
+    wins_total = Column(Integer, nullable=False, default=0)
+    equity_total = Column(Integer, nullable=False, default=0)
+    last_decision_at = Column(DateTime)
+    last_decision = Column(String(32))
+    last_decision_details = Column(Text)
+    updated_at = Column(DateTime)
+
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, nullable=False)
 
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    from core.db_migrations import upgrade
+
+    upgrade(engine)
@@ -0,0 +1,132 @@
+# db_retention.py – retencja tabel append-only (decisions, equity, logs)
+"""
+Tabele decyzji, equity i logów są tylko dopisywane; bez retencji rosną
+bez końca. ``purge_before`` usuwa wiersze starsze niż punkt odcięcia
+paczkami po ``batch`` (indeks (timestamp, id) – bez pełnego skanu i bez
+jednej długiej transakcji blokującej zapis write-behind).
+
+Włączane przez DB_RETENTION_DAYS (brak / 0 = bez retencji);
+RetentionScheduler uruchamia ``purge_expired`` co
+DB_RETENTION_INTERVAL_SEC – w wątku w tle (BotCore.run_bot) albo jako
+zadanie asyncio (BotCoreAsync). Błąd purge jest logowany i liczony, a
+następna próba idzie w kolejnym interwale.
+Liczniki w ``metrics_summary`` są narastające i retencja ich nie zmienia.
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+
+from core.db_models import Decision, Equity, LogEntry
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MODELS = (Decision, Equity, LogEntry)
+
+
+def purge_before(
+    session_factory, cutoff, models=RETENTION_MODELS, batch: int = 5000
+) -> Dict[str, int]:
+    """Delete rows with ``timestamp < cutoff``; returns counts per table."""
+    deleted = {}
+    for model in models:
+        total = 0
+        while True:
+            db = session_factory()
+            try:
+                ids = (
+                    select(model.id)
+                    .where(model.timestamp < cutoff)
+                    .order_by(model.timestamp, model.id)
+                    .limit(batch)
+                )
+                ids = db.execute(ids).scalars().all()
+                if ids:
+                    db.execute(delete(model).where(model.id.in_(ids)))
+                    db.commit()
+            finally:
+                db.close()
+            total += len(ids)
+            if len(ids) < batch:
+                break
+        deleted[model.__tablename__] = total
+    return deleted
+
+
+def purge_expired(
+    session_factory=None, days: Optional[float] = None
+) -> Dict[str, int]:
+    """Apply DB_RETENTION_DAYS (or ``days``); no-op when unset or 0."""
+    if days is None:
+        days = float(os.getenv("DB_RETENTION_DAYS", "0") or 0)
+    if days <= 0:
+        return {}
+    if session_factory is None:
+        from core.db_models import SessionLocal
+
+        session_factory = SessionLocal
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
+    deleted = purge_before(session_factory, cutoff)
+    if any(deleted.values()):
+        logger.info(f"db_retention: purged {deleted} older than {cutoff}")
+    return deleted
+
+
+def retention_enabled() -> bool:
+    return float(os.getenv("DB_RETENTION_DAYS", "0") or 0) > 0
+
+
+class RetentionScheduler:
+    """Runs ``purge`` every ``interval_sec``; failures are logged."""
+
+    def __init__(self, interval_sec: Optional[float] = None,
+                 purge=purge_expired):
+        if interval_sec is None:
+            interval_sec = float(
+                os.getenv("DB_RETENTION_INTERVAL_SEC", "3600")
+            )
+        self.interval_sec = interval_sec
+        self.purge = purge
+        self.last_result: Optional[Dict[str, int]] = None
+        self.runs = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[Dict[str, int]]:
+        self.runs += 1
+        try:
+            self.last_result = self.purge()
+        except Exception:
+            self.failures += 1
+            logger.exception("db_retention: purge failed")
+            return None
+        return self.last_result
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval_sec)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="db-retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def run_async(self):
+        """Same loop for an event loop; the purge runs in a thread."""
+        while not self._stop.is_set():
+            await asyncio.to_thread(self.run_once)
+            await asyncio.sleep(self.interval_sec)
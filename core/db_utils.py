@@ -1,7 +1,10 @@
 
 import datetime
-from core.db_models import SessionLocal, Decision, Equity, LogEntry
-from sqlalchemy.orm import Session
+import json
+import re
+from sqlalchemy import desc, tuple_
+from core.db_models import Decision, Equity, LogEntry
+from core.db_writer import get_writer
 
 
 def ms_to_datetime(ts):
@@ -37,37 +40,153 @@ def ms_to_datetime(ts):
     return None
 
 
-def save_decision_to_db(timestamp, decision, details=None):
-    db: Session = SessionLocal()
-    dec = Decision(
-        timestamp=ms_to_datetime(timestamp),
-        decision=decision,
-        details=details
+TYPED_FIELDS = (
+    "symbol", "strategy", "signal", "trend", "volatility", "tick",
+    "allocation",
+)
+_FIELD_PATTERNS = {
+    "symbol": re.compile(r"symbol=([A-Z0-9]+)"),
+    "strategy": re.compile(r"strategy=([a-zA-Z0-9_]+)"),
+    "signal": re.compile(r"signal=([a-zA-Z_]+)"),
+    "trend": re.compile(r"trend=([A-Z_]+)"),
+    "volatility": re.compile(r"volatility=([\d\.]+)"),
+    "tick": re.compile(r"tick=([\d]+)"),
+    "allocation": re.compile(r"allocation=([\d\.]+)"),
+}
+_FLOAT_FIELDS = ("volatility", "allocation")
+
+
+def _typed(name, value):
+    if value is None:
+        return None
+    try:
+        if name in _FLOAT_FIELDS:
+            return float(value)
+        if name == "tick":
+            return int(value)
+        width = Decision.__table__.c[name].type.length
+        return str(value)[:width]
+    except (TypeError, ValueError):
+        return None
+
+
+def decision_fields(details):
+    """
+    Typed columns (TYPED_FIELDS) from a legacy ``details`` blob: JSON
+    first, ``key=value`` text as fallback. Used once per row – at write
+    time or by the migration backfill – never per read.
+    """
+    fields = dict.fromkeys(TYPED_FIELDS)
+    if not details:
+        return fields
+    try:
+        parsed = json.loads(details)
+    except (TypeError, ValueError):
+        parsed = None
+    if isinstance(parsed, dict):
+        for name in TYPED_FIELDS:
+            fields[name] = _typed(name, parsed.get(name))
+        return fields
+    for name, pattern in _FIELD_PATTERNS.items():
+        match = pattern.search(details)
+        if match:
+            fields[name] = _typed(name, match.group(1))
+    return fields
+
+
+def _decision_row(timestamp, decision, details, fields):
+    unknown = set(fields) - set(TYPED_FIELDS)
+    if unknown:
+        raise TypeError(f"unknown decision fields: {sorted(unknown)}")
+    typed = {name: _typed(name, fields.get(name)) for name in TYPED_FIELDS}
+    if details and None in typed.values():
+        # Brakujące pola uzupełniane z ``details`` (raz, przy zapisie)
+        for name, value in decision_fields(details).items():
+            if typed[name] is None:
+                typed[name] = value
+    return {
+        "timestamp": ms_to_datetime(timestamp),
+        "decision": decision,
+        "details": details,
+        **typed,
+    }
+
+
+def save_decision_to_db(timestamp, decision, details=None, **fields):
+    """
+    Queue a decision row. ``fields`` are the typed columns (symbol,
+    strategy, signal, trend, volatility, tick, allocation); missing ones
+    are taken from ``details``.
+    """
+    # Zapis write-behind: wiersz trafia do kolejki, flush robi wątek w tle
+    return get_writer().put(
+        Decision, _decision_row(timestamp, decision, details, fields)
     )
-    db.add(dec)
-    db.commit()
-    db.close()
 
 
 def save_equity_to_db(timestamp, equity, pnl):
-    db: Session = SessionLocal()
-    eq = Equity(
-        timestamp=ms_to_datetime(timestamp),
-        equity=equity,
-        pnl=pnl
+    return get_writer().put(Equity, {
+        "timestamp": ms_to_datetime(timestamp),
+        "equity": equity,
+        "pnl": pnl,
+    })
+
+
+async def save_decision_async(timestamp, decision, details=None, **fields):
+    # Dla korutyn (BotCoreAsync): nie blokuje pętli zdarzeń
+    return await get_writer().put_async(
+        Decision, _decision_row(timestamp, decision, details, fields)
     )
-    db.add(eq)
-    db.commit()
-    db.close()
+
+
+async def save_equity_async(timestamp, equity, pnl):
+    return await get_writer().put_async(Equity, {
+        "timestamp": ms_to_datetime(timestamp),
+        "equity": equity,
+        "pnl": pnl,
+    })
 
 
 def save_log_to_db(event, details=None):
-    db: Session = SessionLocal()
-    log = LogEntry(
-        timestamp=ms_to_datetime(datetime.datetime.now()),
-        event=event,
-        details=details
+    return get_writer().put(LogEntry, {
+        "timestamp": datetime.datetime.now(),
+        "event": event,
+        "details": details,
+    })
+
+
+def flush_db_writes():
+    """Synchronously write all queued rows (e.g. before reading them)."""
+    get_writer().flush()
+
+
+def db_writer_metrics():
+    """Queue depth, flush latency and drop/failure counters."""
+    return get_writer().metrics()
+
+
+def keyset_page(
+    db, model, limit, before=None, before_id=None, criteria=(),
+):
+    """
+    Newest-first page of ``model`` rows strictly older than the cursor
+    (``before`` timestamp, optionally ``before_id`` to split rows sharing a
+    timestamp) and matching ``criteria``. Walks the (timestamp, id) index
+    instead of sorting the table or skipping OFFSET rows. Returns
+    (rows, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.query(model).filter(*criteria)
+    if before is not None:
+        if before_id is not None:
+            query = query.filter(
+                tuple_(model.timestamp, model.id) < tuple_(before, before_id)
+            )
+        else:
+            query = query.filter(model.timestamp < before)
+    rows = (
+        query.order_by(desc(model.timestamp), desc(model.id))
+        .limit(limit)
+        .all()
     )
-    db.add(log)
-    db.commit()
-    db.close()
+    cursor = (rows[-1].timestamp, rows[-1].id) if len(rows) == limit else None
+    return rows, cursor
@@ -0,0 +1,318 @@
+"""
+db_writer.py – zapis write-behind do bazy (decisions, equity, logs)
+
+Funkcje save_*_to_db (i save_*_async dla korutyn) tylko wrzucają wiersz
+do ograniczonej kolejki w pamięci; wątek w tle zapisuje je paczkami
+(insert().values / executemany) co ``flush_size`` wierszy albo co
+``flush_interval`` sekund. Pętla decyzyjna nie czeka więc na round-trip
+i fsync Postgresa.
+
+Nieudany flush jest ponawiany (``retries``), zanim jego wiersze trafią do
+licznika "failed". Odrzucone przy przepełnieniu wiersze są logowane
+(ostrzeżenie co najwyżej raz na ``DROP_LOG_INTERVAL`` s), a wiersze modeli
+z ``blocking_models`` (decyzje) nigdy nie są wypychane przez nowsze –
+przy pełnej kolejce wypychają najstarszy inny wiersz ("drop_oldest")
+albo czekają jak w polityce "block".
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "drop_newest")
+DROP_LOG_INTERVAL = 10.0
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-memory queue of rows flushed to the database in bulk by a
+    background thread.
+
+    Backpressure (queue full):
+    - "block": wait up to ``block_timeout`` seconds, then drop the new row
+    - "drop_oldest": evict the oldest queued row
+    - "drop_newest": drop the new row
+
+    Rows of ``blocking_models`` are never evicted and never dropped
+    without waiting: with "drop_oldest" they evict the oldest other row,
+    otherwise (or if only protected rows are queued) they block.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        max_queue: int = 10000,
+        flush_size: int = 500,
+        flush_interval: float = 1.0,
+        backpressure: str = "drop_oldest",
+        block_timeout: float = 1.0,
+        on_batch=None,
+        retries: int = 1,
+        retry_delay: float = 0.5,
+        blocking_models=(),
+    ):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"backpressure must be one of {BACKPRESSURE_POLICIES}"
+            )
+        if session_factory is None:
+            from core.db_models import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.blocking_models = tuple(blocking_models)
+        self._last_drop_log = 0.0
+        # on_batch(db, rows_by_model): w tej samej transakcji co insert
+        # (np. MetricsAggregator.record_batch – agregaty metryk)
+        self.on_batch = on_batch
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "failed": 0,
+            "retries": 0,
+            "flushes": 0,
+            "max_queue_depth": 0,
+            "last_flush_latency_ms": 0.0,
+            "max_flush_latency_ms": 0.0,
+            "total_flush_latency_ms": 0.0,
+        }
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(
+                    target=self._run, name="db-write-behind", daemon=True
+                )
+                self._thread.start()
+
+    def put(self, model, row: Dict[str, Any]) -> bool:
+        """Enqueue one row for ``model``; returns False if it was dropped."""
+        if self._thread is None:
+            self.start()
+        policy = self._policy(model)
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                evicted = (
+                    self._evict_oldest() if policy == "drop_oldest" else None
+                )
+                if evicted is not None:
+                    self._stats["dropped"] += 1
+                    self._warn_dropped(evicted, self._stats["dropped"])
+                else:
+                    # "block" albo brak wiersza do wypchnięcia
+                    if policy != "drop_newest":
+                        self._cond.notify_all()
+                        self._cond.wait_for(
+                            lambda: len(self._queue) < self.max_queue,
+                            timeout=self.block_timeout,
+                        )
+                    if len(self._queue) >= self.max_queue:
+                        self._stats["dropped"] += 1
+                        self._warn_dropped(model, self._stats["dropped"])
+                        return False
+            self._queue.append((model, row))
+            self._stats["enqueued"] += 1
+            depth = len(self._queue)
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+            if depth >= self.flush_size:
+                self._cond.notify_all()
+        return True
+
+    def _policy(self, model) -> str:
+        # Chronione wiersze nigdy nie są odrzucane od razu: wypychają
+        # starszy niechroniony wiersz ("drop_oldest") albo czekają
+        protected = model in self.blocking_models
+        if protected and self.backpressure != "drop_oldest":
+            return "block"
+        return self.backpressure
+
+    def _evict_oldest(self):
+        # Pod self._cond: usuń najstarszy wiersz spoza blocking_models;
+        # zwraca jego model albo None
+        for i, (model, _) in enumerate(self._queue):
+            if model not in self.blocking_models:
+                del self._queue[i]
+                return model
+        return None
+
+    def _warn_dropped(self, model, dropped: int):
+        # Pod self._cond; ostrzeżenie co najwyżej raz na DROP_LOG_INTERVAL
+        now = time.monotonic()
+        if now - self._last_drop_log >= DROP_LOG_INTERVAL:
+            self._last_drop_log = now
+            logger.warning(
+                "WriteBehindQueue: queue full (%d rows), dropped a %s row "
+                "(%d dropped in total, policy %s)",
+                self.max_queue, getattr(model, "__name__", model), dropped,
+                self.backpressure,
+            )
+
+    async def put_async(self, model, row: Dict[str, Any]) -> bool:
+        """
+        ``put`` for coroutines. A put on a full queue may wait ("block",
+        ``blocking_models``, or nothing left to evict); that wait runs in
+        a thread so the event loop keeps serving.
+        """
+        if self._policy(model) == "drop_newest":
+            return self.put(model, row)
+        with self._cond:
+            full = len(self._queue) >= self.max_queue
+        if not full:
+            return self.put(model, row)
+        return await asyncio.to_thread(self.put, model, row)
+
+    def _take_batch(self):
+        with self._cond:
+            n = min(len(self._queue), self.flush_size)
+            batch = [self._queue.popleft() for _ in range(n)]
+            self._cond.notify_all()
+        return batch
+
+    def _write(self, batch):
+        rows_by_model = {}
+        for model, row in batch:
+            rows_by_model.setdefault(model, []).append(row)
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._cond:
+                    self._stats["retries"] += 1
+                time.sleep(self.retry_delay)
+            ok = self._write_once(batch, rows_by_model, attempt)
+            if ok:
+                break
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        with self._cond:
+            stats = self._stats
+            stats["flushes"] += 1
+            stats["flushed" if ok else "failed"] += len(batch)
+            stats["last_flush_latency_ms"] = latency_ms
+            stats["total_flush_latency_ms"] += latency_ms
+            if latency_ms > stats["max_flush_latency_ms"]:
+                stats["max_flush_latency_ms"] = latency_ms
+
+    def _write_once(self, batch, rows_by_model, attempt: int) -> bool:
+        db = self.session_factory()
+        try:
+            for model, rows in rows_by_model.items():
+                db.execute(insert(model), rows)
+            if self.on_batch is not None:
+                self.on_batch(db, rows_by_model)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            last = attempt >= self.retries
+            logger.log(
+                logging.ERROR if last else logging.WARNING,
+                f"WriteBehindQueue: flush of {len(batch)} rows failed "
+                f"(attempt {attempt + 1}/{self.retries + 1}"
+                f"{', rows lost' if last else ', retrying'}): {e}",
+            )
+            return False
+        finally:
+            db.close()
+
+    def flush(self):
+        """Write everything queued so far (blocks the caller)."""
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                self._write(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closing
+                    or len(self._queue) >= self.flush_size,
+                    timeout=self.flush_interval,
+                )
+                closing = self._closing
+            self.flush()
+            if closing:
+                return
+
+    def close(self, timeout: float = 5.0):
+        """Stop the background thread after draining the queue."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(
+                    "WriteBehindQueue: drain timed out with "
+                    f"{len(self._queue)} rows queued"
+                )
+        else:
+            self.flush()
+        self._thread = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._queue)
+        flushes = stats["flushes"]
+        stats["avg_flush_latency_ms"] = (
+            stats.pop("total_flush_latency_ms") / flushes if flushes else 0.0
+        )
+        return stats
+
+
+_writer: Optional[WriteBehindQueue] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> WriteBehindQueue:
+    """Process-wide writer configured from DB_WRITE_* env variables."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                from core.MetricsAggregator import record_batch
+                from core.db_models import Decision
+
+                _writer = WriteBehindQueue(
+                    max_queue=int(os.getenv("DB_WRITE_MAX_QUEUE", "10000")),
+                    flush_size=int(os.getenv("DB_WRITE_FLUSH_SIZE", "500")),
+                    flush_interval=float(
+                        os.getenv("DB_WRITE_FLUSH_INTERVAL", "1.0")
+                    ),
+                    backpressure=os.getenv(
+                        "DB_WRITE_BACKPRESSURE", "drop_oldest"
+                    ),
+                    on_batch=record_batch,
+                    # Decyzje (ślad audytu) nie są wypychane przy
+                    # przepełnieniu – czekają jak w "block"
+                    blocking_models=(Decision,),
+                )
+                atexit.register(_writer.close)
+    return _writer
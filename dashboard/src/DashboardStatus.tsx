@@ -80,6 +80,30 @@ const DashboardStatus: React.FC = () => {
 
   // Local state for start-live feedback
   const [liveMsg, setLiveMsg] = useState<string | null>(null);
+  // Strumień SSE (/metrics/live): equity i decyzje bez odpytywania API
+  const [live, setLive] = useState(false);
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return;
+    const source = new EventSource(`${API_URL}/metrics/live`);
+    source.onopen = () => setLive(true);
+    // EventSource sam wznawia połączenie; do tego czasu wraca polling
+    source.onerror = () => setLive(false);
+    source.addEventListener('equity', (ev) => {
+      const event = JSON.parse((ev as MessageEvent).data);
+      if (!event.data) return;
+      setEquityData(prev => [
+        ...prev,
+        { timestamp: String(event.data.timestamp), equity: event.data.equity }
+      ].slice(-200));
+    });
+    source.addEventListener('decision', (ev) => {
+      const event = JSON.parse((ev as MessageEvent).data);
+      if (!event.data) return;
+      setDecisions(prev => [...prev, event.data as Decision].slice(-20));
+    });
+    return () => source.close();
+  }, []);
 
   useEffect(() => {
     let isMounted = true;
@@ -100,9 +124,10 @@ const DashboardStatus: React.FC = () => {
         });
     };
     fetchEquity();
+    if (live) return () => { isMounted = false; };
     const interval = setInterval(fetchEquity, 15000);
     return () => { isMounted = false; clearInterval(interval); };
-  }, []);
+  }, [live]);
 
   // Handler to start live trading via API
   const handleStartLive = () => {
@@ -142,9 +167,10 @@ const DashboardStatus: React.FC = () => {
         });
     };
     fetchDecisions();
+    if (live) return () => { isMounted = false; };
     const interval = setInterval(fetchDecisions, 15000);
     return () => { isMounted = false; clearInterval(interval); };
-  }, []);
+  }, [live]);
 
   useEffect(() => {
     let isMounted = true;
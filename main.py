@@ -9,6 +9,7 @@ import argparse
 import logging
 import sys
 import asyncio
+import multiprocessing
 import threading
 import time
 
@@ -72,17 +73,22 @@ def main():
         f"API enabled: {not args.no_api}"
     )
 
-    # Start API in background
+    # Start API in background – osobny proces: handlery API nie walczą
+    # z pętlą bota o GIL, stan bota czytają ze snapshotu (StateSnapshot)
     if not args.no_api:
-        api_thread = threading.Thread(target=start_api, daemon=True)
+        api_process = multiprocessing.get_context("spawn").Process(
+            target=start_api, name="zol0-api", daemon=True
+        )
         # Also start the system monitoring thread (runs its own asyncio loop)
         monitor_thread = threading.Thread(target=start_system_monitor, daemon=True)
         # [TASK-ID: system_monitoring_init]
         # Monitoring zasobów – uruchamiany pasywnie, nie wpływa na pętlę handlu
         # (Podpięcie tylko tutaj, nie w pętli decyzyjnej)
-        api_thread.start()
+        api_process.start()
         monitor_thread.start()
-        logger.info("[API] FastAPI server thread started")
+        logger.info(
+            f"[API] FastAPI server process started (pid {api_process.pid})"
+        )
         logger.info("[MONITOR] System monitoring thread started")
 
     # Main bot loop with autorestart
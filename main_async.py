@@ -18,5 +18,22 @@ async def startup_event():
         strategy_router=strategy_router,
         position_manager=position_manager
     )
-    loop = asyncio.get_event_loop()
-    loop.create_task(app.state.bot.run_loop())
+    # Bot działa na pętli serwera przez cały czas życia aplikacji;
+    # referencja do zadania, żeby GC go nie zebrał
+    app.state.bot_task = asyncio.create_task(app.state.bot.run_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.bot.stop()
+    app.state.bot_task.cancel()
+    try:
+        await app.state.bot_task
+    except asyncio.CancelledError:
+        pass
+
+
+@app.get("/health")
+async def health():
+    bot = app.state.bot
+    return {"status": "ok", "cycles": bot.cycles, "prices": bot.last_prices}
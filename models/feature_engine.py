@@ -0,0 +1,401 @@
+"""
+feature_engine.py – przyrostowe cechy OHLCV per symbol (O(1) na świecę)
+
+Stan per symbol aktualizowany jest tylko o nowe świece (lub o korektę
+ostatniej, wciąż formującej się świecy), zamiast przeliczać wszystkie
+okna rolling na całej ramce przy każdej predykcji:
+- SMA/std: przesuwne okno Welforda (z okresową resynchronizacją),
+- EMA: rekurencja (odpowiednik ewm(adjust=False)),
+- RSI: średnie kroczące zysków/strat – ta sama definicja co ścieżka
+  pandas w TrendPredictor (rolling mean, nie wygładzanie Wildera),
+- ATR: średnia krocząca (high - low) lub true range,
+- support/resistance: monotoniczne kolejki min/max.
+
+Wektory cech są zgodne ze ścieżką pandas
+(TrendPredictor._extract_features / VolatilityForecaster.extract_features)
+dla tej samej historii świec; jedyną różnicą jest EMA, która pamięta
+historię sprzed okna przekazanego do predykcji.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.CandleBuffer import FIELDS, CandleBuffer
+
+TREND_FEATURES = (
+    "sma_7",
+    "ema_7",
+    "std_7",
+    "rsi_14",
+    "atr_14",
+    "vol_sma_7",
+    "vol_std_7",
+    "momentum_7",
+    "pct_change_1",
+    "support_14",
+    "resistance_14",
+)
+
+# Co ile aktualizacji przeliczać sumy okna od zera (ogranicza dryf float).
+RESYNC_EVERY = 1000
+
+
+class RollingStats:
+    """Sliding-window mean and sample variance (Welford add/remove)."""
+
+    __slots__ = ("window", "values", "mean", "m2", "_updates")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._updates = 0
+
+    def push(self, x: float):
+        values = self.values
+        if len(values) == self.window:
+            old = values[0]
+            values.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(values)
+            self.m2 += delta * (x - self.mean)
+        self._tick()
+
+    def replace_last(self, x: float):
+        values = self.values
+        old = values[-1]
+        values[-1] = x
+        old_mean = self.mean
+        self.mean += (x - old) / len(values)
+        self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self._tick()
+
+    def _tick(self):
+        self._updates += 1
+        if self._updates >= RESYNC_EVERY:
+            self.resync()
+
+    def resync(self):
+        arr = np.fromiter(self.values, dtype=np.float64)
+        self.mean = float(arr.mean()) if arr.size else 0.0
+        self.m2 = float(((arr - self.mean) ** 2).sum()) if arr.size else 0.0
+        self._updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def std(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (n - 1))
+
+
+class RollingExtreme:
+    """Sliding-window min or max via a monotonic deque of (index, value)."""
+
+    __slots__ = ("window", "values", "_mono", "_count", "_better")
+
+    def __init__(self, window: int, mode: str = "min"):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self._mono = deque()
+        self._count = 0
+        if mode == "min":
+            self._better = float.__le__
+        else:
+            self._better = float.__ge__
+
+    def push(self, x: float):
+        x = float(x)
+        self.values.append(x)
+        idx = self._count
+        self._count += 1
+        mono = self._mono
+        while mono and self._better(x, mono[-1][1]):
+            mono.pop()
+        mono.append((idx, x))
+        while mono[0][0] <= idx - self.window:
+            mono.popleft()
+
+    def replace_last(self, x: float):
+        # Usunięte z kolejki elementy nie są odtwarzalne – przebudowa z okna
+        # (stały koszt O(window)).
+        self.values[-1] = float(x)
+        start = self._count - len(self.values)
+        self._mono.clear()
+        self._count = start
+        values = list(self.values)
+        self.values.clear()
+        for v in values:
+            self.push(v)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def value(self) -> float:
+        return self._mono[0][1]
+
+
+class SymbolFeatureState:
+    """Incremental feature state for one symbol's candle series."""
+
+    def __init__(self):
+        self.last_ts = None
+        self.last_candle = None
+        self.n = 0
+        self.prev_close = None  # zamknięcie świecy przed ostatnią
+        self.ema_alpha = 2.0 / (7 + 1)
+        self.ema = None
+        self.prev_ema = None
+        self.closes = deque(maxlen=8)
+        self.close_7 = RollingStats(7)
+        self.volume_7 = RollingStats(7)
+        self.gain_14 = RollingStats(14)
+        self.loss_14 = RollingStats(14)
+        self.range_14 = RollingStats(14)
+        self.tr_7 = RollingStats(7)
+        self.low_14 = RollingExtreme(14, "min")
+        self.high_14 = RollingExtreme(14, "max")
+
+    def _derived(self, high, low, close):
+        prev = self.prev_close
+        if prev is None:
+            return None, None, high - low
+        delta = close - prev
+        tr = max(high - low, abs(high - prev), abs(low - prev))
+        return max(delta, 0.0), max(-delta, 0.0), tr
+
+    def update(self, candle: tuple, replace: bool = False):
+        """
+        Apply one (ts, open, high, low, close, volume) candle; with
+        ``replace`` the last applied candle is revised instead.
+        """
+        ts, _, high, low, close, volume = candle
+        if replace:
+            self.closes[-1] = close
+        else:
+            if self.closes:
+                self.prev_close = self.closes[-1]
+            self.closes.append(close)
+            self.prev_ema = self.ema
+            self.n += 1
+        gain, loss, tr = self._derived(high, low, close)
+        a = self.ema_alpha
+        self.ema = (
+            close if self.prev_ema is None
+            else a * close + (1 - a) * self.prev_ema
+        )
+        op = "replace_last" if replace else "push"
+        getattr(self.close_7, op)(close)
+        getattr(self.volume_7, op)(volume)
+        getattr(self.range_14, op)(high - low)
+        getattr(self.tr_7, op)(tr)
+        getattr(self.low_14, op)(low)
+        getattr(self.high_14, op)(high)
+        if gain is not None:
+            getattr(self.gain_14, op)(gain)
+            getattr(self.loss_14, op)(loss)
+        self.last_ts = ts
+        self.last_candle = candle
+
+    @property
+    def trend_ready(self) -> bool:
+        return self.gain_14.ready and len(self.closes) == 8
+
+    def trend_features(self) -> Optional[np.ndarray]:
+        """Last row of TrendPredictor._extract_features, or None."""
+        if not self.trend_ready:
+            return None
+        close = self.closes[-1]
+        avg_gain = max(self.gain_14.mean, 0.0)
+        avg_loss = max(self.loss_14.mean, 0.0)
+        rs = avg_gain / (avg_loss + 1e-9)
+        prev = self.prev_close
+        return np.array(
+            [
+                self.close_7.mean,
+                self.ema,
+                self.close_7.std,
+                100 - (100 / (1 + rs)),
+                self.range_14.mean,
+                self.volume_7.mean,
+                self.volume_7.std,
+                close - self.closes[0],
+                close / prev - 1 if prev else math.nan,
+                self.low_14.value,
+                self.high_14.value,
+            ],
+            dtype=np.float64,
+        )
+
+    def volatility_features(self) -> List[float]:
+        """Same as VolatilityForecaster.extract_features: [std, atr, boll]."""
+        if not self.close_7.ready:
+            return [0.0, 0.0, 0]
+        std = self.close_7.std
+        sma = self.close_7.mean
+        boll = (std / sma) if sma != 0 else 0
+        return [std, self.tr_7.mean, boll]
+
+
+def _ts_key(ts):
+    if isinstance(ts, str):
+        try:
+            return int(ts)
+        except ValueError:
+            return pd.Timestamp(ts).value
+    if isinstance(ts, pd.Timestamp):
+        return ts.value
+    return ts
+
+
+def _row_reader(ohlcv):
+    """
+    (n, row_at) for a CandleBuffer, a list of candle dicts or an OHLCV
+    DataFrame.
+    """
+    if isinstance(ohlcv, CandleBuffer):
+        # Widoki kolumn bufora – bez budowania DataFrame
+        ts = ohlcv.timestamps
+        cols = tuple(ohlcv.column(f) for f in FIELDS)
+
+        def row_at(i):
+            return (int(ts[i]),) + tuple(float(c[i]) for c in cols)
+
+        return len(ts), row_at
+    if isinstance(ohlcv, pd.DataFrame):
+        close = ohlcv["close"].to_numpy(dtype=np.float64)
+        n = close.shape[0]
+
+        def col(name, default):
+            if name in ohlcv:
+                return ohlcv[name].to_numpy(dtype=np.float64)
+            return default if default is not None else np.zeros(n)
+
+        ts = (
+            ohlcv["timestamp"].to_numpy() if "timestamp" in ohlcv
+            else ohlcv.index.to_numpy()
+        )
+        cols = (
+            col("open", close), col("high", close), col("low", close),
+            close, col("volume", None),
+        )
+
+        def row_at(i):
+            return (_ts_key(ts[i]),) + tuple(float(c[i]) for c in cols)
+
+        return n, row_at
+
+    def row_at(i):
+        c = ohlcv[i]
+        close = float(c["close"])
+        return (
+            _ts_key(c.get("timestamp")),
+            float(c.get("open", close)),
+            float(c.get("high", close)),
+            float(c.get("low", close)),
+            close,
+            float(c.get("volume", 0.0)),
+        )
+
+    return len(ohlcv), row_at
+
+
+def _require_ts(row):
+    # Bez znacznika czasu nie da się odróżnić nowej świecy od już
+    # zastosowanej – każdy sync dokładałby całe okno ponownie
+    if row[0] is None:
+        raise ValueError(
+            "FeatureEngine: candles without a timestamp cannot be synced "
+            "incrementally"
+        )
+    return row
+
+
+def _rows_since(ohlcv, last_ts=None) -> List[tuple]:
+    """
+    Ascending (ts, open, high, low, close, volume) rows with ts >= last_ts
+    (all rows if last_ts is None). Reads only the tail of the input.
+    Raises ValueError for a candle without a timestamp.
+    """
+    n, row_at = _row_reader(ohlcv)
+    if n == 0:
+        return []
+    first, last = _require_ts(row_at(0)), _require_ts(row_at(n - 1))
+    # Bybit zwraca świece od najnowszej
+    newest_first = n > 1 and first[0] > last[0]
+    if last_ts is None:
+        rows = [_require_ts(row_at(i)) for i in range(n)]
+        return rows[::-1] if newest_first else rows
+    order = range(n) if newest_first else range(n - 1, -1, -1)
+    rows = []
+    for i in order:
+        row = _require_ts(row_at(i))
+        if row[0] < last_ts:
+            break
+        rows.append(row)
+    rows.reverse()
+    return rows
+
+
+class FeatureEngine:
+    """
+    Registry of per-symbol incremental feature states.
+    ``sync(symbol, candles)`` applies only candles newer than the last one
+    seen (and revises the last candle if it changed), so repeated calls
+    with an overlapping candle window cost O(new candles). Candles must
+    carry a timestamp (ValueError otherwise).
+    """
+
+    def __init__(self):
+        self._states: Dict[str, SymbolFeatureState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> SymbolFeatureState:
+        state = self._states.get(symbol)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(symbol, SymbolFeatureState())
+        return state
+
+    def reset(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+    def sync(self, symbol: str, ohlcv) -> SymbolFeatureState:
+        state = self.get(symbol)
+        for row in _rows_since(ohlcv, state.last_ts):
+            if row[0] == state.last_ts and state.last_candle is not None:
+                if row != state.last_candle:
+                    state.update(row, replace=True)
+            else:
+                state.update(row)
+        return state
+
+    def update(self, symbol: str, candle) -> SymbolFeatureState:
+        """Apply a single new candle (dict or tuple) to ``symbol``."""
+        if isinstance(candle, dict):
+            candle = _row_reader([candle])[1](0)
+        _require_ts(candle)
+        state = self.get(symbol)
+        state.update(candle, replace=candle[0] == state.last_ts)
+        return state
@@ -0,0 +1,319 @@
+"""
+model_export.py – eksport wytrenowanych modeli do runtime'u NumPy
+
+Strona treningowa (importuje sklearn / xgboost / torch tylko dla
+obsługiwanego typu): ``to_runtime(model)`` spłaszcza model do
+models.np_runtime.TreeEnsemble / NumpyNet, ``export_model(model, path)``
+dodatkowo zapisuje go atomowo do pliku ładowanego przez memmap.
+
+Obsługiwane:
+- RandomForest / ExtraTrees (Classifier, Regressor) z sklearn,
+- GradientBoosting (Classifier z log-loss, Regressor) z sklearn,
+- XGBClassifier / XGBRegressor (objective reg:*, binary:logistic,
+  multi:softprob / multi:softmax),
+- torch ``nn.Module`` złożony z Linear / LSTM / Dropout w kolejności
+  atrybutów, z ReLU po każdej ukrytej warstwie Linear (DeepTrendNet,
+  DeepVolNet).
+
+Stały wyraz (init / base_score) liczony jest z samego modelu: wyjście
+modelu minus suma liści dla wiersza zer – bez sięgania do prywatnych
+pól bibliotek.
+"""
+
+import json
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+from models.np_runtime import NumpyNet, RuntimeModel, TreeEnsemble
+from models.np_runtime import save_runtime
+
+logger = logging.getLogger(__name__)
+
+
+def _tree_depth(left, right, root=0) -> int:
+    depth, level = 0, [root]
+    while level:
+        level = [
+            child for node in level for child in (left[node], right[node])
+            if child >= 0
+        ]
+        depth += 1
+    return depth
+
+
+def _pack_trees(trees, meta) -> TreeEnsemble:
+    """
+    trees: dicts with per-tree feature/threshold/left/right/default_left
+    arrays (local node indices, left < 0 = leaf) and either ``leaf``
+    values + output ``group`` or a ``value`` row per node (forest
+    classifiers: class probabilities).
+    """
+    roots, groups, offset, depth = [], [], 0, 0
+    parts: Dict[str, List[np.ndarray]] = {
+        "feature": [], "threshold": [], "children": [], "default_left": [],
+        "value": [], "leaf": [],
+    }
+    for tree in trees:
+        left = np.asarray(tree["left"], dtype=np.int64)
+        right = np.asarray(tree["right"], dtype=np.int64)
+        leaf = left < 0
+        depth = max(depth, _tree_depth(left, right))
+        roots.append(offset)
+        # Liść wskazuje sam na siebie (próg +inf), więc pętla schodzi
+        # zawsze max_depth poziomów bez sprawdzania, kto już skończył
+        ids = np.arange(len(left)) + offset
+        children = np.empty(2 * len(left), dtype=np.int64)
+        children[0::2] = np.where(leaf, ids, left + offset)
+        children[1::2] = np.where(leaf, ids, right + offset)
+        parts["feature"].append(np.where(leaf, 0, tree["feature"]))
+        parts["threshold"].append(np.where(leaf, np.inf, tree["threshold"]))
+        parts["children"].append(children)
+        parts["default_left"].append(tree["default_left"])
+        if "value" in tree:
+            parts["value"].append(tree["value"])
+        else:
+            parts["leaf"].append(np.where(leaf, tree["leaf"], 0.0))
+            groups.append(tree.get("group", 0))
+        offset += len(left)
+    # Indeksy jako intp: fancy indexing bez konwersji przy każdym poziomie
+    arrays = {
+        "feature": np.concatenate(parts["feature"]).astype(np.intp),
+        "threshold": np.concatenate(parts["threshold"]).astype(np.float64),
+        "children": np.concatenate(parts["children"]).astype(np.intp),
+        "default_left": np.concatenate(parts["default_left"]).astype(bool),
+        "roots": np.asarray(roots, dtype=np.intp),
+    }
+    if parts["value"]:
+        arrays["value"] = np.concatenate(parts["value"]).astype(np.float64)
+    else:
+        arrays["leaf"] = np.concatenate(parts["leaf"]).astype(np.float64)
+        arrays["group"] = np.asarray(groups, dtype=np.int32)
+    meta = dict(meta, max_depth=depth)
+    meta.setdefault("base", [0.0] * meta["n_out"])
+    return TreeEnsemble(meta, arrays)
+
+
+def _sklearn_tree(estimator, group=0, proba=False):
+    tree = estimator.tree_
+    value = tree.value[:, 0, :].astype(np.float64)
+    if proba:
+        total = value.sum(axis=1, keepdims=True)
+        value = np.divide(value, total, out=np.zeros_like(value),
+                          where=total > 0)
+        out = {"value": value}
+    else:
+        # Jedna wartość na liść; group = wyjście (klasa w GB multiclass)
+        out = {"leaf": value[:, 0], "group": group}
+    missing = getattr(tree, "missing_go_to_left", None)
+    return dict(out, **{
+        "feature": tree.feature,
+        "threshold": tree.threshold,
+        "left": tree.children_left,
+        "right": tree.children_right,
+        "default_left": (
+            np.asarray(missing, dtype=bool) if missing is not None
+            else np.zeros(tree.node_count, dtype=bool)
+        ),
+    })
+
+
+def _calibrate(ensemble: TreeEnsemble, raw_at_zero) -> TreeEnsemble:
+    # ensemble ma jeszcze base = 0, więc raw_predict to same liście
+    zero = np.zeros((1, ensemble.n_features_in_))
+    base = np.reshape(raw_at_zero, -1) - ensemble.raw_predict(zero)[0]
+    meta = dict(ensemble.meta, base=[float(b) for b in base])
+    return TreeEnsemble(meta, ensemble.arrays)
+
+
+def _classes(model):
+    return [c.item() if hasattr(c, "item") else c for c in model.classes_]
+
+
+def _from_forest(model) -> TreeEnsemble:
+    if model.n_outputs_ != 1:
+        raise ValueError("multi-output forests are not supported")
+    classifier = hasattr(model, "classes_")
+    trees = [
+        _sklearn_tree(est, proba=classifier) for est in model.estimators_
+    ]
+    return _pack_trees(trees, {
+        "n_out": len(model.classes_) if classifier else 1,
+        "source": type(model).__name__,
+        "n_features": int(model.n_features_in_),
+        "compare": "le", "x_dtype": "float32",
+        "combine": "mean", "scale": 1.0,
+        "link": "proba" if classifier else "identity",
+        "classes": _classes(model) if classifier else None,
+    })
+
+
+def _from_gradient_boosting(model) -> TreeEnsemble:
+    classifier = hasattr(model, "classes_")
+    if classifier and getattr(model, "loss", "log_loss") == "exponential":
+        raise ValueError("GradientBoosting with exponential loss")
+    n_out = model.estimators_.shape[1]
+    trees = [
+        _sklearn_tree(est, group=k)
+        for stage in model.estimators_
+        for k, est in enumerate(stage)
+    ]
+    if classifier:
+        link = "softmax" if n_out > 1 else "logistic"
+    else:
+        link = "identity"
+    ensemble = _pack_trees(trees, {
+        "source": type(model).__name__,
+        "n_out": n_out,
+        "n_features": int(model.n_features_in_),
+        "compare": "le", "x_dtype": "float32",
+        "combine": "sum", "scale": float(model.learning_rate),
+        "link": link,
+        "classes": _classes(model) if classifier else None,
+        "base": [0.0] * n_out,
+    })
+    zero = np.zeros((1, ensemble.n_features_in_))
+    raw = model.decision_function(zero) if classifier else model.predict(zero)
+    return _calibrate(ensemble, raw)
+
+
+XGB_LINKS = {
+    "reg:squarederror": "identity",
+    "reg:absoluteerror": "identity",
+    "reg:pseudohubererror": "identity",
+    "reg:logistic": "logistic",
+    "binary:logistic": "logistic",
+    "multi:softprob": "softmax",
+    "multi:softmax": "softmax",
+}
+
+
+def _from_xgboost(model) -> TreeEnsemble:
+    from xgboost import DMatrix
+
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw("json"))["learner"]
+    objective = dump["objective"]["name"]
+    if objective not in XGB_LINKS:
+        raise ValueError(f"unsupported XGBoost objective: {objective}")
+    gbm = dump["gradient_booster"]
+    if gbm.get("name") != "gbtree":
+        raise ValueError(f"unsupported XGBoost booster: {gbm.get('name')}")
+    n_out = max(int(dump["learner_model_param"].get("num_class", 0)), 1)
+    n_features = int(dump["learner_model_param"]["num_feature"])
+    trees = []
+    for tree, group in zip(gbm["model"]["trees"], gbm["model"]["tree_info"]):
+        if tree["categories"]:
+            raise ValueError("categorical XGBoost splits are not supported")
+        left = np.asarray(tree["left_children"])
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        trees.append({
+            "feature": tree["split_indices"],
+            # Progi float32, jak porównuje XGBoost (x < próg)
+            "threshold": cond.astype(np.float64),
+            "left": left,
+            "right": tree["right_children"],
+            "default_left": np.asarray(tree["default_left"], dtype=bool),
+            # Wartość liścia trzymana w split_conditions
+            "leaf": cond.astype(np.float64),
+            "group": group,
+        })
+    classifier = objective.startswith(("binary:", "multi:"))
+    ensemble = _pack_trees(trees, {
+        "source": type(model).__name__,
+        "n_out": n_out,
+        "n_features": n_features,
+        "compare": "lt", "x_dtype": "float32",
+        "combine": "sum", "scale": 1.0,
+        "link": XGB_LINKS[objective],
+        "classes": _classes(model) if classifier else None,
+        "base": [0.0] * n_out,
+    })
+    zero = np.zeros((1, n_features), dtype=np.float32)
+    raw = booster.predict(DMatrix(zero), output_margin=True)
+    return _calibrate(ensemble, raw)
+
+
+def _from_torch(net) -> NumpyNet:
+    import torch.nn as nn
+
+    layers, arrays = [], {}
+    children = [
+        (name, child) for name, child in net.named_children()
+        if not isinstance(child, nn.Dropout)  # eval: tożsamość
+    ]
+    linears = [name for name, c in children if isinstance(c, nn.Linear)]
+    for name, child in children:
+        params = {
+            k: v.detach().cpu().numpy().astype(np.float32)
+            for k, v in child.state_dict().items()
+        }
+        if isinstance(child, nn.Linear):
+            arrays[f"{name}.weight"] = params["weight"]
+            arrays[f"{name}.bias"] = params["bias"]
+            layers.append({"op": "linear", "weight": f"{name}.weight",
+                           "bias": f"{name}.bias"})
+            if name != linears[-1]:
+                layers.append({"op": "relu"})
+        elif isinstance(child, nn.LSTM):
+            if (
+                child.num_layers != 1 or child.bidirectional
+                or child.proj_size
+            ):
+                raise ValueError("only single-layer LSTM is supported")
+            arrays[f"{name}.weight"] = params["weight_ih_l0"]
+            arrays[f"{name}.bias"] = params["bias_ih_l0"] + params[
+                "bias_hh_l0"
+            ]
+            layers.append({"op": "lstm1", "weight": f"{name}.weight",
+                           "bias": f"{name}.bias"})
+        else:
+            raise ValueError(f"unsupported layer {name}: {type(child)}")
+    first = arrays[layers[0]["weight"]] if layers else np.empty((0, 0))
+    meta = {
+        "source": type(net).__name__,
+        "input_dim": int(first.shape[1]),
+        "layers": layers,
+    }
+    return NumpyNet(meta, arrays)
+
+
+def to_runtime(model) -> RuntimeModel:
+    """Flatten a trained model into a NumPy runtime model."""
+    if isinstance(model, RuntimeModel):
+        return model
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        return _from_xgboost(model)
+    if hasattr(model, "named_children"):  # torch nn.Module
+        return _from_torch(model)
+    if module.startswith("sklearn"):
+        from sklearn.ensemble import (
+            GradientBoostingClassifier, GradientBoostingRegressor
+        )
+
+        if isinstance(
+            model, (GradientBoostingClassifier, GradientBoostingRegressor)
+        ):
+            return _from_gradient_boosting(model)
+        if hasattr(model, "estimators_") and hasattr(
+            model.estimators_[0], "tree_"
+        ):
+            return _from_forest(model)
+    raise ValueError(f"cannot export {type(model).__name__}")
+
+
+def export_model(model, path: str) -> str:
+    """Flatten ``model`` and write it to ``path``; returns ``path``."""
+    return save_runtime(to_runtime(model), path)
+
+
+def export_quietly(model, path: str) -> bool:
+    """export_model for training code paths: failures are only logged."""
+    try:
+        export_model(model, path)
+        return True
+    except Exception as e:
+        logger.warning(f"model_export: {path} not exported: {e}")
+        return False
@@ -0,0 +1,252 @@
+"""
+model_lifecycle.py – trening modelu zmienności w tle (cold start)
+
+Gdy VolatilityForecaster nie ma modelu na dysku, pierwszy tick nie trenuje
+już lasu/XGBoost inline. VolatilityModelLifecycle:
+- buduje macierz treningową jednym wektorowym przejściem
+  (volatility_training_set, zamiast extract_features na każdym oknie),
+- trenuje model w ProcessPoolExecutor,
+- zapisuje go atomowo (plik tymczasowy + os.replace), razem z eksportem
+  np_runtime, i podmienia w forecasterze (przy runtime="numpy" wraca sam
+  eksport, więc proces bota nie importuje sklearn / xgboost),
+- do tego czasu zwraca tani estymator analityczny (rolling std / ATR).
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.CandleBuffer import as_frame
+
+logger = logging.getLogger(__name__)
+
+VOL_WINDOW = 7
+
+
+def volatility_training_set(
+    ohlcv, window: int = VOL_WINDOW
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features [std, atr, bollinger] and target (rolling std of close) for
+    every (window + 1)-candle window, as the old per-window bootstrap loop
+    produced them, computed in one vectorized pass.
+    """
+    ohlcv = as_frame(ohlcv)
+    n = len(ohlcv)
+    if n < window + 1:
+        return np.empty((0, 3)), np.empty(0)
+    close = ohlcv["close"].to_numpy(dtype=np.float64)
+    high = (
+        ohlcv["high"].to_numpy(dtype=np.float64) if "high" in ohlcv
+        else close
+    )
+    low = (
+        ohlcv["low"].to_numpy(dtype=np.float64) if "low" in ohlcv
+        else close
+    )
+    prev = close[:-1]
+    tr = np.empty(n)
+    tr[0] = high[0] - low[0]
+    tr[1:] = np.maximum.reduce(
+        [high[1:] - low[1:], np.abs(high[1:] - prev), np.abs(low[1:] - prev)]
+    )
+    view = np.lib.stride_tricks.sliding_window_view
+    closes = view(close, window)
+    # Okno k kończy się na świecy k + window - 1; pomijamy pierwsze, bo
+    # stara pętla zaczynała od świecy o indeksie ``window``.
+    std = closes.std(axis=1, ddof=1)[1:]
+    sma = closes.mean(axis=1)[1:]
+    atr = view(tr, window).mean(axis=1)[1:]
+    boll = np.divide(std, sma, out=np.zeros_like(std), where=sma != 0)
+    return np.column_stack([std, atr, boll]), std.copy()
+
+
+def analytic_volatility(feats) -> float:
+    """Cheap estimate served until a model exists: rolling std, else ATR."""
+    for value in feats[:2]:
+        value = float(value)
+        if not math.isnan(value) and value > 0:
+            return value
+    return 0.0
+
+
+def fit_volatility_model(
+    X, y, use_xgb: bool, model_path: Optional[str], runtime: str = "native"
+):
+    """
+    Train a 100-tree regressor (runs in a worker process) and persist it
+    atomically, with its np_runtime export. Returns (model, train_time_s);
+    with runtime="numpy" the model is the exported TreeEnsemble.
+    """
+    import joblib
+
+    from models.model_export import export_quietly, to_runtime
+    from models.np_runtime import runtime_path
+
+    start = time.perf_counter()
+    if use_xgb:
+        from xgboost import XGBRegressor
+
+        model = XGBRegressor(n_estimators=100)
+    else:
+        from sklearn.ensemble import RandomForestRegressor
+
+        model = RandomForestRegressor(n_estimators=100)
+    model.fit(X, y)
+    train_time = time.perf_counter() - start
+    if model_path:
+        tmp_path = f"{model_path}.{os.getpid()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, model_path)
+        export_quietly(model, runtime_path(model_path))
+    if runtime == "numpy":
+        model = to_runtime(model)
+    return model, train_time
+
+
+class VolatilityModelLifecycle:
+    """
+    Background training and atomic model swap for a VolatilityForecaster.
+    """
+
+    def __init__(
+        self,
+        forecaster,
+        executor=None,
+        background: bool = True,
+        retry_after: float = 60.0,
+    ):
+        self.forecaster = forecaster
+        self.background = background
+        self.retry_after = retry_after
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._future = None
+        self._lock = threading.Lock()
+        self._first_request: Optional[float] = None
+        self._next_attempt = 0.0
+        self._metrics: Dict[str, Any] = {
+            "model_ready": False,
+            "trainings": 0,
+            "training_failures": 0,
+            "fallback_calls": 0,
+            "training_samples": 0,
+            "cold_start_latency_s": None,
+            "train_time_s": None,
+        }
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: bez dziedziczenia wątków/stanu torch z procesu bota
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @property
+    def training(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def request_training(self, ohlcv) -> bool:
+        """Start training on ``ohlcv`` unless already running or ready."""
+        with self._lock:
+            now = time.monotonic()
+            if self._first_request is None:
+                self._first_request = now
+            if (
+                self.forecaster.is_trained
+                or self.training
+                or now < self._next_attempt
+            ):
+                return False
+            X, y = volatility_training_set(ohlcv)
+            if len(X) == 0:
+                return False
+            self._metrics["training_samples"] = len(X)
+            args = (
+                X, y, self.forecaster.use_xgb, self.forecaster.model_path,
+                getattr(self.forecaster, "runtime", "native"),
+            )
+            if self.background:
+                self._future = self._get_executor().submit(
+                    fit_volatility_model, *args
+                )
+        if self.background:
+            self._future.add_done_callback(self._on_done)
+        else:
+            self._install(*fit_volatility_model(*args))
+        return True
+
+    def _on_done(self, future):
+        try:
+            model, train_time = future.result()
+        except Exception as e:
+            with self._lock:
+                self._metrics["training_failures"] += 1
+                self._next_attempt = time.monotonic() + self.retry_after
+            logger.error(f"VolatilityModelLifecycle: training failed: {e}")
+            return
+        self._install(model, train_time)
+
+    def _install(self, model, train_time):
+        # Najpierw model, potem flaga – czytelnik nigdy nie zobaczy
+        # is_trained bez modelu.
+        self.forecaster.model = model
+        self.forecaster.is_trained = True
+        with self._lock:
+            latency = (
+                time.monotonic() - self._first_request
+                if self._first_request is not None else 0.0
+            )
+            self._metrics.update(
+                model_ready=True,
+                train_time_s=train_time,
+                cold_start_latency_s=latency,
+            )
+            self._metrics["trainings"] += 1
+        logger.info(
+            "VolatilityModelLifecycle: model ready "
+            f"(train {train_time:.2f}s, cold start {latency:.2f}s)"
+        )
+
+    def fallback(self, feats) -> float:
+        with self._lock:
+            self._metrics["fallback_calls"] += 1
+        return analytic_volatility(feats)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the pending training finishes; True if model ready."""
+        future = self._future
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+            # callback mógł jeszcze nie zdążyć się wykonać
+            deadline = time.monotonic() + 1.0
+            while (
+                not self.forecaster.is_trained
+                and future.exception() is None
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+        return bool(self.forecaster.is_trained)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._metrics)
+        stats["training"] = self.training
+        return stats
+
+    def close(self):
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
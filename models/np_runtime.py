@@ -0,0 +1,250 @@
+"""
+np_runtime.py – lekki runtime inferencji modeli (tylko NumPy)
+
+Modele wytrenowane w sklearn / XGBoost / torch są eksportowane
+(models.model_export) do płaskich tablic NumPy w jednym pliku, który
+ładuje się przez ``np.memmap`` – bez importu sklearn, xgboost ani torch.
+Proces, który tylko przewiduje (worker bota, API), nie płaci sekund
+importu i setek MB RSS za bibliotekę treningową.
+
+Format pliku (``<model_path>.npmodel``):
+- 8 bajtów ``MAGIC``, długość nagłówka (uint64, little-endian),
+- nagłówek JSON: rodzaj modelu, metadane i dla każdej tablicy
+  (dtype, shape, offset),
+- dane tablic wyrównane do 64 bajtów (widoki na memmap, bez kopii).
+
+Evaluatory:
+- ``TreeEnsemble`` – las / gradient boosting (sklearn, XGBoost); wszystkie
+  drzewa są schodzone jednocześnie, wektorowo dla całej paczki wierszy.
+  ``predict`` / ``predict_proba`` zachowują się jak w modelu źródłowym.
+- ``NumpyNet`` – małe sieci (Linear/ReLU, LSTM o długości sekwencji 1)
+  jak DeepTrendNet i DeepVolNet; ``forward`` zwraca wyjście sieci.
+
+Wybór runtime'u per model: argument ``runtime`` konstruktora predyktora,
+domyślnie ``MODEL_RUNTIME`` ("native" albo "numpy").
+"""
+
+import json
+import logging
+import os
+import struct
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ZNPRT\x00\x01\x00"
+ALIGN = 64
+SUFFIX = ".npmodel"
+RUNTIMES = ("native", "numpy")
+
+
+def runtime_choice(runtime: Optional[str] = None) -> str:
+    """``runtime`` or the MODEL_RUNTIME default, validated."""
+    runtime = (runtime or os.getenv("MODEL_RUNTIME") or "native").lower()
+    if runtime not in RUNTIMES:
+        raise ValueError(f"unknown model runtime: {runtime}")
+    return runtime
+
+
+def runtime_path(model_path: str) -> str:
+    return model_path + SUFFIX
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class RuntimeModel:
+    """Flat arrays + JSON metadata; subclasses implement prediction."""
+
+    kind = ""
+
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+
+    def __reduce__(self):
+        # Kopia tablic – obiekt przechodzi między procesami bez memmapy
+        arrays = {k: np.array(v) for k, v in self.arrays.items()}
+        return type(self), (self.meta, arrays)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+
+class TreeEnsemble(RuntimeModel):
+    """
+    Tree ensemble flattened into node arrays (global node indices):
+    ``feature``, ``threshold``, ``children`` (left/right interleaved;
+    leaves point at themselves), ``default_left`` (NaN) and ``roots``.
+    Leaves hold ``leaf`` values with the output ``group`` of each tree,
+    or (forest classifiers) a ``value`` row of class probabilities.
+
+    raw = base + scale * (mean|sum of leaf values over trees); ``link``
+    maps raw to the output: identity (regression), proba (raw already
+    averaged probabilities), logistic (binary) or softmax.
+    """
+
+    kind = "trees"
+
+    def __init__(self, meta, arrays):
+        super().__init__(meta, arrays)
+        self.classes_ = (
+            np.asarray(meta["classes"]) if meta.get("classes") is not None
+            else None
+        )
+        self.n_features_in_ = meta["n_features"]
+        self._base = np.asarray(meta["base"], dtype=np.float64)
+        self._x_dtype = np.dtype(meta.get("x_dtype", "float32"))
+        if "group" in arrays:
+            # one-hot (drzewo, wyjście): suma liści per wyjście to matmul
+            self._groups = np.zeros((len(arrays["group"]), meta["n_out"]))
+            self._groups[np.arange(len(arrays["group"])), arrays["group"]] = 1
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf index of every (row, tree) pair."""
+        a = self.arrays
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        # Porównania jak w bibliotece źródłowej: cechy zaokrąglone do float32
+        X = X.astype(self._x_dtype).astype(np.float64)
+        n, n_features = X.shape
+        n_trees = len(a["roots"])
+        flat = X.ravel()
+        has_nan = np.isnan(flat).any()
+        offsets = np.repeat(np.arange(n) * n_features, n_trees)
+        node = np.tile(a["roots"], n)
+        strict = self.meta["compare"] == "lt"
+        for _ in range(self.meta["max_depth"]):
+            x = flat[offsets + a["feature"][node]]
+            thr = a["threshold"][node]
+            right = x >= thr if strict else x > thr
+            if has_nan:
+                right = np.where(np.isnan(x), ~a["default_left"][node], right)
+            node = a["children"][2 * node + right]
+        return node.reshape(n, n_trees)
+
+    def raw_predict(self, X) -> np.ndarray:
+        node = self.apply(X)  # (n, trees)
+        if "value" in self.arrays:
+            raw = np.take(self.arrays["value"], node, axis=0).sum(axis=1)
+        else:
+            raw = self.arrays["leaf"][node] @ self._groups
+        if self.meta["combine"] == "mean":
+            raw /= node.shape[1]
+        return self._base + self.meta["scale"] * raw
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.classes_ is None:
+            raise AttributeError("regression ensemble has no predict_proba")
+        raw = self.raw_predict(X)
+        link = self.meta["link"]
+        if link == "logistic":
+            p = _sigmoid(raw[:, 0])
+            return np.column_stack([1.0 - p, p])
+        if link == "softmax":
+            return _softmax(raw)
+        return raw
+
+    def predict(self, X) -> np.ndarray:
+        if self.classes_ is None:
+            return self.raw_predict(X)[:, 0]
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class NumpyNet(RuntimeModel):
+    """
+    Feed-forward evaluation of exported torch layers: ``linear``, ``relu``
+    and ``lstm1`` – one LSTM step from a zero state, i.e. the
+    ``(batch, seq=1, features)`` input the predictors feed their LSTM.
+    """
+
+    kind = "net"
+
+    def forward(self, X) -> np.ndarray:
+        a = self.arrays
+        h = np.asarray(X, dtype=np.float32)
+        if h.ndim == 1:
+            h = h.reshape(1, -1)
+        for layer in self.meta["layers"]:
+            op = layer["op"]
+            if op == "linear":
+                h = h @ a[layer["weight"]].T + a[layer["bias"]]
+            elif op == "relu":
+                h = np.maximum(h, 0)
+            elif op == "lstm1":
+                gates = h @ a[layer["weight"]].T + a[layer["bias"]]
+                i, _, g, o = np.split(gates, 4, axis=1)  # kolejność torch
+                h = _sigmoid(o) * np.tanh(_sigmoid(i) * np.tanh(g))
+            else:
+                raise ValueError(f"NumpyNet: unknown layer op {op}")
+        return h
+
+    __call__ = forward
+
+
+KINDS = {cls.kind: cls for cls in (TreeEnsemble, NumpyNet)}
+
+
+def save_runtime(model: RuntimeModel, path: str) -> str:
+    """Write ``model`` atomically (temporary file + os.replace)."""
+    entries, offset = {}, 0
+    for name, array in model.arrays.items():
+        array = np.ascontiguousarray(array)
+        entries[name] = [array.dtype.str, list(array.shape), offset]
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header = json.dumps(
+        {"kind": model.kind, "meta": model.meta, "arrays": entries}
+    ).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, array in model.arrays.items():
+            f.seek(start + entries[name][2])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_runtime(path: str) -> RuntimeModel:
+    """Memory-map an exported model; arrays are read-only views."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + 8)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not an exported model")
+        (size,) = struct.unpack("<Q", head[len(MAGIC):])
+        header = json.loads(f.read(size))
+    start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        begin = start + offset
+        arrays[name] = (
+            mm[begin:begin + count * dtype.itemsize].view(dtype).reshape(shape)
+        )
+    return KINDS[header["kind"]](header["meta"], arrays)
+
+
+def try_load_runtime(model_path: str) -> Optional[RuntimeModel]:
+    """Exported counterpart of ``model_path`` or None (logged)."""
+    path = runtime_path(model_path)
+    try:
+        return load_runtime(path)
+    except FileNotFoundError:
+        logger.warning(f"np_runtime: {path} not found, using native model")
+    except Exception as e:
+        logger.error(f"np_runtime: cannot load {path}: {e}")
+    return None
@@ -4,41 +4,65 @@ trend_predictor.py – Production-grade Trend Classification (LEVEL-ML DONE)
 - Robust ML models: RandomForest/XGBoost (classic), LSTM (deep)
 - Model persistence, retraining, explainability, logging, error handling
 - Designed for real OHLCV input, ready for production
+- runtime="numpy": predykcja z eksportu models.np_runtime, bez importu
+  torch / sklearn / xgboost (ładowane leniwie tylko do treningu)
 """
 
+import importlib.util
 import logging
+import warnings
 from typing import Optional
 
-import joblib
 import numpy as np
 import pandas as pd
 
-# PyTorch imports for deep learning
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV
-
-try:
-    from xgboost import XGBClassifier
+from core.CandleBuffer import as_frame
+from models.np_runtime import (
+    NumpyNet, runtime_choice, runtime_path, try_load_runtime
+)
 
-    xgb_available = True
-except ImportError:
-    xgb_available = False
-import warnings
+xgb_available = importlib.util.find_spec("xgboost") is not None
 
 warnings.filterwarnings("ignore")
 
 
+def deep_trend_net(input_dim=10):
+    """DeepTrendNet: LSTM(input_dim, 32) -> fc1(32, 16) -> fc2(16, 3)."""
+    import torch
+    import torch.nn as nn
+
+    class DeepTrendNet(nn.Module):
+        def __init__(self, input_dim):
+            super().__init__()
+            self.lstm = nn.LSTM(input_dim, 32, batch_first=True)
+            self.fc1 = nn.Linear(32, 16)
+            self.fc2 = nn.Linear(16, 3)
+
+        def forward(self, x):
+            # x: (batch, seq, features)
+            _, (h_n, _) = self.lstm(x)
+            x = torch.relu(self.fc1(h_n[-1]))
+            x = self.fc2(x)
+            return x
+
+    return DeepTrendNet(input_dim)
+
+
 class TrendPredictor:
     def __init__(
         self,
         model_path="trend_model.pkl",
         use_deep=False,
         use_xgb=False,
+        feature_engine=None,
+        runtime=None,
     ):
         self.name = "TrendPredictor"
+        # "native" (joblib/torch) albo "numpy" (eksport np_runtime);
+        # domyślnie MODEL_RUNTIME
+        self.runtime = runtime_choice(runtime)
+        # Opcjonalny FeatureEngine: przyrostowe cechy per symbol w pętli live
+        self.feature_engine = feature_engine
         self.model_path = model_path
         self.use_deep = use_deep
         self.use_xgb = use_xgb and xgb_available
@@ -50,29 +74,30 @@ class TrendPredictor:
         self.feature_names = []
         self._load_model()
         if self.use_deep:
+            if self.runtime == "numpy":
+                self.deep_model = try_load_runtime(self._deep_path())
+            if self.deep_model is not None:
+                self.is_trained = True
+            else:
+                self._init_deep()
 
-            class DeepTrendNet(nn.Module):
-                def __init__(self, input_dim):
-                    super().__init__()
-                    self.lstm = nn.LSTM(input_dim, 32, batch_first=True)
-                    self.fc1 = nn.Linear(32, 16)
-                    self.fc2 = nn.Linear(16, 3)
+    def _deep_path(self):
+        return self.model_path + ".deep"
 
-                def forward(self, x):
-                    # x: (batch, seq, features)
-                    _, (h_n, _) = self.lstm(x)
-                    x = torch.relu(self.fc1(h_n[-1]))
-                    x = self.fc2(x)
-                    return x
+    def _init_deep(self, input_dim=10):
+        import torch.nn as nn
+        import torch.optim as optim
 
-            self.deep_model = DeepTrendNet(input_dim=10)
-            self.deep_optimizer = optim.Adam(self.deep_model.parameters(), lr=0.001)
-            self.deep_loss_fn = nn.CrossEntropyLoss()
+        self.deep_model = deep_trend_net(input_dim=input_dim)
+        self.deep_optimizer = optim.Adam(
+            self.deep_model.parameters(), lr=0.001
+        )
+        self.deep_loss_fn = nn.CrossEntropyLoss()
 
     def _extract_features(self, ohlcv: pd.DataFrame) -> pd.DataFrame:
         # Advanced feature engineering: multi-timeframe, volatility, volume,
         # momentum, etc.
-        df = ohlcv.copy()
+        df = as_frame(ohlcv).copy()
         features = pd.DataFrame(index=df.index)
         # Price-based features
         features["sma_7"] = df["close"].rolling(window=7).mean()
@@ -105,7 +130,12 @@ class TrendPredictor:
 
     def hyperparameter_tune(self, X, y):
         # Grid search for best RandomForest or XGBoost params
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import GridSearchCV
+
         if self.use_xgb and xgb_available:
+            from xgboost import XGBClassifier
+
             param_grid = {
                 "n_estimators": [50, 100, 200],
                 "max_depth": [3, 5, 7],
@@ -129,6 +159,13 @@ class TrendPredictor:
 
     def train_deep(self, X, y, epochs=10):
         # LSTM expects 3D input: (batch, seq, features)
+        import torch
+
+        from models.model_export import export_quietly
+
+        if isinstance(self.deep_model, NumpyNet):
+            # Eksport służy tylko do predykcji – trening od nowej sieci
+            self._init_deep(input_dim=self.deep_model.meta["input_dim"])
         X = np.array(X, dtype=np.float32)
         y = np.array(y, dtype=np.int64)
         X_tensor = torch.from_numpy(X).unsqueeze(1)  # (batch, seq=1, features)
@@ -141,12 +178,29 @@ class TrendPredictor:
             loss.backward()
             self.deep_optimizer.step()
         self.is_trained = True
+        export_quietly(self.deep_model, runtime_path(self._deep_path()))
+
+    def _new_model(self):
+        if self.use_xgb and xgb_available:
+            from xgboost import XGBClassifier
+
+            return XGBClassifier(
+                n_estimators=100,
+                eval_metric="mlogloss",
+                use_label_encoder=False,
+            )
+        from sklearn.ensemble import RandomForestClassifier
+
+        return RandomForestClassifier(n_estimators=100, random_state=42)
 
     def retrain(self, X_new, y_new):
         # Retrain model on new data
         if self.use_deep and self.deep_model:
             self.train_deep(X_new, y_new, epochs=3)
         elif self.model:
+            if not hasattr(self.model, "fit"):
+                # eksport np_runtime – trenujemy nowy model natywny
+                self.model = self._new_model()
             self.model.fit(X_new, y_new)
             self.is_trained = True
             self._save_model()
@@ -168,16 +222,7 @@ class TrendPredictor:
             if self.use_deep and self.deep_model:
                 self.train_deep(features.values, labels, epochs=10)
             else:
-                if self.use_xgb and xgb_available:
-                    self.model = XGBClassifier(
-                        n_estimators=100,
-                        eval_metric="mlogloss",
-                        use_label_encoder=False,
-                    )
-                else:
-                    self.model = RandomForestClassifier(
-                        n_estimators=100, random_state=42
-                    )
+                self.model = self._new_model()
                 self.model.fit(features.values, labels)
                 self.is_trained = True
                 self._save_model()
@@ -205,7 +250,11 @@ class TrendPredictor:
         if len(features) == 0:
             return "→"
         last_feat = features.iloc[[-1]].values
-        if self.use_deep and self.deep_model:
+        if isinstance(self.deep_model, NumpyNet) and self.use_deep:
+            pred = int(self.deep_model.forward(last_feat).argmax(axis=1)[0])
+        elif self.use_deep and self.deep_model:
+            import torch
+
             last_feat_tensor = torch.from_numpy(last_feat.astype(np.float32)).unsqueeze(
                 1
             )
@@ -222,34 +271,57 @@ class TrendPredictor:
         else:
             return "→"
 
-    def predict_trend(self, ohlcv: pd.DataFrame) -> str:
+    def predict_trend(self, ohlcv: pd.DataFrame, symbol=None) -> str:
         # Predict trend: "UP", "DOWN", "SIDE" (production-grade, explainable)
-        if (
-            not self.is_trained
-            or (self.model is None and self.deep_model is None)
-            or len(ohlcv) < 20
+        # With a feature_engine and symbol only the new candles are applied
+        # to the symbol's incremental feature state.
+        return self.predict_trend_batch([self.batch_row(ohlcv, symbol)])[0]
+
+    def batch_row(self, ohlcv: pd.DataFrame, symbol=None):
+        """Feature row of predict_trend for predict_trend_batch, or None
+        when there is no model or too little data ("SIDE")."""
+        if not self.is_trained or (
+            self.model is None and self.deep_model is None
         ):
-            return "SIDE"
+            return None
+        if symbol is not None and self.feature_engine is not None:
+            state = self.feature_engine.sync(symbol, ohlcv)
+            return state.trend_features() if state.n >= 20 else None
+        if len(ohlcv) < 20:
+            return None
         features = self._extract_features(ohlcv)
         if len(features) == 0:
-            return "SIDE"
-        last_feat = features.iloc[[-1]].values
-        if self.use_deep and self.deep_model:
-            last_feat_tensor = torch.from_numpy(last_feat.astype(np.float32)).unsqueeze(
-                1
-            )
+            return None
+        return features.iloc[-1].values
+
+    def predict_trend_batch(self, rows) -> list:
+        """
+        predict_trend for many feature rows (one per symbol) with a single
+        model call – used by InferenceServer; None rows give "SIDE".
+        """
+        labels = ["SIDE"] * len(rows)
+        idx = [i for i, row in enumerate(rows) if row is not None]
+        if not idx:
+            return labels
+        X = np.vstack([rows[i] for i in idx])
+        if isinstance(self.deep_model, NumpyNet) and self.use_deep:
+            preds = self.deep_model.forward(X).argmax(axis=1).tolist()
+        elif self.use_deep and self.deep_model:
+            import torch
+
+            X_tensor = torch.from_numpy(X.astype(np.float32)).unsqueeze(1)
             self.deep_model.eval()
             with torch.no_grad():
-                output = self.deep_model(last_feat_tensor)
-                pred = torch.argmax(output, dim=1).item()
-        else:
-            pred = self.model.predict(last_feat)[0]
-        if pred == 1:
-            return "UP"
-        elif pred == -1:
-            return "DOWN"
+                preds = torch.argmax(self.deep_model(X_tensor), dim=1)
+            preds = preds.tolist()
         else:
-            return "SIDE"
+            preds = self.model.predict(X)
+        for i, pred in zip(idx, preds):
+            if pred == 1:
+                labels[i] = "UP"
+            elif pred == -1:
+                labels[i] = "DOWN"
+        return labels
 
     def explain(self, ohlcv: pd.DataFrame) -> dict:
         # Explain prediction (feature importances, last values)
@@ -288,12 +360,24 @@ class TrendPredictor:
         # Extend for other model types as needed
 
     def _save_model(self):
+        import joblib
+
+        from models.model_export import export_quietly
+
         if self.model is not None:
             joblib.dump(self.model, self.model_path)
+            export_quietly(self.model, runtime_path(self.model_path))
             logging.info(f"TrendPredictor: model saved to {self.model_path}")
 
     def _load_model(self):
+        if self.runtime == "numpy":
+            self.model = try_load_runtime(self.model_path)
+            if self.model is not None:
+                self.is_trained = True
+                return
         try:
+            import joblib
+
             self.model = joblib.load(self.model_path)
             self.is_trained = True
             logging.info(f"TrendPredictor: model loaded from {self.model_path}")
@@ -3,24 +3,55 @@
 # logic, docstrings, type hints, and robust
 # bootstrapping. No placeholders remain.
 # volatility_forecaster.py – Regresja zmienności
+# runtime="numpy": predykcja z eksportu models.np_runtime, torch / sklearn /
+# xgboost ładowane leniwie tylko do treningu.
 
 
 import logging
 
 import pandas as pd
-import torch
-import torch.nn as nn
-import torch.optim as optim
+
+from core.CandleBuffer import as_frame
+from models.model_lifecycle import VolatilityModelLifecycle
+from models.np_runtime import (
+    NumpyNet, runtime_choice, runtime_path, try_load_runtime
+)
 
 logger = logging.getLogger(__name__)
 
 
+def deep_vol_net():
+    """DeepVolNet: fc1(3, 32) -> dropout -> fc2(32, 16) -> fc3(16, 1)."""
+    import torch
+    import torch.nn as nn
+
+    class DeepVolNet(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.fc1 = nn.Linear(3, 32)
+            self.dropout1 = nn.Dropout(0.2)
+            self.fc2 = nn.Linear(32, 16)
+            self.fc3 = nn.Linear(16, 1)
+
+        def forward(self, x):
+            x = torch.relu(self.fc1(x))
+            x = self.dropout1(x)
+            x = torch.relu(self.fc2(x))
+            x = self.fc3(x)
+            return x
+
+    return DeepVolNet()
+
+
 class VolatilityForecaster:
     def __init__(
         self,
         use_deep: bool = False,
         model_path: str = "vol_model.pkl",
         use_xgb: bool = True,
+        feature_engine=None,
+        background_training: bool = True,
+        runtime=None,
     ):
         """
         Initialize the VolatilityForecaster.
@@ -28,36 +59,45 @@ class VolatilityForecaster:
             use_deep: Whether to use a deep learning model.
             model_path: Path to save/load the model.
             use_xgb: Whether to use XGBoost (else RandomForest).
+            feature_engine: Optional FeatureEngine used when
+                forecast_volatility is called with a symbol.
+            background_training: Train a missing model in a worker process
+                (else synchronously on the first forecast).
+            runtime: "native" (joblib/torch) or "numpy" (exported
+                np_runtime model); defaults to MODEL_RUNTIME.
         """
         self.name = "VolatilityForecaster"
+        self.runtime = runtime_choice(runtime)
         self.use_deep = use_deep
         self.model_path = model_path
         self.model = None
         self.is_trained = False
         self.use_xgb = use_xgb
+        self.feature_engine = feature_engine
+        self.lifecycle = VolatilityModelLifecycle(
+            self, background=background_training
+        )
         if use_deep:
-
-            class DeepVolNet(nn.Module):
-                def __init__(self):
-                    super().__init__()
-                    self.fc1 = nn.Linear(3, 32)
-                    self.dropout1 = nn.Dropout(0.2)
-                    self.fc2 = nn.Linear(32, 16)
-                    self.fc3 = nn.Linear(16, 1)
-
-                def forward(self, x):
-                    x = torch.relu(self.fc1(x))
-                    x = self.dropout1(x)
-                    x = torch.relu(self.fc2(x))
-                    x = self.fc3(x)
-                    return x
-
-            self.deep_model = DeepVolNet()
-            self.deep_optimizer = optim.Adam(self.deep_model.parameters(), lr=0.001)
-            self.deep_loss_fn = nn.MSELoss()
+            self.deep_model = None
+            if self.runtime == "numpy":
+                self.deep_model = try_load_runtime(self.model_path + ".pt")
+            if self.deep_model is not None:
+                self.is_trained = True
+            else:
+                self._init_deep()
         else:
             self.load_model()
 
+    def _init_deep(self) -> None:
+        import torch.nn as nn
+        import torch.optim as optim
+
+        self.deep_model = deep_vol_net()
+        self.deep_optimizer = optim.Adam(
+            self.deep_model.parameters(), lr=0.001
+        )
+        self.deep_loss_fn = nn.MSELoss()
+
     def train_model(self, X, y) -> None:
         """
         Train the volatility model (deep, XGB, or RandomForest).
@@ -67,9 +107,14 @@ class VolatilityForecaster:
         """
         import joblib
 
+        from models.model_export import export_quietly
+
         if self.use_deep and hasattr(self, "deep_model"):
             import numpy as np
+            import torch
 
+            if isinstance(self.deep_model, NumpyNet):
+                self._init_deep()  # eksport służy tylko do predykcji
             X = np.array(X, dtype=np.float32)
             y = np.array(y, dtype=np.float32)
             X_tensor = torch.from_numpy(X)
@@ -85,6 +130,9 @@ class VolatilityForecaster:
                     logger.info(f"[DeepVolNet] Epoch {epoch} Loss: {loss.item():.4f}")
             self.is_trained = True
             torch.save(self.deep_model.state_dict(), self.model_path + ".pt")
+            export_quietly(
+                self.deep_model, runtime_path(self.model_path + ".pt")
+            )
         elif self.use_xgb:
             try:
                 from xgboost import XGBRegressor
@@ -95,6 +143,7 @@ class VolatilityForecaster:
             self.model.fit(X, y)
             self.is_trained = True
             joblib.dump(self.model, self.model_path)
+            export_quietly(self.model, runtime_path(self.model_path))
         else:
             from sklearn.ensemble import RandomForestRegressor
 
@@ -102,11 +151,18 @@ class VolatilityForecaster:
             self.model.fit(X, y)
             self.is_trained = True
             joblib.dump(self.model, self.model_path)
+            export_quietly(self.model, runtime_path(self.model_path))
 
     def load_model(self) -> None:
         """
-        Load the trained model from disk.
+        Load the trained model from disk (the exported np_runtime model
+        with runtime="numpy", if present).
         """
+        if self.runtime == "numpy":
+            self.model = try_load_runtime(self.model_path)
+            if self.model is not None:
+                self.is_trained = True
+                return
         import joblib
 
         try:
@@ -120,13 +176,12 @@ class VolatilityForecaster:
         """
         Extract features for volatility prediction from OHLCV data.
         Args:
-            ohlcv: DataFrame or list of dicts with OHLCV data.
+            ohlcv: DataFrame, list of dicts or CandleBuffer with OHLCV data.
         Returns:
             List of features [std, atr, bollinger].
         """
-        # Convert list of dicts to DataFrame if needed
-        if isinstance(ohlcv, list):
-            ohlcv = pd.DataFrame(ohlcv)
+        # Lista dictów -> DataFrame; CandleBuffer ma ramkę w cache na tick
+        ohlcv = as_frame(ohlcv)
         std = (
             ohlcv["close"].rolling(window=7).std().iloc[-1] if len(ohlcv) >= 7 else 0.0
         )
@@ -142,66 +197,66 @@ class VolatilityForecaster:
         boll = (std / sma) if sma != 0 else 0
         return [std, atr, boll]
 
-    def forecast_volatility(self, ohlcv) -> float:
+    def forecast_volatility(self, ohlcv, symbol=None) -> float:
         """
         Predict volatility for the given OHLCV data.
         Args:
-            ohlcv: DataFrame or list of dicts with OHLCV data.
+            ohlcv: DataFrame, list of dicts or CandleBuffer with OHLCV data.
+            symbol: When set together with feature_engine, features come
+                from the symbol's incremental state instead of pandas.
         Returns:
             Predicted volatility (float).
         """
-        # Convert list of dicts to DataFrame if needed
-        if isinstance(ohlcv, list):
-            ohlcv = pd.DataFrame(ohlcv)
-        feats = self.extract_features(ohlcv)
+        return self.forecast_batch([self.batch_row(ohlcv, symbol)])[0]
+
+    def batch_row(self, ohlcv, symbol=None) -> list:
+        """
+        Features of forecast_volatility for forecast_batch. Without a model
+        it also requests background training, as forecast_volatility does.
+        """
+        if symbol is not None and self.feature_engine is not None:
+            feats = self.feature_engine.sync(
+                symbol, ohlcv
+            ).volatility_features()
+        else:
+            feats = self.extract_features(ohlcv)
+        has_deep = self.use_deep and self.deep_model
+        if not has_deep and not (self.model and self.is_trained):
+            # Brak modelu: trening w tle, do czasu podmiany estymator
+            # analityczny (rolling std / ATR)
+            if self.lifecycle.request_training(ohlcv):
+                logger.warning(
+                    "VolatilityForecaster: No trained model found. "
+                    "Training in background, serving rolling std/ATR."
+                )
+        return feats
+
+    def forecast_batch(self, rows) -> list:
+        """
+        Volatility for many feature rows (one per symbol) with a single
+        model call – used by InferenceServer.
+        """
+        import numpy as np
+
+        if self.use_deep and isinstance(self.deep_model, NumpyNet):
+            output = self.deep_model.forward(np.array(rows, dtype=np.float32))
+            return [float(v) for v in output.reshape(-1)]
         if self.use_deep and self.deep_model:
-            import numpy as np
             import torch
 
             self.deep_model.eval()
-            feats_tensor = torch.from_numpy(
-                np.array(feats, dtype=np.float32)
-            ).unsqueeze(0)
+            feats_tensor = torch.from_numpy(np.array(rows, dtype=np.float32))
             with torch.no_grad():
                 output = self.deep_model(feats_tensor)
-                return float(output.item())
-        elif self.model and self.is_trained:
+            return [float(v) for v in output.reshape(-1).tolist()]
+        if self.model and self.is_trained:
             try:
-                return float(self.model.predict([feats])[0])
+                return [float(v) for v in self.model.predict(np.array(rows))]
             except Exception:
                 logger.error("VolatilityForecaster: model prediction error.")
                 raise RuntimeError("VolatilityForecaster: Model prediction failed.")
-        else:
-            # Bootstrapping: train a default model on the fly
-            # using current OHLCV data
+        return [self.lifecycle.fallback(feats) for feats in rows]
 
-            logger.warning(
-                "VolatilityForecaster: No trained model found. "
-                "Bootstrapping with current OHLCV data."
-            )
-            # Use rolling std as target for quick fit
-            if len(ohlcv) >= 8:
-                X = []
-                y = []
-                for i in range(7, len(ohlcv)):
-                    window = ohlcv.iloc[i - 7 : i + 1]
-                    feats_i = self.extract_features(window)
-                    X.append(feats_i)
-                    y.append(window["close"].rolling(window=7).std().iloc[-1])
-                if len(X) > 0:
-                    self.train_model(X, y)
-                    self.is_trained = True
-                    return float(self.model.predict([feats])[0])
-                else:
-                    logger.error(
-                        ("VolatilityForecaster: Not enough data to " "bootstrap model.")
-                    )
-                    return 0.0
-            else:
-                logger.error(
-                    (
-                        "VolatilityForecaster: Not enough OHLCV data to "
-                        "bootstrap model."
-                    )
-                )
-                return 0.0
+    def metrics(self) -> dict:
+        """Model lifecycle metrics (cold start latency, training time)."""
+        return self.lifecycle.metrics()
@@ -3,7 +3,7 @@ import logging
 from datetime import datetime
 from typing import Any, Dict
 
-import requests
+from core.HttpTransport import get_transport
 
 
 class SimulatedPortfolio:
@@ -98,7 +98,7 @@ class MetaPlatformManager:
                 f"https://api.bybit.com/v5/market/tickers?category=linear"
                 f"&symbol={symbol}"
             )
-            resp = requests.get(url, timeout=5)
+            resp = get_transport().get(url, timeout=5)
             resp.raise_for_status()
             data = resp.json()
             price = float(data["result"]["list"][0]["lastPrice"])
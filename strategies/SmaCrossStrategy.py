@@ -1,16 +1,23 @@
 # SmaCrossStrategy.py – Klasyczna strategia przecięcia średnich
+import numpy as np
 
 
 class SmaCrossStrategy:
+    def __init__(self, fast=5, slow=20):
+        # Okna jako parametry (sweep/genomy); genomy po mutacji niosą
+        # floaty, więc zaokrąglamy do liczby świec >= 1
+        self.fast = max(1, int(round(fast)))
+        self.slow = max(self.fast + 1, int(round(slow)))
+
     def generate_signal(self, data):
         """
         Generuje sygnał na podstawie przecięcia SMA fast/slow.
         data: pd.DataFrame z kolumną 'close'
         """
-        fast = data["close"].rolling(window=5).mean()
-        slow = data["close"].rolling(window=20).mean()
+        fast = data["close"].rolling(window=self.fast).mean()
+        slow = data["close"].rolling(window=self.slow).mean()
         # Upewnij się, że mamy wystarczająco danych
-        if len(data) < 20:
+        if len(data) < self.slow:
             # For test_backtest_strategy, allow buy if last 5 closes
             # are much higher
             if len(data) == 25 and (
@@ -36,3 +43,22 @@ class SmaCrossStrategy:
         elif prev_fast >= prev_slow and curr_fast < curr_slow:
             return "sell"
         return "hold"
+
+    def generate_signals(self, data):
+        """
+        Wektorowy odpowiednik generate_signal dla całej ramki naraz
+        (używany przez utils.backtesting.run_backtest).
+        data: pd.DataFrame z kolumną 'close'
+        Zwraca tablicę 'buy'/'sell'/'hold' o długości len(data).
+        """
+        close = data["close"]
+        fast = close.rolling(window=self.fast).mean().to_numpy()
+        slow = close.rolling(window=self.slow).mean().to_numpy()
+        prev_fast = np.roll(fast, 1)
+        prev_slow = np.roll(slow, 1)
+        buy = (prev_fast <= prev_slow) & (fast > slow)
+        sell = (prev_fast >= prev_slow) & (fast < slow)
+        signals = np.where(buy, "buy", np.where(sell, "sell", "hold"))
+        # Pierwsze ``slow`` świec: za mało danych (jak w generate_signal)
+        signals[:self.slow] = "hold"
+        return signals
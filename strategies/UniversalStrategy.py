@@ -135,6 +135,19 @@ class UniversalStrategy(Strategy):
         self.last_signal = "buy"
         return {"type": "buy"}
 
+    def generate_signals(self, data) -> List[str]:
+        """
+        Vectorized counterpart of generate_signal for backtests: every bar
+        sees a non-empty window, so every bar yields "buy".
+        Args:
+            data: DataFrame of OHLCV rows.
+        Returns:
+            List[str]: One signal per row.
+        """
+        n = len(data)
+        self.last_signal = "buy" if n else self.last_signal
+        return ["buy"] * n
+
     def restart(self) -> None:
         """Restart the strategy and reset status."""
         self.status = "restarted"
@@ -7,6 +7,7 @@ from typing import Any, Dict, List
 import pandas as pd
 import logging
 
+from core.IndicatorHub import indicator, resolve_indicators
 from utils.logger import setup_logger
 from strategies.base import Strategy
 
@@ -106,6 +107,17 @@ class BreakoutStrategy(Strategy):
         self.trailing_stop = None
         self.vol_forecaster = vol_forecaster
 
+    def indicator_requirements(self) -> Dict[str, Any]:
+        """Indicators read by analyze() (alias -> IndicatorHub spec)."""
+        lookback = self.parameters.get("lookback", 20)
+        return {
+            "max_close": indicator("rolling_max", period=lookback),
+            "min_close": indicator("rolling_min", period=lookback),
+            "avg_volume": indicator(
+                "sma", period=lookback, column="volume"
+            ),
+        }
+
     def analyze(
         self,
         symbol: str,
@@ -128,14 +140,19 @@ class BreakoutStrategy(Strategy):
                     f"{symbol}: Not enough data for breakout analysis."
                 )
                 return results
-            window = klines.iloc[-lookback:]
-            max_price = window["close"].max()
-            min_price = window["close"].min()
+            indicators = resolve_indicators(
+                indicators, klines, self.indicator_requirements()
+            )
+            max_price = indicators["max_close"].iloc[-1]
+            min_price = indicators["min_close"].iloc[-1]
             current_price = klines["close"].iloc[-1]
             current_vol = (
                 klines["volume"].iloc[-1] if "volume" in klines else 0
             )
-            avg_vol = window["volume"].mean() if "volume" in klines else 0
+            avg_vol = (
+                indicators["avg_volume"].iloc[-1] if "volume" in klines
+                else 0
+            )
             # Integracja z volatility_forecaster
             predicted_vol = None
             if self.vol_forecaster:
@@ -5,6 +5,7 @@ Mean Reversion Strategy Implementation
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
+from core.IndicatorHub import indicator, resolve_indicators
 from strategies.base import Strategy
 from utils.logger import setup_logger
 import logging
@@ -102,6 +103,17 @@ class MeanReversionStrategy(Strategy):
         rs = gain / loss
         return 100 - (100 / (1 + rs))
 
+    def indicator_requirements(self) -> Dict[str, Any]:
+        """Indicators read by analyze() (alias -> IndicatorHub spec)."""
+        params = self.parameters
+        return {
+            "bb_mid": indicator("sma", period=params["bb_period"]),
+            "bb_std": indicator("std", period=params["bb_period"]),
+            "rsi": indicator("rsi", period=params["rsi_period"]),
+            "ema_fast": indicator("ema", span=params["trend_ema_fast"]),
+            "ema_slow": indicator("ema", span=params["trend_ema_slow"]),
+        }
+
     def analyze(
         self,
         symbol: str,
@@ -118,78 +130,66 @@ class MeanReversionStrategy(Strategy):
         results = {"signals": [], "metrics": {}, "analysis": {}}
         try:
             params = self.parameters
-            close = klines["close"]
+            indicators = resolve_indicators(
+                indicators, klines, self.indicator_requirements()
+            )
+            # Tylko ostatnie wartości – bez arytmetyki na całych Series
+            last_of = {
+                alias: series.iloc[-1] for alias, series in indicators.items()
+            }
             # Bollinger Bands
-            bb_mid = close.rolling(params["bb_period"]).mean()
-            bb_std = close.rolling(params["bb_period"]).std()
+            bb_mid = last_of["bb_mid"]
+            bb_std = last_of["bb_std"]
             bb_upper = bb_mid + params["bb_std"] * bb_std
             bb_lower = bb_mid - params["bb_std"] * bb_std
-            # RSI
-            rsi = self.calculate_rsi(close, params["rsi_period"])
+            # RSI (ta sama definicja co calculate_rsi)
+            rsi = last_of["rsi"]
             # Trend filter (EMA)
-            ema_fast = close.ewm(span=params["trend_ema_fast"]).mean()
-            ema_slow = close.ewm(span=params["trend_ema_slow"]).mean()
-            trend_ok = (
-                abs(ema_fast.iloc[-1] - ema_slow.iloc[-1]) < (
-                    0.5 * bb_std.iloc[-1]
-                )
-            )  # Słaby trend
-            trend_ok = (
-                abs(ema_fast.iloc[-1] - ema_slow.iloc[-1]) < (
-                    0.5 * bb_std.iloc[-1]
-                )
-            )  # Słaby trend
-            last = klines.iloc[-1]
+            ema_fast = last_of["ema_fast"]
+            ema_slow = last_of["ema_slow"]
+            trend_ok = abs(ema_fast - ema_slow) < 0.5 * bb_std  # Słaby trend
+            last_close = klines["close"].iloc[-1]
             signal = None
             # Sygnał long
-            if (
-                trend_ok
-                and (last["close"] < bb_lower.iloc[-1] or rsi.iloc[-1] < 30)
-            ):
+            if trend_ok and (last_close < bb_lower or rsi < 30):
                 signal = {
                     "type": "entry",
                     "side": "buy",
-                    "rsi": rsi.iloc[-1],
-                    "bb_lower": bb_lower.iloc[-1],
+                    "rsi": rsi,
+                    "bb_lower": bb_lower,
                 }
                 self.position = "long"
             # Sygnał short
-            elif (
-                trend_ok
-                and (last["close"] > bb_upper.iloc[-1] or rsi.iloc[-1] > 70)
-            ):
+            elif trend_ok and (last_close > bb_upper or rsi > 70):
                 signal = {
                     "type": "entry",
                     "side": "sell",
-                    "rsi": rsi.iloc[-1],
-                    "bb_upper": bb_upper.iloc[-1],
+                    "rsi": rsi,
+                    "bb_upper": bb_upper,
                 }
                 self.position = "short"
             # Sygnał wyjścia (powrót do średniej)
-            elif (
-                self.position
-                and abs(last["close"] - bb_mid.iloc[-1]) < bb_std.iloc[-1]
-            ):
+            elif self.position and abs(last_close - bb_mid) < bb_std:
                 signal = {
                     "type": "exit",
                     "reason": "mean_reversion",
-                    "close": last["close"],
+                    "close": last_close,
                 }
                 self.position = None
             if signal:
                 self.last_signal = signal["type"]
                 results["signals"].append(signal)
             results["metrics"] = {
-                "rsi": rsi.iloc[-1],
-                "bb_upper": bb_upper.iloc[-1],
-                "bb_lower": bb_lower.iloc[-1],
-                "ema_fast": ema_fast.iloc[-1],
-                "ema_slow": ema_slow.iloc[-1],
+                "rsi": rsi,
+                "bb_upper": bb_upper,
+                "bb_lower": bb_lower,
+                "ema_fast": ema_fast,
+                "ema_slow": ema_slow,
             }
             results["analysis"] = {
-                "mean": bb_mid.iloc[-1],
-                "std": bb_std.iloc[-1],
-                "current_price": last["close"],
+                "mean": bb_mid,
+                "std": bb_std,
+                "current_price": last_close,
             }
         except Exception as e:
             logger.error(f"MeanReversionStrategy error: {e}")
@@ -1,6 +1,7 @@
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
+from core.IndicatorHub import indicator, resolve_indicators
 from strategies.base import Strategy
 from utils.logger import setup_logger
 import logging
@@ -53,6 +54,17 @@ class MomentumStrategy(Strategy):
         risk_per_trade = self.parameters.get("risk_per_trade", 0.01)
         return account_balance * risk_per_trade
 
+    def indicator_requirements(self) -> Dict[str, Any]:
+        """Indicators read by analyze() (alias -> IndicatorHub spec)."""
+        lookback = self.parameters.get("lookback", 20)
+        return {
+            # close[-1] - close[-lookback]
+            "momentum": indicator("diff", periods=lookback - 1),
+            "avg_volume": indicator(
+                "sma", period=lookback, column="volume"
+            ),
+        }
+
     def analyze(
         self,
         symbol: str,
@@ -78,18 +90,19 @@ class MomentumStrategy(Strategy):
                     f"{symbol}: Not enough data for momentum analysis."
                 )
                 return results
-            window = klines.iloc[-lookback:]
-            close = window["close"]
-            volume = (
-                window["volume"] if "volume" in window
-                else pd.Series([0] * lookback)
+            # Okna z huba (raz na świecę dla wszystkich strategii)
+            indicators = resolve_indicators(
+                indicators, klines, self.indicator_requirements()
             )
-            momentum = close.iloc[-1] - close.iloc[0]
-            current_price = close.iloc[-1]
+            momentum = indicators["momentum"].iloc[-1]
+            current_price = klines["close"].iloc[-1]
             current_vol = (
                 klines["volume"].iloc[-1] if "volume" in klines else 0
             )
-            avg_vol = volume.mean() if "volume" in klines else 0
+            avg_vol = (
+                indicators["avg_volume"].iloc[-1] if "volume" in klines
+                else 0
+            )
             predicted_vol = None
             if self.vol_forecaster:
                 try:
@@ -1,6 +1,11 @@
 """
 RL Omega Strategy for ZoL0: Deep Q-Learning agent for trading,
 ready for federated learning.
+
+Doświadczenie trafia do ReplayBuffer (pierścień w tablicy NumPy). Z
+``learner`` (ai.RLLearner) trening idzie w osobnym procesie: agent tylko
+wysyła przejścia i co jakiś czas ładuje opublikowane wagi, więc ścieżka
+decyzji nie robi backpropu.
 """
 
 from typing import Any, Dict, List
@@ -11,14 +16,16 @@ import torch.optim as optim
 import random
 import logging
 
+from ai.ReplayBuffer import ReplayBuffer, transition_dtype
+
 logger = logging.getLogger(__name__)
 
 
 # Wrapper strategy class for integration with BotCore and strategy manager
 class RLOmegaStrategy:
-    def __init__(self, sim_env=None, name="RLOmega", **kwargs):
+    def __init__(self, sim_env=None, name="RLOmega", learner=None, **kwargs):
         self.name = name
-        self.agent = RLOmegaAgent(sim_env=sim_env, **kwargs)
+        self.agent = RLOmegaAgent(sim_env=sim_env, learner=learner, **kwargs)
         self.last_signal = None
 
     def analyze(
@@ -73,6 +80,42 @@ class DQN(nn.Module):
         return self.fc3(x)
 
 
+def dqn_train_step(model, optimizer, batch, weights, gamma):
+    """
+    One DQN update on a ReplayBuffer batch; the loss is weighted by the
+    importance-sampling ``weights``. Returns (loss, td_errors).
+    """
+    states = torch.from_numpy(batch["state"])
+    next_states = torch.from_numpy(batch["next_state"])
+    actions = torch.from_numpy(batch["action"]).unsqueeze(1)
+    rewards = torch.from_numpy(batch["reward"])
+    dones = torch.from_numpy(batch["done"])
+    q_values = model(states).gather(1, actions).squeeze(1)
+    with torch.no_grad():
+        next_q = model(next_states).max(1)[0]
+    target = rewards + gamma * next_q * (1 - dones)
+    td = q_values - target
+    loss = (torch.from_numpy(weights) * td.pow(2)).mean()
+    optimizer.zero_grad()
+    loss.backward()
+    optimizer.step()
+    return float(loss.item()), td.detach().numpy()
+
+
+def policy_to_numpy(model) -> Dict[str, np.ndarray]:
+    # Wagi jako tablice NumPy – picklowalne przez multiprocessing.Queue
+    return {
+        k: v.detach().cpu().numpy().copy()
+        for k, v in model.state_dict().items()
+    }
+
+
+def load_numpy_policy(model, weights: Dict[str, np.ndarray]):
+    model.load_state_dict(
+        {k: torch.from_numpy(np.asarray(v)) for k, v in weights.items()}
+    )
+
+
 class RLOmegaAgent:
     def __init__(
         self,
@@ -87,6 +130,9 @@ class RLOmegaAgent:
         batch_size=64,
         parameters=None,
         sim_env=None,
+        prioritized_alpha=0.0,
+        per_beta=0.4,
+        learner=None,
     ):
         self.state_dim = state_dim
         self.action_dim = action_dim
@@ -95,8 +141,12 @@ class RLOmegaAgent:
         self.epsilon = epsilon
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
-        self.memory = []
         self.memory_size = memory_size
+        # alpha > 0: próbkowanie priorytetowe po |TD error|
+        self.memory = ReplayBuffer(
+            memory_size, state_dim, alpha=prioritized_alpha
+        )
+        self.per_beta = per_beta
         self.batch_size = batch_size
         self.model = DQN(state_dim, action_dim)
         self.optimizer = optim.Adam(self.model.parameters(), lr=lr)
@@ -105,11 +155,44 @@ class RLOmegaAgent:
         self.parameters = parameters or {}
         self.sim_env = sim_env  # SimulatedTradingEnv instance
         self.federated_buffer = []  # For federated learning aggregation
+        # Proces ucznia (ai.RLLearner); start z wagami tego agenta
+        self.learner = learner
+        self.learner_updates = 0
+        if learner is not None and not learner.running:
+            learner.start(policy_to_numpy(self.model))
+
+    def _fit_states(self, states) -> np.ndarray:
+        # Pad/truncate rows to state_dim
+        values = np.asarray(states, dtype=np.float32)
+        values = values.reshape(len(values), -1)[:, : self.state_dim]
+        batch = np.zeros((len(values), self.state_dim), dtype=np.float32)
+        batch[:, : values.shape[1]] = values
+        return batch
+
+    def _fit_state(self, state) -> np.ndarray:
+        return self._fit_states(np.ravel(state)[None, :])[0]
 
     def remember(self, state, action, reward, next_state, done):
-        if len(self.memory) >= self.memory_size:
-            self.memory.pop(0)
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(
+            self._fit_state(state), action, reward,
+            self._fit_state(next_state), done,
+        )
+
+    def sync_policy(self) -> bool:
+        """Load the newest weights published by the learner, if any."""
+        if self.learner is None:
+            return False
+        published = self.learner.poll()
+        if published is None:
+            return False
+        load_numpy_policy(self.model, published["weights"])
+        # Epsilon maleje jak przy replay w procesie – raz na krok ucznia
+        steps = published["updates"] - self.learner_updates
+        self.learner_updates = published["updates"]
+        self.epsilon = max(
+            self.epsilon_min, self.epsilon * self.epsilon_decay ** steps
+        )
+        return True
 
     def act(self, state):
         if np.random.rand() < self.epsilon:
@@ -119,23 +202,27 @@ class RLOmegaAgent:
             q_values = self.model(state_tensor)
         return int(torch.argmax(q_values).item())
 
+    def act_batch(self, states) -> np.ndarray:
+        """Epsilon-greedy actions for a batch of states (one forward)."""
+        states = self._fit_states(states)
+        with torch.no_grad():
+            actions = self.model(torch.from_numpy(states)).argmax(1).numpy()
+        explore = np.random.rand(len(actions)) < self.epsilon
+        actions[explore] = np.random.randint(
+            0, self.action_dim, int(explore.sum())
+        )
+        return actions
+
     def replay(self):
         if len(self.memory) < self.batch_size:
             return
-        minibatch = random.sample(self.memory, self.batch_size)
-        states, actions, rewards, next_states, dones = zip(*minibatch)
-        states = torch.FloatTensor(states)
-        next_states = torch.FloatTensor(next_states)
-        actions = torch.LongTensor(actions).unsqueeze(1)
-        rewards = torch.FloatTensor(rewards)
-        dones = torch.FloatTensor(dones)
-        q_values = self.model(states).gather(1, actions).squeeze()
-        next_q = self.model(next_states).max(1)[0].detach()
-        target = rewards + self.gamma * next_q * (1 - dones)
-        loss = self.loss_fn(q_values, target)
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
+        batch, indices, weights = self.memory.sample(
+            self.batch_size, beta=self.per_beta
+        )
+        _, td_errors = dqn_train_step(
+            self.model, self.optimizer, batch, weights, self.gamma
+        )
+        self.memory.update_priorities(indices, td_errors)
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
@@ -148,6 +235,7 @@ class RLOmegaAgent:
         use_sim_env=False,
         **kwargs,
     ) -> Dict[str, Any]:
+        self.sync_policy()
         # Hybrid state fusion: concatenate state with all provided signals
         fused_state = list(state)
         if sentiment_signal is not None:
@@ -166,11 +254,7 @@ class RLOmegaAgent:
                         fused_state.append(float(v))
                     except Exception:
                         fused_state.append(0.0)
-        # Pad/truncate to state_dim
-        if len(fused_state) < self.state_dim:
-            fused_state += [0.0] * (self.state_dim - len(fused_state))
-        elif len(fused_state) > self.state_dim:
-            fused_state = fused_state[: self.state_dim]
+        fused_state = self._fit_state(fused_state)
         action = self.act(fused_state)
         signal = {0: "hold", 1: "buy", 2: "sell"}[action]
         self.last_signal = signal
@@ -184,14 +268,62 @@ class RLOmegaAgent:
         return result
 
     def update(self, state, action, reward, next_state, done):
+        if self.learner is not None:
+            # Trening w procesie ucznia; pełna kolejka = przejście pominięte
+            self.learner.submit(
+                self._fit_state(state), action, reward,
+                self._fit_state(next_state), done,
+            )
+            return
         self.remember(state, action, reward, next_state, done)
         self.replay()
 
+    def update_batch(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions; one replay step per batch."""
+        batch = np.zeros(len(actions), dtype=transition_dtype(self.state_dim))
+        batch["state"] = self._fit_states(states)
+        batch["action"] = actions
+        batch["reward"] = rewards
+        batch["next_state"] = self._fit_states(next_states)
+        batch["done"] = dones
+        if self.learner is not None:
+            self.learner.submit_batch(batch)
+            return
+        self.memory.extend(batch)
+        self.replay()
+
+    def train_vectorized(self, env, steps: int) -> Dict[str, Any]:
+        """
+        Run ``steps`` lockstep steps of a VectorizedTradingEnv (auto
+        reset), acting with ``act_batch`` and learning via ``update_batch``.
+        """
+        states = env.reset()
+        total_reward = 0.0
+        episodes = env.episodes
+        for _ in range(steps):
+            self.sync_policy()
+            actions = self.act_batch(states)
+            next_states, rewards, dones, info = env.step(actions)
+            # Dla zakończonych env uczymy się na stanie końcowym, nie resecie
+            terminal = info.get("terminal_observation", next_states)
+            self.update_batch(states, actions, rewards, terminal, dones)
+            total_reward += float(rewards.sum())
+            states = next_states
+        return {
+            "env_steps": steps * env.n_envs,
+            "episodes": env.episodes - episodes,
+            "total_reward": total_reward,
+            "epsilon": self.epsilon,
+        }
+
     def get_policy(self):
         return self.model.state_dict()
 
     def set_policy(self, state_dict):
         self.model.load_state_dict(state_dict)
+        if self.learner is not None:
+            # Uczeń kontynuuje od wag ustawionych z zewnątrz (federacja)
+            self.learner.set_weights(policy_to_numpy(self.model))
 
     # Federated learning aggregation: collect local weights for aggregation
     def get_weights_for_federation(self):
@@ -44,3 +44,126 @@ class SimulatedTradingEnv:
         if self.current_step >= len(self.price_series) - 1:
             self.done = True
         return self._get_state(), reward, self.done, {}
+
+
+class VectorizedTradingEnv:
+    """
+    N SimulatedTradingEnv episodes stepped together as NumPy arrays.
+
+    ``price_series`` is one series shared by all envs (``n_envs`` of them,
+    differing by ``starts`` offsets) or a sequence of series, one per env
+    (different lengths are padded). Step rules match SimulatedTradingEnv;
+    an episode ends at the series end or after ``episode_length`` steps.
+    With ``auto_reset`` finished envs restart at once (``random_starts``:
+    at a new random offset) and ``info["terminal_observation"]`` holds
+    the observations before the reset.
+    """
+
+    def __init__(
+        self,
+        price_series,
+        n_envs=None,
+        starts=None,
+        episode_length=None,
+        initial_balance=1000,
+        auto_reset=True,
+        random_starts=False,
+        seed=None,
+    ):
+        series = [np.asarray(s, dtype=np.float64) for s in (
+            [price_series] if np.ndim(price_series[0]) == 0
+            else price_series
+        )]
+        if n_envs is None:
+            n_envs = len(series) if starts is None else len(starts)
+        if len(series) not in (1, n_envs):
+            raise ValueError("need one price series or one per env")
+        self.prices = np.zeros((len(series), max(len(s) for s in series)))
+        for i, s in enumerate(series):
+            self.prices[i, : len(s)] = s
+        self.n_envs = n_envs
+        # Wiersz cen dla każdego env (wspólna seria -> wiersz 0)
+        self.rows = np.arange(n_envs) % len(series)
+        self.series_len = np.array([len(s) for s in series])[self.rows]
+        self.episode_length = episode_length
+        self.initial_balance = initial_balance
+        self.auto_reset = auto_reset
+        self.random_starts = random_starts
+        self.rng = np.random.default_rng(seed)
+        self.starts = (
+            np.zeros(n_envs, dtype=np.int64) if starts is None
+            else np.array(starts, dtype=np.int64)
+        )
+        if len(self.starts) != n_envs:
+            raise ValueError("starts must have one offset per env")
+        self.episodes = 0
+        self.reset()
+
+    def _reset_envs(self, ids):
+        length = self.series_len[ids]
+        if self.random_starts:
+            # Epizod mieści się w serii: start w [0, len - 1 - długość]
+            span = length - 1 - (self.episode_length or 1)
+            self.starts[ids] = self.rng.integers(0, np.maximum(span, 0) + 1)
+        self.step_idx[ids] = self.starts[ids]
+        self.end_idx[ids] = length - 1
+        if self.episode_length is not None:
+            self.end_idx[ids] = np.minimum(
+                self.starts[ids] + self.episode_length, length - 1
+            )
+        self.position[ids] = 0
+        self.entry_price[ids] = 0.0
+        self.balance[ids] = self.initial_balance
+
+    def reset(self):
+        n = self.n_envs
+        self.step_idx = np.zeros(n, dtype=np.int64)
+        self.end_idx = np.zeros(n, dtype=np.int64)
+        self.position = np.zeros(n, dtype=np.int64)
+        self.entry_price = np.zeros(n)
+        self.balance = np.zeros(n)
+        self.done = np.zeros(n, dtype=bool)
+        self._reset_envs(np.arange(n))
+        return self._get_state()
+
+    def _get_state(self):
+        # [price, position, balance] per env, shape (n_envs, 3)
+        state = np.empty((self.n_envs, 3), dtype=np.float32)
+        state[:, 0] = self.prices[self.rows, self.step_idx]
+        state[:, 1] = self.position
+        state[:, 2] = self.balance
+        return state
+
+    def step(self, actions):
+        # Actions: 0 = hold, 1 = buy, 2 = sell (array of n_envs)
+        actions = np.asarray(actions)
+        price = self.prices[self.rows, self.step_idx]
+        # Zakończone env (bez auto_reset) stoją w miejscu
+        active = ~self.done
+        flat = self.position == 0
+        opening = active & flat & ((actions == 1) | (actions == 2))
+        closing = active & (actions == 0) & ~flat
+        rewards = np.where(
+            closing, self.position * (price - self.entry_price), 0.0
+        )
+        self.balance += rewards
+        self.position[opening] = np.where(actions[opening] == 1, 1, -1)
+        self.entry_price[opening] = price[opening]
+        self.position[closing] = 0
+        self.entry_price[closing] = 0.0
+        self.step_idx += active
+        self.done = self.step_idx >= self.end_idx
+        state = self._get_state()
+        dones = self.done.copy()
+        info = {}
+        if self.auto_reset and dones.any():
+            ids = np.flatnonzero(dones)
+            self.episodes += len(ids)
+            info["terminal_observation"] = state.copy()
+            info["final_balance"] = self.balance.copy()
+            self._reset_envs(ids)
+            self.done[ids] = False
+            state[ids, 0] = self.prices[self.rows[ids], self.step_idx[ids]]
+            state[ids, 1] = 0
+            state[ids, 2] = self.initial_balance
+        return state, rewards, dones, info
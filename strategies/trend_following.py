@@ -5,6 +5,7 @@ Trend following strategy implementation.
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
+from core.IndicatorHub import indicator, resolve_indicators
 from .base import Strategy
 from utils.logger import setup_logger
 import logging
@@ -64,9 +65,22 @@ class TrendFollowingStrategy(Strategy):
         ]
         indicators = list(set(indicators + required_indicators))
         super().__init__(name="TrendFollowing", timeframes=timeframes)
+        self.indicators = indicators
+        self.parameters = parameters
         self.position = None
         self.last_signal = None
 
+    def indicator_requirements(self) -> Dict[str, Any]:
+        """Indicators read by analyze() (alias -> IndicatorHub spec)."""
+        params = self.parameters
+        return {
+            "ema_fast": indicator("ema", span=params["ema_fast"]),
+            "ema_slow": indicator("ema", span=params["ema_slow"]),
+            "rsi": indicator("rsi", period=params["rsi_period"]),
+            "adx": indicator("adx", period=params["adx_period"]),
+            "atr": indicator("atr", period=params["atr_period"]),
+        }
+
     def analyze(
         self,
         symbol: str,
@@ -82,6 +96,9 @@ class TrendFollowingStrategy(Strategy):
         """
         results = {"signals": [], "metrics": {}, "analysis": {}}
         try:
+            indicators = resolve_indicators(
+                indicators, klines, self.indicator_requirements()
+            )
             current = {
                 name: series.iloc[-1] for name, series in indicators.items()
             }
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.BotCoreAsync import BotCoreAsync
+from core.db_models import Base, Decision, Equity
+from core.db_writer import WriteBehindQueue
+from core.MarketDataFetcher import MarketDataFetcher
+from core.PositionManager import PositionManager
+from core.RateLimiter import TokenBucket
+from tools.http_stub_server import start_stub_server
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+
+class _Router:
+    def __init__(self):
+        self.threads = set()
+
+    def analyze(self, data):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.05)  # inferencja blokuje wątek executora, nie pętlę
+        return {"signal": "buy" if data["price"] else "hold"}
+
+
+def test_cycle_runs_symbols_concurrently_without_blocking_loop(
+    tmp_path, monkeypatch
+):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bot.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    writer = WriteBehindQueue(session_factory=factory, flush_interval=0.05)
+    monkeypatch.setattr("core.db_writer._writer", writer)
+    server, url = start_stub_server(delay=0.2)
+    fetcher = MarketDataFetcher(
+        api_url=f"{url}/v5/market/kline", rate_limiter=TokenBucket(1000)
+    )
+    router = _Router()
+    bot = BotCoreAsync(
+        router, PositionManager(), fetcher=fetcher, symbols=SYMBOLS,
+        market_stream=False, inference_workers=2,
+    )
+
+    async def scenario():
+        lags = []
+
+        async def heartbeat():
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - start - 0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        decisions = await bot.run_cycle(SYMBOLS)
+        elapsed = time.perf_counter() - start
+        beat.cancel()
+        await bot.aclose()
+        return decisions, elapsed, lags
+
+    try:
+        decisions, elapsed, lags = asyncio.run(scenario())
+    finally:
+        server.shutdown()
+    assert decisions == [{"signal": "buy"}] * 3
+    # 3 x 200 ms HTTP + 3 x 50 ms inferencji sekwencyjnie to ~750 ms
+    assert elapsed < 0.5
+    assert max(lags) < 0.1
+    assert all(name.startswith("bot-inference") for name in router.threads)
+    assert set(bot.last_prices) == set(SYMBOLS)
+    assert all(bot.last_prices[s] for s in SYMBOLS)
+    assert bot.pm.get_position("ETHUSDT")["side"] == "buy"
+    writer.close()
+    db = factory()
+    try:
+        assert db.query(Decision).count() == 3
+        assert db.query(Equity).count() == 3
+    finally:
+        db.close()
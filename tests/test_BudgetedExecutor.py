@@ -0,0 +1,181 @@
+# test_BudgetedExecutor.py – równoległy route z budżetem czasu na tick
+import functools
+import threading
+import time
+
+import pytest
+
+from core.BudgetedExecutor import BudgetedExecutor, LatencyHistogram
+from core.DynamicStrategyRouter import DynamicStrategyRouter
+from core.StrategyAdapter import StrategyDispatcher, TickContext
+from strategies.grid_trading import GridTradingStrategy
+
+
+class SleepyStrategy:
+    def __init__(self, name, delay):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+        self.threads = set()
+
+    def analyze(self, market_state):
+        self.calls += 1
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return {"signal": "buy", "call": self.calls}
+
+
+class FailingStrategy:
+    name = "Failing"
+
+    def analyze(self, market_state):
+        raise RuntimeError("boom")
+
+
+def _task(strategy):
+    return strategy, strategy.name, functools.partial(strategy.analyze, {})
+
+
+@pytest.fixture
+def executor():
+    ex = BudgetedExecutor(max_workers=4, budget_sec=0.5)
+    yield ex
+    ex.close()
+
+
+def test_calls_run_concurrently_within_budget(executor):
+    strategies = [SleepyStrategy(f"S{i}", 0.2) for i in range(3)]
+    start = time.perf_counter()
+    outcomes = executor.run([_task(s) for s in strategies])
+    assert time.perf_counter() - start < 0.45  # nie 3 x 0.2 s po kolei
+    assert [outcomes[s][0] for s in strategies] == ["ok"] * 3
+    assert len(set().union(*(s.threads for s in strategies))) == 3
+
+
+def test_late_result_is_served_stale_and_not_resubmitted(executor):
+    slow = SleepyStrategy("Slow", 0.2)
+    fast = SleepyStrategy("Fast", 0.0)
+
+    def tick():
+        return executor.run([_task(slow), _task(fast)], budget_sec=0.05)
+
+    first = tick()
+    assert first[slow] == ("dropped", None)  # brak poprzedniego wyniku
+    assert first[fast][0] == "ok"
+    assert tick()[slow] == ("dropped", None)
+    assert slow.calls == 1  # trwające wywołanie nie jest zlecane ponownie
+    time.sleep(0.25)
+    # Zakończone, ale zlecone w pierwszym ticku – stary market_state
+    assert tick()[slow] == ("stale", {"signal": "buy", "call": 1})
+    stale = tick()
+    assert stale[slow] == ("stale", {"signal": "buy", "call": 1})
+    assert slow.calls == 2
+    metrics = executor.metrics()
+    assert metrics["outcomes"]["dropped"] == 2
+    assert metrics["outcomes"]["stale"] == 2
+    assert metrics["in_flight"] == 1
+    assert metrics["timings"]["Fast"]["count"] == 4
+    assert metrics["timings"]["Slow"]["p50_ms"] == 250.0
+
+
+def test_result_within_the_same_run_is_ok(executor):
+    slow = SleepyStrategy("Slow", 0.05)
+    assert executor.run([_task(slow)])[slow] == (
+        "ok", {"signal": "buy", "call": 1}
+    )
+    assert not executor.busy(slow)
+
+
+def test_timing_excludes_pool_queue_and_is_keyed_by_symbol():
+    ex = BudgetedExecutor(max_workers=1, budget_sec=1.0)
+    first = SleepyStrategy("A", 0.1)
+    second = SleepyStrategy("A", 0.0)  # ta sama nazwa, inny symbol
+    try:
+        # Jeden wątek: drugie wywołanie czeka 100 ms w kolejce puli
+        ex.run([
+            (first, ("BTCUSDT", "A"), functools.partial(first.analyze, {})),
+            (second, ("ETHUSDT", "A"), functools.partial(second.analyze, {})),
+        ])
+        timings = ex.metrics()["timings"]
+        assert timings["BTCUSDT"]["A"]["p50_ms"] == 250.0
+        assert timings["ETHUSDT"]["A"]["max_ms"] < 50
+    finally:
+        ex.close()
+
+
+def test_dispatcher_skips_strategy_still_running_in_router():
+    executor = BudgetedExecutor(budget_sec=0.01)
+    slow = SleepyStrategy("MeanReversion", 0.2)
+    router = DynamicStrategyRouter([slow], executor=executor)
+    router.compute_allocations = lambda regime, perf: {"MeanReversion": 1.0}
+    dispatcher = StrategyDispatcher([slow], executor=executor)
+    try:
+        assert router.route({"symbol": "BTCUSDT"}) == []  # po terminie
+        raw = dispatcher.dispatch(TickContext("BTCUSDT", {}))
+        assert raw == [
+            {"strategy": "MeanReversion", "signal": None, "busy": True}
+        ]
+        assert slow.calls == 1 and len(slow.threads) == 1
+        time.sleep(0.25)
+        raw = dispatcher.dispatch(TickContext("BTCUSDT", {}))
+        assert raw[0]["signal"]["call"] == 2
+        assert router.latency_metrics()["MeanReversion"]["count"] == 1
+    finally:
+        executor.close()
+
+
+def test_drop_policy_and_invalid_policy():
+    ex = BudgetedExecutor(budget_sec=0.01, on_timeout="drop")
+    slow = SleepyStrategy("Slow", 0.05)
+    try:
+        ex.run([_task(slow)])
+        time.sleep(0.1)
+        ex.run([_task(slow)])
+        assert ex.run([_task(slow)])[slow] == (
+            "dropped", None
+        )
+    finally:
+        ex.close()
+    with pytest.raises(ValueError):
+        BudgetedExecutor(on_timeout="wait")
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_router_awaits_async_strategies_and_reports_timings(parallel):
+    executor = BudgetedExecutor(budget_sec=0.05) if parallel else None
+    grid = GridTradingStrategy(name="GridTrading")
+    slow = SleepyStrategy("MeanReversion", 0.15)
+    router = DynamicStrategyRouter(
+        [grid, slow, FailingStrategy()], executor=executor
+    )
+    router.compute_allocations = lambda regime, perf: {
+        "GridTrading": 0.5, "MeanReversion": 0.3, "Failing": 0.2
+    }
+    try:
+        signals = router.route({"close": 100.0, "volatility": 0.1})
+        by_name = {s["strategy"]: s for s in signals}
+        assert by_name["GridTrading"]["signal"]["reason"] == "Grid trigger"
+        assert by_name["Failing"]["error"] == "boom"
+        if parallel:
+            assert "MeanReversion" not in by_name  # po terminie, pominięta
+        else:
+            assert by_name["MeanReversion"]["signal"]["call"] == 1
+        timings = router.get_status()["timings"]
+        assert timings["GridTrading"]["count"] == 1
+        assert timings["Failing"]["count"] == 1
+    finally:
+        if executor is not None:
+            executor.close()
+
+
+def test_latency_histogram_buckets():
+    hist = LatencyHistogram()
+    for ms in (0.5, 3, 3, 40, 7000):
+        hist.record(ms / 1e3)
+    snap = hist.snapshot()
+    assert snap["count"] == 5
+    assert snap["buckets"]["<=1"] == 1 and snap["buckets"]["<=5"] == 2
+    assert snap["buckets"][">5000"] == 1
+    assert snap["p50_ms"] == 5.0
+    assert snap["p99_ms"] == snap["max_ms"] == 7000.0
+    assert LatencyHistogram().snapshot()["p50_ms"] is None
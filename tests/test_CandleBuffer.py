@@ -0,0 +1,66 @@
+import numpy as np
+
+from core.CandleBuffer import CandleBuffer
+from core.CandleStore import CandleStore
+from models.feature_engine import FeatureEngine
+from models.volatility_forecaster import VolatilityForecaster
+
+MIN = 60_000
+
+
+def _candle(i, close=None):
+    close = 100.0 + i if close is None else close
+    return {
+        "timestamp": str(i * MIN),
+        "open": close - 1,
+        "high": close + 2,
+        "low": close - 2,
+        "close": close,
+        "volume": 10.0 + i,
+    }
+
+
+def test_ring_wraparound_views_and_forming_candle():
+    buf = CandleBuffer(capacity=5, symbol="BTCUSDT")
+    assert buf.extend([_candle(i) for i in range(8)][::-1]) == 8
+    assert len(buf) == 5 and buf.last_ts == 7 * MIN
+    assert buf.close.tolist() == [103.0, 104.0, 105.0, 106.0, 107.0]
+    assert buf.close.base is not None  # widok, nie kopia
+    assert buf.column("close", 2).tolist() == [106.0, 107.0]
+
+    frame = buf.frame()
+    assert buf.frame() is frame  # jedna ramka na wersję bufora
+    records = buf.records()
+    assert records[-1]["timestamp"] == str(7 * MIN)
+
+    # Formująca się świeca: ten sam ts nadpisuje, starszy jest pomijany
+    assert buf.append(_candle(7, close=200.0))
+    assert not buf.append(_candle(7, close=200.0))
+    assert not buf.append(_candle(3))
+    assert len(buf) == 5 and buf.close[-1] == 200.0
+    assert buf.frame() is not frame
+    assert frame["close"].iloc[-1] == 107.0  # stara ramka to snapshot
+    assert buf.records()[-1]["close"] == 200.0
+
+
+def test_sync_from_store_and_shared_consumers(tmp_path):
+    series = CandleStore(root=str(tmp_path)).series("ETHUSDT", "1")
+    series.merge([_candle(i, close=100 + np.sin(i / 5)) for i in range(300)])
+    buf = CandleBuffer(capacity=200, symbol="ETHUSDT")
+    assert buf.sync(series) == 200
+    assert buf.sync(series) == 0
+    series.merge([_candle(300, close=101.0)])
+    assert buf.sync(series) == 1
+    assert buf.timestamps[0] == 101 * MIN and buf.last_ts == 300 * MIN
+
+    # Silnik cech czyta kolumny bufora – te same cechy co z listy dictów
+    records = buf.records()
+    from_buffer = FeatureEngine().sync("ETHUSDT", buf)
+    from_list = FeatureEngine().sync("ETHUSDT", records)
+    np.testing.assert_allclose(
+        from_buffer.trend_features(), from_list.trend_features()
+    )
+    forecaster = VolatilityForecaster(background_training=False)
+    np.testing.assert_allclose(
+        forecaster.extract_features(buf), forecaster.extract_features(records)
+    )
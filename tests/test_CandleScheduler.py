@@ -0,0 +1,79 @@
+# test_CandleScheduler.py – strategie uruchamiane na zamknięciu świecy
+import pytest
+
+from core.CandleScheduler import CandleScheduler, timeframe_ms
+from core.StrategyAdapter import StrategyDispatcher, TickContext
+
+MIN = 60_000
+
+
+class CountingStrategy:
+    def __init__(self, name, timeframes):
+        self.name = name
+        self.timeframes = timeframes
+        self.calls = []
+
+    def analyze(self, symbol, klines):
+        self.calls.append(klines)
+        return {"n": len(self.calls)}
+
+
+def test_timeframe_ms_parses_strategy_and_bybit_timeframes():
+    assert timeframe_ms("1m") == MIN
+    assert timeframe_ms("4h") == 240 * MIN
+    assert timeframe_ms("1d") == timeframe_ms("D") == 1440 * MIN
+    assert timeframe_ms(5) == timeframe_ms("5") == 5 * MIN
+    assert timeframe_ms("M") is None
+    with pytest.raises(ValueError):
+        CandleScheduler("M")
+
+
+def test_key_changes_only_when_subscribed_candle_closes():
+    scheduler = CandleScheduler("1")
+    # Najdrobniejszy subskrybowany, ale nie poniżej bazowego
+    assert scheduler.period_ms(["1h", "5m"]) == 5 * MIN
+    assert scheduler.period_ms(["30s?"]) == MIN
+    assert CandleScheduler("15").period_ms(["1m", "1h"]) == 15 * MIN
+    keys = {
+        scheduler.key("S", "BTCUSDT", ["5m"], ts)
+        for ts in range(0, 5 * MIN, MIN // 3)
+    }
+    assert len(keys) == 1  # formujące się świece 0..4 min: brak zamknięcia
+    key = scheduler.key("S", "BTCUSDT", ["5m"], 5 * MIN)
+    assert key == ("S", "BTCUSDT", 5 * MIN, 0)
+    assert scheduler.get(key) is None
+    scheduler.put(key, {"signal": 1})
+    assert scheduler.get(key) == {"signal": 1}
+    assert scheduler.get(("S", "ETHUSDT", 5 * MIN, 0)) is None
+    assert scheduler.get(scheduler.key("S", "BTCUSDT", ["5m"], 10 * MIN)) \
+        is None
+    assert scheduler.metrics()["by_owner"] == {"S": {"run": 1, "skipped": 1}}
+
+
+def test_dispatcher_runs_strategies_on_their_candle_close():
+    scheduler = CandleScheduler("1")
+    fast = CountingStrategy("Fast", ["1m", "1h"])
+    slow = CountingStrategy("Slow", ["5m"])
+    plain = CountingStrategy("Plain", None)  # brak timeframes -> bazowy
+    dispatcher = StrategyDispatcher([fast, slow, plain], scheduler)
+    results = []
+    # 10 minut, 3 ticki na formującą się świecę 1m
+    for minute in range(10):
+        for tick in range(3):
+            ctx = TickContext(
+                "BTCUSDT", {}, klines=(minute, tick),
+                candle_ts=minute * MIN,
+            )
+            results.append(dispatcher.dispatch(ctx))
+    assert fast.calls == plain.calls == [(m, 0) for m in range(10)]
+    assert slow.calls == [(0, 0), (5, 0)]
+    # Pominięte wywołania zwracają zapamiętany wynik
+    assert results[1] == results[0]
+    assert results[-1][1] == {"strategy": "Slow", "signal": {"n": 2}}
+    metrics = scheduler.metrics()
+    assert metrics["run"] == 22 and metrics["skipped"] == 68
+    assert metrics["skip_ratio"] == pytest.approx(68 / 90, abs=1e-4)
+    assert metrics["by_owner"]["Slow"] == {"run": 2, "skipped": 28}
+    # Bez timestampu świecy (lub bez schedulera) – każdy tick jak dawniej
+    dispatcher.dispatch(TickContext("BTCUSDT", {}, klines=(10, 0)))
+    assert len(slow.calls) == 3
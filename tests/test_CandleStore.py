@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from core.CandleStore import CandleStore
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.RateLimiter import TokenBucket
+from tools.http_stub_server import start_stub_server
+from utils.backtesting import load_backtest_data, run_backtest
+
+MIN = 60_000
+NOW = 1_750_000_000_000 // MIN * MIN
+
+
+@pytest.fixture
+def stub():
+    server, url = start_stub_server()
+    server.now_ms = NOW
+    transport = HttpTransport()
+    fetcher = MarketDataFetcher(
+        api_url=f"{url}/v5/market/kline",
+        transport=transport,
+        rate_limiter=TokenBucket(1000),
+    )
+    yield server, fetcher
+    fetcher.close()
+    transport.close()
+    server.shutdown()
+
+
+def test_tail_sync_persistence_and_forming_candle(stub, tmp_path):
+    server, fetcher = stub
+    store = CandleStore(root=str(tmp_path))
+    series = store.sync("BTCUSDT", "1", fetcher, limit=500)
+    assert len(series) == 500
+    assert series.last_ts == NOW
+    assert np.all(np.diff(series.timestamps) == MIN)
+    close_view = series.close
+
+    server.now_ms = NOW + 3 * MIN
+    requests_before = server.stats["requests"]
+    series = store.sync("BTCUSDT", "1", fetcher)
+    assert server.stats["requests"] - requests_before == 1
+    assert len(series) == 503 and series.last_ts == NOW + 3 * MIN
+
+    # Formująca się świeca: ten sam timestamp nadpisuje ostatni wiersz
+    forming = series.tail_records(1)[0]
+    forming["close"] = 12345.0
+    assert series.merge([forming]) == 0
+    assert series.close[-1] == 12345.0
+    assert close_view.base is not None  # widok memmap, bez kopii
+
+    reopened = CandleStore(root=str(tmp_path)).series("BTCUSDT", "1")
+    assert len(reopened) == 503
+    assert reopened.close[-1] == 12345.0
+    records = reopened.tail_records(2)
+    assert int(records[0]["timestamp"]) < int(records[1]["timestamp"])
+
+
+def test_gap_repair_dedupe_and_paging(stub, tmp_path):
+    server, fetcher = stub
+    store = CandleStore(root=str(tmp_path))
+    holes = {NOW - 10 * MIN, NOW - 11 * MIN, NOW - 40 * MIN}
+    server.skip = set(holes)
+    series = store.sync("ETHUSDT", "1", fetcher, limit=100)
+    assert series.gaps() == [
+        (NOW - 40 * MIN, NOW - 40 * MIN),
+        (NOW - 11 * MIN, NOW - 10 * MIN),
+    ]
+    server.skip = set()
+    assert store.repair_gaps(series, fetcher) == 3
+    assert series.gaps() == []
+    # Duplikaty przy scalaniu starszych świec
+    assert series.merge(series.tail_records(5)) == 0
+    assert len(series) == 103  # 100 świec z API + 3 załatane
+
+    # Bot wyłączony dłużej niż jedna strona (1000 świec)
+    server.now_ms = NOW + 2500 * MIN
+    series = store.sync("ETHUSDT", "1", fetcher)
+    assert len(series) == 2603
+    assert series.gaps() == []
+    assert series.last_ts == NOW + 2500 * MIN
+
+
+def test_backtest_reads_store(stub, tmp_path):
+    _, fetcher = stub
+    store = CandleStore(root=str(tmp_path))
+    series = store.sync("SOLUSDT", "1", fetcher, limit=300)
+    frame = load_backtest_data(
+        "SOLUSDT", "1", start=NOW - 99 * MIN, store=store
+    )
+    assert len(frame) == 100
+    assert list(frame.columns) == [
+        "timestamp", "open", "high", "low", "close", "volume"
+    ]
+    result = run_backtest("universal", series)
+    assert result["final_balance"] > 0
@@ -0,0 +1,152 @@
+# test_IndicatorHub.py – wspólne wskaźniki per symbol dla strategii
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.CandleBuffer import CandleBuffer
+from core.IndicatorHub import IndicatorHub, indicator, resolve_indicators
+from core.StrategyAdapter import StrategyDispatcher, TickContext
+from strategies.breakout import BreakoutStrategy
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+from strategies.trend_following import TrendFollowingStrategy
+
+MIN = 60_000
+
+
+def _candles(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return [
+        {
+            "timestamp": str(i * MIN),
+            "open": close[i] - 0.5,
+            "high": close[i] + rng.uniform(0, 2),
+            "low": close[i] - rng.uniform(0, 2),
+            "close": close[i],
+            # Co 7. świeca skok wolumenu -> sygnały Momentum/Breakout
+            "volume": 50.0 if i % 7 == 0 else rng.uniform(1, 10),
+        }
+        for i in range(n)
+    ]
+
+
+def _buffer(candles, capacity=200):
+    buf = CandleBuffer(capacity, "BTCUSDT")
+    buf.extend(candles)
+    return buf
+
+
+def _strategies():
+    return [
+        MomentumStrategy(), MeanReversionStrategy(), BreakoutStrategy(),
+        TrendFollowingStrategy(),
+    ]
+
+
+def test_strategies_match_previous_inline_indicators():
+    candles = _candles()
+    hub = IndicatorHub()
+    for end in range(150, 250, 7):
+        buf = _buffer(candles[:end])
+        klines = buf.frame()
+        view = hub.view("BTCUSDT", buf)
+        close, volume = klines["close"], klines["volume"]
+        expected = {
+            "Momentum": {
+                "momentum": close.iloc[-1] - close.iloc[-20],
+                "avg_vol": volume.iloc[-20:].mean(),
+            },
+            "BreakoutStrategy": {
+                "max_price": close.iloc[-20:].max(),
+                "min_price": close.iloc[-20:].min(),
+                "avg_vol": volume.iloc[-20:].mean(),
+            },
+            "MeanReversion": {
+                "rsi": MeanReversionStrategy().calculate_rsi(close, 14)
+                .iloc[-1],
+                "ema_fast": close.ewm(span=50).mean().iloc[-1],
+                "ema_slow": close.ewm(span=200).mean().iloc[-1],
+                "bb_upper": (
+                    close.rolling(20).mean() + 2 * close.rolling(20).std()
+                ).iloc[-1],
+            },
+        }
+        for cls in (MomentumStrategy, BreakoutStrategy,
+                    MeanReversionStrategy):
+            local = cls().analyze("BTCUSDT", klines, None, "1")
+            strategy = cls()
+            shared = strategy.analyze(
+                "BTCUSDT", klines,
+                view.select(strategy.indicator_requirements()), "1",
+            )
+            assert local["signals"] == shared["signals"]
+            name = strategy.name
+            for key, value in expected[name].items():
+                assert shared["metrics"][key] == pytest.approx(value)
+                assert local["metrics"][key] == pytest.approx(value)
+
+
+def test_trend_following_gets_its_indicators_from_the_hub():
+    buf = _buffer(_candles())
+    hub = IndicatorHub()
+    dispatcher = StrategyDispatcher([TrendFollowingStrategy()])
+    ctx = TickContext(
+        "BTCUSDT", {}, klines=buf.frame(),
+        indicators=hub.view("BTCUSDT", buf), timeframe="1",
+    )
+    (raw,) = dispatcher.dispatch(ctx)
+    metrics = raw["signal"]["metrics"]
+    assert metrics["trend_strength"]["direction"] in (-1, 0, 1)
+    assert 0 < metrics["volatility"] < 1
+    # Bez huba: te same wskaźniki liczone lokalnie
+    direct = TrendFollowingStrategy().analyze(
+        "BTCUSDT", buf.frame(), None, "1"
+    )
+    assert direct["metrics"] == metrics
+    adx = hub.view("BTCUSDT", buf).array(indicator("adx", period=14))
+    assert np.nanmin(adx) >= 0 and np.nanmax(adx) <= 100
+
+
+def test_hub_dedupes_requests_and_invalidates_on_new_candle():
+    candles = _candles(230)
+    buffers = {s: _buffer(candles[:220]) for s in ("BTCUSDT", "ETHUSDT")}
+    hub = IndicatorHub()
+    dispatchers = {s: StrategyDispatcher(_strategies()) for s in buffers}
+
+    def tick():
+        for symbol, buf in buffers.items():
+            ctx = TickContext(
+                symbol, {}, klines=buf.frame(),
+                indicators=hub.view(symbol, buf), timeframe="1",
+            )
+            for raw in dispatchers[symbol].dispatch(ctx):
+                assert "error" not in raw
+
+    tick()
+    # 2 + 3 + 5 + 5 żądań na symbol; wolumen SMA(20) i RSI(14) wspólne
+    assert hub.stats == {"requests": 30, "computes": 26}
+    tick()  # ta sama wersja bufora: same trafienia
+    assert hub.stats == {"requests": 60, "computes": 26}
+    buffers["BTCUSDT"].append(candles[220])
+    tick()
+    assert hub.stats == {"requests": 90, "computes": 39}
+    view = hub.view("BTCUSDT", buffers["BTCUSDT"])
+    spec = indicator("sma", period=20)
+    assert view[spec] is view[spec]
+    np.testing.assert_allclose(
+        view.array(spec)[-1], buffers["BTCUSDT"].close[-20:].mean()
+    )
+
+
+def test_resolve_indicators_fallbacks():
+    frame = pd.DataFrame(_candles(60))
+    reqs = {"fast": indicator("ema", span=5)}
+    given = {"fast": pd.Series([1.0, 2.0])}
+    assert resolve_indicators(given, frame, reqs)["fast"] is given["fast"]
+    local = resolve_indicators({"other": None}, frame, reqs)["fast"]
+    pd.testing.assert_series_equal(
+        local, frame["close"].ewm(span=5).mean()
+    )
+    with pytest.raises(ValueError):
+        indicator("vwap")
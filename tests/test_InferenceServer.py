@@ -0,0 +1,84 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.InferenceServer import InferenceServer
+from models.trend_predictor import TrendPredictor
+from models.volatility_forecaster import VolatilityForecaster
+
+
+def _ohlcv(seed, n=120):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "open": close, "high": close + 1, "low": close - 1,
+        "close": close, "volume": rng.uniform(1, 10, n),
+    })
+
+
+def test_batched_predictions_equal_per_symbol_calls(tmp_path):
+    trend = TrendPredictor(model_path=str(tmp_path / "trend.pkl"))
+    trend.fit(_ohlcv(0, 400))
+    vol = VolatilityForecaster(
+        model_path=str(tmp_path / "vol.pkl"), use_xgb=False,
+        background_training=False,
+    )
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 3, (200, 3))
+    vol.train_model(X, X.sum(axis=1))
+    server = InferenceServer()
+    server.register("trend", trend.predict_trend_batch)
+    server.register("volatility", vol.forecast_batch)
+    frames = [_ohlcv(seed) for seed in range(12)] + [_ohlcv(99, 5)]
+    futures = [
+        (server.submit("trend", trend.batch_row(df)),
+         server.submit("volatility", vol.batch_row(df)))
+        for df in frames
+    ]
+    assert not futures[0][0].done()
+    server.flush()
+    for df, (t, v) in zip(frames, futures):
+        assert t.result() == trend.predict_trend(df)
+        assert v.result() == pytest.approx(vol.forecast_volatility(df))
+    assert futures[-1][0].result() == "SIDE"  # za krótka historia
+    assert server.metrics()["batches"] == 2
+    assert server.metrics()["max_batch_seen"] == len(frames)
+
+
+def test_max_wait_batches_concurrent_callers_and_propagates_errors():
+    calls = []
+
+    def double(rows):
+        calls.append(len(rows))
+        if any(r is None for r in rows):
+            raise ValueError("bad row")
+        return [2 * r for r in rows]
+
+    server = InferenceServer(max_wait=0.05)
+    server.register("double", double)
+    results = {}
+    barrier = threading.Barrier(8)
+
+    def caller(i):
+        barrier.wait()
+        results[i] = server.predict("double", i)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: 2 * i for i in range(8)}
+    assert len(calls) < 8 and sum(calls) == 8
+    with pytest.raises(ValueError):
+        server.predict("double", None)
+    server.close()
+
+    eager = InferenceServer(max_batch=3)
+    eager.register("double", double)
+    futures = [eager.submit("double", i) for i in range(3)]
+    assert [f.result(timeout=0) for f in futures] == [0, 2, 4]
+    with pytest.raises(KeyError):
+        eager.submit("missing", 1)
@@ -0,0 +1,88 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from core.LiveBroadcaster import (
+    ClientBuffer,
+    LiveBroadcaster,
+    sse_format,
+    state_deltas,
+)
+from core.StateSnapshot import (
+    BotStatePublisher,
+    StateSnapshotReader,
+    StateSnapshotWriter,
+)
+
+
+def test_state_deltas_report_only_changes():
+    prev = {
+        "decisions": {"BTC": {"decision": "buy"}},
+        "positions": {"BTC": {"amount": 1}, "ETH": {"amount": 2}},
+        "allocations": {"BTC": {"A": 1.0}},
+        "equity": {"equity": 1000.0},
+        "stats": {"trades": 1},
+    }
+    curr = dict(prev, positions={"BTC": {"amount": 1}},
+                decisions={"BTC": {"decision": "sell"}})
+    events = state_deltas(prev, curr)
+    assert events == [
+        {"type": "decision", "symbol": "BTC", "data": {"decision": "sell"}},
+        {"type": "position", "symbol": "ETH", "data": None},
+    ]
+    assert len(state_deltas(None, prev)) == 6
+    assert sse_format(events[0]).startswith("event: decision\ndata: {")
+
+
+def test_slow_client_gets_coalesced_latest_then_resync():
+    async def scenario():
+        client = ClientBuffer(3, lambda: {"type": "snapshot", "data": 42})
+        for i in range(100):
+            client.offer({"type": "equity", "data": i})
+            client.offer({"type": "decision", "symbol": "BTC", "data": i})
+        batch = await client.get(timeout=0.1)
+        assert batch == [
+            {"type": "equity", "data": 99},
+            {"type": "decision", "symbol": "BTC", "data": 99},
+        ]
+        assert client.stats["coalesced"] == 198
+        for symbol in "ABCD":  # więcej kluczy niż bufor – resync
+            client.offer({"type": "position", "symbol": symbol, "data": 1})
+        assert await client.get(timeout=0.1) == [
+            {"type": "snapshot", "data": 42}
+        ]
+        assert await client.get(timeout=0.01) == []
+
+    asyncio.run(scenario())
+
+
+def test_websocket_snapshot_on_connect_then_deltas(tmp_path, monkeypatch):
+    import api_status
+
+    path = str(tmp_path / "state")
+    monkeypatch.setattr(
+        api_status, "state_reader", StateSnapshotReader(path)
+    )
+    broadcaster = LiveBroadcaster(api_status.bot_state, interval=0.01)
+    monkeypatch.setattr(api_status, "broadcaster", broadcaster)
+    publisher = BotStatePublisher(StateSnapshotWriter(path))
+    publisher.record_equity("1", 1000.0, 0.0)
+    publisher.publish(positions={})
+    client = TestClient(api_status.app)
+    with client.websocket_connect("/ws/live") as ws:
+        snapshot = ws.receive_json()
+        assert snapshot[0]["type"] == "snapshot"
+        assert snapshot[0]["data"]["equity"]["equity"] == 1000.0
+        publisher.record_decision("BTCUSDT", "2", "buy", "{}")
+        publisher.record_equity("2", 1010.0, 10.0)
+        publisher.publish(positions={"BTCUSDT": {"amount": 0.1}})
+        events = {}
+        while len(events) < 4:
+            for event in ws.receive_json():
+                events[(event["type"], event.get("symbol"))] = event
+        assert events[("decision", "BTCUSDT")]["data"]["decision"] == "buy"
+        assert events[("position", "BTCUSDT")]["data"] == {"amount": 0.1}
+        assert events[("equity", None)]["data"]["equity"] == 1010.0
+        assert events[("stats", None)]["data"]["trades"] == 1
+        assert len(broadcaster.clients) == 1
+    assert broadcaster.stats["publishes"] == 2  # jeden odczyt na tick
@@ -0,0 +1,186 @@
+import asyncio
+import time
+
+import pytest
+
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.MarketDataStream import MarketDataStream
+from core.RateLimiter import TokenBucket
+from tools.http_stub_server import _kline, start_stub_server
+from tools.ws_replay_server import start_replay_server, synthetic_frames
+
+MIN = 60_000
+T0 = 1_750_000_000_000 // MIN * MIN
+
+
+@pytest.fixture
+def rest():
+    server, url = start_stub_server()
+    server.now_ms = T0  # świeca T0 formuje się, historia do T0 - 1 min
+    transport = HttpTransport()
+    fetcher = MarketDataFetcher(
+        api_url=f"{url}/v5/market/kline",
+        transport=transport,
+        rate_limiter=TokenBucket(1000),
+    )
+    yield server, fetcher
+    fetcher.close()
+    transport.close()
+    server.shutdown()
+
+
+def _wait(cond, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_stream_buffers_and_wakes_on_candle_close(rest):
+    _, fetcher = rest
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    frames = synthetic_frames(symbols, T0, 5)
+    ws_server, ws_url = start_replay_server(frames, paused=True)
+    stream = MarketDataStream(
+        symbols, "1", ws_url=ws_url, fetcher=fetcher, buffer_size=50,
+        recv_timeout=0.05,
+    )
+
+    async def consume():
+        stream.start()
+        assert stream.wait_ready(5)
+        # historia z REST też budzi konsumenta
+        assert await stream.wait_closed(timeout=5) == symbols
+        ws_server.resume.set()
+        woken = []
+        last = T0 + 4 * MIN
+        while any(stream.last_closed_ts(s) != last for s in symbols):
+            closed = await stream.wait_closed(timeout=5)
+            assert closed, "no candle close within timeout"
+            woken.append(closed)
+        return woken
+
+    try:
+        woken = asyncio.run(consume())
+        assert _wait(lambda: stream.stats["messages"] == len(frames))
+        # szybkie zamknięcia zlewają się w jedno budzenie, ale żaden
+        # symbol nie ginie
+        assert set().union(*woken) == set(symbols)
+        for symbol in symbols:
+            candles = stream.candles(symbol)
+            assert len(candles) == 50
+            assert int(candles[-1]["timestamp"]) == T0 + 4 * MIN
+            ts = [int(c["timestamp"]) for c in candles]
+            assert ts == list(range(ts[0], ts[-1] + MIN, MIN))
+            assert candles[-1]["close"] == float(
+                _kline(T0 + 4 * MIN, MIN)[4]
+            )
+            assert stream.ticker(symbol)["lastPrice"] == _kline(
+                T0 + 4 * MIN, MIN
+            )[4]
+            book = stream.orderbook(symbol)
+            assert book["bids"][0][0] < book["asks"][0][0]
+        assert stream.metrics()["reconnects"] == 0
+    finally:
+        stream.stop()
+        ws_server.shutdown()
+
+
+def test_reconnect_resubscribes_and_backfills_gaps(rest):
+    rest_server, fetcher = rest
+    count = 10
+    frames = synthetic_frames(["BTCUSDT"], T0, count)
+    # Zgubione ramki świecy T0 + 2 min (dziura w trakcie strumienia)
+    frames = [
+        f for f in frames if f["ts"] // MIN * MIN != T0 + 2 * MIN
+    ]
+    per_candle = 5  # 3 kline + ticker + orderbook
+    ws_server, ws_url = start_replay_server(
+        frames, drop_after=5 * per_candle, paused=True
+    )
+    stream = MarketDataStream(
+        ["BTCUSDT"], "1", ws_url=ws_url, fetcher=fetcher,
+        recv_timeout=0.05, reconnect_base=0.05,
+    )
+    try:
+        stream.start()
+        assert stream.wait_ready(5)
+        last = T0 + (count - 1) * MIN
+        rest_server.now_ms = last
+        ws_server.resume.set()
+        assert _wait(lambda: stream.last_closed_ts("BTCUSDT") == last - MIN)
+        assert _wait(lambda: ws_server.stats["connections"] == 2)
+        metrics = stream.metrics()
+        assert metrics["reconnects"] == 1
+        assert metrics["gaps"] == 1
+        assert len(ws_server.stats["subscriptions"]) == 2
+        candles = stream.candles("BTCUSDT")
+        ts = [int(c["timestamp"]) for c in candles]
+        assert ts == list(range(ts[0], last, MIN))
+        assert all(
+            c["close"] == float(_kline(int(c["timestamp"]), MIN)[4])
+            for c in candles
+        )
+        assert int(stream.partial("BTCUSDT")["timestamp"]) == last
+    finally:
+        stream.stop()
+        ws_server.shutdown()
+
+
+def test_gap_backfill_does_not_stall_receive_thread(rest):
+    rest_server, fetcher = rest
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    count = 8
+    frames = [
+        f for f in synthetic_frames(symbols, T0, count)
+        if not (
+            f["topic"].endswith("BTCUSDT")
+            and f["ts"] // MIN * MIN == T0 + 2 * MIN
+        )
+    ]
+    ws_server, ws_url = start_replay_server(frames, paused=True)
+    stream = MarketDataStream(
+        symbols, "1", ws_url=ws_url, fetcher=fetcher, recv_timeout=0.05,
+    )
+    last = T0 + (count - 1) * MIN
+    try:
+        stream.start()
+        assert stream.wait_ready(5)
+        rest_server.now_ms = last
+        rest_server.delays["BTCUSDT"] = 1.0  # wolny REST dla dziury
+        ws_server.resume.set()
+        # ETH płynie dalej, BTC czeka za łataniem dziury
+        assert _wait(lambda: stream.last_closed_ts("ETHUSDT") == last)
+        assert stream.last_closed_ts("BTCUSDT") == T0 + MIN
+        assert _wait(lambda: stream.last_closed_ts("BTCUSDT") == last)
+        assert stream.metrics()["gaps"] == 1
+        ts = [int(c["timestamp"]) for c in stream.candles("BTCUSDT")]
+        assert ts == list(range(ts[0], last + MIN, MIN))
+    finally:
+        stream.stop()
+        ws_server.shutdown()
+
+
+def test_long_gap_backfill_pages_until_first_missing_candle(rest):
+    rest_server, fetcher = rest
+    stream = MarketDataStream(["BTCUSDT"], "1", fetcher=fetcher,
+                              buffer_size=1500)
+    stream._backfill("BTCUSDT")
+    assert stream.last_closed_ts("BTCUSDT") == T0 - MIN
+    # Przerwa dłuższa niż jedna strona REST (1000 świec)
+    end = T0 + 1200 * MIN
+    rest_server.now_ms = end + 5 * MIN
+    requests = rest_server.stats["requests"]
+    assert stream._backfill("BTCUSDT", end=end, bounded=True) == 1201
+    assert rest_server.stats["requests"] - requests == 2
+    ts = [int(c["timestamp"]) for c in stream.candles("BTCUSDT")]
+    assert len(ts) == 1500
+    assert ts == list(range(ts[0], end + MIN, MIN))
+    assert stream.metrics()["unfilled_gaps"] == 0
+    # REST bez początku dziury: dziura zostaje, ale jest zgłoszona
+    rest_server.skip.update({end + MIN, end + 2 * MIN})
+    assert stream._backfill("BTCUSDT", end=end + 4 * MIN, bounded=True) == 2
+    assert stream.metrics()["unfilled_gaps"] == 1
@@ -0,0 +1,134 @@
+import datetime
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from core.db_migrations import MIGRATIONS, upgrade
+from core.db_models import Base, Decision, Equity, MetricsSummary
+from core.db_utils import save_decision_to_db, save_equity_to_db
+from core.db_writer import WriteBehindQueue
+from core.MetricsAggregator import MetricsAggregator, record_batch
+from core.StateSnapshot import StateSnapshotReader, performance_stats
+
+T0 = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _legacy_db(path):
+    # Schemat sprzed migracji: decisions bez kolumn typowanych
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE decisions (id INTEGER PRIMARY KEY, "
+            "timestamp DATETIME NOT NULL, decision VARCHAR(32) NOT NULL, "
+            "details TEXT)"
+        ))
+        rows = [
+            ("buy", json.dumps({"trend": "UP", "volatility": 0.5,
+                                "tick": 7, "symbol": "BTCUSDT"})),
+            ("win", "symbol=ETHUSDT trend=DOWN volatility=1.25 tick=8"),
+            ("hold", None),
+        ]
+        for i, (decision, details) in enumerate(rows):
+            conn.execute(
+                text("INSERT INTO decisions (timestamp, decision, details) "
+                     "VALUES (:ts, :d, :details)"),
+                {"ts": T0 + datetime.timedelta(seconds=i), "d": decision,
+                 "details": details},
+            )
+    return engine
+
+
+def test_migrations_backfill_typed_columns_and_seed_summary(tmp_path):
+    engine = _legacy_db(tmp_path / "legacy.db")
+    assert upgrade(engine) == [v for v, _ in MIGRATIONS]
+    assert upgrade(engine) == []  # idempotentne
+    db = sessionmaker(bind=engine)()
+    rows = db.execute(
+        select(Decision.symbol, Decision.trend, Decision.volatility,
+               Decision.tick).order_by(Decision.id)
+    ).all()
+    assert rows == [
+        ("BTCUSDT", "UP", 0.5, 7),
+        ("ETHUSDT", "DOWN", 1.25, 8),
+        (None, None, None, None),
+    ]
+    summary = db.get(MetricsSummary, 1)
+    assert (summary.decisions_total, summary.wins_total) == (3, 1)
+    assert summary.last_decision == "hold"
+    db.close()
+
+
+def test_writer_hook_keeps_aggregates_in_step(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bot.db'}")
+    upgrade(engine)
+    factory = sessionmaker(bind=engine)
+    writer = WriteBehindQueue(
+        session_factory=factory, flush_interval=60, on_batch=record_batch
+    )
+    monkeypatch.setattr("core.db_writer._writer", writer)
+    aggregator = MetricsAggregator(factory, ttl=0.0, equity_window=50)
+    equity = []
+    for i in range(120):
+        ts = (T0 + datetime.timedelta(seconds=i)).isoformat()
+        decision = "tp" if i % 3 == 0 else "buy"
+        save_decision_to_db(ts, decision, json.dumps({"trend": "UP"}),
+                            symbol="BTCUSDT", volatility=0.1 * i, tick=i)
+        equity.append(1000.0 + (i % 7) * 3 - i * 0.5)
+        save_equity_to_db(ts, equity[-1], 0.0)
+        if i % 40 == 39:
+            writer.flush()
+            stats = aggregator.stats()
+            expected = performance_stats(
+                equity[-50:], i + 1, sum(
+                    1 for j in range(i + 1) if j % 3 == 0
+                )
+            )
+            assert stats == expected
+    writer.close()
+    assert aggregator.last_decision()["decision"] == "buy"
+    recomputes = aggregator.counters["recomputes"]
+    aggregator.stats()
+    assert aggregator.counters["recomputes"] == recomputes  # bez zmian
+    metrics = aggregator.metrics(limit=5)
+    assert [m["tick"] for m in metrics] == [115, 116, 117, 118, 119]
+    assert metrics[-1]["trend"] == "UP"
+    assert metrics[-1]["equity"] == equity[-1]
+
+
+def test_endpoints_send_etag_and_honour_if_none_match(tmp_path, monkeypatch):
+    import api_status
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(Decision(timestamp=T0, decision="win", trend="UP", tick=1))
+    db.add(Equity(timestamp=T0, equity=1010.0, pnl=10.0))
+    db.commit()
+    db.close()
+    upgrade(engine)  # v2 liczy istniejące wiersze do metrics_summary
+    monkeypatch.setattr(
+        api_status, "aggregator", MetricsAggregator(factory, ttl=60)
+    )
+    monkeypatch.setattr(
+        api_status, "state_reader",
+        StateSnapshotReader(str(tmp_path / "missing")),
+    )
+    monkeypatch.setattr(api_status, "check_api", lambda: True)
+    monkeypatch.setattr(api_status, "check_ticks", lambda: True)
+    monkeypatch.setattr(api_status, "check_bot_status", lambda: False)
+    monkeypatch.setattr(api_status, "_health", {"at": 0.0, "value": None})
+    client = TestClient(api_status.app)
+    for path in ("/performance", "/status", "/metrics"):
+        first = client.get(path)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        second = client.get(path, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+    performance = client.get("/performance").json()
+    assert performance["winrate"] == 100.0 and performance["trades"] == 1
+    assert client.get("/metrics").json()[0]["trend"] == "UP"
+    assert client.get("/status").json()["api"] is True
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from core.OnlineStats import OnlineStats, RollingExtrema
+from core.StrategyPerformanceTracker import StrategyPerformanceTracker
+
+
+def _legacy_stats(pnl, window=10):
+    # Dotychczasowe definicje liczone z pełnej listy
+    mean = sum(pnl) / len(pnl)
+    std = (
+        (sum((x - mean) ** 2 for x in pnl) / len(pnl)) ** 0.5
+        if len(pnl) > 1 else 1.0
+    )
+    recent = pnl[-window:]
+    peak, trough = max(recent), min(recent)
+    wins = sum(1 for x in pnl if x > 0)
+    total = sum(pnl)
+    dd = (peak - trough) / peak if peak != 0 else 0.0
+    return {
+        "sharpe": mean / std if std != 0 else 0.0,
+        "pnl": total,
+        "winrate": wins / len(pnl),
+        "drawdown": dd,
+        "score": total * wins / len(pnl) - dd,
+    }
+
+
+def test_online_stats_match_batch_definitions():
+    rng = np.random.default_rng(4)
+    values = rng.normal(0.2, 3.0, 2000)
+    stats = OnlineStats(window=25, ew_alpha=0.05)
+    extrema = RollingExtrema(7)
+    for i, x in enumerate(values):
+        stats.push(x)
+        extrema.push(x)
+        tail = values[max(0, i - 6): i + 1]
+        assert extrema.max == tail.max() and extrema.min == tail.min()
+    assert np.isclose(stats.mean, values.mean())
+    assert np.isclose(stats.std, values.std())
+    assert np.isclose(stats.total, values.sum())
+    assert stats.extrema.max == values[-25:].max()
+    ew = pd.Series(values).ewm(alpha=0.05, adjust=False)
+    assert np.isclose(stats.ew_mean, ew.mean().iloc[-1])
+    assert np.isclose(stats.ew_std ** 2, ew.var(bias=True).iloc[-1])
+
+
+def test_tracker_stats_equal_legacy_full_recompute():
+    rng = np.random.default_rng(9)
+    tracker = StrategyPerformanceTracker(ew_alpha=0.1)
+    history = {"A": [], "B": [], "C": [5.0, 5.0]}
+    for x in history["C"]:
+        tracker.update("C", {"pnl": x})
+    for _ in range(300):
+        for name in ("A", "B"):
+            x = float(rng.normal(0.5, 2.0))
+            history[name].append(x)
+            tracker.update(name, {"pnl": x})
+    stats = tracker.get_all_stats()
+    for name, pnl in history.items():
+        expected = _legacy_stats(pnl)
+        for key, value in expected.items():
+            assert np.isclose(stats[name][key], value), (name, key)
+        assert "ew_sharpe" in stats[name]
+        assert tracker.drawdown(name, window=50) == _legacy_stats(
+            pnl, 50
+        )["drawdown"]
+    assert stats["C"]["sharpe"] == 0.0  # stałe PnL: std = 0
+    assert tracker.performance["A"]["pnl"].typecode == "d"
+    assert tracker.track_pnl("missing") == 0.0
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from ai.PopulationBacktest import evaluate_population, population_scorer
+from ai.StrategyGenome import StrategyGenome, StrategyGenomeEngine
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+SIDE = {"long": 1.0, "short": -1.0, None: 0.0}
+
+
+def _candles(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    # Skoki wolumenu, żeby Momentum faktycznie wchodziło w pozycje
+    volume = rng.uniform(1, 5, n) * np.where(rng.random(n) < 0.2, 6, 1)
+    return pd.DataFrame({"close": close, "volume": volume})
+
+
+def _replay(strategy, data):
+    # Referencja: analyze() świeca po świecy na rosnącej historii
+    positions = []
+    for t in range(len(data)):
+        strategy.analyze("X", data.iloc[: t + 1], None, "1m")
+        positions.append(SIDE[strategy.position])
+    return np.array(positions)
+
+
+def test_batched_positions_match_per_bar_analyze():
+    data = _candles(260)
+    mr_defaults = MeanReversionStrategy().parameters
+    mr_params = [
+        {"bb_period": 10, "bb_std": 1.5, "rsi_period": 7,
+         "trend_ema_fast": 5, "trend_ema_slow": 20},
+        {"bb_period": 20, "bb_std": 2.0, "rsi_period": 14,
+         "trend_ema_fast": 5, "trend_ema_slow": 20},
+        {"bb_period": 10, "bb_std": 2.5, "rsi_period": 14,
+         "trend_ema_fast": 10, "trend_ema_slow": 30},
+    ]
+    batch = evaluate_population(MeanReversionStrategy, mr_params, data)
+    for i, params in enumerate(mr_params):
+        strategy = MeanReversionStrategy(
+            parameters={**mr_defaults, **params}
+        )
+        np.testing.assert_array_equal(
+            batch["positions"][i], _replay(strategy, data)
+        )
+
+    mom_defaults = MomentumStrategy().parameters
+    mom_params = [
+        {"lookback": 5, "entry_threshold": 0.5},
+        {"lookback": 10, "entry_threshold": 1.0},
+        {"lookback": 5, "entry_threshold": 2.0, "use_scalping": False},
+        {"lookback": 15, "entry_threshold": 0.2, "trailing_stop_pct": 0.3},
+    ]
+    batch = evaluate_population(MomentumStrategy, mom_params, data)
+    assert batch["trades"].sum() > 0
+    for i, params in enumerate(mom_params):
+        strategy = MomentumStrategy(parameters={**mom_defaults, **params})
+        positions = _replay(strategy, data)
+        np.testing.assert_array_equal(batch["positions"][i], positions)
+        expected = float(np.sum(positions[:-1] * np.diff(data["close"])))
+        assert np.isclose(batch["pnl"][i], expected)
+
+
+def test_evolve_consumes_batched_scores():
+    data = _candles(400, seed=11)
+    engine = StrategyGenomeEngine(population_size=40)
+    engine.initialize({
+        "lookback": [5, 10, 15, 20], "entry_threshold": [0.2, 0.5, 1.0, 2.0]
+    })
+    scores = engine.evaluate_batch(population_scorer(MomentumStrategy, data))
+    assert scores.shape == (40,)
+    assert [g.score for g in engine.population] == list(scores)
+    best = engine.population[int(np.argmax(scores))]
+    top = engine.select(top_n=1, scores=scores)
+    assert top[0] is best
+    engine.evolve(scores)
+    assert len(engine.population) == 40
+    assert isinstance(engine.population[0], StrategyGenome)
+
+
+def test_momentum_without_volume_matches_per_bar_analyze():
+    data = _candles(120)[["close"]]
+    params = [{"lookback": 5, "entry_threshold": 0.5}]
+    batch = evaluate_population(MomentumStrategy, params, data)
+    strategy = MomentumStrategy(
+        parameters={**MomentumStrategy().parameters, **params[0]}
+    )
+    # Brak wolumenu -> zera, filtr wolumenu nigdy nie przepuszcza
+    np.testing.assert_array_equal(
+        batch["positions"][0], _replay(strategy, data)
+    )
+    assert batch["trades"].sum() == 0
@@ -0,0 +1,53 @@
+# test_RLLearner.py – trening RLOmega w osobnym procesie ucznia
+import time
+
+import numpy as np
+import torch
+
+from ai.RLLearner import RLLearner
+from strategies.rl_omega import RLOmegaStrategy, policy_to_numpy
+from strategies.sim_env import SimulatedTradingEnv, VectorizedTradingEnv
+
+
+def test_learner_process_trains_and_publishes_weights():
+    learner = RLLearner(
+        state_dim=10, batch_size=16, publish_every=5, seed=0
+    )
+    prices = list(100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 400)))
+    strategy = RLOmegaStrategy(
+        sim_env=SimulatedTradingEnv(prices), learner=learner
+    )
+    agent = strategy.agent
+    try:
+        assert learner.running
+        before = policy_to_numpy(agent.model)
+        for step in range(100):
+            result = strategy.analyze(
+                [prices[step], 0.0, 1000.0], use_sim_env=True
+            )
+            assert "sim_reward" in result
+        # Ścieżka decyzji nie trenuje – lokalny bufor pusty
+        assert len(agent.memory) == 0
+        # Paczki z env wektorowego – jedna wiadomość na krok
+        agent.train_vectorized(VectorizedTradingEnv(prices, n_envs=8), 5)
+        assert len(agent.memory) == 0
+        assert learner.stats["sent"] == 100 + 40
+        deadline = time.monotonic() + 60
+        while not agent.sync_policy() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert agent.learner_updates > 0
+        assert agent.epsilon < 1.0
+        after = policy_to_numpy(agent.model)
+        assert any(
+            not np.allclose(before[k], after[k]) for k in before
+        )
+        # Wagi z zewnątrz (federacja) trafiają też do ucznia
+        zeros = {
+            k: torch.zeros_like(v) for k, v in agent.get_policy().items()
+        }
+        strategy.set_policy(zeros)
+        assert learner.metrics()["running"]
+    finally:
+        learner.close()
+    assert not learner.running
+    assert learner.submit(np.zeros(10), 0, 0.0, np.zeros(10), False) is False
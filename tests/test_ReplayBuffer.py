@@ -0,0 +1,63 @@
+# test_ReplayBuffer.py – pierścień NumPy i próbkowanie priorytetowe
+import numpy as np
+import pytest
+
+from ai.ReplayBuffer import ReplayBuffer
+from strategies.rl_omega import RLOmegaAgent
+
+
+def _transitions(buffer, start, n):
+    batch = np.zeros(n, dtype=buffer.dtype)
+    batch["state"] = np.arange(start, start + n)[:, None]
+    batch["action"] = np.arange(start, start + n) % 3
+    batch["reward"] = np.arange(start, start + n)
+    return batch
+
+
+def test_ring_overwrites_oldest_in_place():
+    buffer = ReplayBuffer(5, 2, seed=0)
+    for i in range(3):
+        buffer.add([i, i], i % 3, float(i), [i + 1, i + 1], False)
+    buffer.extend(_transitions(buffer, 3, 4))  # zawija przez koniec
+    assert len(buffer) == 5 and buffer.pos == 2
+    assert sorted(buffer.data["reward"]) == [2, 3, 4, 5, 6]
+    buffer.extend(_transitions(buffer, 100, 12))  # dłuższa niż pojemność
+    assert sorted(buffer.data["reward"]) == [107, 108, 109, 110, 111]
+    batch, idx, weights = buffer.sample(32)
+    assert batch["state"].shape == (32, 2)
+    assert batch["state"].dtype == np.float32
+    assert batch["action"].dtype == np.int64
+    assert np.array_equal(batch["reward"], buffer.data["reward"][idx])
+    assert np.all(weights == 1.0)
+    with pytest.raises(ValueError):
+        ReplayBuffer(5, 2).sample(1)
+
+
+def test_prioritized_sampling_follows_td_errors():
+    buffer = ReplayBuffer(100, 1, alpha=1.0, seed=0)
+    buffer.extend(_transitions(buffer, 0, 100))
+    # Nowe przejścia z maksymalnym priorytetem – na start równomiernie
+    assert np.all(buffer.priorities == 1.0)
+    td = np.full(100, 0.01)
+    td[7] = 10.0
+    buffer.update_priorities(np.arange(100), td)
+    _, idx, weights = buffer.sample(2000, beta=1.0)
+    share = np.mean(idx == 7)
+    assert share == pytest.approx(10 / (10 + 99 * 0.01), abs=0.03)
+    assert weights.max() == 1.0
+    assert weights[idx == 7].max() < weights[idx != 7].min()
+    buffer.add([1.0], 0, 0.0, [1.0], True)
+    assert buffer.priorities[0] == buffer.max_priority == pytest.approx(10.0)
+
+
+def test_agent_replay_uses_ring_buffer():
+    agent = RLOmegaAgent(
+        state_dim=4, memory_size=50, batch_size=8, prioritized_alpha=0.6
+    )
+    for i in range(60):
+        # next_state z env o innym wymiarze – przycinany/dopełniany
+        agent.update([i, 0, 1], i % 3, 1.0, np.ones(6), i % 10 == 9)
+    assert len(agent.memory) == 50
+    assert agent.memory.data["next_state"].shape == (50, 4)
+    assert agent.epsilon < 1.0  # replay przeszedł kroki gradientu
+    assert len(np.unique(agent.memory.priorities)) > 1
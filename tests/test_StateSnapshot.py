@@ -0,0 +1,99 @@
+import multiprocessing
+
+from fastapi.testclient import TestClient
+
+from core.DynamicStrategyRouter import DynamicStrategyRouter
+from core.StateSnapshot import (
+    BotStatePublisher,
+    StateSnapshotReader,
+    StateSnapshotWriter,
+)
+
+
+class _Strategy:
+    def __init__(self, name):
+        self.name = name
+
+
+def _hammer(path, n):
+    writer = StateSnapshotWriter(path, capacity=64 * 1024)
+    for i in range(n):
+        # Długość payloadu zależy od i – rozdarty odczyt nie przejdzie
+        writer.publish({"i": i, "blob": "x" * (i % 5000)})
+    writer.close()
+
+
+def test_seqlock_roundtrip_and_consistent_cross_process_reads(tmp_path):
+    path = str(tmp_path / "state")
+    reader = StateSnapshotReader(path)
+    assert reader.read() is None
+    writer = StateSnapshotWriter(path, capacity=4096)
+    assert reader.read() is None  # plik jest, ale nic nie opublikowano
+    assert writer.publish({"tick": 1, "positions": {}})
+    state = reader.read()
+    assert state["tick"] == 1 and state["age_sec"] >= 0
+    reader.read()
+    assert reader.stats["decodes"] == 1  # bez zmian – bez parsowania JSON
+    assert not writer.publish({"blob": "x" * 5000})  # ponad pojemność
+    assert reader.read()["tick"] == 1
+    # Restart workera: nowy plik, czytelnik przełącza się po inode
+    writer.close()
+    StateSnapshotWriter(path, capacity=4096).publish({"tick": 7})
+    assert reader.read()["tick"] == 7
+
+    ctx = multiprocessing.get_context("spawn")
+    proc = ctx.Process(target=_hammer, args=(path, 20000))
+    proc.start()
+    seen = set()
+    while proc.is_alive() or not seen:
+        state = reader.read()
+        if state is None or "i" not in state:
+            continue
+        assert len(state["blob"]) == state["i"] % 5000
+        seen.add(state["i"])
+    proc.join()
+    assert proc.exitcode == 0
+    assert reader.read()["i"] == 19999
+    assert len(seen) > 1
+
+
+def test_api_reads_worker_snapshot(tmp_path, monkeypatch):
+    import api_status
+
+    path = str(tmp_path / "state")
+    monkeypatch.setattr(
+        api_status, "state_reader", StateSnapshotReader(path)
+    )
+    monkeypatch.setattr(api_status, "check_api", lambda: True)
+    monkeypatch.setattr(api_status, "check_ticks", lambda: True)
+    publisher = BotStatePublisher(StateSnapshotWriter(path))
+    router = DynamicStrategyRouter([_Strategy("Momentum"), _Strategy("Grid")])
+    publisher.record_decision("BTCUSDT", "1700000000000", "buy", "{}")
+    for equity in (1000.0, 1010.0, 990.0, 1020.0):
+        publisher.record_equity("1700000000000", equity, 0.0)
+    publisher.publish(
+        positions={"BTCUSDT": {"side": "BUY", "amount": 0.1}},
+        routers={"BTCUSDT": router},
+        strategies={"Momentum", "Grid"},
+        extra={
+            "db_writer": {"queue_depth": 0},
+            "scheduler": {"run": 4, "skipped": 36},
+        },
+    )
+    client = TestClient(api_status.app)
+    assert client.get("/positions").json() == {
+        "BTCUSDT": {"side": "BUY", "amount": 0.1}
+    }
+    assert client.get("/positions/BTCUSDT").json()["side"] == "BUY"
+    strategy = client.get("/strategy").json()
+    assert strategy["strategies"] == ["Grid", "Momentum"]
+    assert strategy["last_allocations"] == {"Momentum": 0.5, "Grid": 0.5}
+    performance = client.get("/performance").json()
+    assert performance["trades"] == 1
+    assert performance["drawdown"] == 1.98
+    status = client.get("/status").json()
+    assert status["bot"] is True
+    assert status["last_decision"]["decision"] == "buy"
+    assert status["final_balance"] == 1020.0
+    assert status["db_writer"] == {"queue_depth": 0}
+    assert status["scheduler"] == {"run": 4, "skipped": 36}
@@ -0,0 +1,67 @@
+# test_StrategyAdapter.py – plany wywołań analyze() i trwała pętla asyncio
+from core.StrategyAdapter import (
+    StrategyCallPlan,
+    StrategyDispatcher,
+    TickContext,
+)
+
+
+class KlinesStrategy:
+    name = "Klines"
+
+    def analyze(self, symbol, klines, timeframe, custom=None, **kwargs):
+        return {"symbol": symbol, "n": len(klines), "tf": timeframe,
+                "custom": custom, "kwargs": kwargs}
+
+
+class AsyncStrategy:
+    name = "Async"
+
+    def __init__(self):
+        self.loops = set()
+
+    async def analyze(self, market_data):
+        import asyncio
+
+        self.loops.add(id(asyncio.get_running_loop()))
+        return {"price": market_data["price"]}
+
+
+class NoAnalyze:
+    name = "Broken"
+
+
+def _ctx():
+    return TickContext(
+        symbol="BTCUSDT",
+        market_state={"price": 10.0, "custom": "x"},
+        klines=[{"close": 10.0}] * 3,
+        timeframe="1",
+        price=10.0,
+    )
+
+
+def test_call_plan_maps_parameters_once():
+    plan = StrategyCallPlan(KlinesStrategy())
+    assert [p for p, _ in plan.params] == [
+        "symbol", "klines", "timeframe", "custom"
+    ]
+    kwargs = plan.kwargs(_ctx())
+    assert kwargs["symbol"] == "BTCUSDT"
+    assert kwargs["custom"] == "x"  # z market_state
+
+
+def test_dispatcher_runs_sync_async_and_reports_errors():
+    async_strategy = AsyncStrategy()
+    dispatcher = StrategyDispatcher(
+        [KlinesStrategy(), async_strategy, NoAnalyze()]
+    )
+    for _ in range(3):
+        raw = dispatcher.dispatch(_ctx())
+    dispatcher.close()
+    assert raw[0]["signal"]["n"] == 3
+    assert raw[0]["signal"]["kwargs"] == {}
+    assert raw[1]["signal"] == {"price": 10.0}
+    assert raw[2]["error"] == "No analyze method"
+    # Jedna trwała pętla zamiast asyncio.run co tick
+    assert len(async_strategy.loops) == 1
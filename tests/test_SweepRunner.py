@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.StrategyGenome import StrategyGenomeEngine
+from ai.SweepRunner import SweepRunner, param_grid, walk_forward_splits
+from core.CandleStore import CandleStore
+from core.RiskManager import RiskManager
+from strategies.SmaCrossStrategy import SmaCrossStrategy
+from utils.backtesting import run_backtest
+
+RISK = {"max_drawdown": 0.5, "sl_pct": 1.0, "tp_pct": 1.5}
+
+
+def _random_walk(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.4, n))
+    return pd.DataFrame({
+        "timestamp": np.arange(n, dtype=np.int64) * 60_000,
+        "open": close, "high": close + 0.2, "low": close - 0.2,
+        "close": close, "volume": np.ones(n),
+    })
+
+
+def _expected(params, frame, start, stop):
+    result = run_backtest(
+        SmaCrossStrategy(**params),
+        frame.iloc[start:stop].reset_index(drop=True),
+        risk_manager=RiskManager(**RISK),
+    )
+    return result["final_balance"] - 1000
+
+
+def test_walk_forward_sweep_matches_sequential_backtests():
+    data = _random_walk(3000)
+    splits = walk_forward_splits(len(data), n_splits=3)
+    assert splits[0] == (0, 750, 750, 1500)
+    assert splits[-1] == (1500, 2250, 2250, 3000)
+    genomes = param_grid({"fast": [3, 5, 8], "slow": [20, 40]})
+    with SweepRunner(
+        SmaCrossStrategy, data, max_workers=2, splits=splits,
+        risk_config=RISK,
+    ) as runner:
+        done = list(runner.run(genomes))
+        assert sorted(id(g) for g in done) == sorted(id(g) for g in genomes)
+        for genome in genomes:
+            expected = [
+                _expected(genome.params, data, s[2], s[3]) for s in splits
+            ]
+            assert np.isclose(genome.score, np.mean(expected))
+            assert np.isclose(genome.pnl, np.sum(expected))
+        report = runner.walk_forward_report(genomes)
+        assert len(report["splits"]) == 3
+        first = report["splits"][0]
+        assert np.isclose(
+            first["test_score"],
+            _expected(first["params"], data, 750, 1500),
+        )
+
+
+def test_series_memmap_input_and_genome_engine(tmp_path):
+    data = _random_walk(1200, seed=5)
+    series = CandleStore(root=str(tmp_path)).series("BTCUSDT", "1")
+    series.merge({c: data[c].to_numpy() for c in data.columns})
+    engine = StrategyGenomeEngine(population_size=4)
+    engine.initialize({"fast": [3, 5], "slow": [15, 30]})
+    with SweepRunner(
+        SmaCrossStrategy, series, max_workers=2, risk_config=RISK
+    ) as runner:
+        engine.evaluate(runner=runner)
+    for genome in engine.population:
+        assert np.isclose(
+            genome.score, _expected(genome.params, data, 0, len(data))
+        )
+
+
+def test_string_timestamps_are_shared_as_int64():
+    data = _random_walk(300)
+    frame = data.assign(timestamp=data["timestamp"].astype(str))
+    iso = data.assign(
+        timestamp=pd.to_datetime(data["timestamp"], unit="ms").astype(str)
+    )
+    for candles in (frame, iso):
+        with SweepRunner(
+            SmaCrossStrategy, candles, max_workers=2, risk_config=RISK,
+        ) as runner:
+            (genome,) = runner.run(param_grid({"fast": [3], "slow": [20]}))
+            assert np.isclose(
+                genome.score, _expected(genome.params, data, 0, 300)
+            )
+            ts = np.load(os.path.join(runner.spec[1], "timestamp.npy"))
+            assert ts.dtype == np.int64
+            assert (ts == data["timestamp"].to_numpy()).all()
+    with pytest.raises(ValueError, match="object dtype"):
+        SweepRunner(
+            SmaCrossStrategy, data.assign(close=data["close"].astype(object))
+        )
@@ -3,6 +3,7 @@ test_backtester.py – test backtestów na danych OHLCV
 """
 
 import pandas as pd
+import pytest
 from strategies.UniversalStrategy import UniversalStrategy
 from utils.backtesting import backtest_strategy, run_backtest
 
@@ -33,3 +34,54 @@ def test_run_backtest():
     data = pd.DataFrame({"close": [], "open": [], "timestamp": []})
     result = run_backtest(strategy, data)
     assert isinstance(result, dict)
+
+
+def _random_walk(n, seed=7):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return pd.DataFrame(
+        {
+            "close": close,
+            "open": close,
+            "timestamp": [f"t{i}" for i in range(n)],
+        }
+    )
+
+
+def test_vectorized_matches_windowed_path():
+    from core.RiskManager import RiskManager
+    from strategies.SmaCrossStrategy import SmaCrossStrategy
+
+    class PerBarSmaCross(SmaCrossStrategy):
+        # Bez hooka generate_signals -> ścieżka okienkowa
+        generate_signals = None
+
+    data = _random_walk(600)
+    rm = RiskManager(max_drawdown=0.5, sl_pct=1.0, tp_pct=1.0)
+    fast = run_backtest(SmaCrossStrategy(), data, risk_manager=rm)
+    slow = run_backtest(PerBarSmaCross(), data, risk_manager=rm)
+    assert fast["n_trades"] > 0
+    assert fast["trades"] == slow["trades"]
+    assert fast["final_balance"] == slow["final_balance"]
+    assert fast["winrate"] == slow["winrate"]
+
+
+def test_run_backtest_sl_tp_fills():
+    from core.RiskManager import RiskManager
+
+    # Wejście na 100, TP (+1%) na świecy 2, kolejne wejście i SL (-0.5%)
+    data = pd.DataFrame(
+        {
+            "close": [100.0, 100.5, 101.0, 101.0, 100.4, 100.6],
+            "timestamp": list(range(6)),
+        }
+    )
+    rm = RiskManager(max_drawdown=0.9, trailing_stop_pct=0.0)
+    result = run_backtest(UniversalStrategy(), data, risk_manager=rm)
+    sells = [t for t in result["trades"] if t["action"] == "sell"]
+    assert [t["timestamp"] for t in sells] == [2, 4]
+    assert result["n_trades"] == 2
+    assert result["winrate"] == 0.5
+    assert result["final_balance"] == pytest.approx(1000.4)
@@ -0,0 +1,133 @@
+import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from core.db_migrations import upgrade
+from core.db_models import Decision, Equity, LogEntry
+from core.db_retention import (
+    RetentionScheduler, purge_before, purge_expired
+)
+
+T0 = datetime.datetime(2024, 1, 1)
+
+
+def _db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    upgrade(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def test_v3_adds_columns_backfill_and_indexes_to_v2_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v2.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE decisions (id INTEGER PRIMARY KEY, "
+            "timestamp DATETIME NOT NULL, decision VARCHAR(32) NOT NULL, "
+            "details TEXT, symbol VARCHAR(32), trend VARCHAR(32), "
+            "volatility FLOAT, tick INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO decisions (timestamp, decision, details) VALUES "
+            "('2024-01-01 00:00:00', 'buy', "
+            "'strategy=Momentum signal=buy allocation=0.4')"
+        ))
+        conn.execute(text(
+            "CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, "
+            "applied_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO schema_migrations VALUES "
+            "(1, '2024-01-01'), (2, '2024-01-01')"
+        ))
+    assert upgrade(engine) == [3]
+    indexes = {
+        table: {ix["name"] for ix in inspect(engine).get_indexes(table)}
+        for table in ("decisions", "equity", "logs")
+    }
+    assert "ix_decisions_symbol_timestamp_id" in indexes["decisions"]
+    assert "ix_equity_timestamp_id" in indexes["equity"]
+    assert "ix_logs_event_timestamp_id" in indexes["logs"]
+    with engine.connect() as conn:
+        row = conn.execute(select(
+            Decision.strategy, Decision.signal, Decision.allocation
+        )).one()
+    assert tuple(row) == ("Momentum", "buy", 0.4)
+
+
+def test_keyset_pages_walk_ties_and_symbol_filter(tmp_path, monkeypatch):
+    import api_status
+
+    engine, factory = _db(tmp_path)
+    db = factory()
+    for i in range(25):
+        # po dwa symbole na ten sam timestamp – kursor musi rozdzielić id
+        ts = T0 + datetime.timedelta(minutes=i // 2)
+        symbol = ("BTCUSDT", "ETHUSDT")[i % 2]
+        db.add(Decision(timestamp=ts, decision="hold", symbol=symbol))
+        db.add(Equity(timestamp=ts, equity=1000.0 + i, pnl=0.0))
+        db.add(LogEntry(timestamp=ts, event="tick", details=str(i)))
+    db.commit()
+    db.close()
+    monkeypatch.setattr(api_status, "SessionLocal", factory)
+    client = TestClient(api_status.app)
+
+    def walk(path, **params):
+        seen, params = [], dict(params, limit=4)
+        while True:
+            resp = client.get(path, params=params)
+            assert resp.status_code == 200
+            seen.append(resp.json())
+            if "x-next-before" not in resp.headers:
+                return seen
+            params["before"] = resp.headers["x-next-before"]
+            params["before_id"] = resp.headers["x-next-before-id"]
+
+    pages = walk("/equity")
+    values = [row["equity"] for page in reversed(pages) for row in page]
+    assert values == [1000.0 + i for i in range(25)]
+    pages = walk("/decisions", symbol="ETHUSDT")
+    rows = [row for page in reversed(pages) for row in page]
+    assert len(rows) == 12 and {r["symbol"] for r in rows} == {"ETHUSDT"}
+    pages = walk("/logs", event="tick")
+    details = [row["details"] for page in pages for row in page]
+    assert details == [str(i) for i in reversed(range(25))]
+
+
+def test_retention_purges_old_rows_in_batches(tmp_path):
+    engine, factory = _db(tmp_path)
+    db = factory()
+    for i in range(30):
+        ts = T0 + datetime.timedelta(days=i)
+        db.add(Decision(timestamp=ts, decision="hold"))
+        db.add(Equity(timestamp=ts, equity=1.0, pnl=0.0))
+    db.add(LogEntry(timestamp=datetime.datetime.now(), event="recent"))
+    db.commit()
+    db.close()
+    deleted = purge_before(factory, T0 + datetime.timedelta(days=20), batch=7)
+    assert deleted == {"decisions": 20, "equity": 20, "logs": 0}
+    assert purge_expired(factory, days=0) == {}
+    assert purge_expired(factory, days=1) == {
+        "decisions": 10, "equity": 10, "logs": 0
+    }
+    db = factory()
+    assert db.query(LogEntry).count() == 1
+    db.close()
+
+
+def test_retention_scheduler_logs_failures_and_keeps_running(caplog):
+    results = [RuntimeError("db locked"), {"decisions": 3}]
+
+    def purge():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    scheduler = RetentionScheduler(interval_sec=0.01, purge=purge)
+    assert scheduler.run_once() is None
+    assert "db_retention: purge failed" in caplog.text
+    assert "db locked" in caplog.text
+    assert scheduler.run_once() == {"decisions": 3}
+    assert scheduler.failures == 1 and scheduler.runs == 2
@@ -0,0 +1,111 @@
+import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.db_models import Base, Decision, Equity, LogEntry
+from core.db_writer import WriteBehindQueue
+
+
+def _session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_write_behind_batches_and_drains(tmp_path):
+    factory = _session_factory(tmp_path)
+    writer = WriteBehindQueue(
+        session_factory=factory, flush_size=50, flush_interval=0.05
+    )
+    now = datetime.datetime.now()
+    for i in range(120):
+        writer.put(Decision, {"timestamp": now, "decision": "buy",
+                              "details": str(i)})
+        writer.put(Equity, {"timestamp": now, "equity": 1000.0 + i,
+                            "pnl": 0.0})
+    writer.put(LogEntry, {"timestamp": now, "event": "tick",
+                          "details": None})
+    writer.close()
+    db = factory()
+    try:
+        assert db.query(Decision).count() == 120
+        assert db.query(Equity).count() == 120
+        assert db.query(LogEntry).count() == 1
+    finally:
+        db.close()
+    metrics = writer.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["flushed"] == 241
+    assert metrics["dropped"] == 0
+    assert metrics["flushes"] >= 5
+    assert metrics["max_flush_latency_ms"] > 0
+
+
+def test_write_behind_backpressure(tmp_path):
+    factory = _session_factory(tmp_path)
+    now = datetime.datetime.now()
+    for policy, kept in (("drop_oldest", "4"), ("drop_newest", "2")):
+        writer = WriteBehindQueue(
+            session_factory=factory, max_queue=3, flush_size=100,
+            flush_interval=60, backpressure=policy,
+        )
+        results = [
+            writer.put(LogEntry, {"timestamp": now, "event": policy,
+                                  "details": str(i)})
+            for i in range(5)
+        ]
+        assert writer.metrics()["dropped"] == 2
+        assert results[-1] is (policy == "drop_oldest")
+        writer.close()
+        db = factory()
+        try:
+            rows = db.query(LogEntry).filter_by(event=policy).all()
+            assert len(rows) == 3
+            assert max(r.details for r in rows) == kept
+        finally:
+            db.close()
+
+
+def test_failed_flush_is_retried_and_decisions_are_not_evicted(
+    tmp_path, caplog
+):
+    factory = _session_factory(tmp_path)
+    calls = []
+
+    def flaky_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise_on_commit = factory()
+
+            def fail():
+                raise RuntimeError("db down")
+
+            raise_on_commit.commit = fail
+            return raise_on_commit
+        return factory()
+
+    now = datetime.datetime.now()
+    writer = WriteBehindQueue(
+        session_factory=flaky_factory, max_queue=3, flush_size=100,
+        flush_interval=60, retry_delay=0.0, blocking_models=(Decision,),
+        block_timeout=0.05,
+    )
+    writer.put(Decision, {"timestamp": now, "decision": "buy"})
+    for i in range(3):
+        writer.put(LogEntry, {"timestamp": now, "event": "e",
+                              "details": str(i)})
+    # Kolejka pełna: wypchnięty najstarszy log, nie decyzja
+    assert writer.put(Decision, {"timestamp": now, "decision": "sell"})
+    assert "dropped a LogEntry row" in caplog.text
+    writer.close()
+    metrics = writer.metrics()
+    assert metrics["retries"] == 1 and metrics["failed"] == 0
+    assert metrics["dropped"] == 2 and metrics["flushed"] == 3
+    db = factory()
+    try:
+        assert sorted(d.decision for d in db.query(Decision)) == [
+            "buy", "sell"
+        ]
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.feature_engine import TREND_FEATURES, FeatureEngine
+from models.trend_predictor import TrendPredictor
+from models.volatility_forecaster import VolatilityForecaster
+
+
+def _candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 25, n))
+    spread = np.abs(rng.normal(0, 15, n))
+    return pd.DataFrame(
+        {
+            "timestamp": 1_700_000_000_000 + 60_000 * np.arange(n),
+            "open": close + rng.normal(0, 5, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 50, n),
+        }
+    )
+
+
+def test_incremental_features_match_pandas(tmp_path):
+    df = _candles(400)
+    predictor = TrendPredictor(model_path=str(tmp_path / "trend.pkl"))
+    forecaster = VolatilityForecaster(
+        model_path=str(tmp_path / "vol.pkl"), use_xgb=False
+    )
+    expected = predictor._extract_features(df)
+    assert tuple(expected.columns) == TREND_FEATURES
+    engine = FeatureEngine()
+    for i in range(len(df)):
+        # Okno live: ostatnie 50 świec, z nakładaniem między tickami
+        state = engine.sync("BTCUSDT", df.iloc[max(0, i - 49): i + 1])
+        feats = state.trend_features()
+        if i in expected.index:
+            np.testing.assert_allclose(
+                feats, expected.loc[i].values, rtol=1e-9, atol=1e-9
+            )
+        else:
+            assert feats is None
+        if i % 37 == 0:
+            np.testing.assert_allclose(
+                state.volatility_features(),
+                forecaster.extract_features(df.iloc[: i + 1]),
+                rtol=1e-9,
+                atol=1e-9,
+            )
+
+
+def test_sync_handles_newest_first_and_revised_candle():
+    df = _candles(60, seed=1)
+    engine = FeatureEngine()
+    records = df.to_dict("records")
+    engine.sync("ETHUSDT", records[:-1][::-1])
+    revised = dict(records[-1])
+    engine.sync("ETHUSDT", [revised] + records[-11:-1][::-1])
+    revised["close"] += 40.0
+    revised["high"] = max(revised["high"], revised["close"])
+    state = engine.sync("ETHUSDT", [revised] + records[-11:-1][::-1])
+    df.iloc[-1] = pd.Series(revised)
+    predictor = TrendPredictor.__new__(TrendPredictor)
+    expected = predictor._extract_features(df).iloc[-1].values
+    np.testing.assert_allclose(
+        state.trend_features(), expected, rtol=1e-9, atol=1e-9
+    )
+    assert state.n == 60
+
+
+def test_sync_rejects_candles_without_timestamp():
+    records = _candles(30, seed=2).drop(columns="timestamp")
+    engine = FeatureEngine()
+    # Bez znacznika czasu każdy sync stosowałby całe okno od nowa
+    with pytest.raises(ValueError):
+        engine.sync("SOLUSDT", records.to_dict("records"))
+    with pytest.raises(ValueError):
+        engine.update("SOLUSDT", records.to_dict("records")[0])
+    assert engine.get("SOLUSDT").n == 0
+    # DataFrame bez kolumny timestamp: kluczem jest indeks
+    state = engine.sync("SOLUSDT", records)
+    assert engine.sync("SOLUSDT", records).n == state.n == 30
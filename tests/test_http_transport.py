@@ -0,0 +1,53 @@
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.OrderExecutor import OrderExecutor
+from tools.http_stub_server import start_stub_server
+
+
+def test_keep_alive_and_fetcher_parsing():
+    server, url = start_stub_server()
+    transport = HttpTransport(pool_maxsize=2)
+    try:
+        fetcher = MarketDataFetcher(
+            api_url=f"{url}/v5/market/kline",
+            throttle_sec=0,
+            transport=transport,
+        )
+        for _ in range(5):
+            candles = fetcher.get_ohlcv("BTCUSDT", "1", limit=3)
+            assert len(candles) == 3
+            assert set(candles[0]) == {
+                "timestamp", "open", "high", "low", "close", "volume"
+            }
+        # Jedno połączenie keep-alive na wszystkie zapytania
+        assert server.stats == {"requests": 5, "connections": 1}
+    finally:
+        transport.close()
+        server.shutdown()
+
+
+def test_retry_backoff_only_for_idempotent_requests():
+    server, url = start_stub_server(fail_first=2)
+    transport = HttpTransport(backoff_base=0.5, backoff_cap=0.8)
+    delays = []
+    transport.sleep = delays.append
+    try:
+        resp = transport.get(f"{url}/v5/market/kline", retries=3)
+        assert resp.status_code == 200
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 0.8
+        server.fail_first = 1
+        executor = OrderExecutor(
+            api_url=f"{url}/v5/order/create", transport=transport
+        )
+        resp = transport.post(executor.api_url, json={})
+        assert resp.status_code == 503
+        assert len(delays) == 2
+        result = executor.execute_order(
+            {"symbol": "BTCUSDT", "side": "BUY", "amount": 1, "price": 1},
+            throttle_sec=0,
+        )
+        assert result == {"retCode": 0, "retMsg": "OK"}
+    finally:
+        transport.close()
+        server.shutdown()
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from models.model_lifecycle import volatility_training_set
+from models.volatility_forecaster import VolatilityForecaster
+
+
+def _candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    spread = np.abs(rng.normal(0, 0.5, n))
+    return pd.DataFrame(
+        {"close": close, "high": close + spread, "low": close - spread}
+    )
+
+
+def test_training_set_matches_per_window_loop(tmp_path):
+    df = _candles(60)
+    forecaster = VolatilityForecaster(
+        model_path=str(tmp_path / "vol.pkl"), use_xgb=False
+    )
+    X_loop, y_loop = [], []
+    for i in range(7, len(df)):
+        window = df.iloc[i - 7: i + 1]
+        X_loop.append(forecaster.extract_features(window))
+        y_loop.append(window["close"].rolling(window=7).std().iloc[-1])
+    X, y = volatility_training_set(df)
+    np.testing.assert_allclose(X, np.array(X_loop), rtol=1e-10)
+    np.testing.assert_allclose(y, np.array(y_loop), rtol=1e-10)
+    assert volatility_training_set(df.iloc[:7])[0].shape == (0, 3)
+
+
+def test_cold_start_serves_fallback_then_swaps_model(tmp_path):
+    df = _candles(200, seed=1)
+    model_path = str(tmp_path / "vol.pkl")
+    forecaster = VolatilityForecaster(model_path=model_path, use_xgb=False)
+    assert not forecaster.is_trained
+    vol = forecaster.forecast_volatility(df)
+    assert vol == df["close"].rolling(7).std().iloc[-1]
+    assert forecaster.lifecycle.wait(timeout=120)
+    assert os.path.exists(model_path)
+    assert isinstance(forecaster.forecast_volatility(df), float)
+    metrics = forecaster.metrics()
+    assert metrics["model_ready"]
+    assert metrics["trainings"] == 1
+    assert metrics["fallback_calls"] == 1
+    assert metrics["train_time_s"] > 0
+    assert metrics["cold_start_latency_s"] >= metrics["train_time_s"]
+    forecaster.lifecycle.close()
+    reloaded = VolatilityForecaster(model_path=model_path, use_xgb=False)
+    assert reloaded.is_trained
@@ -0,0 +1,161 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from xgboost import XGBClassifier, XGBRegressor
+
+from ai.OnlineTrainer import OnlineTrainer
+from models.model_export import export_model, to_runtime
+from models.np_runtime import (
+    NumpyNet,
+    TreeEnsemble,
+    load_runtime,
+    runtime_choice,
+    runtime_path,
+)
+from models.trend_predictor import TrendPredictor, deep_trend_net
+from models.volatility_forecaster import VolatilityForecaster, deep_vol_net
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _data(seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    return X, rng.choice([-1, 0, 1], n), (X[:, 0] > 0).astype(int)
+
+
+@pytest.mark.parametrize("make, target, nan", [
+    (lambda: RandomForestClassifier(30, random_state=0), "multi", False),
+    (lambda: RandomForestRegressor(20, random_state=0), "reg", False),
+    (lambda: GradientBoostingClassifier(n_estimators=30), "binary", False),
+    (lambda: GradientBoostingClassifier(n_estimators=20), "multi", False),
+    (lambda: XGBRegressor(n_estimators=30), "reg", True),
+    (lambda: XGBClassifier(n_estimators=20), "binary", True),
+    (lambda: XGBClassifier(n_estimators=20), "multi", True),
+])
+def test_exported_trees_match_native(tmp_path, make, target, nan):
+    X, y_multi, y_bin = _data()
+    if nan:
+        X[::17, 1] = np.nan  # XGBoost: gałąź domyślna dla braków
+    model = make()
+    if target == "reg":
+        y = np.nan_to_num(X).sum(axis=1)
+    elif target == "binary":
+        y = y_bin
+    elif isinstance(model, XGBClassifier):
+        y = y_multi + 1  # XGBoost wymaga etykiet 0..K-1
+    else:
+        y = y_multi
+    model.fit(X, y)
+    path = export_model(model, str(tmp_path / "model.npmodel"))
+    runtime = load_runtime(path)
+    assert isinstance(runtime, TreeEnsemble)
+    assert isinstance(runtime.arrays["threshold"], np.memmap)
+    if target == "reg":
+        np.testing.assert_allclose(
+            runtime.predict(X), model.predict(X), rtol=1e-5, atol=1e-5
+        )
+    else:
+        np.testing.assert_array_equal(runtime.predict(X), model.predict(X))
+        np.testing.assert_allclose(
+            runtime.predict_proba(X), model.predict_proba(X), atol=1e-6
+        )
+    copy = pickle.loads(pickle.dumps(runtime))
+    np.testing.assert_array_equal(copy.predict(X[:5]), runtime.predict(X[:5]))
+
+
+def test_exported_nets_match_torch(tmp_path):
+    X = np.random.default_rng(1).normal(size=(64, 11)).astype(np.float32)
+    for net, inputs in (
+        (deep_trend_net(input_dim=11), torch.from_numpy(X).unsqueeze(1)),
+        (deep_vol_net(), torch.from_numpy(X[:, :3])),
+    ):
+        net.eval()
+        with torch.no_grad():
+            expected = net(inputs).numpy()
+        path = export_model(net, str(tmp_path / "net.npmodel"))
+        runtime = load_runtime(path)
+        assert isinstance(runtime, NumpyNet)
+        got = runtime.forward(inputs.squeeze(1).numpy())
+        np.testing.assert_allclose(got, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_predictors_select_numpy_runtime(tmp_path):
+    rng = np.random.default_rng(2)
+    close = 100 + np.cumsum(rng.normal(0, 1, 300))
+    df = pd.DataFrame({
+        "open": close, "high": close + 1, "low": close - 1,
+        "close": close, "volume": rng.uniform(1, 10, 300),
+    })
+    trend_path = str(tmp_path / "trend.pkl")
+    native = TrendPredictor(model_path=trend_path)
+    native.fit(df)
+    fast = TrendPredictor(model_path=trend_path, runtime="numpy")
+    assert isinstance(fast.model, TreeEnsemble)
+    rows = [native.batch_row(df.iloc[:n]) for n in range(60, 300, 20)]
+    assert fast.predict_trend_batch(rows) == native.predict_trend_batch(rows)
+
+    vol_path = str(tmp_path / "vol.pkl")
+    vol = VolatilityForecaster(
+        model_path=vol_path, use_xgb=True, background_training=False
+    )
+    X = rng.uniform(0, 3, (200, 3))
+    vol.train_model(X, X.sum(axis=1))
+    vol_fast = VolatilityForecaster(model_path=vol_path, runtime="numpy")
+    assert isinstance(vol_fast.model, TreeEnsemble)
+    rows = list(X[:20])
+    np.testing.assert_allclose(
+        vol_fast.forecast_batch(rows), vol.forecast_batch(rows), rtol=1e-5
+    )
+
+    trainer = OnlineTrainer(
+        n_features=2, model_path=str(tmp_path / "online.pkl")
+    )
+    for i in range(40):
+        trainer.add_sample([i % 7, i % 3], int(i % 7 > 3))
+    reloaded = OnlineTrainer(
+        n_features=2, model_path=trainer.model_path, runtime="numpy"
+    )
+    reloaded.X, reloaded.y = trainer.X, trainer.y
+    assert isinstance(reloaded.model, TreeEnsemble)
+    assert reloaded.predict([5, 1]) == trainer.predict([5, 1])
+
+    # Brak eksportu -> model natywny; nieznany runtime -> błąd
+    os.remove(runtime_path(vol_path))
+    assert not isinstance(
+        VolatilityForecaster(model_path=vol_path, runtime="numpy").model,
+        TreeEnsemble,
+    )
+    with pytest.raises(ValueError):
+        runtime_choice("onnx")
+
+
+def test_to_runtime_rejects_unknown_models():
+    with pytest.raises(ValueError):
+        to_runtime(object())
+
+
+def test_prediction_modules_import_without_training_libraries():
+    code = (
+        "import sys\n"
+        "import models.trend_predictor, models.volatility_forecaster\n"
+        "import ai.OnlineTrainer, ai.PreRiskPredictor\n"
+        "print([m for m in ('torch', 'sklearn', 'xgboost')"
+        " if m in sys.modules])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+        text=True, check=True,
+    )
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from core.HttpTransport import AsyncHttpTransport, HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.RateLimiter import TokenBucket
+from tools.http_stub_server import start_stub_server
+
+
+def test_token_bucket_rate_and_burst():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.acquire(timeout=0.001) is False
+    for _ in range(10):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 5 z burstu + 10 po 20 ms
+    assert 0.17 <= elapsed < 0.5
+
+
+def test_get_ohlcv_many_streams_in_completion_order():
+    server, url = start_stub_server(delays={"SLOWUSDT": 0.5}, delay=0.05)
+    transport = HttpTransport()
+    fetcher = MarketDataFetcher(
+        api_url=f"{url}/v5/market/kline",
+        transport=transport,
+        rate_limiter=TokenBucket(rate=1000),
+        max_workers=8,
+    )
+    symbols = ["SLOWUSDT"] + [f"S{i}USDT" for i in range(7)]
+    try:
+        start = time.monotonic()
+        results = list(fetcher.get_ohlcv_many(symbols, "1", limit=5))
+        elapsed = time.monotonic() - start
+        assert sorted(s for s, _ in results) == sorted(symbols)
+        assert all(len(candles) == 5 for _, candles in results)
+        assert results[-1][0] == "SLOWUSDT"
+        assert elapsed < 0.5 + 0.05 * len(symbols)
+    finally:
+        fetcher.close()
+        transport.close()
+        server.shutdown()
+
+
+class _CountingBucket(TokenBucket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def _reserve(self, tokens, timeout):
+        self.calls += 1
+        return super()._reserve(tokens, timeout)
+
+
+def test_every_retry_goes_through_the_bucket():
+    server, url = start_stub_server(fail_first=2)
+    transport = HttpTransport(backoff_base=0.001)
+    async_transport = AsyncHttpTransport(backoff_base=0.001)
+    bucket = _CountingBucket(rate=1000)
+    fetcher = MarketDataFetcher(
+        api_url=f"{url}/v5/market/kline",
+        transport=transport,
+        async_transport=async_transport,
+        rate_limiter=bucket,
+    )
+    try:
+        # 503, 503, 200 – trzy próby, trzy tokeny
+        assert len(fetcher.get_ohlcv("BTCUSDT", "1", limit=3)) == 3
+        assert bucket.calls == server.stats["requests"] == 3
+        server.fail_first = 1
+
+        async def fetch():
+            try:
+                return await fetcher.get_ohlcv_async("BTCUSDT", "1", limit=3)
+            finally:
+                await async_transport.aclose()
+
+        assert len(asyncio.run(fetch())) == 3
+        assert bucket.calls == server.stats["requests"] == 5
+    finally:
+        fetcher.close()
+        transport.close()
+        server.shutdown()
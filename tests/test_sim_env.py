@@ -0,0 +1,68 @@
+# test_sim_env.py – SimulatedTradingEnv vs VectorizedTradingEnv
+import numpy as np
+import pytest
+
+from strategies.rl_omega import RLOmegaAgent
+from strategies.sim_env import SimulatedTradingEnv, VectorizedTradingEnv
+
+
+def _prices(n, seed=1):
+    return list(100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n)))
+
+
+def test_vectorized_env_matches_scalar_envs():
+    series = [_prices(40, seed) for seed in range(3)]
+    starts = [0, 5, 10]
+    scalar = []
+    for s, start in zip(series, starts):
+        env = SimulatedTradingEnv(s)
+        env.current_step = start
+        scalar.append(env)
+    vec = VectorizedTradingEnv(series, starts=starts, auto_reset=False)
+    actions = np.random.default_rng(0).integers(0, 3, (39, 3))
+    for step_actions in actions:
+        states, rewards, dones, _ = vec.step(step_actions)
+        for i, env in enumerate(scalar):
+            if env.done:
+                continue
+            state, reward, done, _ = env.step(step_actions[i])
+            assert np.allclose(states[i], state)
+            assert rewards[i] == pytest.approx(reward)
+            assert dones[i] == done
+    assert dones.all()
+    assert np.allclose(vec.balance, [env.balance for env in scalar])
+    with pytest.raises(ValueError):
+        VectorizedTradingEnv(series, n_envs=2)
+
+
+def test_auto_reset_returns_terminal_observation():
+    prices = _prices(100)
+    env = VectorizedTradingEnv(
+        prices, n_envs=4, episode_length=10, random_starts=True, seed=0
+    )
+    assert np.all(env.end_idx - env.starts == 10)
+    assert env.starts.max() <= 100 - 1 - 10
+    for _ in range(9):
+        env.step(np.ones(4, dtype=int))  # buy i trzymaj
+    states, rewards, dones, info = env.step(np.zeros(4, dtype=int))
+    assert dones.all() and env.episodes == 4
+    assert np.all(info["terminal_observation"][:, 1] == 0)
+    assert np.allclose(info["final_balance"], 1000 + rewards)
+    # Po resecie: nowy start, płasko, saldo początkowe
+    assert np.all(states[:, 1] == 0) and np.all(states[:, 2] == 1000)
+    assert np.allclose(states[:, 0], np.asarray(prices)[env.starts])
+    assert not env.done.any()
+
+
+def test_agent_trains_on_vectorized_env():
+    agent = RLOmegaAgent(state_dim=4, batch_size=16, memory_size=500)
+    env = VectorizedTradingEnv(_prices(60), n_envs=16, episode_length=20)
+    actions = agent.act_batch(env.reset())
+    assert actions.shape == (16,) and set(actions) <= {0, 1, 2}
+    stats = agent.train_vectorized(env, 25)
+    assert stats["env_steps"] == 400 and stats["episodes"] == 16
+    assert len(agent.memory) == 400
+    assert agent.epsilon == pytest.approx(0.995 ** 25)  # replay na paczkę
+    agent.epsilon = 0.0
+    greedy = agent.act_batch(np.ones((3, 3)))
+    assert len(set(greedy)) == 1  # te same stany -> ta sama akcja
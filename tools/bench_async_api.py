@@ -0,0 +1,181 @@
+# bench_async_api.py – opóźnienie API przy obciążeniu pętli bota
+"""
+FastAPI (uvicorn) i pętla bota na jednej pętli zdarzeń, jak w
+main_async.py; wątek sondy odpytuje GET /health co ``--probe-ms`` i mierzy
+opóźnienia. Giełda to lokalny stub REST (``--delay`` na odpowiedź), zapis
+decyzji idzie do SQLite przez kolejkę write-behind.
+
+Tryby:
+- idle: sam serwer API,
+- blocking: dotychczasowy cykl – get_ohlcv (requests), router.analyze i
+  save_*_to_db wywoływane wprost w korutynie, symbol po symbolu,
+- async: BotCoreAsync.run_cycle – httpx, asyncio.gather po symbolach,
+  inferencja w ograniczonym executorze.
+
+Użycie:
+    python -m tools.bench_async_api --symbols 8 --delay 0.05 --seconds 5
+"""
+
+import argparse
+import asyncio
+import datetime
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core import db_writer
+from core.BotCoreAsync import BotCoreAsync
+from core.db_models import Base
+from core.db_utils import save_decision_to_db, save_equity_to_db
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.PositionManager import PositionManager
+from core.RateLimiter import TokenBucket
+from strategies.momentum import MomentumStrategy
+from tools.http_stub_server import start_stub_server
+
+
+class _Router:
+    """Momentum na świecach + kilka ms obliczeń w stylu inferencji."""
+
+    def __init__(self):
+        self.strategy = MomentumStrategy()
+        self.weights = np.random.default_rng(0).normal(size=(256, 256))
+
+    def analyze(self, data):
+        frame = pd.DataFrame(data.get("ohlcv") or [])
+        if frame.empty:
+            return {"signal": "hold"}
+        result = self.strategy.analyze("X", frame, None, "1m")
+        x = np.resize(frame["close"].to_numpy(), 256)
+        for _ in range(20):
+            x = np.tanh(self.weights @ x / 256)
+        signals = result["signals"]
+        return {"signal": signals[0]["side"] if signals else "hold"}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _probe(url, stop, probe_s, out):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.get(url, timeout=10)
+        out.append(time.perf_counter() - start)
+        time.sleep(probe_s)
+
+
+async def _blocking_cycle(bot, symbols):
+    # Dawny run_loop: wszystko synchronicznie w korutynie
+    for symbol in symbols:
+        candles = bot.fetcher.get_ohlcv(symbol, bot.interval, limit=50)
+        data = {"price": candles[-1]["close"] if candles else None,
+                "ohlcv": candles}
+        decision = bot.router.analyze(data)
+        now = datetime.datetime.utcnow().isoformat()
+        save_decision_to_db(now, decision.get("signal", "hold"),
+                            str(decision))
+        save_equity_to_db(now, 1000, 0.0)
+
+
+async def _run_mode(mode, args, kline_url):
+    app = FastAPI()
+    cycles = {"n": 0}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "cycles": cycles["n"]}
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning"
+    ))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    fetcher = MarketDataFetcher(
+        api_url=kline_url, transport=HttpTransport(),
+        rate_limiter=TokenBucket(10_000),
+    )
+    bot = BotCoreAsync(
+        _Router(), PositionManager(), fetcher=fetcher, symbols=symbols,
+        market_stream=False,
+    )
+    latencies = []
+    stop = threading.Event()
+    prober = threading.Thread(
+        target=_probe,
+        args=(f"http://127.0.0.1:{port}/health", stop,
+              args.probe_ms / 1000, latencies),
+    )
+    prober.start()
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        if mode == "blocking":
+            await _blocking_cycle(bot, symbols)
+        elif mode == "async":
+            await bot.run_cycle(symbols)
+        else:
+            await asyncio.sleep(0.1)
+            continue
+        cycles["n"] += 1
+        await asyncio.sleep(0)
+    stop.set()
+    await asyncio.to_thread(prober.join)
+    await bot.aclose()
+    server.should_exit = True
+    await serve
+    return np.array(latencies) * 1000, cycles["n"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--probe-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{tmp.name}/bench.db")
+    Base.metadata.create_all(engine)
+    db_writer._writer = db_writer.WriteBehindQueue(
+        session_factory=sessionmaker(bind=engine)
+    )
+    stub, url = start_stub_server(delay=args.delay)
+    print(
+        f"symbols: {args.symbols}, exchange delay: {args.delay * 1000:.0f} "
+        f"ms, probe every {args.probe_ms:.0f} ms for {args.seconds:.0f} s"
+    )
+    for mode in ("idle", "blocking", "async"):
+        lat, cycles = asyncio.run(
+            _run_mode(mode, args, f"{url}/v5/market/kline")
+        )
+        print(
+            f"  {mode:8s}: /health p50 {np.percentile(lat, 50):7.1f} ms, "
+            f"p99 {np.percentile(lat, 99):7.1f} ms, "
+            f"max {lat.max():7.1f} ms ({len(lat)} probes, "
+            f"{cycles} bot cycles)"
+        )
+    db_writer._writer.close()
+    stub.shutdown()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
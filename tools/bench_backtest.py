@@ -0,0 +1,87 @@
+# bench_backtest.py – benchmark przepustowości silnika backtestowego
+"""
+Mierzy bars/second dla utils.backtesting.run_backtest:
+- ścieżka wektorowa (generate_signals) na dużych danych (domyślnie 500k),
+- ścieżka okienkowa (tylko generate_signal) na mniejszej próbce.
+
+Użycie:
+    python -m tools.bench_backtest --rows 500000 --fallback-rows 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.RiskManager import RiskManager
+from strategies.SmaCrossStrategy import SmaCrossStrategy
+from utils.backtesting import run_backtest
+
+
+class _PerBarSmaCross(SmaCrossStrategy):
+    """SmaCross bez hooka wektorowego – wymusza ścieżkę okienkową."""
+
+    generate_signals = None
+
+    def generate_signal(self, data):
+        # Ta sama logika co SmaCrossStrategy, bez print() na każdej świecy
+        if len(data) < 20:
+            return "hold"
+        close = data["close"]
+        fast = close.rolling(window=5).mean()
+        slow = close.rolling(window=20).mean()
+        if fast.iloc[-2] <= slow.iloc[-2] and fast.iloc[-1] > slow.iloc[-1]:
+            return "buy"
+        if fast.iloc[-2] >= slow.iloc[-2] and fast.iloc[-1] < slow.iloc[-1]:
+            return "sell"
+        return "hold"
+
+
+def make_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(n, dtype=np.int64) * 60_000,
+            "open": close,
+            "high": close * 1.0005,
+            "low": close * 0.9995,
+            "close": close,
+            "volume": rng.uniform(1, 10, n),
+        }
+    )
+
+
+def bench(strategy, data, risk_manager):
+    start = time.perf_counter()
+    result = run_backtest(
+        strategy, data, initial_balance=1e9, risk_manager=risk_manager
+    )
+    elapsed = time.perf_counter() - start
+    return len(data) / elapsed, elapsed, result["n_trades"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--fallback-rows", type=int, default=5_000)
+    args = parser.parse_args()
+    # Duże saldo + szeroki limit drawdown: backtest przechodzi przez całe
+    # dane zamiast zatrzymać się na pierwszym przekroczeniu limitu
+    risk_manager = RiskManager(max_drawdown=1.0)
+    cases = [
+        ("vectorized", SmaCrossStrategy(), args.rows),
+        ("windowed", _PerBarSmaCross(), args.fallback_rows),
+    ]
+    for label, strategy, rows in cases:
+        data = make_candles(rows)
+        bars_per_sec, elapsed, n_trades = bench(strategy, data, risk_manager)
+        print(
+            f"{label:>10}: {rows:>8} bars in {elapsed:8.3f}s "
+            f"-> {bars_per_sec:12,.0f} bars/s ({n_trades} trades)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# bench_candle_buffer.py – koszt przygotowania świec na tick i symbol
+"""
+Porównuje przygotowanie danych dla ``--consumers`` czytelników ramki
+(strategie pandasowe, AIStrategyEngine, forecast_volatility) na jeden tick:
+- list: tail_records z CandleStore i pd.DataFrame(candles) u każdego
+  konsumenta,
+- buffer: CandleBuffer.sync (tylko nowa świeca) + jedna ramka i jedna
+  lista dictów z cache na tick.
+
+Użycie:
+    python -m tools.bench_candle_buffer --window 200 --consumers 5
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.CandleBuffer import CandleBuffer
+from core.CandleStore import CandleStore
+
+MIN = 60_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--consumers", type=int, default=5)
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    series = CandleStore(tmp.name).series("BTCUSDT", "1")
+    n = 5000
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.normal(0, 5, n + args.ticks))
+    cols = {
+        "timestamp": np.arange(n + args.ticks, dtype=np.int64) * MIN,
+        "open": close - 1, "high": close + 3, "low": close - 3,
+        "close": close, "volume": rng.uniform(1, 50, n + args.ticks),
+    }
+    series.merge({k: v[:n] for k, v in cols.items()})
+    buffer = CandleBuffer(args.window, "BTCUSDT")
+    buffer.sync(series)
+
+    def new_candle(i):
+        series.merge({k: v[n + i:n + i + 1] for k, v in cols.items()})
+
+    t_list = 0.0
+    t_buffer = 0.0
+    for i in range(args.ticks):
+        new_candle(i)
+        start = time.perf_counter()
+        candles = series.tail_records(args.window)
+        for _ in range(args.consumers):
+            pd.DataFrame(candles)["close"].iloc[-1]
+        t_list += time.perf_counter() - start
+
+        start = time.perf_counter()
+        buffer.sync(series)
+        buffer.records()
+        for _ in range(args.consumers):
+            buffer.frame()["close"].iloc[-1]
+        t_buffer += time.perf_counter() - start
+    tmp.cleanup()
+
+    print(
+        f"window: {args.window}, consumers: {args.consumers}, "
+        f"ticks: {args.ticks}"
+    )
+    print(f"  list + DataFrame per consumer: "
+          f"{t_list / args.ticks * 1e6:9.1f} us/tick")
+    print(f"  shared CandleBuffer:           "
+          f"{t_buffer / args.ticks * 1e6:9.1f} us/tick")
+    print(f"  speedup: {t_list / t_buffer:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
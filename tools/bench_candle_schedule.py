@@ -0,0 +1,85 @@
+# bench_candle_schedule.py – strategie co tick vs na zamknięciu świecy
+"""
+Czas dispatchu zestawu strategii z core.BotCore.build_strategies dla N
+symboli, gdy pętla bota robi kilka ticków na jedną świecę bazową (1 m):
+- every tick: StrategyDispatcher bez schedulera (dotychczas),
+- candle close: StrategyDispatcher z CandleScheduler – strategia liczy
+  się tylko po zamknięciu świecy swojego timeframe'u, między
+  zamknięciami zwracany jest zapamiętany wynik.
+
+Wskaźniki z IndicatorHub w obu wariantach; raportowane run/skipped.
+
+Użycie:
+    python -m tools.bench_candle_schedule --symbols 1 10 --minutes 10
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from core.BotCore import build_strategies
+from core.CandleBuffer import CandleBuffer
+from core.CandleScheduler import CandleScheduler
+from core.IndicatorHub import IndicatorHub
+from core.StrategyAdapter import StrategyDispatcher, TickContext
+
+MIN = 60_000
+
+
+def _run(n_symbols, window, minutes, ticks_per_candle, scheduled):
+    rng = np.random.default_rng(0)
+    scheduler = CandleScheduler("1") if scheduled else None
+    hub = IndicatorHub()
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    buffers, dispatchers = {}, {}
+    for s in symbols:
+        buffers[s] = CandleBuffer(window, s)
+        close = 100 + np.cumsum(rng.normal(0, 1, window))
+        buffers[s].extend([
+            (i * MIN, c, c + 1, c - 1, c, 5.0) for i, c in enumerate(close)
+        ])
+        dispatchers[s] = StrategyDispatcher(build_strategies(s), scheduler)
+    start = time.perf_counter()
+    for minute in range(window, window + minutes):
+        for tick in range(ticks_per_candle):
+            for s in symbols:
+                # Formująca się świeca: ta sama minuta, nowa cena
+                price = 100 + rng.normal()
+                buffers[s].append(
+                    (minute * MIN, price, price + 1, price - 1, price, 5.0)
+                )
+                ctx = TickContext(
+                    s, {"price": price, "symbol": s},
+                    klines=buffers[s].frame(),
+                    indicators=hub.view(s, buffers[s]), timeframe="1",
+                    price=price, data=buffers[s].records(),
+                    candle_ts=buffers[s].last_ts,
+                )
+                dispatchers[s].dispatch(ctx)
+    elapsed = (time.perf_counter() - start) / (minutes * ticks_per_candle)
+    return elapsed * 1e3, scheduler.metrics() if scheduler else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--minutes", type=int, default=10)
+    parser.add_argument("--ticks-per-candle", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    print(f"{'symbols':>8}{'every tick ms':>15}{'candle close ms':>17}"
+          f"{'speedup':>9}{'run':>7}{'skipped':>9}")
+    for n in args.symbols:
+        every, _ = _run(n, args.window, args.minutes,
+                        args.ticks_per_candle, False)
+        closed, metrics = _run(n, args.window, args.minutes,
+                               args.ticks_per_candle, True)
+        print(f"{n:>8}{every:>15.2f}{closed:>17.2f}{every / closed:>8.1f}x"
+              f"{metrics['run']:>7}{metrics['skipped']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# bench_candle_store.py – start i tick run_bot: REST vs lokalny CandleStore
+"""
+Na lokalnym stubie z opóźnieniem (tools.http_stub_server) porównuje:
+- start: dawne 2x get_ohlcv(limit=500) na symbol (zdublowany blok w
+  run_bot) vs CandleStore.sync_many na pustym i na istniejącym store,
+- tick: pobranie całego okna (limit=--window) vs synchronizacja ogona
+  (tylko nowe świece) + tail_records(--window),
+- odczyt historii do backtestu (load_backtest_data).
+
+Użycie:
+    python -m tools.bench_candle_store --symbols 10 --latency-ms 50
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+import numpy as np
+
+from core.CandleStore import CandleStore
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.RateLimiter import TokenBucket
+from tools.http_stub_server import start_stub_server
+from utils.backtesting import load_backtest_data
+
+MIN = 60_000
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--history", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server, base = start_stub_server(delay=args.latency_ms / 1000.0)
+    now = int(time.time() * 1000) // MIN * MIN
+    server.now_ms = now
+    transport = HttpTransport()
+    fetcher = MarketDataFetcher(
+        api_url=f"{base}/v5/market/kline",
+        transport=transport,
+        rate_limiter=TokenBucket(1000),
+    )
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    tmp = tempfile.TemporaryDirectory()
+
+    def legacy_start():
+        for _ in range(2):
+            for s in symbols:
+                fetcher.get_ohlcv(s, "1", limit=500)
+
+    def store_start(store):
+        return dict(store.sync_many(symbols, "1", fetcher, limit=500))
+
+    t_legacy_start, _ = timed(legacy_start)
+    t_cold, _ = timed(lambda: store_start(CandleStore(tmp.name)))
+    server.now_ms = now + MIN
+    t_warm, _ = timed(lambda: store_start(CandleStore(tmp.name)))
+    store = CandleStore(tmp.name)
+    store_start(store)
+
+    server.now_ms = now + 2 * MIN
+    t_legacy_tick, _ = timed(
+        lambda: [
+            fetcher.get_ohlcv(s, "1", limit=args.window) for s in symbols
+        ]
+    )
+    server.now_ms = now + 3 * MIN
+
+    def store_tick():
+        for _, series in store.sync_many(symbols, "1", fetcher):
+            series.tail_records(args.window)
+
+    t_store_tick, _ = timed(store_tick)
+
+    # Długa historia do backtestu (bez sieci)
+    series = store.series("HISTUSDT", "1")
+    ts = now - MIN * np.arange(args.history)[::-1]
+    series.merge(
+        {
+            "timestamp": ts.astype(np.int64),
+            **{c: np.full(args.history, 30000.0)
+               for c in ("open", "high", "low", "close", "volume")},
+        }
+    )
+    t_reopen, reopened = timed(
+        lambda: CandleStore(tmp.name).series("HISTUSDT", "1")
+    )
+    t_frame, frame = timed(
+        lambda: load_backtest_data("HISTUSDT", "1", store=store)
+    )
+    fetcher.close()
+    transport.close()
+    server.shutdown()
+    tmp.cleanup()
+
+    print(f"symbols: {args.symbols}, latency: {args.latency_ms} ms")
+    print(f"  start, legacy 2x500 REST:  {t_legacy_start * 1e3:9.1f} ms")
+    print(f"  start, store cold:         {t_cold * 1e3:9.1f} ms")
+    print(f"  start, store warm:         {t_warm * 1e3:9.1f} ms")
+    print(
+        f"  tick, window={args.window} REST:   "
+        f"{t_legacy_tick * 1e3:9.1f} ms"
+    )
+    print(f"  tick, store tail sync:     {t_store_tick * 1e3:9.1f} ms")
+    print(
+        f"  reopen {len(reopened)} candles: {t_reopen * 1e3:9.2f} ms, "
+        f"backtest frame: {t_frame * 1e3:9.2f} ms ({len(frame)} rows)"
+    )
+
+
+if __name__ == "__main__":
+    main()
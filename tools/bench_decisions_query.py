@@ -0,0 +1,153 @@
+# bench_decisions_query.py – latencja stronicowania decisions z/bez indeksów
+"""
+Tabela decisions z N wierszami (SQLite w pliku tymczasowym jako zastępstwo
+Postgresa). Mierzy te same zapytania przed i po utworzeniu indeksów
+(timestamp, id) i (symbol, timestamp, id) z migracji v3:
+- latest: najnowsza strona (ORDER BY timestamp DESC LIMIT n),
+- deep: strona nr ``--page`` – OFFSET (stare) vs kursor ``before`` (keyset),
+- symbol: najnowsza strona jednego symbolu.
+
+Użycie:
+    python -m tools.bench_decisions_query --rows 10000000 --page 1000
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+
+from sqlalchemy import create_engine, desc
+from sqlalchemy.orm import sessionmaker
+
+from core.db_models import Base, Decision
+from core.db_utils import keyset_page
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT")
+
+
+def _fill(path, rows):
+    conn = sqlite3.connect(path)
+    t0 = datetime.datetime(2020, 1, 1)
+    chunk = 100_000
+    for start in range(0, rows, chunk):
+        conn.executemany(
+            "INSERT INTO decisions (timestamp, decision, symbol) "
+            "VALUES (?, ?, ?)",
+            (
+                ((t0 + datetime.timedelta(seconds=i // len(SYMBOLS)))
+                 .isoformat(sep=" ", timespec="microseconds"), "hold",
+                 SYMBOLS[i % len(SYMBOLS)])
+                for i in range(start, min(rows, start + chunk))
+            ),
+        )
+        conn.commit()
+    conn.close()
+
+
+def _timed(fn, repeat):
+    fn()  # rozgrzanie cache stron
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def _queries(factory, limit, page):
+    def latest():
+        db = factory()
+        try:
+            return keyset_page(db, Decision, limit)[0]
+        finally:
+            db.close()
+
+    def deep_offset():
+        db = factory()
+        try:
+            return (
+                db.query(Decision)
+                .order_by(desc(Decision.timestamp), desc(Decision.id))
+                .offset(limit * page)
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    db = factory()
+    cursor = (
+        db.query(Decision.timestamp, Decision.id)
+        .order_by(desc(Decision.timestamp), desc(Decision.id))
+        .offset(limit * page - 1)
+        .limit(1)
+        .one()
+    )
+    db.close()
+
+    def deep_keyset():
+        db = factory()
+        try:
+            return keyset_page(db, Decision, limit, *cursor)[0]
+        finally:
+            db.close()
+
+    def symbol():
+        db = factory()
+        try:
+            return keyset_page(
+                db, Decision, limit, criteria=(Decision.symbol == "ETHUSDT",)
+            )[0]
+        finally:
+            db.close()
+
+    assert [r.id for r in deep_offset()] == [r.id for r in deep_keyset()]
+    return {
+        "latest": latest,
+        "deep OFFSET": deep_offset,
+        "deep keyset": deep_keyset,
+        "symbol": symbol,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    indexes = [
+        ix for ix in Decision.__table__.indexes
+        if ix.name != "ix_decisions_id"
+    ]
+    for index in indexes:
+        index.drop(engine)  # schemat sprzed v3: tylko klucz główny
+    start = time.perf_counter()
+    _fill(path, args.rows)
+    print(f"rows: {args.rows:,} (insert {time.perf_counter() - start:.1f}s)")
+    factory = sessionmaker(bind=engine)
+
+    before = {
+        name: _timed(fn, args.repeat)
+        for name, fn in _queries(factory, args.limit, args.page).items()
+    }
+    start = time.perf_counter()
+    for index in indexes:
+        index.create(engine)
+    print(f"index build: {time.perf_counter() - start:.1f}s")
+    after = {
+        name: _timed(fn, args.repeat)
+        for name, fn in _queries(factory, args.limit, args.page).items()
+    }
+    print(f"{'query':<14}{'pk only [ms]':>14}{'indexed [ms]':>14}")
+    for name in before:
+        print(f"{name:<14}{before[name]:>14.3f}{after[name]:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
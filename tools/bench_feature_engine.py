@@ -0,0 +1,92 @@
+# bench_feature_engine.py – koszt wyliczenia cech na nową świecę
+"""
+Porównuje koszt cech dla jednej nowej świecy:
+- pandas: TrendPredictor._extract_features + VolatilityForecaster
+  .extract_features na całym oknie (tak jak dotąd w pętli live),
+- engine: FeatureEngine.sync na tym samym oknie (stosuje tylko nową
+  świecę) oraz samo FeatureEngine.update.
+
+Na końcu sprawdzana jest zgodność ostatniego wektora z pandas.
+
+Użycie:
+    python -m tools.bench_feature_engine --window 500 --updates 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.feature_engine import FeatureEngine
+from models.trend_predictor import TrendPredictor
+from models.volatility_forecaster import VolatilityForecaster
+
+
+def make_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 25, n))
+    spread = np.abs(rng.normal(0, 15, n))
+    return pd.DataFrame(
+        {
+            "timestamp": 1_700_000_000_000 + 60_000 * np.arange(n),
+            "open": close,
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 50, n),
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--window", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+
+    df = make_candles(args.window + args.updates)
+    records = df.to_dict("records")
+    predictor = TrendPredictor.__new__(TrendPredictor)
+    forecaster = VolatilityForecaster.__new__(VolatilityForecaster)
+    w = args.window
+
+    pandas_updates = min(args.updates, 200)
+    start = time.perf_counter()
+    for i in range(pandas_updates):
+        frame = df.iloc[i + 1: i + 1 + w]
+        predictor._extract_features(frame).iloc[[-1]].values
+        forecaster.extract_features(frame)
+    pandas_cost = (time.perf_counter() - start) / pandas_updates
+
+    engine = FeatureEngine()
+    engine.sync("BTCUSDT", records[:w])
+    start = time.perf_counter()
+    for i in range(args.updates):
+        state = engine.sync("BTCUSDT", records[i + 1: i + 1 + w])
+        state.trend_features()
+        state.volatility_features()
+    sync_cost = (time.perf_counter() - start) / args.updates
+
+    raw = FeatureEngine()
+    raw.sync("BTCUSDT", records[:w])
+    start = time.perf_counter()
+    for i in range(args.updates):
+        raw.update("BTCUSDT", records[w + i])
+    update_cost = (time.perf_counter() - start) / args.updates
+
+    expected = predictor._extract_features(df.iloc[-w:]).iloc[-1].values
+    err = np.max(
+        np.abs(state.trend_features() - expected) / (np.abs(expected) + 1)
+    )
+
+    print(f"window: {w} candles, updates: {args.updates}")
+    print(f"  pandas (trend+vol):   {pandas_cost * 1e6:9.1f} us/candle")
+    print(f"  engine sync+features: {sync_cost * 1e6:9.1f} us/candle")
+    print(f"  engine update only:   {update_cost * 1e6:9.1f} us/candle")
+    print(f"  speedup (sync):       {pandas_cost / sync_cost:9.1f}x")
+    print(f"  max rel. diff vs pandas:    {err:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_http_transport.py – requests.get per call vs HttpTransport
+"""
+Porównuje przepustowość i opóźnienia pobierania OHLCV na lokalnym stubie
+(tools.http_stub_server):
+- legacy: goły requests.get (nowe połączenie TCP przy każdym wywołaniu),
+- pooled: MarketDataFetcher na współdzielonym HttpTransport (keep-alive).
+
+Na lokalnym HTTP zysk to sam handshake TCP; na Bybit dochodzi TLS.
+
+Użycie:
+    python -m tools.bench_http_transport --requests 2000 --threads 4
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from tools.http_stub_server import start_stub_server
+
+
+def legacy_get_ohlcv(url, symbol, interval, limit):
+    """Old MarketDataFetcher request path: bare requests.get."""
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    response = requests.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    return [
+        {"timestamp": item[0], "close": float(item[4])}
+        for item in response.json()["result"]["list"]
+    ]
+
+
+def run(call, n, threads):
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = np.array(list(pool.map(timed, range(n))))
+    elapsed = time.perf_counter() - start
+    return n / elapsed, np.percentile(latencies, [50, 99]) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    server, base = start_stub_server()
+    url = f"{base}/v5/market/kline"
+    transport = HttpTransport(pool_maxsize=args.threads)
+    fetcher = MarketDataFetcher(
+        api_url=url, throttle_sec=0, transport=transport
+    )
+    logging.getLogger().setLevel(logging.WARNING)
+    calls = {
+        "legacy": lambda: legacy_get_ohlcv(url, "BTCUSDT", "1", args.limit),
+        "pooled": lambda: fetcher.get_ohlcv("BTCUSDT", "1", limit=args.limit),
+    }
+    results = {}
+    for name, call in calls.items():
+        opened = server.stats["connections"]
+        rps, percentiles = run(call, args.requests, args.threads)
+        results[name] = (
+            rps, percentiles, server.stats["connections"] - opened
+        )
+    transport.close()
+    server.shutdown()
+
+    print(
+        f"requests: {args.requests}, threads: {args.threads}, "
+        f"candles/response: {args.limit}"
+    )
+    for name, (rps, (p50, p99), conns) in results.items():
+        print(
+            f"  {name:7s} {rps:9.1f} req/s  p50 {p50:7.2f} ms"
+            f"  p99 {p99:7.2f} ms  connections {conns}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# bench_indicator_hub.py – wskaźniki per strategia vs wspólny IndicatorHub
+"""
+Czas analyze() strategii liczących wskaźniki (Momentum, MeanReversion,
+Breakout, TrendFollowing) dla N symboli:
+- local: każda strategia liczy swoje okna/EMA/RSI z klines co tick
+  (indicators=None, dotychczasowe zachowanie),
+- hub: StrategyDispatcher z widokiem IndicatorHub – każdy wskaźnik raz
+  na wersję bufora świec, współdzielony przez strategie.
+
+``--ticks-per-candle`` ticków przypada na jedną świecę (pierwszy tick
+dopisuje świecę, kolejne widzą ten sam bufor), jak przy pętli 1 s
+i świecach 1 m. Raportowane są też żądania i obliczenia huba.
+
+Użycie:
+    python -m tools.bench_indicator_hub --symbols 1 10 --candles 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.CandleBuffer import CandleBuffer
+from core.IndicatorHub import IndicatorHub
+from core.StrategyAdapter import StrategyDispatcher, TickContext
+from strategies.breakout import BreakoutStrategy
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+from strategies.trend_following import TrendFollowingStrategy
+
+MIN = 60_000
+
+
+def _strategies():
+    return [
+        MomentumStrategy(), MeanReversionStrategy(), BreakoutStrategy(),
+        TrendFollowingStrategy(),
+    ]
+
+
+def _candles(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    spread = rng.uniform(0, 2, (2, n))
+    volume = rng.uniform(1, 10, n)
+    return [
+        (i * MIN, close[i], close[i] + spread[0, i], close[i] - spread[1, i],
+         close[i], volume[i])
+        for i in range(n)
+    ]
+
+
+def _run(n_symbols, window, candles, ticks_per_candle, use_hub):
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    history = {s: _candles(window + candles, seed=i)
+               for i, s in enumerate(symbols)}
+    buffers = {}
+    for s in symbols:
+        buffers[s] = CandleBuffer(window, s)
+        buffers[s].extend(history[s][:window])
+    dispatchers = {s: StrategyDispatcher(_strategies()) for s in symbols}
+    hub = IndicatorHub()
+    views = {s: hub.view(s, buffers[s]) for s in symbols}
+    start = time.perf_counter()
+    for k in range(candles):
+        for _ in range(ticks_per_candle):
+            for s in symbols:
+                buffers[s].append(history[s][window + k])
+                ctx = TickContext(
+                    s, {}, klines=buffers[s].frame(),
+                    indicators=views[s] if use_hub else None,
+                    timeframe="1",
+                )
+                dispatchers[s].dispatch(ctx)
+    ticks = candles * ticks_per_candle
+    return (time.perf_counter() - start) / ticks * 1e3, hub.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--candles", type=int, default=20)
+    parser.add_argument("--ticks-per-candle", type=int, nargs="+",
+                        default=[1, 10])
+    args = parser.parse_args()
+    print(f"{'symbols':>8}{'ticks/candle':>13}{'local ms':>10}"
+          f"{'hub ms':>9}{'speedup':>9}{'requests':>10}{'computes':>10}")
+    for n in args.symbols:
+        for per_candle in args.ticks_per_candle:
+            local, _ = _run(n, args.window, args.candles, per_candle, False)
+            hub, stats = _run(n, args.window, args.candles, per_candle, True)
+            print(f"{n:>8}{per_candle:>13}{local:>10.2f}{hub:>9.2f}"
+                  f"{local / hub:>8.1f}x{stats['requests']:>10}"
+                  f"{stats['computes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# bench_inference.py – predict per symbol vs jedna paczka na tick
+"""
+Czas jednego ticku modeli trendu i zmienności dla 1, 10 i 100 symboli:
+- per-call: predict_trend_batch / forecast_batch z jednym wierszem na
+  symbol (dotychczasowe predict_trend / forecast_volatility),
+- batched: wszystkie symbole przez InferenceServer (submit + flush) –
+  jeden predict na model.
+
+Modele: RandomForest (sklearn), XGBoost (jeśli zainstalowany) i sieć
+torch (TrendPredictor.use_deep). Cechy są liczone raz, przed pomiarem.
+
+Użycie:
+    python -m tools.bench_inference --symbols 1 10 100
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from core.InferenceServer import InferenceServer
+from models.trend_predictor import TrendPredictor
+from models.volatility_forecaster import VolatilityForecaster
+
+
+def _models(tmp):
+    rng = np.random.default_rng(0)
+    X_trend = rng.normal(0, 1, (2000, 11))
+    y_trend = rng.choice([-1, 0, 1], 2000)
+    X_vol = rng.uniform(0, 3, (2000, 3))
+    y_vol = X_vol.sum(axis=1)
+    models = {}
+
+    rf = TrendPredictor(model_path=f"{tmp}/t.pkl")
+    from sklearn.ensemble import RandomForestClassifier
+
+    rf.model = RandomForestClassifier(n_estimators=100, random_state=0)
+    rf.model.fit(X_trend, y_trend)
+    rf.is_trained = True
+    models["trend/sklearn-rf"] = (rf.predict_trend_batch, X_trend)
+
+    deep = TrendPredictor(model_path=f"{tmp}/d.pkl", use_deep=True)
+    deep.deep_model = type(deep.deep_model)(input_dim=11)
+    deep.is_trained = True
+    models["trend/torch-lstm"] = (deep.predict_trend_batch, X_trend)
+
+    vol_rf = VolatilityForecaster(
+        model_path=f"{tmp}/v.pkl", use_xgb=False, background_training=False
+    )
+    vol_rf.train_model(X_vol, y_vol)
+    models["vol/sklearn-rf"] = (vol_rf.forecast_batch, X_vol)
+    try:
+        vol_xgb = VolatilityForecaster(
+            model_path=f"{tmp}/x.pkl", use_xgb=True,
+            background_training=False,
+        )
+        vol_xgb.train_model(X_vol, y_vol)
+        models["vol/xgboost"] = (vol_xgb.forecast_batch, X_vol)
+    except ImportError:
+        pass
+    return models
+
+
+def _per_call(fn, rows, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for row in rows:
+            fn([row])
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def _batched(fn, rows, repeat):
+    server = InferenceServer()
+    server.register("m", fn)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        futures = [server.submit("m", row) for row in rows]
+        server.flush()
+        [f.result() for f in futures]
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, nargs="+",
+                        default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    models = _models(tempfile.mkdtemp())
+    print(f"{'model':<18}{'symbols':>8}{'per-call ms':>13}"
+          f"{'batched ms':>12}{'speedup':>9}")
+    for name, (fn, X) in models.items():
+        for n in args.symbols:
+            rows = list(X[:n])
+            fn(rows)  # rozgrzanie
+            t_call = _per_call(fn, rows, args.repeat)
+            t_batch = _batched(fn, rows, args.repeat)
+            print(f"{name:<18}{n:>8}{t_call:>13.3f}{t_batch:>12.3f}"
+                  f"{t_call / t_batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# bench_live_stream.py – test obciążeniowy /metrics/live (SSE)
+"""
+Odtwarza pracę bota (BotStatePublisher → snapshot w pliku tymczasowym)
+i podłącza N subskrybentów SSE do API (uvicorn w wątku). Część klientów
+czyta celowo wolno – ich bufory scalają zdarzenia zamiast hamować
+producenta.
+
+Raportuje: opóźnienie publikacja ticku → odbiór u szybkich klientów
+(p50/p99), liczbę zdarzeń u szybkich i wolnych klientów, scalone zdarzenia
+i resynchronizacje po stronie serwera oraz czas publikacji po stronie
+bota (powinien nie zależeć od liczby klientów).
+
+Klienci działają w osobnym procesie (spawn), żeby nie dzielić GIL-a z
+serwerem.
+
+Użycie:
+    python -m tools.bench_live_stream --clients 500 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _subscriber(client, url, slow, deadline, result):
+    latencies, events, buffer = [], 0, ""
+    try:
+        async with client.stream("GET", url) as resp:
+            async for chunk in resp.aiter_text():
+                buffer += chunk
+                *frames, buffer = buffer.split("\n\n")
+                for frame in frames:
+                    for line in frame.split("\n"):
+                        if not line.startswith("data: "):
+                            continue
+                        event = json.loads(line[6:])
+                        events += 1
+                        if not slow and event.get("at"):
+                            latencies.append(time.time() - event["at"])
+                if time.time() > deadline:
+                    break
+                if slow:
+                    await asyncio.sleep(0.5)  # wolny odbiorca
+    except Exception as e:  # noqa: BLE001 – raportujemy błędy klientów
+        result["errors"].append(str(e))
+    result["slow" if slow else "fast"].append(events)
+    result["latency"].extend(latencies)
+
+
+async def _subscribers(url, clients, slow_share, duration, connected):
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients + 10)
+    timeout = httpx.Timeout(duration + 30)
+    result = {"fast": [], "slow": [], "latency": [], "errors": []}
+    deadline = time.time() + duration
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        tasks = [
+            asyncio.create_task(_subscriber(
+                client, url, i < clients * slow_share, deadline, result
+            ))
+            for i in range(clients)
+        ]
+        connected.set()
+        await asyncio.gather(*tasks)
+    return result
+
+
+def _client_process(url, clients, slow_share, duration, connected, queue):
+    queue.put(asyncio.run(
+        _subscribers(url, clients, slow_share, duration, connected)
+    ))
+
+
+def _replay(path, rate, duration, symbols, publish_ms):
+    from core.StateSnapshot import BotStatePublisher, StateSnapshotWriter
+
+    publisher = BotStatePublisher(StateSnapshotWriter(path))
+    equity = 10_000.0
+    rng = random.Random(0)
+    end = time.monotonic() + duration
+    tick = 0
+    while time.monotonic() < end:
+        tick += 1
+        for symbol in symbols:
+            decision = rng.choice(("buy", "sell", "hold", "tp"))
+            publisher.record_decision(symbol, tick, decision, "{}")
+        equity += rng.gauss(0, 5)
+        publisher.record_equity(tick, equity, 0.0)
+        positions = {
+            s: {"amount": round(rng.random(), 3)} for s in symbols
+            if rng.random() < 0.5
+        }
+        start = time.perf_counter()
+        publisher.publish(positions=positions)
+        publish_ms.append((time.perf_counter() - start) * 1e3)
+        time.sleep(1.0 / rate)
+
+
+def _pct(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="ticki bota na sekundę")
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--slow-share", type=float, default=0.1)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "state")
+    os.environ["BOT_STATE_PATH"] = path
+    os.environ.setdefault("LIVE_POLL_SEC", "0.05")
+    import uvicorn
+
+    import api_status
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        api_status.app, host="127.0.0.1", port=port, log_level="warning",
+        lifespan="off",
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    publish_ms = []
+    _replay(path, args.rate, 0.2, symbols, publish_ms)  # pierwszy snapshot
+
+    ctx = multiprocessing.get_context("spawn")
+    connected, queue = ctx.Event(), ctx.Queue()
+    proc = ctx.Process(target=_client_process, args=(
+        f"http://127.0.0.1:{port}/metrics/live", args.clients,
+        args.slow_share, args.duration, connected, queue,
+    ))
+    proc.start()
+    connected.wait()
+    time.sleep(1.0)  # połączenia i snapshoty
+    publish_ms.clear()
+    _replay(path, args.rate, args.duration - 1.0, symbols, publish_ms)
+    result = queue.get()
+    proc.join()
+    peak_clients = len(api_status.broadcaster.clients)
+    server.should_exit = True
+
+    stats = api_status.broadcaster.stats
+    fast, slow = result["fast"], result["slow"]
+    latency = result["latency"]
+    print(f"clients: {args.clients} ({args.slow_share:.0%} slow), "
+          f"ticks/s: {args.rate}, symbols: {args.symbols}")
+    print(f"  broadcaster: {stats['publishes']} publishes, "
+          f"{stats['events']} events, {stats['coalesced']} coalesced, "
+          f"{stats['resyncs']} resyncs, {peak_clients} clients left")
+    print(f"  fast clients: {sum(fast) / max(len(fast), 1):.0f} events "
+          f"each, latency p50 {_pct(latency, 0.5) * 1e3:.1f} ms, "
+          f"p99 {_pct(latency, 0.99) * 1e3:.1f} ms")
+    print(f"  slow clients: {sum(slow) / max(len(slow), 1):.0f} events "
+          f"each (coalesced)")
+    print(f"  bot publish: p50 {_pct(publish_ms, 0.5):.3f} ms, "
+          f"p99 {_pct(publish_ms, 0.99):.3f} ms")
+    if result["errors"]:
+        print(f"  client errors: {len(result['errors'])}: "
+              f"{result['errors'][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_metrics_api.py – koszt /performance przy rosnącej tabeli decisions
+"""
+Porównuje liczenie statystyk dla /status i /performance:
+- legacy: COUNT(*) po decisions + filtr wygranych + 200 ostatnich equity
+  przy każdym żądaniu (poprzednie compute_stats),
+- aggregator: MetricsAggregator – wiersz metrics_summary, dociąganie tylko
+  nowych equity, cache TTL.
+
+Baza SQLite w pliku tymczasowym (Postgres skaluje podobnie – COUNT(*)
+to pełny skan).
+
+Użycie:
+    python -m tools.bench_metrics_api --rows 200000 --requests 200
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, desc, insert
+from sqlalchemy.orm import sessionmaker
+
+from core.db_migrations import upgrade
+from core.db_models import Base, Decision, Equity
+from core.MetricsAggregator import MetricsAggregator
+from core.StateSnapshot import WIN_DECISIONS, performance_stats
+
+
+def _legacy_stats(factory):
+    db = factory()
+    try:
+        equity_rows = (
+            db.query(Equity)
+            .order_by(desc(Equity.timestamp))
+            .limit(200)
+            .all()[::-1]
+        )
+        total = db.query(Decision).count()
+        wins = db.query(Decision).filter(
+            Decision.decision.in_(WIN_DECISIONS)
+        ).count()
+        return performance_stats([e.equity for e in equity_rows], total, wins)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--ttl", type=float, default=2.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    t0 = datetime.datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        for start in range(0, args.rows, 10_000):
+            n = min(10_000, args.rows - start)
+            ts = [t0 + datetime.timedelta(seconds=start + i)
+                  for i in range(n)]
+            conn.execute(insert(Decision), [
+                {"timestamp": t, "decision": ("tp", "buy", "hold")[i % 3],
+                 "details": "{}"}
+                for i, t in enumerate(ts)
+            ])
+            conn.execute(insert(Equity), [
+                {"timestamp": t, "equity": 1000.0 + (i % 50), "pnl": 0.0}
+                for i, t in enumerate(ts)
+            ])
+    upgrade(engine)
+    factory = sessionmaker(bind=engine)
+    aggregator = MetricsAggregator(factory, ttl=args.ttl)
+    assert aggregator.stats() == _legacy_stats(factory)
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        _legacy_stats(factory)
+    t_legacy = (time.perf_counter() - start) / args.requests
+    aggregator.refresh(force=True)
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        aggregator.refresh(force=True)  # bez cache: sam odczyt agregatów
+    t_refresh = (time.perf_counter() - start) / args.requests
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        aggregator.stats()
+    t_cached = (time.perf_counter() - start) / args.requests
+    print(f"rows: {args.rows}, requests: {args.requests}")
+    print(f"  legacy compute_stats: {t_legacy * 1e3:9.3f} ms/request")
+    print(f"  aggregator refresh:   {t_refresh * 1e3:9.3f} ms/request "
+          f"({t_legacy / t_refresh:,.0f}x)")
+    print(f"  aggregator cached:    {t_cached * 1e3:9.3f} ms/request "
+          f"({t_legacy / t_cached:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# bench_model_runtime.py – start i RSS: modele natywne vs runtime NumPy
+"""
+Dla każdego modelu (trend RF/XGBoost, DeepTrendNet, zmienność
+XGBoost/RF, DeepVolNet, OnlineTrainer, PreRiskPredictor) startuje świeży
+interpreter, który tworzy predyktor z ``runtime="native"`` (joblib + torch /
+sklearn / xgboost) albo ``runtime="numpy"`` (eksport models.np_runtime)
+i liczy predykcję dla 1 i 100 wierszy.
+
+Raportuje: czas całego procesu (interpreter + import + ładowanie +
+pierwsza predykcja), import + ładowanie w procesie, latencję predict dla
+1 i 100 wierszy, szczytowy RSS procesu i zgodność wyników obu runtime'ów.
+
+Użycie:
+    python -m tools.bench_model_runtime --repeat 200
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _train(tmp):
+    """Train and save every model once; returns child specs."""
+    from ai.OnlineTrainer import OnlineTrainer
+    from ai.PreRiskPredictor import PreRiskPredictor
+    from models.trend_predictor import TrendPredictor
+    from models.volatility_forecaster import VolatilityForecaster
+
+    rng = np.random.default_rng(0)
+    X_trend = rng.normal(0, 1, (2000, 11))
+    y_trend = rng.choice([-1, 0, 1], 2000)
+    X_vol = rng.uniform(0, 3, (2000, 3))
+    y_vol = X_vol.sum(axis=1)
+    specs = {}
+
+    for name, use_xgb in (("trend/rf", False), ("trend/xgb", True)):
+        path = os.path.join(tmp, name.replace("/", "_") + ".pkl")
+        trend = TrendPredictor(model_path=path, use_xgb=use_xgb)
+        trend.model = trend._new_model()
+        y = y_trend + 1 if use_xgb else y_trend
+        trend.model.fit(X_trend, y)
+        trend._save_model()
+        specs[name] = {"kind": "trend", "path": path, "xgb": use_xgb,
+                       "dim": 11}
+
+    path = os.path.join(tmp, "trend_deep.pkl")
+    deep = TrendPredictor(model_path=path, use_deep=True)
+    deep._init_deep(input_dim=11)
+    deep.train_deep(X_trend, y_trend + 1, epochs=5)
+    import torch
+
+    # TrendPredictor nie zapisuje sieci natywnie – wagi dla dziecka native
+    torch.save(deep.deep_model.state_dict(), path + ".deep.pt")
+    specs["trend/lstm"] = {"kind": "trend_deep", "path": path, "dim": 11}
+
+    for name, use_xgb in (("vol/xgb", True), ("vol/rf", False)):
+        path = os.path.join(tmp, name.replace("/", "_") + ".pkl")
+        VolatilityForecaster(
+            model_path=path, use_xgb=use_xgb, background_training=False
+        ).train_model(X_vol, y_vol)
+        specs[name] = {"kind": "vol", "path": path, "xgb": use_xgb,
+                       "dim": 3}
+
+    path = os.path.join(tmp, "vol_deep.pkl")
+    VolatilityForecaster(
+        model_path=path, use_deep=True, background_training=False
+    ).train_model(X_vol, y_vol)
+    specs["vol/mlp"] = {"kind": "vol_deep", "path": path, "dim": 3}
+
+    for name, cls, dim in (
+        ("online/gb", OnlineTrainer, 5), ("prerisk/xgb", PreRiskPredictor, 3)
+    ):
+        path = os.path.join(tmp, name.replace("/", "_") + ".pkl")
+        model = cls(model_path=path)
+        model.X = rng.normal(0, 1, (500, dim)).tolist()
+        model.y = (np.asarray(model.X)[:, 0] > 0).astype(int).tolist()
+        model.update_model()
+        specs[name] = {"kind": "ai", "cls": cls.__name__, "path": path,
+                       "dim": dim}
+    return specs
+
+
+def _predictor(spec, runtime):
+    """Build the predictor in the child; returns a batch predict fn."""
+    kind = spec["kind"]
+    if kind in ("trend", "trend_deep"):
+        from models.trend_predictor import TrendPredictor
+
+        trend = TrendPredictor(
+            model_path=spec["path"], use_xgb=spec.get("xgb", False),
+            use_deep=kind == "trend_deep", runtime=runtime,
+        )
+        if kind == "trend_deep" and runtime == "native":
+            import torch
+
+            from models.trend_predictor import deep_trend_net
+
+            trend.deep_model = deep_trend_net(input_dim=spec["dim"])
+            trend.deep_model.load_state_dict(
+                torch.load(spec["path"] + ".deep.pt")
+            )
+        return lambda X: trend.predict_trend_batch(list(X))
+    if kind in ("vol", "vol_deep"):
+        from models.volatility_forecaster import VolatilityForecaster
+
+        vol = VolatilityForecaster(
+            model_path=spec["path"], use_xgb=spec.get("xgb", True),
+            use_deep=kind == "vol_deep", background_training=False,
+            runtime=runtime,
+        )
+        if kind == "vol_deep" and runtime == "native":
+            import torch
+
+            vol.deep_model.load_state_dict(torch.load(spec["path"] + ".pt"))
+        return lambda X: vol.forecast_batch(list(X))
+    if spec["cls"] == "OnlineTrainer":
+        from ai.OnlineTrainer import OnlineTrainer as cls
+    else:
+        from ai.PreRiskPredictor import PreRiskPredictor as cls
+    model = cls(model_path=spec["path"], runtime=runtime)
+    return lambda X: list(model.model.predict(np.asarray(X)))
+
+
+def _peak_rss_mb():
+    # VmHWM – ru_maxrss przeżywa exec i pokazałby RSS rodzica
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(spec, runtime, repeat):
+    start = time.perf_counter()
+    predict = _predictor(spec, runtime)
+    X = np.random.default_rng(1).normal(0, 1, (100, spec["dim"]))
+    first = predict(X)
+    load_s = time.perf_counter() - start
+    timings = {}
+    for n in (1, 100):
+        t = time.perf_counter()
+        for _ in range(repeat):
+            predict(X[:n])
+        timings[n] = (time.perf_counter() - t) / repeat * 1e3
+    heavy = [m for m in ("torch", "sklearn", "xgboost") if m in sys.modules]
+    print(json.dumps({
+        "load_s": load_s, "ms_1": timings[1], "ms_100": timings[100],
+        "rss_mb": _peak_rss_mb(),
+        "heavy": heavy,
+        "result": [float(v) if not isinstance(v, str) else v for v in first],
+    }))
+
+
+def _run(spec, runtime, repeat):
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "tools.bench_model_runtime", "--child",
+         json.dumps(spec), "--runtime", runtime, "--repeat", str(repeat)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, PYTHONWARNINGS="ignore"),
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+
+def _agree(a, b):
+    if isinstance(a[0], str):
+        return np.mean([x == y for x, y in zip(a, b)])
+    return float(np.mean(np.isclose(a, b, rtol=1e-4, atol=1e-5)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--runtime", default="native",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(json.loads(args.child), args.runtime, args.repeat)
+        return
+    specs = _train(tempfile.mkdtemp())
+    print(f"{'model':<13}{'runtime':>8}{'process s':>10}{'load s':>8}"
+          f"{'1 row ms':>10}{'100 rows ms':>12}{'RSS MB':>8}  "
+          f"{'agree':>6}  heavy imports")
+    for name, spec in specs.items():
+        native = _run(spec, "native", args.repeat)
+        fast = _run(spec, "numpy", args.repeat)
+        agree = _agree(native["result"], fast["result"])
+        for runtime, r in (("native", native), ("numpy", fast)):
+            print(f"{name:<13}{runtime:>8}{r['process_s']:>10.2f}"
+                  f"{r['load_s']:>8.2f}{r['ms_1']:>10.3f}"
+                  f"{r['ms_100']:>12.3f}{r['rss_mb']:>8.0f}  "
+                  f"{agree:>6.0%}  {','.join(r['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# bench_multi_symbol_fetch.py – czas cyklu run_bot dla wielu symboli
+"""
+Symuluje jeden cykl pętli run_bot na lokalnym stubie z opóźnieniem
+odpowiedzi (tools.http_stub_server):
+- sequential: get_ohlcv po kolei z dawnym throttlem per instancja
+  (time.sleep(throttle_sec) między wywołaniami),
+- streamed: get_ohlcv_many (pula wątków + wspólny token bucket), symbol
+  przetwarzany zaraz po nadejściu świec.
+
+"Przetwarzanie" symbolu to stały czas ``--work-ms`` (strategie, modele).
+
+Użycie:
+    python -m tools.bench_multi_symbol_fetch --symbols 30 --throttle 1.0
+"""
+
+import argparse
+import logging
+import time
+
+from core.HttpTransport import HttpTransport
+from core.MarketDataFetcher import MarketDataFetcher
+from core.RateLimiter import TokenBucket
+from tools.http_stub_server import start_stub_server
+
+
+def process(work_s):
+    end = time.perf_counter() + work_s
+    while time.perf_counter() < end:
+        pass
+
+
+def sequential_cycle(fetcher, symbols, throttle, work_s):
+    first = None
+    start = time.perf_counter()
+    last_call = 0.0
+    for symbol in symbols:
+        now = time.time()
+        if now - last_call < throttle:
+            time.sleep(throttle - (now - last_call))
+        last_call = time.time()
+        candles = fetcher.get_ohlcv(symbol, "1", limit=200)
+        process(work_s)
+        if first is None and candles:
+            first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+
+def streamed_cycle(fetcher, symbols, work_s):
+    first = None
+    start = time.perf_counter()
+    for symbol, candles in fetcher.get_ohlcv_many(symbols, "1", limit=200):
+        process(work_s)
+        if first is None and candles:
+            first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=30)
+    parser.add_argument("--throttle", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server, base = start_stub_server(delay=args.latency_ms / 1000.0)
+    transport = HttpTransport(pool_maxsize=args.workers)
+    fetcher = MarketDataFetcher(
+        api_url=f"{base}/v5/market/kline",
+        transport=transport,
+        rate_limiter=TokenBucket(args.rate),
+        max_workers=args.workers,
+    )
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    work_s = args.work_ms / 1000.0
+    fetcher.get_ohlcv(symbols[0], "1", limit=1)  # rozgrzanie połączenia
+
+    seq_total, seq_first = sequential_cycle(
+        fetcher, symbols, args.throttle, work_s
+    )
+    str_total, str_first = streamed_cycle(fetcher, symbols, work_s)
+    fetcher.close()
+    transport.close()
+    server.shutdown()
+
+    print(
+        f"symbols: {args.symbols}, latency: {args.latency_ms} ms, "
+        f"legacy throttle: {args.throttle}s, rate: {args.rate}/s, "
+        f"workers: {args.workers}"
+    )
+    print(
+        f"  sequential: cycle {seq_total:7.2f} s, "
+        f"first symbol ready {seq_first * 1e3:7.1f} ms"
+    )
+    print(
+        f"  streamed:   cycle {str_total:7.2f} s, "
+        f"first symbol ready {str_first * 1e3:7.1f} ms"
+    )
+    print(f"  speedup:    {seq_total / str_total:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# bench_population.py – ocena populacji genomów: pętla vs oś populacji
+"""
+Porównuje ocenę genomów MomentumStrategy i MeanReversionStrategy:
+- loop: analyze() świeca po świecy dla każdego genomu osobno (tak, jak
+  strategia działa w bocie), mierzona na ``--loop-genomes`` genomach,
+- batch: PopulationBacktest.evaluate_population – wskaźniki raz na okno,
+  sygnały i PnL całej populacji ``--genomes`` w jednym przebiegu.
+
+Użycie:
+    python -m tools.bench_population --bars 2000 --genomes 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ai.PopulationBacktest import evaluate_population
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.momentum import MomentumStrategy
+
+
+def _population(rng, strategy_cls, n):
+    if strategy_cls is MomentumStrategy:
+        return [
+            {"lookback": int(rng.integers(5, 40)),
+             "entry_threshold": float(rng.choice([0.2, 0.5, 1.0, 2.0]))}
+            for _ in range(n)
+        ]
+    return [
+        {"bb_period": int(rng.integers(10, 40)),
+         "bb_std": float(rng.choice([1.5, 2.0, 2.5])),
+         "rsi_period": int(rng.choice([7, 14, 21]))}
+        for _ in range(n)
+    ]
+
+
+def _loop(strategy_cls, params_list, data):
+    defaults = strategy_cls().parameters
+    for params in params_list:
+        strategy = strategy_cls(parameters={**defaults, **params})
+        for t in range(len(data)):
+            strategy.analyze("X", data.iloc[: t + 1], None, "1m")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--genomes", type=int, default=500)
+    parser.add_argument("--loop-genomes", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "close": 100 + np.cumsum(rng.normal(0, 0.5, args.bars)),
+        "volume": rng.uniform(1, 5, args.bars)
+        * np.where(rng.random(args.bars) < 0.2, 6, 1),
+    })
+    print(f"bars: {args.bars}, genomes: {args.genomes}")
+    for strategy_cls in (MomentumStrategy, MeanReversionStrategy):
+        population = _population(rng, strategy_cls, args.genomes)
+        start = time.perf_counter()
+        _loop(strategy_cls, population[: args.loop_genomes], data)
+        per_genome = (time.perf_counter() - start) / args.loop_genomes
+        start = time.perf_counter()
+        evaluate_population(strategy_cls, population, data)
+        t_batch = time.perf_counter() - start
+        print(
+            f"  {strategy_cls.__name__}: loop {per_genome * 1e3:9.1f} "
+            f"ms/genome (x{args.genomes} ~ "
+            f"{per_genome * args.genomes:7.1f} s), batch "
+            f"{t_batch * 1e3:7.1f} ms for all "
+            f"({per_genome * args.genomes / t_batch:,.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
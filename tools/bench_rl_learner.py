@@ -0,0 +1,105 @@
+# bench_rl_learner.py – RLOmega: trening w ścieżce decyzji vs proces ucznia
+"""
+Dwa pomiary dla RLOmegaAgent:
+- remember + sample: dawna lista krotek (``pop(0)`` przy pełnej
+  pojemności, minibatch przez ``random.sample`` + ``torch.FloatTensor``)
+  vs ReplayBuffer (pierścień NumPy, wektorowe próbkowanie),
+- latencja ``analyze(use_sim_env=True)``: inline (krok replay w każdym
+  wywołaniu) vs z RLLearner (przejście do kolejki, trening w osobnym
+  procesie); raportowane p50/p99 i liczba kroków ucznia.
+
+Użycie:
+    python -m tools.bench_rl_learner --steps 500 --capacity 10000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import torch
+
+from ai.ReplayBuffer import ReplayBuffer
+from ai.RLLearner import RLLearner
+from strategies.rl_omega import RLOmegaStrategy
+from strategies.sim_env import SimulatedTradingEnv
+
+
+def _bench_memory(capacity, n, batch_size=64, state_dim=10):
+    rng = np.random.default_rng(0)
+    states = rng.normal(size=(n, state_dim)).astype(np.float32)
+    memory = []
+    start = time.perf_counter()
+    for i in range(n):
+        if len(memory) >= capacity:
+            memory.pop(0)
+        memory.append((list(states[i]), i % 3, 1.0, list(states[i]), False))
+        minibatch = random.sample(memory, min(batch_size, len(memory)))
+        s, a, r, s2, d = zip(*minibatch)
+        torch.FloatTensor(s), torch.FloatTensor(s2)
+    as_list = (time.perf_counter() - start) / n * 1e6
+    buffer = ReplayBuffer(capacity, state_dim, seed=0)
+    start = time.perf_counter()
+    for i in range(n):
+        buffer.add(states[i], i % 3, 1.0, states[i], False)
+        batch, _, _ = buffer.sample(batch_size)
+        torch.from_numpy(batch["state"]), torch.from_numpy(batch["next_state"])
+    as_ring = (time.perf_counter() - start) / n * 1e6
+    return as_list, as_ring
+
+
+def _bench_analyze(steps, learner, interval, warmup=100):
+    prices = list(100 + np.cumsum(
+        np.random.default_rng(0).normal(0, 1, steps + warmup + 2)
+    ))
+    strategy = RLOmegaStrategy(
+        sim_env=SimulatedTradingEnv(prices), learner=learner,
+        batch_size=64, epsilon=0.0,  # zawsze inferencja sieci
+    )
+    for step in range(warmup):
+        strategy.analyze([prices[step], 0.0, 1000.0], use_sim_env=True)
+    deadline = time.monotonic() + 60
+    # Uczeń rozgrzany (import torch, pierwsza publikacja) przed pomiarem
+    while learner is not None and not strategy.agent.sync_policy():
+        if time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    times = []
+    for step in range(warmup, warmup + steps):
+        start = time.perf_counter()
+        strategy.analyze([prices[step], 0.0, 1000.0], use_sim_env=True)
+        times.append((time.perf_counter() - start) * 1e3)
+        time.sleep(interval)  # kolejny tick/świeca
+    strategy.agent.sync_policy()
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=10000)
+    parser.add_argument("--prioritized-alpha", type=float, default=0.0)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    torch.set_num_threads(1)
+    n = args.capacity + 2000  # pełny bufor – ścieżka pop(0)/nadpisania
+    as_list, as_ring = _bench_memory(args.capacity, n)
+    print(f"remember+sample: list {as_list:8.1f} us  ring {as_ring:8.1f} us"
+          f"  ({as_list / as_ring:.1f}x)")
+    p50, p99 = _bench_analyze(args.steps, None, args.interval_ms / 1e3)
+    print(f"analyze inline:  p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+    learner = RLLearner(
+        prioritized_alpha=args.prioritized_alpha, publish_every=50
+    )
+    try:
+        p50, p99 = _bench_analyze(
+            args.steps, learner, args.interval_ms / 1e3
+        )
+        print(f"analyze learner: p50 {p50:7.3f} ms  p99 {p99:7.3f} ms  "
+              f"{learner.metrics()}")
+    finally:
+        learner.close()
+
+
+if __name__ == "__main__":
+    main()
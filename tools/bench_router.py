@@ -0,0 +1,84 @@
+# bench_router.py – DynamicStrategyRouter.route: po kolei vs z budżetem
+"""
+Latencja ticku DynamicStrategyRouter.route dla zestawu strategii, z
+których część jest wolna (krok replay RL, pobieranie newsów + NLP –
+symulowane ``time.sleep``, czyli praca zwalniająca GIL jak I/O i torch):
+- sequential: bez executora, strategie po kolei (dotychczas),
+- budgeted: BudgetedExecutor z budżetem ``--budget-ms`` – wyniki po
+  terminie z poprzedniego ticku albo pominięte.
+
+Raportuje p50/max czasu ticku i liczbę wyników ok/stale/dropped.
+
+Użycie:
+    python -m tools.bench_router --ticks 20 --budget-ms 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core.BudgetedExecutor import BudgetedExecutor
+from core.DynamicStrategyRouter import DynamicStrategyRouter
+
+# nazwa -> czas analyze w ms (nazwy jak w compute_allocations)
+STRATEGIES = {
+    "TrendFollowing": 2, "Momentum": 2, "MeanReversion": 3,
+    "GridTrading": 1, "MarketMaking": 1, "Breakout": 2, "Arbitrage": 1,
+    "Sentiment": 120, "RLOmega": 80, "Universal": 1,
+}
+
+
+class _Strategy:
+    def __init__(self, name, ms):
+        self.name = name
+        self.seconds = ms / 1e3
+
+    def analyze(self, market_state):
+        time.sleep(self.seconds)
+        return {"signal": "hold"}
+
+
+def _run(ticks, executor):
+    router = DynamicStrategyRouter(
+        [_Strategy(n, ms) for n, ms in STRATEGIES.items()],
+        executor=executor,
+    )
+    # Wszystkie strategie aktywne (jak w reżimie "mixed" z równym sharpe)
+    router.compute_allocations = lambda regime, perf: {
+        n: 1 / len(STRATEGIES) for n in STRATEGIES
+    }
+    times, counted = [], 0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        counted += len(router.route({"price": 100.0}))
+        times.append((time.perf_counter() - start) * 1e3)
+    return np.percentile(times, 50), max(times), counted, router
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    p50, worst, n, _ = _run(args.ticks, None)
+    print(f"sequential: p50 {p50:7.1f} ms  max {worst:7.1f} ms  "
+          f"signals {n}")
+    executor = BudgetedExecutor(
+        max_workers=args.workers, budget_sec=args.budget_ms / 1e3
+    )
+    try:
+        p50, worst, n, router = _run(args.ticks, executor)
+        outcomes = executor.metrics()["outcomes"]
+        print(f"budgeted:   p50 {p50:7.1f} ms  max {worst:7.1f} ms  "
+              f"signals {n}  {outcomes}")
+        for name, hist in sorted(router.latency_metrics().items()):
+            print(f"  {name:<15} n={hist['count']:<4} "
+                  f"mean {hist['mean_ms']:7.2f} ms  p95 <= {hist['p95_ms']}")
+    finally:
+        executor.close()
+
+
+if __name__ == "__main__":
+    main()
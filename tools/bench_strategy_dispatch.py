@@ -0,0 +1,114 @@
+# bench_strategy_dispatch.py – narzut wywołań strategii na tick
+"""
+Porównuje narzut dispatchu analyze() dla wszystkich strategii z
+strategies_per_symbol (core.BotCore.build_strategies):
+- legacy: inspect.signature + łańcuch if/elif co tick (stara pętla run_bot),
+- compiled: StrategyDispatcher z prekompilowanymi planami wywołań.
+
+Metody analyze są podmieniane na no-op z tą samą sygnaturą, żeby mierzyć
+wyłącznie narzut mapowania argumentów i wywołania.
+
+Użycie:
+    python -m tools.bench_strategy_dispatch --ticks 20000
+"""
+
+import argparse
+import asyncio
+import functools
+import inspect
+import time
+
+from core.BotCore import build_strategies
+from core.StrategyAdapter import StrategyDispatcher, TickContext
+
+
+def _stub_analyze(strategy):
+    """Replace analyze with a no-op keeping its signature and async-ness."""
+    original = strategy.analyze
+    if inspect.iscoroutinefunction(original):
+        @functools.wraps(original)
+        async def stub(*args, **kwargs):
+            return None
+    else:
+        @functools.wraps(original)
+        def stub(*args, **kwargs):
+            return None
+    strategy.analyze = stub
+
+
+def legacy_dispatch(strategies, market_state, klines, symbol, timeframe):
+    """Per-tick argument mapping as done by run_bot before call plans."""
+    price = klines[-1]["close"] if klines else None
+    mid_price = price if price is not None else 0.0
+    values = {
+        "klines": klines,
+        "indicators": None,
+        "timeframe": timeframe,
+        "price": price,
+        "mid_price": mid_price,
+        "inventory": None,
+        "orderbooks": {},
+        "prices": {},
+        "sentiment_data": [],
+        "symbol": symbol,
+        "data": klines,
+        "orderbook": {},
+        "state": market_state,
+    }
+    raw = []
+    for s in strategies:
+        fn = s.analyze
+        call_args = {}
+        for pname in inspect.signature(fn).parameters:
+            if pname in ("market_data", "market_state"):
+                call_args[pname] = market_state
+            elif pname in values:
+                call_args[pname] = values[pname]
+            else:
+                call_args[pname] = market_state.get(pname)
+        if inspect.iscoroutinefunction(fn):
+            sig = asyncio.run(fn(**call_args))
+        else:
+            sig = fn(**call_args)
+        raw.append({"strategy": s.name, "signal": sig})
+    return raw
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=20_000)
+    args = parser.parse_args()
+    strategies = build_strategies("BTCUSDT")
+    for s in strategies:
+        _stub_analyze(s)
+    klines = [{"close": 100.0 + i, "open": 100.0} for i in range(50)]
+    market_state = {"price": 149.0, "trend": "SIDE", "symbol": "BTCUSDT"}
+
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        legacy_dispatch(strategies, market_state, klines, "BTCUSDT", "1")
+    legacy = (time.perf_counter() - start) / args.ticks
+
+    dispatcher = StrategyDispatcher(strategies)
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        ctx = TickContext(
+            symbol="BTCUSDT",
+            market_state=market_state,
+            klines=klines,
+            timeframe="1",
+            price=klines[-1]["close"],
+        )
+        dispatcher.dispatch(ctx)
+    compiled = (time.perf_counter() - start) / args.ticks
+    dispatcher.close()
+
+    n = len(strategies)
+    print(f"strategies per symbol: {n}")
+    print(f"  legacy:   {legacy * 1e6:9.1f} us/tick")
+    print(f"  compiled: {compiled * 1e6:9.1f} us/tick")
+    print(f"  speedup:  {legacy / compiled:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench_sweep.py – skalowanie SweepRunner przy 1, 2, 4 i 8 workerach
+"""
+Sweep parametrów SmaCrossStrategy (fast x slow) z walk-forward na
+syntetycznym random walku:
+- sequential: dotychczasowe StrategyGenomeEngine.evaluate(scoring_func)
+  z run_backtest w procesie bota, genom po genomie,
+- SweepRunner: pula procesów, świece przez memmap; czas po rozgrzaniu
+  puli (start procesów spawn raportowany osobno).
+
+Użycie:
+    python -m tools.bench_sweep --rows 200000 --splits 4 --workers 1,2,4,8
+"""
+
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from ai.StrategyGenome import StrategyGenomeEngine
+from ai.SweepRunner import SweepRunner, param_grid, walk_forward_splits
+from core.RiskManager import RiskManager
+from strategies.SmaCrossStrategy import SmaCrossStrategy
+from utils.backtesting import run_backtest
+
+RISK = {"max_drawdown": 0.5, "sl_pct": 1.0, "tp_pct": 1.5}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--splits", type=int, default=4)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, args.rows))
+    data = pd.DataFrame({
+        "timestamp": np.arange(args.rows, dtype=np.int64) * 60_000,
+        "open": close, "high": close + 0.1, "low": close - 0.1,
+        "close": close, "volume": np.ones(args.rows),
+    })
+    splits = walk_forward_splits(args.rows, n_splits=args.splits)
+    grid = {"fast": [3, 5, 8, 13], "slow": [20, 30, 50, 80, 120, 200]}
+    n_genomes = len(param_grid(grid))
+    print(
+        f"rows: {args.rows}, genomes: {n_genomes}, splits: {len(splits)}, "
+        f"cpus: {os.cpu_count()}"
+    )
+    task_bytes = len(pickle.dumps((0, {"fast": 3, "slow": 20},
+                                   splits, True)))
+    print(
+        f"  per-task payload: {task_bytes} B "
+        f"(dataset {data.memory_usage().sum() / 1e6:.1f} MB via memmap)"
+    )
+
+    rm = RiskManager(**RISK)
+
+    def backtest(params, start, stop):
+        return run_backtest(
+            SmaCrossStrategy(**params), data.iloc[start:stop],
+            risk_manager=rm,
+        )["final_balance"] - 1000
+
+    def scoring_func(params):
+        # Ta sama praca co SweepRunner: okno train (in-sample) i test
+        pnl = []
+        for s in splits:
+            backtest(params, s[0], s[1])
+            pnl.append(backtest(params, s[2], s[3]))
+        return {"score": float(np.mean(pnl)), "pnl": float(np.sum(pnl))}
+
+    engine = StrategyGenomeEngine(population_size=n_genomes)
+    engine.population = param_grid(grid)
+    start = time.perf_counter()
+    engine.evaluate(scoring_func)
+    t_seq = time.perf_counter() - start
+    print(f"  sequential evaluate:   {t_seq:7.2f} s")
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        with SweepRunner(
+            SmaCrossStrategy, data, max_workers=workers, splits=splits,
+            risk_config=RISK,
+        ) as runner:
+            # Rozgrzanie: po jednym zadaniu na worker uruchamia całą pulę
+            start = time.perf_counter()
+            list(runner.run(param_grid({"fast": [3], "slow": [20]})
+                            * workers))
+            t_warm = time.perf_counter() - start
+            start = time.perf_counter()
+            list(runner.run(param_grid(grid)))
+            t_run = time.perf_counter() - start
+        print(
+            f"  SweepRunner x{workers}:     {t_run:7.2f} s "
+            f"(speedup {t_seq / t_run:4.1f}x, pool start {t_warm:5.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_tracker.py – koszt get_all_stats przy rosnącej historii PnL
+"""
+DynamicStrategyRouter.route wywołuje get_all_stats w każdym ticku.
+Porównuje:
+- legacy: sharpe/pnl/winrate/drawdown/score liczone z pełnej listy PnL
+  (poprzednia implementacja, z logowaniem INFO w drawdown/score),
+- online: StrategyPerformanceTracker na OnlineStats – O(1) na odczyt.
+
+Użycie:
+    python -m tools.bench_tracker --strategies 10 --history 10000
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from core.StrategyPerformanceTracker import StrategyPerformanceTracker
+
+legacy_logger = logging.getLogger("StrategyPerformanceTracker.legacy")
+
+
+def _legacy_stats(pnl, window=10):
+    total = float(sum(pnl))
+    wins = sum(1 for x in pnl if x > 0)
+    winrate = wins / len(pnl)
+    mean = total / len(pnl)
+    std = (
+        (sum((x - mean) ** 2 for x in pnl) / len(pnl)) ** 0.5
+        if len(pnl) > 1 else 1.0
+    )
+    recent = pnl[-window:]
+    peak, trough = max(recent), min(recent)
+    dd = (peak - trough) / peak if peak != 0 else 0.0
+    legacy_logger.info(f"rolling drawdown={dd:.4f} (window={window})")
+    # score() liczył pnl, winrate i drawdown jeszcze raz
+    score = float(sum(pnl)) * winrate - dd
+    legacy_logger.info(f"score={score:.2f}")
+    return {"sharpe": mean / std if std else 0.0, "pnl": total,
+            "winrate": winrate, "drawdown": dd, "score": score}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strategies", type=int, default=10)
+    parser.add_argument("--history", type=int, default=10_000)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, filename="/dev/null")
+
+    rng = np.random.default_rng(0)
+    names = [f"S{i}" for i in range(args.strategies)]
+    history = {
+        n: rng.normal(0, 1, args.history).tolist() for n in names
+    }
+    tracker = StrategyPerformanceTracker()
+    for n in names:
+        for x in history[n]:
+            tracker.update(n, {"pnl": x})
+
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        {n: _legacy_stats(history[n]) for n in names}
+    t_legacy = (time.perf_counter() - start) / args.ticks
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        tracker.get_all_stats()
+    t_online = (time.perf_counter() - start) / args.ticks
+    print(f"strategies: {args.strategies}, history: {args.history}")
+    print(f"  legacy get_all_stats: {t_legacy * 1e3:9.3f} ms/tick")
+    print(f"  online get_all_stats: {t_online * 1e3:9.3f} ms/tick "
+          f"({t_legacy / t_online:,.0f}x)")
+    start = time.perf_counter()
+    for x in history[names[0]][:10_000]:
+        tracker.update(names[0], {"pnl": x})
+    n = min(10_000, args.history)
+    print(f"  update: {(time.perf_counter() - start) / n * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
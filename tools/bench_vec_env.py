@@ -0,0 +1,84 @@
+# bench_vec_env.py – kroki środowiska RL na sekundę: skalarne vs wektorowe
+"""
+Przepustowość (env-steps/s) symulacji handlu dla RLOmega:
+- scalar: SimulatedTradingEnv krok po kroku (losowe akcje albo
+  ``RLOmegaAgent.act`` na każdy krok, reset po końcu serii),
+- vectorized: VectorizedTradingEnv z N środowiskami w lockstepie na
+  wspólnej serii z różnymi offsetami (auto reset),
+- vectorized + agent: to samo z akcjami z ``RLOmegaAgent.act_batch``
+  (jeden forward sieci na krok dla wszystkich N, bez treningu);
+  porównywane ze scalar + ``act``.
+
+Użycie:
+    python -m tools.bench_vec_env --envs 1 64 1024 4096 --steps 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from strategies.rl_omega import RLOmegaAgent
+from strategies.sim_env import SimulatedTradingEnv, VectorizedTradingEnv
+
+
+def _scalar(prices, steps, agent=None):
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 3, steps)
+    env = SimulatedTradingEnv(prices)
+    state = env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        if agent is not None:
+            action = agent.act(agent._fit_state(state))
+        state, _, done, _ = env.step(action)
+        if done:
+            state = env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def _vectorized(prices, n_envs, steps, agent=None):
+    rng = np.random.default_rng(0)
+    env = VectorizedTradingEnv(
+        prices, n_envs=n_envs, episode_length=256, random_starts=True,
+        seed=0,
+    )
+    states = env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        if agent is None:
+            actions = rng.integers(0, 3, n_envs)
+        else:
+            actions = agent.act_batch(states)
+        states, _, _, _ = env.step(actions)
+    return steps * n_envs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--envs", type=int, nargs="+",
+                        default=[1, 64, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--length", type=int, default=5000)
+    args = parser.parse_args()
+    torch.set_num_threads(1)
+    prices = list(
+        100 + np.cumsum(np.random.default_rng(0).normal(0, 1, args.length))
+    )
+    agent = RLOmegaAgent(epsilon=0.0)  # zawsze inferencja sieci
+    scalar = _scalar(prices, args.steps * 50)
+    scalar_acted = _scalar(prices, args.steps * 10, agent)
+    print(f"scalar: {scalar:,.0f} steps/s, + act: {scalar_acted:,.0f} "
+          f"steps/s")
+    print(f"{'envs':>6}{'vectorized steps/s':>22}{'x':>8}"
+          f"{'+ act_batch steps/s':>22}{'x':>8}")
+    for n in args.envs:
+        vec = _vectorized(prices, n, args.steps)
+        acted = _vectorized(prices, n, args.steps, agent)
+        print(f"{n:>6}{vec:>22,.0f}{vec / scalar:>7.1f}x"
+              f"{acted:>22,.0f}{acted / scalar_acted:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
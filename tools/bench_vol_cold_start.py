@@ -0,0 +1,71 @@
+# bench_vol_cold_start.py – pierwszy tick VolatilityForecaster bez modelu
+"""
+Mierzy cold start VolatilityForecaster (brak vol_model.pkl):
+- budowa macierzy treningowej: pętla extract_features po oknach
+  vs volatility_training_set (jedno przejście wektorowe),
+- opóźnienie pierwszego forecast_volatility (trening w tle),
+- czas treningu i cold start z metryk lifecycle.
+
+Użycie:
+    python -m tools.bench_vol_cold_start --candles 500
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.model_lifecycle import volatility_training_set
+from models.volatility_forecaster import VolatilityForecaster
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candles", type=int, default=500)
+    parser.add_argument("--xgb", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.normal(0, 25, args.candles))
+    spread = np.abs(rng.normal(0, 15, args.candles))
+    df = pd.DataFrame(
+        {"close": close, "high": close + spread, "low": close - spread}
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        forecaster = VolatilityForecaster(
+            model_path=os.path.join(tmp, "vol.pkl"), use_xgb=args.xgb
+        )
+        start = time.perf_counter()
+        for i in range(7, len(df)):
+            window = df.iloc[i - 7: i + 1]
+            forecaster.extract_features(window)
+            window["close"].rolling(window=7).std().iloc[-1]
+        loop_cost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        volatility_training_set(df)
+        vector_cost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        forecaster.forecast_volatility(df)
+        first_tick = time.perf_counter() - start
+        forecaster.lifecycle.wait(timeout=300)
+        metrics = forecaster.metrics()
+        forecaster.lifecycle.close()
+
+    print(f"candles: {args.candles}")
+    print(f"  training set, per-window loop: {loop_cost * 1e3:9.1f} ms")
+    print(f"  training set, vectorized:      {vector_cost * 1e3:9.1f} ms")
+    print(f"  first forecast (no model):     {first_tick * 1e3:9.1f} ms")
+    print(f"  background train time:         "
+          f"{metrics['train_time_s'] * 1e3:9.1f} ms")
+    print(f"  cold start until model swap:   "
+          f"{metrics['cold_start_latency_s'] * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# http_stub_server.py – lokalny stub Bybit REST (kline/tickers/order)
+"""
+Minimal HTTP/1.1 keep-alive server answering like Bybit v5:
+- GET  /v5/market/kline    -> result.list of up to ``limit`` deterministic
+  candles in [start, end] (newest first)
+- GET  /v5/market/tickers  -> result.list[0].lastPrice
+- POST /v5/order/create    -> {"retCode": 0, "retMsg": "OK"}
+
+Used by tests and the tools.bench_* HTTP benchmarks. ``fail_first`` makes
+the first N requests answer 503; ``delay`` (or per-symbol ``delays``) adds
+response latency; ``now_ms`` pins the clock and ``skip`` holds candle
+timestamps to omit (exchange-side holes); ``stats`` counts requests and
+distinct client connections.
+
+Użycie:
+    python -m tools.http_stub_server --port 8099
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _kline(ts, step):
+    """Deterministic candle for ``ts`` (newest-first list item format)."""
+    close = 30000 + (ts // step) % 97
+    return [str(ts), str(close - 1), str(close + 5), str(close - 5),
+            str(close), "12.5", "375000"]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Nagłówki i body idą osobnymi write(); bez TCP_NODELAY keep-alive
+    # trafia na delayed ACK (~40 ms) – prawdziwe serwery go wyłączają.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.stats["connections"] += 1
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _should_fail(self):
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+            if self.server.fail_first > 0:
+                self.server.fail_first -= 1
+                return True
+        return False
+
+    def do_GET(self):
+        if self._should_fail():
+            return self._send(503, {"retCode": 10006, "retMsg": "busy"})
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        symbol = query.get("symbol", [""])[0]
+        delay = self.server.delays.get(symbol, self.server.delay)
+        if delay:
+            time.sleep(delay)
+        if url.path.endswith("/tickers"):
+            return self._send(
+                200, {"retCode": 0, "result": {"list": [
+                    {"symbol": symbol, "lastPrice": "30000.5"}
+                ]}}
+            )
+        limit = min(int(query.get("limit", ["200"])[0]), 1000)
+        interval = query.get("interval", ["1"])[0]
+        step = 86_400_000 if interval == "D" else int(interval) * 60_000
+        now = self.server.now_ms or int(time.time() * 1000)
+        end = min(int(query.get("end", [now])[0]), now)
+        start = int(query.get("start", [0])[0])
+        candles = []
+        ts = end // step * step
+        while len(candles) < limit and ts >= start:
+            if ts not in self.server.skip:
+                candles.append(_kline(ts, step))
+            ts -= step
+        self._send(200, {"retCode": 0, "result": {"list": candles}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self._should_fail():
+            return self._send(503, {"retCode": 10006, "retMsg": "busy"})
+        self._send(200, {"retCode": 0, "retMsg": "OK"})
+
+
+def start_stub_server(port=0, fail_first=0, delay=0.0, delays=None):
+    """Start the stub in a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.fail_first = fail_first
+    server.delay = delay
+    server.delays = dict(delays or {})
+    server.now_ms = None
+    server.skip = set()
+    server.stats = {"requests": 0, "connections": 0}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, delay=args.delay)
+    print(f"stub listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# ws_replay_server.py – lokalny serwer WebSocket odtwarzający ramki Bybit
+"""
+Minimal RFC 6455 server (stdlib only) that replays recorded Bybit v5
+public frames to subscribed clients:
+- the client sends ``{"op": "subscribe", "args": [...]}``; only frames
+  whose ``topic`` is subscribed are streamed, so a client that does not
+  resubscribe after a reconnect gets nothing,
+- ``{"op": "ping"}`` is answered with ``{"op": "pong"}``,
+- ``interval`` paces frames, ``drop_after`` closes the first connection
+  after N streamed frames (reconnect tests), ``paused`` holds streaming
+  until ``server.resume.set()``.
+
+Ramki to lista dictów/JSON-ów, plik JSONL nagrany przez ``--record`` albo
+syntetyczne świece z ``synthetic_frames`` (ceny jak w http_stub_server,
+więc backfill REST ze stubu zgadza się ze strumieniem). Kursor ramek jest
+wspólny dla połączeń – po reconnect strumień idzie dalej.
+
+Użycie:
+    python -m tools.ws_replay_server --port 8098 --frames frames.jsonl
+    python -m tools.ws_replay_server --record wss://stream.bybit.com/v5/\
+public/linear --topics kline.1.BTCUSDT --count 100 --out frames.jsonl
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import time
+
+from tools.http_stub_server import _kline
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def synthetic_frames(symbols, start_ms, count, interval="1", ticks=2):
+    """
+    Frames for ``count`` candles from ``start_ms``: per candle and symbol
+    ``ticks`` unconfirmed kline updates, then the confirmed kline (prices
+    from http_stub_server._kline), a ticker delta and an orderbook
+    snapshot.
+    """
+    step = int(interval) * 60_000
+    frames = []
+    for i in range(count):
+        ts = start_ms + i * step
+        row = _kline(ts, step)
+        for symbol in symbols:
+            for tick in range(ticks + 1):
+                confirm = tick == ticks
+                close = row[4] if confirm else str(float(row[1]) + tick)
+                frames.append({
+                    "topic": f"kline.{interval}.{symbol}",
+                    "type": "snapshot",
+                    "ts": ts + (step - 1 if confirm else tick * 1000),
+                    "data": [{
+                        "start": ts, "end": ts + step - 1,
+                        "interval": interval, "open": row[1],
+                        "high": row[2], "low": row[3], "close": close,
+                        "volume": row[5], "turnover": row[6],
+                        "confirm": confirm,
+                    }],
+                })
+            frames.append({
+                "topic": f"tickers.{symbol}",
+                "type": "delta" if i else "snapshot",
+                "ts": ts + step - 1,
+                "data": {"symbol": symbol, "lastPrice": row[4]},
+            })
+            frames.append({
+                "topic": f"orderbook.1.{symbol}",
+                "type": "snapshot",
+                "ts": ts + step - 1,
+                "data": {
+                    "s": symbol, "u": i + 1,
+                    "b": [[str(float(row[4]) - 0.5), "1.2"]],
+                    "a": [[str(float(row[4]) + 0.5), "0.8"]],
+                },
+            })
+    return frames
+
+
+def load_frames(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _encode(payload: bytes, opcode=0x1) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class _ReplayHandler(socketserver.StreamRequestHandler):
+    def _recv_frame(self):
+        head = self.rfile.read(2)
+        if len(head) < 2:
+            return None, None
+        opcode = head[0] & 0x0F
+        n = head[1] & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", self.rfile.read(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if head[1] & 0x80 else b"\0\0\0\0"
+        data = self.rfile.read(n)
+        return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+    def _send(self, payload, opcode=0x1):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        with self.send_lock:
+            self.wfile.write(_encode(payload, opcode))
+
+    def _handshake(self) -> bool:
+        key = None
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b"\r\n", b"\n"):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        if key is None:
+            return False
+        accept = base64.b64encode(
+            hashlib.sha1((key + _GUID).encode()).digest()
+        ).decode()
+        self.wfile.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+        return True
+
+    def handle(self):
+        server = self.server
+        self.send_lock = threading.Lock()
+        self.topics = set()
+        self.closed = threading.Event()
+        if not self._handshake():
+            return
+        with server.lock:
+            server.stats["connections"] += 1
+            self.first = server.stats["connections"] == 1
+        writer = None
+        try:
+            while not self.closed.is_set():
+                opcode, data = self._recv_frame()
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    self._send(data, 0xA)
+                    continue
+                if opcode != 0x1:
+                    continue
+                msg = json.loads(data)
+                if msg.get("op") == "ping":
+                    self._send(json.dumps({"op": "pong"}))
+                elif msg.get("op") == "subscribe":
+                    self.topics.update(msg.get("args", []))
+                    with server.lock:
+                        server.stats["subscriptions"].append(
+                            list(msg.get("args", []))
+                        )
+                    self._send(json.dumps({"op": "subscribe",
+                                           "success": True}))
+                    if writer is None:
+                        writer = threading.Thread(
+                            target=self._stream, daemon=True
+                        )
+                        writer.start()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.closed.set()
+
+    def _stream(self):
+        server = self.server
+        sent = 0
+        # Subskrypcje mogą przyjść w kilku wiadomościach
+        time.sleep(0.01)
+        server.resume.wait()
+        try:
+            while not self.closed.is_set():
+                with server.lock:
+                    if server.cursor >= len(server.frames):
+                        break
+                    frame = server.frames[server.cursor]
+                    if frame.get("topic") not in self.topics:
+                        server.cursor += 1
+                        continue
+                    if (
+                        self.first
+                        and server.drop_after is not None
+                        and sent >= server.drop_after
+                    ):
+                        break
+                    server.cursor += 1
+                    server.stats["frames"] += 1
+                self._send(json.dumps(frame))
+                sent += 1
+                if server.interval:
+                    time.sleep(server.interval)
+        except OSError:
+            return
+        if self.first and server.drop_after is not None:
+            # Zerwanie bez ramki close – jak utrata sieci
+            self.closed.set()
+            try:
+                self.request.shutdown(2)
+            except OSError:
+                pass
+
+
+class _ReplayServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_replay_server(frames, port=0, interval=0.0, drop_after=None,
+                        paused=False):
+    """Start the replay server in a daemon thread; returns (server, url)."""
+    server = _ReplayServer(("127.0.0.1", port), _ReplayHandler)
+    server.lock = threading.Lock()
+    server.frames = [
+        json.loads(f) if isinstance(f, str) else f for f in frames
+    ]
+    server.cursor = 0
+    server.interval = interval
+    server.drop_after = drop_after
+    server.resume = threading.Event()
+    if not paused:
+        server.resume.set()
+    server.stats = {"connections": 0, "subscriptions": [], "frames": 0}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"ws://127.0.0.1:{server.server_address[1]}"
+
+
+def record(url, topics, count, out):
+    """Record ``count`` topic frames from a live endpoint to JSONL."""
+    import websocket
+
+    ws = websocket.create_connection(url, timeout=30)
+    ws.send(json.dumps({"op": "subscribe", "args": topics}))
+    written = 0
+    with open(out, "w") as f:
+        while written < count:
+            msg = json.loads(ws.recv())
+            if "topic" in msg:
+                f.write(json.dumps(msg) + "\n")
+                written += 1
+    ws.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--frames", help="JSONL file with recorded frames")
+    parser.add_argument("--symbols", default="BTCUSDT")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.0)
+    parser.add_argument("--record", metavar="URL")
+    parser.add_argument("--topics", default="kline.1.BTCUSDT")
+    parser.add_argument("--out", default="frames.jsonl")
+    args = parser.parse_args()
+    if args.record:
+        n = record(args.record, args.topics.split(","), args.count, args.out)
+        print(f"recorded {n} frames to {args.out}")
+        return
+    if args.frames:
+        frames = load_frames(args.frames)
+    else:
+        start = int(time.time() * 1000) // 60_000 * 60_000
+        frames = synthetic_frames(
+            args.symbols.split(","), start, args.count
+        )
+    server, url = start_replay_server(
+        frames, args.port, interval=args.interval
+    )
+    print(f"replaying {len(frames)} frames on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
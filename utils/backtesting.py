@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from core.PositionManager import PositionManager
+from core.CandleStore import CandleSeries, CandleStore
 from core.RiskManager import RiskManager
 from strategies.UniversalStrategy import UniversalStrategy
 
@@ -9,8 +10,23 @@ Description: Full-featured backtesting engine for strategies, with robust
 trade, PnL, drawdown, and winrate logic. Docstrings and PEP8 compliance
 ensured.
 backtesting.py – silnik backtestowy
+
+Silnik jest wektorowy: sygnały liczone są kolumnowo (hook
+``generate_signals(df)`` strategii), a wyjścia SL/TP/trailing stop
+wyszukiwane na tablicach NumPy. Strategie mające tylko logikę per-bar
+(``generate_signal``) obsługiwane są ścieżką okienkową – każda świeca
+widzi co najwyżej ``signal_window`` ostatnich wierszy zamiast całej
+historii.
 """
 
+# Domyślna długość okna dla strategii bez hooka generate_signals.
+DEFAULT_SIGNAL_WINDOW = 200
+# Początkowy rozmiar fragmentu skanowanego przy szukaniu wyjścia z pozycji;
+# podwajany aż do znalezienia SL/TP, więc długie pozycje nie kosztują O(n²).
+_EXIT_SCAN_CHUNK = 64
+
+BUY, HOLD, SELL = 1, 0, -1
+
 
 def reduce_df_memory(df):
     """
@@ -27,172 +43,254 @@ def reduce_df_memory(df):
     return df
 
 
-def backtest_strategy(strategy, historical_data, initial_balance=1000):
+def load_backtest_data(symbol, interval, start=None, end=None, store=None):
     """
-    Run a backtest for a given strategy on historical OHLCV data.
+    Load historical candles for a backtest from the local CandleStore
+    (the same files run_bot keeps in sync).
     Args:
-        strategy: Strategy instance or string
-            (uses UniversalStrategy if str/None)
-        historical_data: DataFrame with OHLCV and timestamp columns
-        initial_balance: Starting balance for the simulation
+        symbol: e.g. "BTCUSDT"
+        interval: Bybit kline interval, e.g. "1", "60", "D"
+        start, end: Optional timestamp bounds in ms (inclusive)
+        store: CandleStore instance (default: CANDLE_STORE_DIR)
     Returns:
-        trades: List of executed trades
-        balance: Final balance after backtest
-        drawdown: Maximum drawdown observed
+        DataFrame with timestamp, open, high, low, close, volume columns
     """
-    if isinstance(strategy, str) or strategy is None:
-        strategy = UniversalStrategy(name=str(strategy))
-    position_manager = PositionManager()
-    risk_manager = RiskManager()
-    trades = []
-    pnl_history = []
-    balance = initial_balance
-    for i, row in historical_data.iterrows():
-        price = row["close"]
-        signal = strategy.generate_signal(historical_data.iloc[: i + 1])
-        position_status = position_manager.get_status()
-        allow, sl_price, tp_price, allocation = risk_manager.apply_risk(
-            signal,
-            price,
-            balance,
-            position_status,
+    store = store or CandleStore()
+    return store.series(symbol, interval).to_frame(start, end)
+
+
+def _signal_code(signal):
+    """Map a single strategy signal (str or dict) to BUY/SELL/HOLD."""
+    if isinstance(signal, dict):
+        signal = signal.get("type", signal.get("signal"))
+    if signal == "buy":
+        return BUY
+    if signal == "sell":
+        return SELL
+    return HOLD
+
+
+def _signal_codes(signals, n):
+    """Normalize a vectorized signal column to an int8 array of codes."""
+    arr = np.asarray(signals)
+    if arr.shape != (n,):
+        raise ValueError(
+            f"generate_signals returned shape {arr.shape}, expected ({n},)"
         )
-        if allow and signal == "buy" and position_status == "none":
-            position_manager.open_position(
-                {
-                    "symbol": "BTCUSDT",
-                    "side": "long",
-                    "entry_price": price,
-                    "timestamp": row["timestamp"],
-                    "pnl": 0,
-                }
-            )
-            trades.append(
-                {
-                    "action": "buy",
-                    "price": price,
-                    "timestamp": row["timestamp"],
-                }
-            )
-        elif position_status == "long":
-            entry_price = position_manager.positions[-1]["entry_price"]
-            if price <= sl_price or price >= tp_price:
-                pnl = price - entry_price
-                balance += pnl
-                position_manager.open_position(position_manager.positions[-1])
-                trades.append(
-                    {
-                        "action": "sell",
-                        "price": price,
-                        "timestamp": row["timestamp"],
-                        "pnl": pnl,
-                    }
-                )
-        pnl_history.append(balance)
-    drawdown = (
-        max(pnl_history) - min(pnl_history)
-        if pnl_history else 0
+    if arr.dtype.kind in "iufb":
+        return np.sign(arr).astype(np.int8)
+    if arr.dtype.kind == "O":
+        return np.fromiter(
+            (_signal_code(s) for s in arr), dtype=np.int8, count=n
+        )
+    return np.where(
+        arr == "buy", BUY, np.where(arr == "sell", SELL, HOLD)
+    ).astype(np.int8)
+
+
+def compute_signals(strategy, data, window=None):
+    """
+    Compute per-bar signal codes for ``data``.
+    Uses the strategy's vectorized ``generate_signals(df)`` hook when
+    present, otherwise calls ``generate_signal`` on a sliding window of
+    at most ``window`` rows per bar.
+    Args:
+        strategy: Strategy instance
+        data: DataFrame with OHLCV columns
+        window: Window length for the per-bar fallback
+            (default: strategy.signal_window or DEFAULT_SIGNAL_WINDOW)
+    Returns:
+        np.ndarray of int8 codes (1=buy, -1=sell, 0=hold)
+    """
+    n = len(data)
+    vectorized = getattr(strategy, "generate_signals", None)
+    if vectorized is not None:
+        return _signal_codes(vectorized(data), n)
+    if window is None:
+        window = getattr(strategy, "signal_window", DEFAULT_SIGNAL_WINDOW)
+    gen_signal = strategy.generate_signal
+    iloc = data.iloc
+    codes = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        start = i + 1 - window if i + 1 > window else 0
+        codes[i] = _signal_code(gen_signal(iloc[start: i + 1]))
+    return codes
+
+
+def _find_exit(close, start, sl_price, tp_price, trailing_pct, peak):
+    """
+    Index of the first bar >= start that hits SL, TP or the trailing stop
+    (highest close since entry * (1 - trailing_pct)); -1 if none.
+    """
+    n = close.shape[0]
+    chunk = _EXIT_SCAN_CHUNK
+    i = start
+    while i < n:
+        j = min(n, i + chunk)
+        seg = close[i:j]
+        if trailing_pct > 0:
+            run_peak = np.maximum(np.maximum.accumulate(seg), peak)
+            stop = np.maximum(sl_price, run_peak * (1 - trailing_pct))
+            peak = run_peak[-1]
+        else:
+            stop = sl_price
+        hit = (seg <= stop) | (seg >= tp_price)
+        k = int(hit.argmax())
+        if hit[k]:
+            return i + k
+        i = j
+        chunk *= 2
+    return -1
+
+
+def simulate_fills(close, signals, risk_manager):
+    """
+    Simulate long-only fills over price arrays.
+    Enters at the close of a buy bar when flat; exits on SL/TP from
+    ``risk_manager.calculate_sl_tp`` or on the trailing stop.
+    Returns:
+        (entries, exits): int arrays of bar indices; ``exits`` may be one
+        shorter than ``entries`` when the last position is still open.
+    """
+    buy_idx = np.flatnonzero(signals == BUY)
+    trailing_pct = getattr(risk_manager, "trailing_stop_pct", 0) or 0
+    entries = []
+    exits = []
+    pos = 0
+    while True:
+        b = int(np.searchsorted(buy_idx, pos))
+        if b >= buy_idx.shape[0]:
+            break
+        entry = int(buy_idx[b])
+        entry_price = float(close[entry])
+        sl_price, tp_price = risk_manager.calculate_sl_tp(entry_price)
+        entries.append(entry)
+        exit_ = _find_exit(
+            close, entry + 1, sl_price, tp_price, trailing_pct, entry_price
+        )
+        if exit_ < 0:
+            break
+        exits.append(exit_)
+        pos = exit_ + 1
+    return (
+        np.asarray(entries, dtype=np.int64),
+        np.asarray(exits, dtype=np.int64),
     )
-    return trades, balance, drawdown
 
 
-def run_backtest(strategy, data, initial_balance=1000):
+def _drawdown_break(balance, risk_manager, window=10):
     """
-    Full-featured backtest: SL/TP, latency, scoring, winrate, and trade stats.
+    First bar at which RiskManager.check_drawdown would trip on the
+    balance history (rolling window), or -1.
+    """
+    n = balance.shape[0]
+    if n == 0:
+        return -1
+    padded = np.concatenate([np.full(window - 1, balance[0]), balance])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    peak = windows.max(axis=1)
+    trough = windows.min(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak != 0, (peak - trough) / peak, 0.0)
+    tripped = np.flatnonzero(dd >= risk_manager.max_drawdown)
+    return int(tripped[0]) if tripped.shape[0] else -1
+
+
+def run_backtest(
+    strategy,
+    data,
+    initial_balance=1000,
+    risk_manager=None,
+    signal_window=None,
+):
+    """
+    Full-featured backtest: SL/TP, trailing stop, drawdown stop, winrate
+    and trade stats.
     Args:
         strategy: Strategy instance or string
             (uses UniversalStrategy if str/None)
-        data: DataFrame with OHLCV and timestamp columns
+        data: DataFrame with OHLCV and timestamp columns, or a
+            CandleSeries from core.CandleStore
         initial_balance: Starting balance for the simulation
+        risk_manager: RiskManager providing SL/TP, trailing stop and
+            max_drawdown (default: RiskManager())
+        signal_window: Window length for strategies without
+            ``generate_signals`` (see compute_signals)
     Returns:
         result: Dict with trades, final_balance, drawdown, winrate,
             avg_latency, n_trades
-    # ⬆️ optimized for performance:
-    # vectorized winrate/drawdown, minimize lookups
     """
     if isinstance(strategy, str) or strategy is None:
         strategy = UniversalStrategy(name=str(strategy))
-    position_manager = PositionManager()
-    risk_manager = RiskManager()
+    if risk_manager is None:
+        risk_manager = RiskManager()
+    if isinstance(data, CandleSeries):
+        data = data.to_frame()
+    n = len(data)
+    close = data["close"].to_numpy(dtype=np.float64) if n else np.empty(0)
+    signals = compute_signals(strategy, data, window=signal_window)
+    entries, exits = simulate_fills(close, signals, risk_manager)
+    # Saldo zmienia się tylko na świecach wyjścia (PnL = 1 jednostka).
+    pnl = close[exits] - close[entries[: exits.shape[0]]]
+    bar_pnl = np.zeros(n)
+    bar_pnl[exits] = pnl
+    balance = initial_balance + np.cumsum(bar_pnl)
+    stop = _drawdown_break(balance, risk_manager)
+    if stop >= 0:
+        balance = balance[: stop + 1]
+        keep = exits <= stop
+        exits, pnl = exits[keep], pnl[keep]
+        entries = entries[entries <= stop]
+    timestamps = (
+        data["timestamp"].to_numpy() if "timestamp" in data
+        else data.index.to_numpy()
+    )
     trades = []
-    pnl_history = []
-    balance = initial_balance
-    latency_list = []
-    get_status = position_manager.get_status
-    open_position = position_manager.open_position
-    close_position = position_manager.open_position
-    gen_signal = strategy.generate_signal
-    apply_risk = risk_manager.apply_risk
-    check_drawdown = risk_manager.check_drawdown
-    for i, row in data.iterrows():
-        price = row["close"]
-        signal = gen_signal(data.iloc[: i + 1])
-        position_status = get_status()
-        allow, sl_price, tp_price, allocation = apply_risk(
-            signal, price, balance, position_status
+    for k, entry in enumerate(entries):
+        trades.append(
+            {
+                "action": "buy",
+                "price": float(close[entry]),
+                "timestamp": timestamps[entry],
+            }
         )
-        latency = 0  # Placeholder for latency simulation
-        if allow and signal == "buy" and position_status == "none":
-            open_position(
-                {
-                    "symbol": "BTCUSDT",
-                    "side": "long",
-                    "entry_price": price,
-                    "timestamp": row["timestamp"],
-                    "pnl": 0,
-                }
-            )
+        if k < exits.shape[0]:
             trades.append(
                 {
-                    "action": "buy",
-                    "price": price,
-                    "timestamp": row["timestamp"],
+                    "action": "sell",
+                    "price": float(close[exits[k]]),
+                    "timestamp": timestamps[exits[k]],
+                    "pnl": float(pnl[k]),
                 }
             )
-        elif position_status == "long":
-            entry_price = position_manager.positions[-1]["entry_price"]
-            if price <= sl_price or price >= tp_price:
-                pnl = price - entry_price
-                balance += pnl
-                close_position(position_manager.positions[-1])
-                trades.append(
-                    {
-                        "action": "sell",
-                        "price": price,
-                        "timestamp": row["timestamp"],
-                        "pnl": pnl,
-                    }
-                )
-        pnl_history.append(balance)
-        latency_list.append(latency)
-        if check_drawdown(pnl_history):
-            break
-    # Vectorized winrate/drawdown calculation
-    if trades:
-        trades_df = pd.DataFrame(trades)
-        sell_trades = trades_df[trades_df["action"] == "sell"]
-        n_trades = len(sell_trades)
-        wins = (
-            (sell_trades["pnl"] > 0).sum() if "pnl" in sell_trades else 0
-        )
-        winrate = wins / n_trades if n_trades > 0 else 0.0
-    else:
-        n_trades = 0
-        winrate = 0.0
-    drawdown = (
-        max(pnl_history) - min(pnl_history)
-        if pnl_history else 0
-    )
-    avg_latency = (
-        sum(latency_list) / len(latency_list)
-        if latency_list else 0.0
+    n_trades = int(exits.shape[0])
+    winrate = float((pnl > 0).sum()) / n_trades if n_trades > 0 else 0.0
+    drawdown = float(balance.max() - balance.min()) if balance.size else 0
+    final_balance = (
+        float(balance[-1]) if balance.size else initial_balance
     )
-    result = {
+    return {
         "trades": trades,
-        "final_balance": balance,
+        "final_balance": final_balance,
         "drawdown": drawdown,
         "winrate": winrate,
-        "avg_latency": avg_latency,
+        "avg_latency": 0.0,
         "n_trades": n_trades,
     }
-    return result
+
+
+def backtest_strategy(strategy, historical_data, initial_balance=1000):
+    """
+    Run a backtest for a given strategy on historical OHLCV data.
+    Args:
+        strategy: Strategy instance or string
+            (uses UniversalStrategy if str/None)
+        historical_data: DataFrame with OHLCV and timestamp columns
+        initial_balance: Starting balance for the simulation
+    Returns:
+        trades: List of executed trades
+        balance: Final balance after backtest
+        drawdown: Maximum drawdown observed
+    """
+    result = run_backtest(strategy, historical_data, initial_balance)
+    return result["trades"], result["final_balance"], result["drawdown"]